@@ -2,8 +2,33 @@
 Main API router - includes all endpoint routers
 """
 
+import importlib
+
 from fastapi import APIRouter
-from app.api.v1.endpoints import competitors, monitoring, users, auth, youtube, user_preferences, social_media, content_planning, self_optimization, ai_insights, roi, roi_updates, pdf_conversion, drafts
+from app.core.config import settings
+
+# (endpoint module, prefix, tags) for every router under /api/v1
+ENDPOINT_ROUTERS = [
+    ("auth", "/auth", ["authentication"]),
+    ("users", "/users", ["users"]),
+    ("competitors", "/competitors", ["competitors"]),
+    ("monitoring", "/monitoring", ["monitoring"]),
+    ("youtube", "/youtube", ["youtube"]),
+    ("user_preferences", "/user-preferences", ["user-preferences"]),
+    ("social_media", "/social-media", ["social-media"]),
+    ("content_planning", "/content-planning", ["content-planning"]),
+    ("self_optimization", "/self-optimization", ["self-optimization"]),
+    ("ai_insights", "/ai-insights", ["ai-insights"]),
+    ("roi", "/roi", ["roi"]),
+    ("roi_updates", "/roi-updates", ["roi-updates"]),
+    ("pdf_conversion", "/pdf", ["pdf"]),
+    ("drafts", "/drafts", ["drafts"]),
+]
+
+
+def import_endpoint_router(module_name: str) -> APIRouter:
+    return importlib.import_module(f"app.api.v1.endpoints.{module_name}").router
+
 
 api_router = APIRouter()
 
@@ -13,18 +38,8 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "Backend is running"}
 
-# Include all endpoint routers
-api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(competitors.router, prefix="/competitors", tags=["competitors"])
-api_router.include_router(monitoring.router, prefix="/monitoring", tags=["monitoring"])
-api_router.include_router(youtube.router, prefix="/youtube", tags=["youtube"])
-api_router.include_router(user_preferences.router, prefix="/user-preferences", tags=["user-preferences"])
-api_router.include_router(social_media.router, prefix="/social-media", tags=["social-media"])
-api_router.include_router(content_planning.router, prefix="/content-planning", tags=["content-planning"])
-api_router.include_router(self_optimization.router, prefix="/self-optimization", tags=["self-optimization"])
-api_router.include_router(ai_insights.router, prefix="/ai-insights", tags=["ai-insights"])
-api_router.include_router(roi.router, prefix="/roi", tags=["roi"])
-api_router.include_router(roi_updates.router, prefix="/roi-updates", tags=["roi-updates"])
-api_router.include_router(pdf_conversion.router, prefix="/pdf", tags=["pdf"])
-api_router.include_router(drafts.router, prefix="/drafts", tags=["drafts"])
+# Include all endpoint routers (with LAZY_STARTUP they are mounted on first use instead,
+# see app/api/v1/lazy.py)
+if not settings.LAZY_STARTUP:
+    for module_name, prefix, tags in ENDPOINT_ROUTERS:
+        api_router.include_router(import_endpoint_router(module_name), prefix=prefix, tags=tags)
@@ -4,13 +4,17 @@ Follows the same pattern as other endpoints in the app
 """
 
 from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from datetime import datetime, timezone
+import asyncio
+import json
 import logging
 
 from app.services.content_planning.core_service import ContentPlanningService
 from app.services.content_planning.text_to_image.image import image_service
 from app.services.content_planning.models import (
-    ContentGenerationRequest, ContentGenerationResponse,
+    ContentGenerationRequest, ContentGenerationResponse, ContentVariationsRequest,
     CompetitorAnalysisRequest, CompetitorAnalysisResponse,
     HashtagResearchRequest, HashtagResearchResponse,
     ContentStrategyRequest, ContentStrategyResponse,
@@ -58,6 +62,106 @@ async def generate_content(request: ContentGenerationRequest) -> ContentGenerati
         )
 
 
+def _sse_event(event: str, payload: dict) -> str:
+    data = json.dumps({"event": event, "payload": payload, "ts": datetime.now(timezone.utc).isoformat()}, default=str)
+    return f"data: {data}\n\n"
+
+
+def _stream_pipeline(run, response_model, error_prefix: str) -> StreamingResponse:
+    """
+    Run a service call in the background and stream it as server-sent events:
+    "started" immediately, then "progress"/"token" events reported by the pipeline,
+    and finally "result" with the same payload as the blocking endpoint's response model
+    """
+    async def _event_stream():
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def progress(event: str, payload: dict):
+            queue.put_nowait((event, payload))
+        
+        async def _runner():
+            try:
+                return await run(progress)
+            finally:
+                queue.put_nowait(None)
+        
+        task = asyncio.create_task(_runner())
+        try:
+            yield _sse_event("started", {})
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield _sse_event(*item)
+            
+            result = response_model(**task.result())
+            yield _sse_event("result", result.model_dump())
+        except Exception as e:
+            logger.error(f"❌ {error_prefix}: {str(e)}")
+            yield _sse_event("error", {"success": False, "error": f"{error_prefix}: {str(e)}"})
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(_event_stream(), media_type="text/event-stream")
+
+
+@router.post("/generate-content/stream")
+async def stream_generate_content(request: ContentGenerationRequest):
+    """
+    Streaming variant of /generate-content: progress and partial LLM output as
+    server-sent events, ending with a ContentGenerationResponse payload
+    """
+    logger.info(f"📝 Streaming content generation request for {request.platform} for Clerk ID: {request.clerk_id}")
+    
+    return _stream_pipeline(
+        lambda progress: content_planning_service.generate_content(
+            clerk_id=request.clerk_id,
+            platform=request.platform,
+            content_type=request.content_type,
+            tone=request.tone,
+            target_audience=request.target_audience,
+            custom_requirements=request.custom_requirements,
+            generate_variations=request.generate_variations,
+            industry=request.industry,
+            progress=progress
+        ),
+        ContentGenerationResponse,
+        "Content generation failed"
+    )
+
+
+@router.post("/generate-variations/stream")
+async def stream_content_variations(request: ContentVariationsRequest):
+    """
+    Generate content variations for several tones and platforms in one batched LLM call,
+    streamed as server-sent events: one "variation" event per parsed variation, then "done"
+    """
+    logger.info(f"📝 Variation stream request for {request.platforms} for Clerk ID: {request.clerk_id}")
+    
+    async def _event_stream():
+        count = 0
+        try:
+            async for variation in content_planning_service.stream_content_variations(
+                clerk_id=request.clerk_id,
+                platforms=request.platforms,
+                content_type=request.content_type,
+                target_audience=request.target_audience,
+                tones=request.tones,
+                variation_count=request.variation_count,
+                custom_requirements=request.custom_requirements,
+                industry=request.industry
+            ):
+                count += 1
+                yield _sse_event("variation", variation)
+            yield _sse_event("done", {"success": True, "variation_count": count})
+        except Exception as e:
+            logger.error(f"❌ Variation stream error: {str(e)}")
+            yield _sse_event("error", {"success": False, "error": f"Variation generation failed: {str(e)}"})
+    
+    return StreamingResponse(_event_stream(), media_type="text/event-stream")
+
+
 @router.post("/save-content-suggestion")
 async def save_content_suggestion(
     request: dict
@@ -387,7 +491,8 @@ async def analyze_competitors(request: CompetitorAnalysisRequest) -> CompetitorA
             industry=request.industry,
             competitor_ids=request.competitor_ids,
             analysis_type=request.analysis_type,
-            time_period=request.time_period
+            time_period=request.time_period,
+            clerk_id=request.clerk_id
         )
         
         return CompetitorAnalysisResponse(**result)
@@ -400,6 +505,27 @@ async def analyze_competitors(request: CompetitorAnalysisRequest) -> CompetitorA
         )
 
 
+@router.post("/analyze-competitors/stream")
+async def stream_analyze_competitors(request: CompetitorAnalysisRequest):
+    """
+    Streaming variant of /analyze-competitors, ending with a CompetitorAnalysisResponse payload
+    """
+    logger.info(f"🔍 Streaming competitor analysis request for Clerk ID: {request.clerk_id}")
+    
+    return _stream_pipeline(
+        lambda progress: content_planning_service.analyze_competitors(
+            industry=request.industry,
+            competitor_ids=request.competitor_ids,
+            analysis_type=request.analysis_type,
+            time_period=request.time_period,
+            clerk_id=request.clerk_id,
+            progress=progress
+        ),
+        CompetitorAnalysisResponse,
+        "Competitor analysis failed"
+    )
+
+
 @router.post("/research-hashtags", response_model=HashtagResearchResponse)
 async def research_hashtags(request: HashtagResearchRequest) -> HashtagResearchResponse:
     """
@@ -438,7 +564,8 @@ async def generate_content_strategy(request: ContentStrategyRequest) -> ContentS
             clerk_id=request.clerk_id,
             platforms=request.platforms,
             content_goals=request.content_goals,
-            target_audience=request.target_audience
+            target_audience=request.target_audience,
+            industry=request.industry
         )
         
         return ContentStrategyResponse(**result)
@@ -451,6 +578,27 @@ async def generate_content_strategy(request: ContentStrategyRequest) -> ContentS
         )
 
 
+@router.post("/generate-strategy/stream")
+async def stream_generate_content_strategy(request: ContentStrategyRequest):
+    """
+    Streaming variant of /generate-strategy, ending with a ContentStrategyResponse payload
+    """
+    logger.info(f"📋 Streaming content strategy request for Clerk ID: {request.clerk_id}")
+    
+    return _stream_pipeline(
+        lambda progress: content_planning_service.generate_content_strategy(
+            clerk_id=request.clerk_id,
+            platforms=request.platforms,
+            content_goals=request.content_goals,
+            target_audience=request.target_audience,
+            progress=progress,
+            industry=request.industry
+        ),
+        ContentStrategyResponse,
+        "Strategy generation failed"
+    )
+
+
 @router.post("/generate-calendar", response_model=ContentCalendarResponse)
 async def generate_content_calendar(request: ContentCalendarRequest) -> ContentCalendarResponse:
     """
@@ -582,6 +730,17 @@ async def get_supported_options() -> SupportedOptionsResponse:
         )
 
 
+@router.get("/generation-cache/stats")
+async def get_generation_cache_stats():
+    """
+    Hit rate and latency of the content generation result cache
+    """
+    return {
+        "success": True,
+        "stats": content_planning_service.get_generation_cache_stats()
+    }
+
+
 @router.post("/approve-to-draft")
 async def approve_content_to_draft(
     suggestion_id: str = Query(..., description="The ID of the content suggestion to approve"),
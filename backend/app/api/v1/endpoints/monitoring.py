@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import List, Optional
 from app.core.database import get_db
 from app.core.auth_utils import get_user_id_from_header
-from app.schemas.monitoring import MonitoringDataResponse, MonitoringAlertResponse
+from app.schemas.monitoring import (
+    MonitoringDataResponse, MonitoringAlertResponse, MonitoringFeedItem, MonitoringFeedResponse
+)
 from app.core.supabase_client import SupabaseClient
 from app.services.monitoring.orchestrator import SimpleMonitoringService
 import logging
@@ -18,28 +20,42 @@ router = APIRouter()
 # Initialize monitoring service
 monitoring_service = SimpleMonitoringService()
 
+@router.get("/feed", response_model=MonitoringFeedResponse)
+async def get_monitoring_feed(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    platform: Optional[str] = Query(None),
+    competitor_id: Optional[str] = Query(None),
+    user_id: str = Depends(get_user_id_from_header),
+    db: SupabaseClient = Depends(get_db)
+):
+    """Cursor-paginated monitoring data across all of the user's competitors, newest first"""
+    try:
+        page = await db.get_monitoring_feed(
+            user_id, limit=limit, cursor=cursor, platform=platform, competitor_id=competitor_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MonitoringFeedResponse(
+        items=[MonitoringFeedItem.model_validate(data) for data in page["items"]],
+        next_cursor=page["next_cursor"],
+        has_more=page["next_cursor"] is not None
+    )
+
 @router.get("/data", response_model=List[MonitoringDataResponse])
 async def get_all_monitoring_data(
     limit: int = Query(100, ge=1, le=1000),
+    platform: Optional[str] = Query(None),
+    competitor_id: Optional[str] = Query(None),
     user_id: str = Depends(get_user_id_from_header),
     db: SupabaseClient = Depends(get_db)
 ):
-    """Get all monitoring data for the authenticated user"""
+    """Get all monitoring data for the authenticated user (first page of /feed, every column)"""
     try:
-        # Get all competitors for the user
-        competitors = await db.get_competitors_by_user(user_id)
-        
-        # Collect monitoring data from all competitors
-        all_monitoring_data = []
-        for competitor in competitors:
-            competitor_data = await db.get_monitoring_data_by_competitor(competitor["id"], limit=limit)
-            all_monitoring_data.extend(competitor_data)
-        
-        # Sort by detected_at (most recent first) and limit results
-        all_monitoring_data.sort(key=lambda x: x.get("detected_at", ""), reverse=True)
-        all_monitoring_data = all_monitoring_data[:limit]
-        
-        return [MonitoringDataResponse.model_validate(data) for data in all_monitoring_data]
+        page = await db.get_monitoring_feed(
+            user_id, limit=limit, platform=platform, competitor_id=competitor_id, columns="*"
+        )
+        return [MonitoringDataResponse.model_validate(data) for data in page["items"]]
     except Exception as e:
         logger.error(f"Error getting all monitoring data: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get monitoring data: {str(e)}")
@@ -47,11 +63,15 @@ async def get_all_monitoring_data(
 @router.get("/monitoring-data", response_model=List[MonitoringDataResponse])
 async def get_all_monitoring_data_alias(
     limit: int = Query(100, ge=1, le=1000),
+    platform: Optional[str] = Query(None),
+    competitor_id: Optional[str] = Query(None),
     user_id: str = Depends(get_user_id_from_header),
     db: SupabaseClient = Depends(get_db)
 ):
     """Alias endpoint for /data to match frontend expectations"""
-    return await get_all_monitoring_data(limit=limit, user_id=user_id, db=db)
+    return await get_all_monitoring_data(
+        limit=limit, platform=platform, competitor_id=competitor_id, user_id=user_id, db=db
+    )
 
 @router.get("/data/{competitor_id}", response_model=List[MonitoringDataResponse])
 async def get_monitoring_data(
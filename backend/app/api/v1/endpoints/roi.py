@@ -8,32 +8,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta, timezone
 import os
+import logging
 from app.core.database import get_db
 from app.core.supabase_client import supabase_client
 import importlib.util as _ils
 
-# Check for critical dependencies
-print("🔍 Checking critical dependencies...")
-try:
-    import psycopg2
-    print("✅ psycopg2 available")
-except ImportError:
-    print("❌ psycopg2 NOT available - this could cause database issues")
-
-try:
-    import sqlalchemy
-    print("✅ SQLAlchemy available")
-except ImportError:
-    print("❌ SQLAlchemy NOT available - this could cause database issues")
-
-try:
-    import supabase
-    print("✅ Supabase Python client available")
-except ImportError:
-    print("❌ Supabase Python client NOT available - this could cause Supabase issues")
+logger = logging.getLogger(__name__)
 
-print(f"🔍 Current working directory: {os.getcwd()}")
-print(f"🔍 Supabase client type: {type(supabase_client)}")
+# Optional database drivers reported by /roi/test (checked without importing them, so
+# this module stays cheap to import)
+CRITICAL_DEPENDENCIES = ["psycopg2", "sqlalchemy", "supabase"]
 
 router = APIRouter()
 
@@ -41,20 +25,20 @@ router = APIRouter()
 async def test_endpoint():
     """Simple test endpoint to verify basic functionality"""
     try:
-        print("🧪 Test endpoint called")
+        logger.debug("🧪 Test endpoint called")
         
         # Test basic imports
-        print("✅ Basic imports working")
+        logger.debug("✅ Basic imports working")
         
         # Test datetime functionality
         now = datetime.now(timezone.utc)
-        print(f"✅ Datetime working: {now}")
+        logger.debug("✅ Datetime working: %s", now)
         
         # Test Supabase client
-        print(f"✅ Supabase client available: {type(supabase_client)}")
+        logger.debug("✅ Supabase client available: %s", type(supabase_client))
         
         # Test Supabase connection
-        print("🔍 Testing Supabase connection...")
+        logger.debug("🔍 Testing Supabase connection...")
         from app.core.supabase_client import test_supabase_connection
         connection_success = await test_supabase_connection()
         
@@ -63,10 +47,11 @@ async def test_endpoint():
             "message": "Basic functionality working",
             "timestamp": now.isoformat(),
             "supabase_client_type": str(type(supabase_client)),
-            "supabase_connection": "success" if connection_success else "failed"
+            "supabase_connection": "success" if connection_success else "failed",
+            "dependencies": {name: _ils.find_spec(name) is not None for name in CRITICAL_DEPENDENCIES}
         }
     except Exception as e:
-        print(f"❌ Test endpoint failed: {e}")
+        logger.error("❌ Test endpoint failed: %s", e)
         import traceback
         traceback.print_exc()
         return {
@@ -153,9 +138,9 @@ async def get_campaign_markers(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Campaigns endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Campaigns endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Build query params - include user_id filter only if provided
         query_params = {
@@ -168,8 +153,8 @@ async def get_campaign_markers(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to query campaigns table - NO DATE FILTERING
-        print(f"🔍 Campaigns query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Campaigns query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -181,7 +166,7 @@ async def get_campaign_markers(
             raise HTTPException(status_code=500, detail="Failed to fetch campaigns data")
             
         rows = response.json()
-        print(f"📊 Campaigns rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Campaigns rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -200,9 +185,9 @@ async def get_overview(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Overview endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Overview endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Create cache key - use 'all' if no user_id provided
         cache_user = user_id or "all"
@@ -226,8 +211,8 @@ async def get_overview(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get overview data - NO DATE FILTERING
-        print(f"🔍 Overview query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Overview query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -239,7 +224,7 @@ async def get_overview(
             raise HTTPException(status_code=500, detail="Failed to fetch overview data")
             
         rows = response.json()
-        print(f"📊 Overview rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Overview rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -261,9 +246,9 @@ async def get_revenue_by_source(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Revenue by Source endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Revenue by Source endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Mark as active only if user_id provided
         if user_id:
@@ -281,8 +266,8 @@ async def get_revenue_by_source(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get revenue by source data - NO DATE FILTERING
-        print(f"🔍 Revenue by Source query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Revenue by Source query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -294,15 +279,15 @@ async def get_revenue_by_source(
             raise HTTPException(status_code=500, detail="Failed to fetch revenue by source data")
             
         rows = response.json()
-        print(f"📊 Revenue by Source rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Revenue by Source rows returned: %s (ALL data)", len(rows))
         
         # Add detailed logging for debugging
         if len(rows) > 0:
-            print(f"📊 Sample row data: {rows[0]}")
-            print(f"📊 Platform values found: {list(set(row.get('platform', 'unknown') for row in rows))}")
+            logger.debug("📊 Sample row data: %s", rows[0])
+            logger.debug("📊 Platform values found: %s", sorted({row.get('platform', 'unknown') for row in rows}))
         else:
-            print("❌ No rows returned from Supabase query")
-            print(f"🔍 Query params used: {query_params}")
+            logger.error("❌ No rows returned from Supabase query")
+            logger.debug("🔍 Query params used: %s", query_params)
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -321,9 +306,9 @@ async def get_revenue_trends(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Revenue Trends endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Revenue Trends endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Mark as active only if user_id provided
         if user_id:
@@ -341,8 +326,8 @@ async def get_revenue_trends(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get revenue trends data - NO DATE FILTERING
-        print(f"🔍 Revenue Trends query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Revenue Trends query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -354,7 +339,7 @@ async def get_revenue_trends(
             raise HTTPException(status_code=500, detail="Failed to fetch revenue trends data")
             
         rows = response.json()
-        print(f"📊 Revenue Trends rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Revenue Trends rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -373,9 +358,9 @@ async def get_cost_breakdown(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Cost Breakdown endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Cost Breakdown endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Build query params - include user_id filter only if provided
         query_params = {
@@ -388,8 +373,8 @@ async def get_cost_breakdown(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get cost breakdown data - NO DATE FILTERING
-        print(f"🔍 Cost Breakdown query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Cost Breakdown query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -401,7 +386,7 @@ async def get_cost_breakdown(
             raise HTTPException(status_code=500, detail="Failed to fetch cost breakdown data")
             
         rows = response.json()
-        print(f"📊 Cost Breakdown rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Cost Breakdown rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -436,7 +421,7 @@ async def get_monthly_spend_trends(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get monthly spend trends data
-        print(f"🔍 Monthly Spend Trends query params: {query_params}")
+        logger.debug("🔍 Monthly Spend Trends query params: %s", query_params)
         response = await supabase_client._make_request(
             "GET",
             "roi_metrics",
@@ -474,9 +459,9 @@ async def get_clv(
     db = Depends(get_db),
 ):
     try:
-        print("🚀 CLV endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 CLV endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
 
         query_params = {
             "select": "revenue_generated,ad_spend,views,clicks",
@@ -494,7 +479,7 @@ async def get_clv(
             raise HTTPException(status_code=500, detail="Failed to fetch CLV data")
 
         rows = response.json()
-        print(f"📊 CLV rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 CLV rows returned: %s (ALL data)", len(rows))
 
         if rows:
             total_revenue = sum(float(r.get("revenue_generated", 0)) for r in rows)
@@ -534,9 +519,9 @@ async def get_cac(
     db = Depends(get_db),
 ):
     try:
-        print("🚀 CAC endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 CAC endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
 
         query_params = {
             "select": "ad_spend,clicks,views",
@@ -554,7 +539,7 @@ async def get_cac(
             raise HTTPException(status_code=500, detail="Failed to fetch CAC data")
 
         rows = response.json()
-        print(f"📊 CAC rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 CAC rows returned: %s (ALL data)", len(rows))
 
         if rows:
             total_spend = sum(float(r.get("ad_spend", 0)) for r in rows)
@@ -590,8 +575,8 @@ async def get_roi_trends(
     db = Depends(get_db),
 ):
     try:
-        print(f"ROI Trends endpoint called - fetching ALL data (no date filtering)")
-        print(f"User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
+        logger.debug("ROI Trends endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
         
         # Build query params - include user_id filter only if provided
         query_params = {
@@ -604,35 +589,35 @@ async def get_roi_trends(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to query roi_metrics table - NO DATE FILTERING
-        print(f"ROI Trends query params: {query_params}")
-        print(f"Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("ROI Trends query params: %s", query_params)
+        logger.debug("Fetching ALL data (frontend will handle date filtering)")
         
         try:
-            print("Attempting to make Supabase request...")
+            logger.debug("Attempting to make Supabase request...")
             response = await supabase_client._make_request(
                 "GET",
                 "roi_metrics",
                 params=query_params
             )
-            print(f"Supabase request successful - status: {response.status_code}")
+            logger.debug("Supabase request successful - status: %s", response.status_code)
         except Exception as supabase_error:
-            print(f"Supabase request failed: {type(supabase_error).__name__}: {str(supabase_error)}")
-            print(f"Error details: {supabase_error}")
+            logger.error("Supabase request failed: %s: %s", type(supabase_error).__name__, str(supabase_error))
+            logger.error("Error details: %s", supabase_error)
             raise HTTPException(status_code=500, detail=f"Supabase request failed: {str(supabase_error)}")
         
         if response.status_code != 200:
-            print(f"❌ Supabase returned non-200 status: {response.status_code}")
+            logger.error("❌ Supabase returned non-200 status: %s", response.status_code)
             raise HTTPException(status_code=500, detail="Failed to fetch ROI trends data")
             
         try:
             rows = response.json()
-            print(f"✅ Successfully parsed response JSON - rows type: {type(rows)}, length: {len(rows) if rows else 0}")
+            logger.debug("✅ Successfully parsed response JSON - rows type: %s, length: %s", type(rows), len(rows) if rows else 0)
         except Exception as json_error:
-            print(f"❌ Failed to parse response JSON: {type(json_error).__name__}: {str(json_error)}")
-            print(f"❌ Response content: {response.text if hasattr(response, 'text') else 'No text attribute'}")
+            logger.error("❌ Failed to parse response JSON: %s: %s", type(json_error).__name__, str(json_error))
+            logger.error("❌ Response content: %s", response.text if hasattr(response, 'text') else 'No text attribute')
             raise HTTPException(status_code=500, detail=f"Failed to parse response: {str(json_error)}")
         
-        print(f"📊 ROI Trends rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 ROI Trends rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -651,9 +636,9 @@ async def get_channel_performance(
     db = Depends(get_db),
 ):
     try:
-        print(f"🚀 Channel Performance endpoint called - fetching ALL data (no date filtering)")
-        print(f"👤 User ID filter: {'Yes' if user_id else 'No (fetching all data)'}")
-        print(f"📅 Range parameter received: {range}")
+        logger.debug("🚀 Channel Performance endpoint called - fetching ALL data (no date filtering)")
+        logger.debug("👤 User ID filter: %s", 'Yes' if user_id else 'No (fetching all data)')
+        logger.debug("📅 Range parameter received: %s", range)
         
         # Build query params - include user_id filter only if provided
         query_params = {
@@ -667,8 +652,8 @@ async def get_channel_performance(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get channel performance data - NO DATE FILTERING
-        print(f"🔍 Channel Performance query params: {query_params}")
-        print(f"📊 Fetching ALL data (frontend will handle date filtering)")
+        logger.debug("🔍 Channel Performance query params: %s", query_params)
+        logger.debug("📊 Fetching ALL data (frontend will handle date filtering)")
         
         response = await supabase_client._make_request(
             "GET",
@@ -680,7 +665,7 @@ async def get_channel_performance(
             raise HTTPException(status_code=500, detail="Failed to fetch channel performance data")
             
         rows = response.json()
-        print(f"📊 Channel Performance rows returned: {len(rows)} (ALL data)")
+        logger.debug("📊 Channel Performance rows returned: %s (ALL data)", len(rows))
         
         # Return ALL data - frontend will handle filtering
         # This eliminates all timestamp parsing issues!
@@ -709,7 +694,7 @@ async def export_csv(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get ROI metrics data
-        print(f"🔍 Export CSV query params: {query_params}")
+        logger.debug("🔍 Export CSV query params: %s", query_params)
         response = await supabase_client._make_request(
             "GET",
             "roi_metrics",
@@ -753,7 +738,7 @@ async def export_pdf(
             query_params["user_id"] = f"eq.{user_id}"
         
         # Use Supabase to get ROI metrics data
-        print(f"🔍 Export PDF query params: {query_params}")
+        logger.debug("🔍 Export PDF query params: %s", query_params)
         response = await supabase_client._make_request(
             "GET",
             "roi_metrics",
@@ -833,13 +818,13 @@ async def generate_ai_report(
         try:
             from app.services.roi.report_generation.roi_report_service import ROIReportService
         except ImportError as e:
-            print(f"Failed to import ROIReportService: {e}")
+            logger.error("Failed to import ROIReportService: %s", e)
             raise HTTPException(
                 status_code=500, 
                 detail="Report generation service not available. Please ensure the service modules are properly installed."
             )
         
-        print("Generating comprehensive ROI report with multiple formats...")
+        logger.debug("Generating comprehensive ROI report with multiple formats...")
         
         # Generate the report using the new service
         service = ROIReportService()
@@ -857,7 +842,7 @@ async def generate_ai_report(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in generate_ai_report: {str(e)}")
+        logger.error("Error in generate_ai_report: %s", str(e))
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"generate_ai_report failed: {str(e)}")
@@ -876,7 +861,7 @@ async def generate_html_report(
         # Import the HTML report generation service
         from app.services.roi.report_generation.roi_report_service import ROIReportService
         
-        print("Generating HTML-only ROI report...")
+        logger.debug("Generating HTML-only ROI report...")
         
         # Generate the HTML report using the service
         service = ROIReportService()
@@ -894,7 +879,7 @@ async def generate_html_report(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in generate_html_report: {str(e)}")
+        logger.error("Error in generate_html_report: %s", str(e))
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"generate_html_report failed: {str(e)}")
@@ -903,7 +888,7 @@ async def generate_html_report(
 async def _fetch_all_roi_data() -> list:
     """Fetch ALL ROI metrics data without any filtering"""
     try:
-        print("Fetching all data from roi_metrics table...")
+        logger.debug("Fetching all data from roi_metrics table...")
         
         # Query all data without any filters
         response = await supabase_client._make_request(
@@ -917,15 +902,15 @@ async def _fetch_all_roi_data() -> list:
         )
         
         if response.status_code != 200:
-            print(f"Query failed with status {response.status_code}")
+            logger.error("Query failed with status %s", response.status_code)
             return []
         
         data = response.json()
-        print(f"Retrieved {len(data)} records from roi_metrics")
+        logger.debug("Retrieved %s records from roi_metrics", len(data))
         return data
         
     except Exception as e:
-        print(f"Error in _fetch_all_roi_data: {str(e)}")
+        logger.error("Error in _fetch_all_roi_data: %s", str(e))
         return []
 
 
@@ -976,7 +961,7 @@ def _summarize_data_by_platform(data: list) -> dict:
             summary["content_categories"][content_category] += 1
             
         except Exception as e:
-            print(f"Error processing row: {e}")
+            logger.error("Error processing row: %s", e)
             continue
     
     # Calculate derived metrics
@@ -1003,7 +988,7 @@ def _summarize_data_by_platform(data: list) -> dict:
                 "roas": summary["total_revenue"] / summary["total_spend"] if summary["total_spend"] > 0 else 0
             }
         except Exception as e:
-            print(f"Error calculating metrics for platform {platform}: {e}")
+            logger.error("Error calculating metrics for platform %s: %s", platform, e)
             continue
     
     return result
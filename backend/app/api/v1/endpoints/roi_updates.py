@@ -4,39 +4,50 @@ SSE endpoints for ROI update status
 
 from __future__ import annotations
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-import asyncio
-import json
-from datetime import datetime, timezone
-
-router = APIRouter()
-
-_subscribers = set()
+from typing import Optional
 
+from app.core.event_broker import event_broker
 
-async def _event_stream():
-    queue: asyncio.Queue[str] = asyncio.Queue()
-    _subscribers.add(queue)
-    try:
-        while True:
-            data = await queue.get()
-            yield f"data: {data}\n\n"
-    finally:
-        _subscribers.discard(queue)
+router = APIRouter()
 
 
 def publish_status(event: str, payload: dict):
-    data = json.dumps({"event": event, "payload": payload, "ts": datetime.now(timezone.utc).isoformat()})
-    for q in list(_subscribers):
-        try:
-            q.put_nowait(data)
-        except Exception:
-            pass
+    """Publish an ROI status event; events with a payload user_id only reach that user"""
+    event_broker.publish(event, payload)
 
 
 @router.get("/stream", tags=["roi-updates"])
-async def stream_updates():
-    return StreamingResponse(_event_stream(), media_type="text/event-stream")
-
-
+async def stream_updates(
+    user_id: Optional[str] = Query(default=None, description="Receive this user's updates (EventSource cannot send headers)"),
+    last_event_id: Optional[int] = Query(default=None),
+    x_user_id: Optional[str] = Header(default=None, alias="X-User-ID"),
+    last_event_id_header: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    Stream ROI updates for one user as server-sent events.
+    Reconnecting clients resume after Last-Event-ID; idle streams get a ping comment
+    every few seconds so proxies keep them open.
+    ROI updates are published per user, so a stream without a user is rejected rather
+    than left silently empty.
+    """
+    stream_user = x_user_id or user_id
+    if not stream_user:
+        raise HTTPException(status_code=400, detail="user_id query parameter or X-User-ID header is required")
+
+    resume_from = last_event_id
+    if resume_from is None and last_event_id_header and last_event_id_header.isdigit():
+        resume_from = int(last_event_id_header)
+
+    return StreamingResponse(
+        event_broker.stream(user_id=stream_user, last_event_id=resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats", tags=["roi-updates"])
+async def stream_stats():
+    """Subscriber and buffer counts of the event broker"""
+    return event_broker.stats()
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from app.core.supabase_client import supabase_client
 from app.schemas.social_media import (
@@ -18,7 +19,11 @@ import base64
 import io
 from pydantic import BaseModel
 from app.core.social_media_config import SocialMediaConfig
-from app.services.youtube_service import youtube_service
+from app.services.youtube_service import youtube_service, upload_progress
+from app.services.publishing import (
+    PublishAPIError, get_graph_client, graph_media_forwarder, graph_url, publish_job_engine
+)
+from app.services.social_insights import insights_rollup_service, insights_sync_service
 from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
@@ -141,7 +146,7 @@ async def post_to_facebook(upload_data: dict, account_data: dict) -> dict:
                 post_id = r.get("post_id") or r.get("id")
                 return {"post_id": post_id, "post_url": f"https://facebook.com/{post_id}"}
             else:
-                raise Exception(f"Facebook photo upload error: {resp.status_code} - {resp.text}")
+                raise PublishAPIError(f"Facebook photo upload error: {resp.status_code} - {resp.text}", resp.status_code)
 
         # Handle multi-image posts by uploading photos unpublished then creating feed with attached_media
         if len(image_files) > 1:
@@ -165,7 +170,7 @@ async def post_to_facebook(upload_data: dict, account_data: dict) -> dict:
                     r = resp2.json()
                     return {"post_id": r.get("id"), "post_url": f"https://facebook.com/{r.get('id')}"}
                 else:
-                    raise Exception(f"Facebook feed creation error: {resp2.status_code} - {resp2.text}")
+                    raise PublishAPIError(f"Facebook feed creation error: {resp2.status_code} - {resp2.text}", resp2.status_code)
 
         # Fallback: create a simple feed post (text + links)
         feed_url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{page_id}/feed"
@@ -185,7 +190,7 @@ async def post_to_facebook(upload_data: dict, account_data: dict) -> dict:
             result = response.json()
             return {"post_id": result.get("id"), "post_url": f"https://facebook.com/{result.get('id')}"}
         else:
-            raise Exception(f"Facebook API error: {response.status_code} - {response.text}")
+            raise PublishAPIError(f"Facebook API error: {response.status_code} - {response.text}", response.status_code)
                 
     except Exception as e:
         raise Exception(f"Failed to post to Facebook: {str(e)}")
@@ -232,9 +237,9 @@ async def post_to_instagram(upload_data: dict, account_data: dict) -> dict:
                             "post_url": f"https://instagram.com/p/{publish_result.get('id')}"
                         }
                     else:
-                        raise Exception(f"Failed to publish Instagram post: {publish_response.text}")
+                        raise PublishAPIError(f"Failed to publish Instagram post: {publish_response.text}", publish_response.status_code)
                 else:
-                    raise Exception(f"Instagram API error: {response.text}")
+                    raise PublishAPIError(f"Instagram API error: {response.text}", response.status_code)
         else:
             # Test mode - simulate successful posting
             print(f"🧪 TEST MODE: Would post to Instagram: {upload_data.get('content_text', '')[:50]}...")
@@ -277,7 +282,7 @@ async def post_to_twitter(upload_data: dict, account_data: dict) -> dict:
                     "post_url": f"https://twitter.com/user/status/{result['data']['id']}"
                 }
             else:
-                raise Exception(f"Twitter API error: {response.text}")
+                raise PublishAPIError(f"Twitter API error: {response.text}", response.status_code)
                 
     except Exception as e:
         raise Exception(f"Failed to post to Twitter: {str(e)}")
@@ -324,7 +329,7 @@ async def post_to_linkedin(upload_data: dict, account_data: dict) -> dict:
                     "post_url": f"https://linkedin.com/feed/update/{result.get('id')}"
                 }
             else:
-                raise Exception(f"LinkedIn API error: {response.text}")
+                raise PublishAPIError(f"LinkedIn API error: {response.text}", response.status_code)
                 
     except Exception as e:
         raise Exception(f"Failed to post to LinkedIn: {str(e)}")
@@ -481,7 +486,12 @@ async def publish_direct(
     media_files: List[UploadFile] = File(default=[]),
     current_user_id: str = Depends(get_user_id_from_header)
 ):
-    """Publish content directly to social media with media support"""
+    """
+    Publish content directly to social media with media support
+    
+    Media files are streamed from their spooled uploads to the Graph API rather than
+    read into memory; album photos upload concurrently under a small bound.
+    """
     try:
         # Process hashtags and combine with content
         final_content = content_text
@@ -520,162 +530,138 @@ async def publish_direct(
             media_files = [f for f in media_files if f.filename != ""]
             
             if len(media_files) == 1:
-                # Single media post
+                # Single media post, streamed from the spooled upload file
                 media_file = media_files[0]
-                file_content = await media_file.read()
                 
                 # Check if it's a video
                 if media_file.content_type and media_file.content_type.startswith('video/'):
                     # For videos, use the /videos endpoint
-                    url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{account_data['account_id']}/videos"
-                    
-                    # Create multipart form data for video upload
-                    files = {
-                        'source': (media_file.filename, file_content, media_file.content_type)
-                    }
+                    url = graph_url(account_data['account_id'], "videos")
                     data = {
                         'description': final_content,
                         'access_token': account_data['access_token']
                     }
                     
-                    async with httpx.AsyncClient(timeout=60.0) as client:
-                        response = await client.post(url, files=files, data=data)
-                        
-                        if response.status_code in (200, 201):
-                            result = response.json()
-                            return {
-                                "success": True,
-                                "message": "Video uploaded to Facebook!",
-                                "post_id": result.get("id"),
-                                "post_url": f"https://facebook.com/{result.get('id')}",
-                                "media_type": "video"
-                            }
-                        else:
-                            return {
-                                "success": False,
-                                "message": f"Facebook video upload error: {response.status_code}",
-                                "error": response.text[:200],
-                                "error_type": "facebook_video_error"
-                            }
+                    response = await graph_media_forwarder.upload(url, media_file, data, timeout=60.0)
+                    
+                    if response.status_code in (200, 201):
+                        result = response.json()
+                        return {
+                            "success": True,
+                            "message": "Video uploaded to Facebook!",
+                            "post_id": result.get("id"),
+                            "post_url": f"https://facebook.com/{result.get('id')}",
+                            "media_type": "video"
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Facebook video upload error: {response.status_code}",
+                            "error": response.text[:200],
+                            "error_type": "facebook_video_error"
+                        }
                 
                 else:
                     # For images, use the /photos endpoint
-                    url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{account_data['account_id']}/photos"
-                    
-                    files = {
-                        'source': (media_file.filename, file_content, media_file.content_type)
-                    }
+                    url = graph_url(account_data['account_id'], "photos")
                     data = {
                         'caption': final_content,
                         'access_token': account_data['access_token']
                     }
                     
-                    async with httpx.AsyncClient(timeout=30.0) as client:
-                        response = await client.post(url, files=files, data=data)
-                        
-                        if response.status_code in (200, 201):
-                            result = response.json()
-                            return {
-                                "success": True,
-                                "message": "Photo uploaded to Facebook!",
-                                "post_id": result.get("id"),
-                                "post_url": f"https://facebook.com/{result.get('id')}",
-                                "media_type": "photo"
-                            }
-                        else:
-                            return {
-                                "success": False,
-                                "message": f"Facebook photo upload error: {response.status_code}",
-                                "error": response.text[:200],
-                                "error_type": "facebook_photo_error"
-                            }
+                    response = await graph_media_forwarder.upload(url, media_file, data, timeout=30.0)
+                    
+                    if response.status_code in (200, 201):
+                        result = response.json()
+                        return {
+                            "success": True,
+                            "message": "Photo uploaded to Facebook!",
+                            "post_id": result.get("id"),
+                            "post_url": f"https://facebook.com/{result.get('id')}",
+                            "media_type": "photo"
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Facebook photo upload error: {response.status_code}",
+                            "error": response.text[:200],
+                            "error_type": "facebook_photo_error"
+                        }
             
             elif len(media_files) > 1:
                 # Multiple media files - create album
-                # First upload all photos as unpublished
-                media_fbids = []
+                # First upload all photos as unpublished, a few at a time
+                images = [
+                    f for f in media_files
+                    if f.content_type and f.content_type.startswith('image/')
+                ]
+                photo_ids = await graph_media_forwarder.upload_unpublished_photos(
+                    graph_url(account_data['account_id'], "photos"),
+                    images,
+                    account_data['access_token']
+                )
+                media_fbids = [{"media_fbid": photo_id} for photo_id in photo_ids if photo_id]
                 
-                async with httpx.AsyncClient(timeout=60.0) as client:
-                    for media_file in media_files:
-                        file_content = await media_file.read()
-                        
-                        if media_file.content_type and media_file.content_type.startswith('image/'):
-                            # Upload photo unpublished
-                            url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{account_data['account_id']}/photos"
-                            files = {
-                                'source': (media_file.filename, file_content, media_file.content_type)
-                            }
-                            data = {
-                                'published': 'false',
-                                'access_token': account_data['access_token']
-                            }
-                            
-                            response = await client.post(url, files=files, data=data)
-                            if response.status_code in (200, 201):
-                                result = response.json()
-                                media_fbids.append({"media_fbid": result.get("id")})
+                if media_fbids:
+                    # Create feed post with attached media
+                    url = graph_url(account_data['account_id'], "feed")
+                    data = {
+                        'message': final_content,
+                        'attached_media': json.dumps(media_fbids),
+                        'access_token': account_data['access_token']
+                    }
                     
-                    if media_fbids:
-                        # Create feed post with attached media
-                        url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{account_data['account_id']}/feed"
-                        data = {
-                            'message': final_content,
-                            'attached_media': json.dumps(media_fbids),
-                            'access_token': account_data['access_token']
+                    response = await get_graph_client().post(url, data=data, timeout=60.0)
+                    if response.status_code in (200, 201):
+                        result = response.json()
+                        return {
+                            "success": True,
+                            "message": f"Album with {len(media_fbids)} photos posted to Facebook!",
+                            "post_id": result.get("id"),
+                            "post_url": f"https://facebook.com/{result.get('id')}",
+                            "media_type": "album",
+                            "media_count": len(media_fbids)
                         }
-                        
-                        response = await client.post(url, data=data)
-                        if response.status_code in (200, 201):
-                            result = response.json()
-                            return {
-                                "success": True,
-                                "message": f"Album with {len(media_fbids)} photos posted to Facebook!",
-                                "post_id": result.get("id"),
-                                "post_url": f"https://facebook.com/{result.get('id')}",
-                                "media_type": "album",
-                                "media_count": len(media_fbids)
-                            }
-                        else:
-                            return {
-                                "success": False,
-                                "message": f"Facebook album creation error: {response.status_code}",
-                                "error": response.text[:200],
-                                "error_type": "facebook_album_error"
-                            }
                     else:
                         return {
                             "success": False,
-                            "message": "No valid images found for album",
-                            "error_type": "no_valid_media"
+                            "message": f"Facebook album creation error: {response.status_code}",
+                            "error": response.text[:200],
+                            "error_type": "facebook_album_error"
                         }
+                else:
+                    return {
+                        "success": False,
+                        "message": "No valid images found for album",
+                        "error_type": "no_valid_media"
+                    }
         
         else:
             # Text-only post
-            url = f"https://graph.facebook.com/{settings.META_APP_VERSION}/{account_data['account_id']}/feed"
+            url = graph_url(account_data['account_id'], "feed")
             data = {
                 "message": final_content,
                 "access_token": account_data["access_token"]
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, data=data)
-                
-                if response.status_code in (200, 201):
-                    result = response.json()
-                    return {
-                        "success": True,
-                        "message": "Text post published to Facebook!",
-                        "post_id": result.get("id"),
-                        "post_url": f"https://facebook.com/{result.get('id')}",
-                        "media_type": "text"
-                    }
-                else:
-                    return {
-                        "success": False,
-                        "message": f"Facebook API error: {response.status_code}",
-                        "error": response.text[:200],
-                        "error_type": "facebook_api_error"
-                    }
+            response = await get_graph_client().post(url, data=data)
+            
+            if response.status_code in (200, 201):
+                result = response.json()
+                return {
+                    "success": True,
+                    "message": "Text post published to Facebook!",
+                    "post_id": result.get("id"),
+                    "post_url": f"https://facebook.com/{result.get('id')}",
+                    "media_type": "text"
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": f"Facebook API error: {response.status_code}",
+                    "error": response.text[:200],
+                    "error_type": "facebook_api_error"
+                }
         
     except Exception as e:
         return {
@@ -805,29 +791,49 @@ async def post_content_now(
         if not account:
             raise HTTPException(status_code=400, detail="Account not found")
         
-        # Post to actual social media platform
-        try:
-            post_result = await post_to_social_media(upload, account, current_user_id)
-            update_data = {
-                "status": "posted",
-                "post_id": post_result.get("post_id"),
-                "post_url": post_result.get("post_url"),
-                "error_message": None
-            }
-        except Exception as e:
-            update_data = {
-                "status": "failed",
-                "error_message": str(e)
-            }
-        
-        result = await supabase_client.update_content_upload(upload_id, update_data)
-        return {"success": True, "message": "Content posted successfully!", "data": result}
+        # Publish in the background; progress is persisted on the upload row and
+        # streamed from /publish-jobs/{job_id}/stream
+        job = publish_job_engine.submit_upload(current_user_id, upload, account, post_to_social_media)
+        return {
+            "success": True,
+            "message": "Publishing started",
+            "job_id": job.job_id,
+            "status_url": f"/api/v1/social-media/publish-jobs/{job.job_id}"
+        }
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to post content: {str(e)}")
 
+@router.get("/publish-jobs/{job_id}", response_model=dict)
+async def get_publish_job(
+    job_id: str,
+    current_user_id: str = Depends(get_user_id_from_header)
+):
+    """Current status of a background publish job"""
+    job = publish_job_engine.get(job_id, current_user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Publish job not found")
+    return job.snapshot()
+
+@router.get("/publish-jobs/{job_id}/stream")
+async def stream_publish_job(
+    job_id: str,
+    current_user_id: str = Depends(get_user_id_from_header)
+):
+    """Server-sent events for a publish job: snapshot, per-target updates, job_finished"""
+    job = publish_job_engine.get(job_id, current_user_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Publish job not found")
+
+    async def _event_stream():
+        async for event in publish_job_engine.events(job):
+            data = json.dumps({**event, "ts": datetime.now(timezone.utc).isoformat()}, default=str)
+            yield f"data: {data}\n\n"
+
+    return StreamingResponse(_event_stream(), media_type="text/event-stream")
+
 # ============================================================================
 # CONTENT TEMPLATE MANAGEMENT
 # ============================================================================
@@ -954,35 +960,35 @@ async def bulk_upload_content(
     bulk_request: BulkUploadRequest,
     current_user_id: str = Depends(get_user_id_from_header)
 ):
-    """Upload the same content to multiple platforms"""
+    """
+    Upload the same content to multiple platforms
+    
+    Creates one content_uploads row per platform and publishes them concurrently in the
+    background; returns the job id immediately.
+    """
     try:
-        # TODO: Implement bulk upload logic
-        # For now, just create individual uploads
-        uploads_created = []
+        content = bulk_request.content.dict()
+        content.pop("platform", None)
+        content.pop("account_id", None)
         
-        for platform in bulk_request.platforms:
-            # Get user's account for this platform
-            accounts = await supabase_client.get_user_social_accounts(current_user_id, platform)
-            if not accounts:
-                continue
-            
-            account = accounts[0]  # Use first account for this platform
-            
-            upload_data = bulk_request.content.dict()
-            upload_data["user_id"] = current_user_id
-            upload_data["platform"] = platform
-            upload_data["account_id"] = account["id"]
-            
-            result = await supabase_client.create_content_upload(upload_data)
-            if result.get("success"):
-                uploads_created.append({"platform": platform, "status": "created"})
-            else:
-                uploads_created.append({"platform": platform, "status": "failed"})
+        job = await publish_job_engine.submit_bulk(
+            current_user_id,
+            content,
+            [platform.value for platform in bulk_request.platforms],
+            post_to_social_media,
+            schedule_strategy=bulk_request.schedule_strategy,
+            custom_schedule=bulk_request.custom_schedule
+        )
         
         return {
             "success": True,
             "message": f"Bulk upload initiated for {len(bulk_request.platforms)} platforms",
-            "uploads": uploads_created
+            "job_id": job.job_id,
+            "status_url": f"/api/v1/social-media/publish-jobs/{job.job_id}",
+            "uploads": [
+                {"platform": t.platform, "upload_id": t.upload_id, "status": t.status, "error": t.error}
+                for t in job.targets
+            ]
         }
         
     except Exception as e:
@@ -995,9 +1001,17 @@ async def upload_youtube_video_file(
     description: str = Form(...),
     tags: Optional[str] = Form(default=None),
     privacy_status: str = Form(default="private"),
+    upload_id: Optional[str] = Form(default=None),
     current_user_id: str = Depends(get_user_id_from_header)
 ):
-    """Upload video file directly to YouTube (requires YouTube account connection)"""
+    """
+    Upload video file directly to YouTube (requires YouTube account connection)
+    
+    The file is streamed in resumable chunks; progress for ``upload_id`` is served
+    at /youtube/upload-progress/{upload_id}.
+    """
+    if upload_id and upload_progress.get(current_user_id, upload_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Upload id {upload_id} is already in use")
     try:
         # Get user's YouTube account
         accounts = await supabase_client.get_user_social_accounts(current_user_id)
@@ -1022,24 +1036,23 @@ async def upload_youtube_video_file(
             except:
                 video_tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
         
-        # Read file content
-        file_content = await video_file.read()
-        
-        # Upload to YouTube using the service
-        result = await youtube_service.upload_video_from_file(
+        # Stream the spooled file to YouTube using the service
+        result = await youtube_service.upload_video_stream(
             access_token=access_token,
-            video_content=file_content,
+            video_file=video_file.file,
             title=title,
             description=description,
             tags=video_tags,
             privacy_status=privacy_status,
             content_type=video_file.content_type,
-            user_id=current_user_id
+            user_id=current_user_id,
+            upload_id=upload_id
         )
         
         if result.get("success"):
             return {
                 "success": True,
+                "upload_id": result.get("upload_id"),
                 "video_id": result.get("video_id"),
                 "video_url": result.get("video_url"),
                 "upload_status": result.get("upload_status"),
@@ -1634,151 +1647,57 @@ async def facebook_auth_callback(
 # INSIGHTS: SYNC AND READ ENDPOINTS
 # ============================================================================
 
-async def _floor_to_hour(dt: datetime) -> datetime:
-    return dt.replace(minute=0, second=0, microsecond=0)
-
-async def _fetch_facebook_page_insights(client: httpx.AsyncClient, access_token: str) -> dict:
-    try:
-        # With a Page access token, 'me' refers to the Page
-        metrics = ["page_impressions", "page_engaged_users"]
-        resp = await client.get(
-            "https://graph.facebook.com/me/insights",
-            params={"access_token": access_token, "metric": ",".join(metrics)},
-        )
-        if resp.status_code != 200:
-            return {"error": resp.text}
-        data = resp.json().get("data", [])
-        out = {}
-        for m in data:
-            key = m.get("name")
-            values = m.get("values", [])
-            if values:
-                out[key] = values[0].get("value")
-        return out
-    except Exception as e:
-        return {"error": str(e)}
-
-async def _fetch_instagram_user_insights(client: httpx.AsyncClient, ig_user_id: str, access_token: str) -> dict:
-    try:
-        metrics = ["impressions", "reach", "profile_views"]
-        resp = await client.get(
-            f"https://graph.facebook.com/{ig_user_id}/insights",
-            params={"access_token": access_token, "metric": ",".join(metrics), "period": "day"},
-        )
-        if resp.status_code != 200:
-            return {"error": resp.text}
-        data = resp.json().get("data", [])
-        out = {}
-        for m in data:
-            key = m.get("name")
-            values = m.get("values", [])
-            if values:
-                out[key] = values[0].get("value")
-        return out
-    except Exception as e:
-        return {"error": str(e)}
-
-
 @router.post("/insights/sync")
 async def sync_social_insights(current_user_id: str = Depends(get_user_id_from_header)):
-    """Sync hourly insights for the current user's connected FB/IG accounts."""
+    """
+    Sync hourly insights for the current user's connected FB/IG accounts now.
+    The background sync keeps every user's insights fresh; this forces a refresh.
+    """
     try:
-        accounts = await supabase_client.get_user_social_accounts(current_user_id)
-        if not accounts:
-            return {"success": True, "synced": {"facebook": 0, "instagram": 0}}
-
-        now = datetime.now(timezone.utc)
-        window_start = await _floor_to_hour(now)
-        window_end = window_start + timedelta(hours=1)
-
-        synced_fb = 0
-        synced_ig = 0
-
-        async with httpx.AsyncClient() as client:
-            for acc in accounts:
-                platform = acc.get("platform")
-                if platform not in ["facebook", "instagram"]:
-                    continue
-                access_token = acc.get("access_token")
-                if not access_token:
-                    continue
-
-                if platform == "facebook":
-                    metrics = await _fetch_facebook_page_insights(client, access_token)
-                    row = {
-                        "user_id": current_user_id,
-                        "platform": "facebook",
-                        "account_id": acc.get("account_id"),
-                        "period": "hour",
-                        "window_start": window_start.isoformat(),
-                        "window_end": window_end.isoformat(),
-                        "metrics": metrics,
-                        "derived": {},
-                    }
-                    try:
-                        await supabase_client.upsert_insights(row)
-                        synced_fb += 1
-                    except Exception:
-                        pass
-
-                elif platform == "instagram":
-                    ig_user_id = acc.get("account_id")
-                    metrics = await _fetch_instagram_user_insights(client, ig_user_id, access_token)
-                    row = {
-                        "user_id": current_user_id,
-                        "platform": "instagram",
-                        "account_id": ig_user_id,
-                        "period": "hour",
-                        "window_start": window_start.isoformat(),
-                        "window_end": window_end.isoformat(),
-                        "metrics": metrics,
-                        "derived": {},
-                    }
-                    try:
-                        await supabase_client.upsert_insights(row)
-                        synced_ig += 1
-                    except Exception:
-                        pass
-
+        run = await insights_sync_service.sync_user(current_user_id, force=True)
         return {
             "success": True,
-            "synced": {"facebook": synced_fb, "instagram": synced_ig},
+            "synced": run["synced"],
             "window": {
                 "period": "hour",
-                "window_start": window_start.isoformat(),
-                "window_end": window_end.isoformat(),
+                "window_start": run["window_start"],
+                "window_end": run["window_end"],
             },
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to sync insights: {str(e)}")
 
 
+@router.get("/insights/sync/status")
+async def get_insights_sync_status():
+    """Background insights sync state: last run, skipped windows, errors and sync lag."""
+    return insights_sync_service.status()
+
+
 @router.get("/insights")
 async def get_social_insights(
     platform: str,
-    period: str = Query(default="hour"),
+    period: Optional[str] = Query(default=None, description="hour, day or week; chosen from `hours` if omitted"),
     hours: int = Query(default=24),
+    account_id: Optional[str] = Query(default=None),
     current_user_id: str = Depends(get_user_id_from_header),
 ):
-    """Read recent insights for the current user (last N hours)."""
+    """
+    Read recent insights for the current user (last N hours).
+    Long spans are served from the precomputed day/week rollups; `aggregates` holds the
+    span totals and deltas against the preceding span.
+    """
     try:
-        until = datetime.now(timezone.utc)
-        since = until - timedelta(hours=hours)
-        rows = await supabase_client.get_insights(
+        if period and period not in ("hour", "day", "week"):
+            raise HTTPException(status_code=400, detail="period must be hour, day or week")
+        return await insights_rollup_service.read(
             user_id=current_user_id,
             platform=platform,
+            hours=hours,
             period=period,
-            since=since.isoformat(),
-            until=until.isoformat(),
+            account_id=account_id,
         )
-        return {
-            "platform": platform,
-            "period": period,
-            "series": [
-                {"window_start": r.get("window_start"), "metrics": r.get("metrics", {})}
-                for r in rows
-            ],
-            "aggregates": {},
-        }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to read insights: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to read insights: {str(e)}")
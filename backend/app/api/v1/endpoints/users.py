@@ -5,6 +5,7 @@ Users endpoints for managing users and user settings
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.core.database import get_db
 from app.core.auth_utils import get_user_id_from_header
+from app.core.identity_cache import identity_cache
 from app.schemas.user import UserResponse, ClerkUserData
 from app.schemas.user_settings import UserMonitoringSettingsResponse, UserMonitoringSettingsUpdate
 from app.core.supabase_client import SupabaseClient
@@ -35,6 +36,9 @@ async def sync_user_from_clerk(
             "is_active": True
         }
         
+        # Sign-in is the moment to re-read the user rather than trust a cached row
+        identity_cache.invalidate(clerk_data.id)
+        
         # Use Supabase REST API to create/update user
         result = await db.upsert_user(user_data)
         
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Query, File, UploadFile, Form
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, StreamingResponse
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
+import asyncio
 import httpx
 import os
 from urllib.parse import urlencode, parse_qs, urlparse
@@ -14,7 +15,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.core.config import settings
-from app.services.youtube_service import youtube_service
+from app.services.youtube_service import youtube_service, upload_progress
 from app.core.auth_utils import get_user_id_from_header
 
 router = APIRouter()
@@ -191,11 +192,20 @@ async def upload_video_file(
     description: str = Form(...),
     privacy_status: str = Form(default="private"),
     tags: Optional[str] = Form(default=None),
+    upload_id: Optional[str] = Form(default=None),
     current_user_id: str = Depends(get_user_id_from_header)
 ):
-    """Upload video file to YouTube"""
+    """
+    Upload video file to YouTube
+    
+    The spooled upload is streamed to YouTube in chunks with the resumable protocol.
+    Pass ``upload_id`` to follow progress via /upload-progress/{upload_id}; it must
+    not match another of the user's uploads still held in the progress registry.
+    """
     if not access_token:
         raise HTTPException(status_code=401, detail="Access token required")
+    if upload_id and upload_progress.get(current_user_id, upload_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Upload id {upload_id} is already in use")
     
     try:
         # Validate file type
@@ -210,24 +220,23 @@ async def upload_video_file(
             except:
                 video_tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
         
-        # Read file content
-        file_content = await video_file.read()
-        
-        # Upload to YouTube using the service with user_id for database recording
-        result = await youtube_service.upload_video_from_file(
+        # Stream the spooled file to YouTube with user_id for database recording
+        result = await youtube_service.upload_video_stream(
             access_token=access_token,
-            video_content=file_content,
+            video_file=video_file.file,
             title=title,
             description=description,
             tags=video_tags,
             privacy_status=privacy_status,
             content_type=video_file.content_type,
-            user_id=current_user_id
+            user_id=current_user_id,
+            upload_id=upload_id
         )
         
         if result.get("success"):
             return {
                 "status": "success",
+                "upload_id": result.get("upload_id"),
                 "video_id": result.get("video_id"),
                 "title": result.get("title"),
                 "video_url": result.get("video_url"),
@@ -243,6 +252,46 @@ async def upload_video_file(
         logger.error(f"Video file upload error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+@router.get("/upload-progress/{upload_id}")
+async def get_upload_progress(
+    upload_id: str,
+    current_user_id: str = Depends(get_user_id_from_header)
+):
+    """Current progress of a streamed video upload"""
+    progress = _get_user_upload_progress(upload_id, current_user_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return progress
+
+@router.get("/upload-progress/{upload_id}/stream")
+async def stream_upload_progress(
+    upload_id: str,
+    current_user_id: str = Depends(get_user_id_from_header)
+):
+    """Server-sent progress events for a streamed video upload until it completes or fails"""
+    if _get_user_upload_progress(upload_id, current_user_id) is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    async def _event_stream():
+        last_sent = None
+        while True:
+            progress = _get_user_upload_progress(upload_id, current_user_id)
+            if progress is None:
+                return
+            if progress["updated_at"] != last_sent:
+                last_sent = progress["updated_at"]
+                data = json.dumps({"event": "progress", "payload": progress, "ts": datetime.now(timezone.utc).isoformat()})
+                yield f"data: {data}\n\n"
+            if progress["status"] in ("completed", "failed"):
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(_event_stream(), media_type="text/event-stream")
+
+def _get_user_upload_progress(upload_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    # Entries are keyed per user, so only the uploading user can read one
+    return upload_progress.get(user_id, upload_id)
+
 @router.get("/videos")
 async def get_user_videos(access_token: str, max_results: int = 10):
     """Get user's YouTube videos"""
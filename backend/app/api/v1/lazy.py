@@ -0,0 +1,92 @@
+"""
+Lazy endpoint routers for fast cold starts
+With LAZY_STARTUP enabled, endpoint modules (and the langchain / crawl4ai /
+googleapiclient / xhtml2pdf / tavily imports behind them) are not imported at startup.
+The first request under a router's prefix imports its module in a worker thread, so
+the event loop keeps answering health checks meanwhile, and mounts the router on the
+app before the request is routed. Requesting the OpenAPI schema mounts everything.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+
+from app.api.v1.api import ENDPOINT_ROUTERS, import_endpoint_router
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRouterLoader:
+    """Mounts endpoint routers on an app the first time a request needs them"""
+
+    def __init__(self, app: FastAPI, api_prefix: str = "/api/v1", routers: List[Tuple[str, str, List[str]]] = ENDPOINT_ROUTERS):
+        self.app = app
+        self.api_prefix = api_prefix
+        self.routers = routers
+        self.loaded: Dict[str, float] = {}
+        self.failed: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def match(self, path: str) -> Optional[Tuple[str, str, List[str]]]:
+        for spec in self.routers:
+            full_prefix = self.api_prefix + spec[1]
+            if path == full_prefix or path.startswith(full_prefix + "/"):
+                return spec
+        return None
+
+    async def ensure_loaded(self, path: str) -> None:
+        if path == self.app.openapi_url:
+            await self.load_all()
+            return
+        spec = self.match(path)
+        if spec is not None:
+            await self.load(spec)
+
+    async def load(self, spec: Tuple[str, str, List[str]]) -> None:
+        module_name, prefix, tags = spec
+        if module_name in self.loaded or module_name in self.failed:
+            return
+        lock = self._locks.setdefault(module_name, asyncio.Lock())
+        async with lock:
+            if module_name in self.loaded or module_name in self.failed:
+                return
+            started = time.perf_counter()
+            try:
+                router = await asyncio.to_thread(import_endpoint_router, module_name)
+            except Exception as e:
+                # Remember the failure so every request does not retry a broken import; the
+                # prefix then answers 404 just like a router that was never registered
+                self.failed[module_name] = str(e)
+                logger.error(f"❌ Failed to load {module_name} router: {e}")
+                return
+            self.app.include_router(router, prefix=self.api_prefix + prefix, tags=tags)
+            self.app.openapi_schema = None
+            self.loaded[module_name] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"📦 Loaded {module_name} router in {self.loaded[module_name]} ms")
+
+    async def load_all(self) -> None:
+        for spec in self.routers:
+            await self.load(spec)
+
+    def status(self) -> Dict[str, object]:
+        return {
+            "loaded_ms": dict(self.loaded),
+            "failed": dict(self.failed),
+            "pending": [name for name, _, _ in self.routers if name not in self.loaded and name not in self.failed]
+        }
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that loads the router for a path before the app routes it"""
+
+    def __init__(self, app, loader: LazyRouterLoader):
+        self.app = app
+        self.loader = loader
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            await self.loader.ensure_loaded(scope["path"])
+        await self.app(scope, receive, send)
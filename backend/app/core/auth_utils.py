@@ -42,6 +42,7 @@ async def get_db_user_id(clerk_user_id: str, db) -> str:
     
     This function retrieves the database user ID for a given Clerk user ID.
     Since we're now using Supabase directly, this function is simplified.
+    Lookups are served from the identity cache (see app.core.identity_cache).
     
     Args:
         clerk_user_id: Clerk user ID
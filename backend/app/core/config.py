@@ -75,6 +75,48 @@ class Settings(BaseSettings):
     
     # Image Generation
     STABILITY_AI_API_KEY: Optional[str] = os.getenv("STABILITY_AI_API_KEY")
+
+    # Shared LLM gateway
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_PER_MODEL_CONCURRENCY: int = int(os.getenv("LLM_PER_MODEL_CONCURRENCY", "4"))
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "600"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    
+    # Background social insights sync
+    INSIGHTS_SYNC_ENABLED: bool = os.getenv("INSIGHTS_SYNC_ENABLED", "True").lower() == "true"
+    INSIGHTS_SYNC_INTERVAL_SECONDS: int = int(os.getenv("INSIGHTS_SYNC_INTERVAL_SECONDS", "600"))
+    INSIGHTS_SYNC_CONCURRENCY: int = int(os.getenv("INSIGHTS_SYNC_CONCURRENCY", "8"))
+    INSIGHTS_SYNC_GRAPH_CALLS_PER_SECOND: float = float(os.getenv("INSIGHTS_SYNC_GRAPH_CALLS_PER_SECOND", "5"))
+    
+    # Scheduled publishing: due content_uploads rows are picked up from the database
+    PUBLISH_SCHEDULER_ENABLED: bool = os.getenv("PUBLISH_SCHEDULER_ENABLED", "True").lower() == "true"
+    PUBLISH_SCHEDULER_POLL_SECONDS: int = int(os.getenv("PUBLISH_SCHEDULER_POLL_SECONDS", "60"))
+    
+    # SSE event broker: set to relay events between uvicorn workers through Redis
+    EVENT_BROKER_REDIS_URL: Optional[str] = os.getenv("EVENT_BROKER_REDIS_URL")
+    
+    # Clerk ID -> user/preferences/monitoring settings cache (TTL 0 disables it)
+    IDENTITY_CACHE_TTL_SECONDS: float = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "30"))
+    IDENTITY_CACHE_MAX_SIZE: int = int(os.getenv("IDENTITY_CACHE_MAX_SIZE", "10000"))
+    
+    # Logging (see app/core/logging_config.py): LOG_LEVELS / LOG_SAMPLING are
+    # comma-separated "logger=value" pairs, e.g. "app.core.supabase_client=DEBUG"
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json" if os.getenv("ENVIRONMENT") == "production" else "text")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_SAMPLING: str = os.getenv("LOG_SAMPLING", "")
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    
+    # Cold start: import endpoint routers on first use and boot schedulers after startup
+    LAZY_STARTUP: bool = os.getenv("LAZY_STARTUP", "False").lower() == "true"
+    
+    # ROI scheduler: writes simulated roi_metrics rows every 10 minutes, so it is opt-in
+    ROI_SCHEDULER_ENABLED: bool = os.getenv("ROI_SCHEDULER_ENABLED", "False").lower() == "true"
+    
+    # Metrics: /metrics (Prometheus) and per-dependency Server-Timing headers
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
     
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
@@ -86,6 +128,37 @@ class Settings(BaseSettings):
     # Monitoring settings
     DEFAULT_SCAN_FREQUENCY_MINUTES: int = int(os.getenv("DEFAULT_SCAN_FREQUENCY", "1440"))
     MAX_CONCURRENT_SCANS: int = int(os.getenv("MAX_CONCURRENT_SCANS", "5"))
+    ALERT_BATCH_MAX_SIZE: int = int(os.getenv("ALERT_BATCH_MAX_SIZE", "100"))  # Alerts buffered per scan before a bulk insert
+    # Monitoring state files (scan ledger, scan policy, API budget, analysis cache); STATE_DIR must be a
+    # persistent disk in production, REQUIRE_PERSISTENT_STATE makes a missing one a startup error
+    STATE_DIR: str = os.getenv("STATE_DIR", "cache")
+    REQUIRE_PERSISTENT_STATE: bool = os.getenv("REQUIRE_PERSISTENT_STATE", "False").lower() == "true"
+    # Adaptive per-platform scan intervals, bounded around each competitor's scan_frequency_minutes
+    ADAPTIVE_SCAN_ENABLED: bool = os.getenv("ADAPTIVE_SCAN_ENABLED", "True").lower() == "true"
+    ADAPTIVE_SCAN_MAX_SPEEDUP: float = float(os.getenv("ADAPTIVE_SCAN_MAX_SPEEDUP", "4"))
+    ADAPTIVE_SCAN_MAX_SLOWDOWN: float = float(os.getenv("ADAPTIVE_SCAN_MAX_SLOWDOWN", "4"))
+    SCAN_POLICY_PATH: str = os.getenv("SCAN_POLICY_PATH", os.path.join(STATE_DIR, "scan_policy.sqlite3"))
+    # Checkpoints for multi-competitor scan runs so a restart resumes instead of rescanning
+    SCAN_LEDGER_PATH: str = os.getenv("SCAN_LEDGER_PATH", os.path.join(STATE_DIR, "scan_ledger.sqlite3"))
+    SCAN_LEDGER_STALE_MINUTES: float = float(os.getenv("SCAN_LEDGER_STALE_MINUTES", "30"))
+    # Shared external API budget for the monitoring agents (rate limits and daily quotas);
+    # API_BUDGET_MANUAL_RESERVE is the share of each daily quota kept for manual scans
+    API_BUDGET_PATH: str = os.getenv("API_BUDGET_PATH", os.path.join(STATE_DIR, "api_budget.sqlite3"))
+    API_BUDGET_MANUAL_RESERVE: float = float(os.getenv("API_BUDGET_MANUAL_RESERVE", "0.2"))
+    TAVILY_REQUESTS_PER_SECOND: float = float(os.getenv("TAVILY_REQUESTS_PER_SECOND", "2"))
+    TAVILY_DAILY_CREDITS: float = float(os.getenv("TAVILY_DAILY_CREDITS", "1000"))
+    YOUTUBE_REQUESTS_PER_SECOND: float = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "5"))
+    YOUTUBE_DAILY_QUOTA_UNITS: float = float(os.getenv("YOUTUBE_DAILY_QUOTA_UNITS", "10000"))
+    GEMINI_REQUESTS_PER_MINUTE: float = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+    GEMINI_DAILY_REQUESTS: float = float(os.getenv("GEMINI_DAILY_REQUESTS", "10000"))
+    # LLM analyses reused across scans (TTL 0 disables the cache)
+    ANALYSIS_CACHE_PATH: str = os.getenv("ANALYSIS_CACHE_PATH", os.path.join(STATE_DIR, "analysis_cache.sqlite3"))
+    ANALYSIS_CACHE_TTL_HOURS: float = float(os.getenv("ANALYSIS_CACHE_TTL_HOURS", "72"))
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "20000"))
+    # Syndicated copies (estimated Jaccard >= threshold) collapse into one item per window
+    NEAR_DUPLICATE_WINDOW_HOURS: float = float(os.getenv("NEAR_DUPLICATE_WINDOW_HOURS", "48"))
+    NEAR_DUPLICATE_MAX_PER_COMPETITOR: int = int(os.getenv("NEAR_DUPLICATE_MAX_PER_COMPETITOR", "1000"))
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.6"))
     
     # Browser settings for browser-use
     BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "True").lower() == "true"
@@ -0,0 +1,300 @@
+"""
+In-process event broker for server-sent event streams
+
+- every subscriber has a bounded ring buffer; when a slow or abandoned client falls
+  behind, its oldest events are dropped (and the drop is reported to it) instead of the
+  buffer growing without limit
+- events carrying a user_id only reach that user's subscribers; events without one
+  are broadcast
+- a short history allows replay after a reconnect (SSE ``Last-Event-ID``)
+- ``publish`` is thread-safe: the ROI scheduler publishes from its own thread/loop
+- optionally relays events through Redis pub/sub so every uvicorn worker sees them
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SIZE = 256
+DEFAULT_HISTORY_SIZE = 1024
+DEFAULT_HEARTBEAT_SECONDS = 15.0
+REDIS_CHANNEL = "bos:events"
+
+
+@dataclass
+class BrokerEvent:
+    id: int
+    event: str
+    payload: Dict[str, Any]
+    user_id: Optional[str]
+    ts: str
+
+    def to_sse(self) -> str:
+        data = json.dumps({"event": self.event, "payload": self.payload, "ts": self.ts}, default=str)
+        return f"id: {self.id}\ndata: {data}\n\n"
+
+    def to_wire(self) -> str:
+        return json.dumps({
+            "id": self.id, "event": self.event, "payload": self.payload,
+            "user_id": self.user_id, "ts": self.ts
+        }, default=str)
+
+
+@dataclass(eq=False)
+class Subscription:
+    user_id: Optional[str]
+    loop: asyncio.AbstractEventLoop
+    buffer: Deque[BrokerEvent]
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    dropped: int = 0
+    delivered: int = 0
+
+    def wants(self, event: BrokerEvent) -> bool:
+        # Anonymous subscribers only see broadcast (user-less) events
+        return event.user_id is None or event.user_id == self.user_id
+
+
+def _wake_all(subs: List[Subscription]) -> None:
+    for sub in subs:
+        sub.wakeup.set()
+
+
+class EventBroker:
+    """Fan-out of published events to SSE subscribers with bounded per-subscriber buffers"""
+
+    def __init__(
+        self,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        history_size: int = DEFAULT_HISTORY_SIZE,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS
+    ):
+        self.buffer_size = buffer_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._history: Deque[BrokerEvent] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._by_user: Dict[Optional[str], Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._origin = f"{os.getpid()}-{id(self)}"
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis_task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, event: str, payload: Dict[str, Any], user_id: Optional[str] = None) -> BrokerEvent:
+        """Publish an event to local subscribers (and other workers, if Redis is configured)"""
+        if user_id is None and isinstance(payload, dict):
+            user_id = payload.get("user_id")
+        broker_event = BrokerEvent(
+            id=self._next_id(),
+            event=event,
+            payload=payload,
+            user_id=user_id,
+            ts=datetime.now(timezone.utc).isoformat()
+        )
+        self._deliver(broker_event)
+        if self._redis is not None:
+            self._relay(broker_event)
+        return broker_event
+
+    def _next_id(self) -> int:
+        # Time-based ids stay ordered across workers, so Last-Event-ID replay works
+        # whichever worker a client reconnects to
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            return self._last_id
+
+    def _deliver(self, event: BrokerEvent) -> None:
+        with self._lock:
+            self._history.append(event)
+            if event.user_id is None:
+                subscribers = list(self._subscribers)
+            else:
+                subscribers = list(self._by_user.get(event.user_id, ()))
+            for sub in subscribers:
+                if len(sub.buffer) == sub.buffer.maxlen:
+                    sub.dropped += 1
+                sub.buffer.append(event)
+
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        # Wake subscribers on other loops (e.g. publishes from the ROI scheduler thread)
+        # with one thread-safe callback per loop rather than one per subscriber
+        foreign: Dict[asyncio.AbstractEventLoop, List[Subscription]] = {}
+        for sub in subscribers:
+            if sub.loop is current_loop:
+                sub.wakeup.set()
+            else:
+                foreign.setdefault(sub.loop, []).append(sub)
+        for loop, subs in foreign.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake_all, subs)
+
+    # ------------------------------------------------------------------
+    # Subscribing
+    # ------------------------------------------------------------------
+
+    def subscribe(self, user_id: Optional[str] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """Register a subscriber; events after ``last_event_id`` are replayed from history"""
+        sub = Subscription(user_id=user_id, loop=asyncio.get_running_loop(), buffer=deque(maxlen=self.buffer_size))
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._history:
+                    if event.id > last_event_id and sub.wants(event):
+                        if len(sub.buffer) == sub.buffer.maxlen:
+                            sub.dropped += 1
+                        sub.buffer.append(event)
+            self._subscribers.add(sub)
+            self._by_user.setdefault(user_id, set()).add(sub)
+        if sub.buffer:
+            sub.wakeup.set()
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+            same_user = self._by_user.get(sub.user_id)
+            if same_user is not None:
+                same_user.discard(sub)
+                if not same_user:
+                    del self._by_user[sub.user_id]
+
+    async def stream(
+        self,
+        user_id: Optional[str] = None,
+        last_event_id: Optional[int] = None,
+        heartbeat_seconds: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """SSE-formatted stream for one client, with heartbeat comments while idle"""
+        heartbeat = heartbeat_seconds or self.heartbeat_seconds
+        sub = self.subscribe(user_id, last_event_id)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(sub.wakeup.wait(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                sub.wakeup.clear()
+                for chunk in self.drain(sub):
+                    yield chunk
+        finally:
+            self.unsubscribe(sub)
+
+    def drain(self, sub: Subscription) -> List[str]:
+        """Take everything buffered for a subscriber, reporting drops first"""
+        with self._lock:
+            events = list(sub.buffer)
+            sub.buffer.clear()
+            dropped, sub.dropped = sub.dropped, 0
+        chunks = []
+        if dropped:
+            # Tell the client it missed events so it can refetch instead of trusting the stream
+            notice = json.dumps({
+                "event": "events_dropped", "payload": {"count": dropped},
+                "ts": datetime.now(timezone.utc).isoformat()
+            })
+            chunks.append(f"data: {notice}\n\n")
+        chunks.extend(event.to_sse() for event in events)
+        sub.delivered += len(events)
+        return chunks
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "history": len(self._history),
+                "buffered": sum(len(sub.buffer) for sub in self._subscribers),
+                "backend": "redis" if self._redis is not None else "local"
+            }
+
+    # ------------------------------------------------------------------
+    # Optional cross-process relay
+    # ------------------------------------------------------------------
+
+    async def start(self, redis_url: Optional[str] = None) -> None:
+        """Relay events between workers through Redis pub/sub if a URL is given"""
+        if not redis_url or self._redis is not None:
+            return
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            logger.warning("⚠️ redis package not installed; event broker stays process-local")
+            return
+        try:
+            self._redis = redis_asyncio.from_url(redis_url)
+            await self._redis.ping()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not connect event broker to Redis ({e}); staying process-local")
+            self._redis = None
+            return
+        self._redis_loop = asyncio.get_running_loop()
+        self._redis_task = asyncio.create_task(self._listen())
+        logger.info("✅ Event broker relaying through Redis")
+
+    async def stop(self) -> None:
+        if self._redis_task:
+            self._redis_task.cancel()
+            try:
+                await self._redis_task
+            except asyncio.CancelledError:
+                pass
+            self._redis_task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def _relay(self, event: BrokerEvent) -> None:
+        message = json.dumps({"origin": self._origin, "event": event.to_wire()})
+
+        async def _publish():
+            try:
+                await self._redis.publish(REDIS_CHANNEL, message)
+            except Exception as e:
+                logger.warning(f"⚠️ Event relay to Redis failed: {e}")
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._redis_loop:
+            asyncio.create_task(_publish())
+        elif self._redis_loop is not None and not self._redis_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(_publish(), self._redis_loop)
+
+    async def _listen(self) -> None:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(REDIS_CHANNEL)
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    if data.get("origin") == self._origin:
+                        continue
+                    wire = json.loads(data["event"])
+                    with self._lock:
+                        self._last_id = max(self._last_id, wire["id"])
+                    self._deliver(BrokerEvent(**wire))
+                except Exception as e:
+                    logger.warning(f"⚠️ Ignoring malformed relayed event: {e}")
+        finally:
+            await pubsub.unsubscribe(REDIS_CHANNEL)
+
+
+event_broker = EventBroker()
@@ -0,0 +1,80 @@
+"""
+Identity cache for Clerk ID -> user resolution
+Almost every request resolves the caller from the X-User-ID (Clerk) header, and many
+then load the same user's preferences and monitoring settings. This keeps the user
+row, preferences and monitoring settings together in a bounded LRU with a short TTL,
+so a request pays at most one (combined) Supabase query for them.
+
+Entries are invalidated whenever the user, preferences or monitoring settings are
+written through SupabaseClient; the TTL bounds staleness for writes made by other
+workers.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+
+class IdentityCache:
+    """Thread-safe LRU of identity records (user, preferences, monitoring_settings) keyed by clerk_id"""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clerk_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(clerk_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, identity = entry
+            if expires_at <= time.monotonic():
+                del self._entries[clerk_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(clerk_id)
+            self.hits += 1
+            return identity
+
+    def set(self, clerk_id: str, identity: Dict[str, Any]) -> None:
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[clerk_id] = (time.monotonic() + self.ttl_seconds, identity)
+            self._entries.move_to_end(clerk_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, clerk_id: Optional[str]) -> None:
+        if not clerk_id:
+            return
+        with self._lock:
+            self._entries.pop(clerk_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+identity_cache = IdentityCache(
+    max_size=settings.IDENTITY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.IDENTITY_CACHE_TTL_SECONDS
+)
@@ -0,0 +1,179 @@
+"""
+Logging setup: structured output, per-module levels, sampling and queued writes
+
+- ``LOG_FORMAT=json`` emits one JSON object per line (``extra={...}`` fields included);
+  ``text`` keeps the classic ``time - LEVEL - message`` lines
+- ``LOG_LEVELS="app.core.supabase_client=DEBUG,roi_writer=WARNING"`` sets per-module
+  verbosity on top of ``LOG_LEVEL``
+- ``LOG_SAMPLING="app.core.supabase_client=0.01"`` keeps 1 in 100 records below WARNING
+  from high-frequency loggers (per message template); kept records carry ``sampled``
+- callers only enqueue the record; formatting (including %-style arguments) and
+  writing happen on a listener thread, so the event loop never blocks on stdout. When
+  the queue is full, records are dropped and counted instead of blocking.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Third-party loggers that are too chatty at INFO
+DEFAULT_LEVELS = {"urllib3": "WARNING", "httpx": "WARNING", "httpcore": "WARNING", "asyncio": "WARNING"}
+
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def parse_mapping(value: Optional[str]) -> Dict[str, str]:
+    """``"a=1,b.c=2"`` -> ``{"a": "1", "b.c": "2"}``"""
+    mapping = {}
+    for item in (value or "").split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            mapping[name.strip()] = setting.strip()
+    return mapping
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, any ``extra`` fields, exc"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps every Nth record (below WARNING) per logger and message template"""
+
+    MAX_KEYS = 10000
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._every: Dict[str, int] = {}
+        self._counters: Dict[tuple, int] = {}
+
+    def _every_for(self, name: str) -> int:
+        every = self._every.get(name)
+        if every is None:
+            # Longest configured prefix wins: "app.services" covers "app.services.roi"
+            rate = 1.0
+            best = -1
+            for prefix, prefix_rate in self.rates.items():
+                if (name == prefix or name.startswith(prefix + ".")) and len(prefix) > best:
+                    rate, best = prefix_rate, len(prefix)
+            every = max(1, round(1 / rate)) if rate > 0 else 0
+            self._every[name] = every
+        return every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self._every_for(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        key = (record.name, record.msg)
+        if len(self._counters) >= self.MAX_KEYS:
+            self._counters.clear()
+        count = self._counters.get(key, 0)
+        self._counters[key] = count + 1
+        if count % every:
+            return False
+        record.sampled = every
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread untouched; drops them when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, in the caller; the listener formats instead
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "text",
+    module_levels: Optional[Dict[str, str]] = None,
+    sampling: Optional[Dict[str, float]] = None,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None
+) -> None:
+    """Install the queued root handler; safe to call again (e.g. from a benchmark)"""
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    if sampling:
+        _queue_handler.addFilter(SamplingFilter(sampling))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    for name, name_level in {**DEFAULT_LEVELS, **(module_levels or {})}.items():
+        logging.getLogger(name).setLevel(name_level.upper())
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def configure_from_settings(settings) -> None:
+    configure_logging(
+        level=settings.LOG_LEVEL,
+        fmt=settings.LOG_FORMAT,
+        module_levels=parse_mapping(settings.LOG_LEVELS),
+        sampling={name: float(rate) for name, rate in parse_mapping(settings.LOG_SAMPLING).items()},
+        queue_size=settings.LOG_QUEUE_SIZE
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
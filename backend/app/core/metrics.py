@@ -0,0 +1,268 @@
+"""
+Hot-path instrumentation
+Latency histograms, error counts and payload sizes per external dependency and
+operation (Supabase REST, Gemini, Tavily, YouTube API, crawl4ai, xhtml2pdf), request
+latency per route, Prometheus text exposition for /metrics, and a ``Server-Timing``
+header that breaks each response down by dependency.
+
+    async with track("supabase", "GET users") as t:
+        response = await client.get(...)
+        t.payload_bytes = len(response.content)
+
+    @instrumented("crawl4ai", "crawl_multiprocessing")
+    def crawl(...): ...
+
+    llm = instrument_client(ChatGoogleGenerativeAI(...), "gemini", "youtube_agent", ["ainvoke"])
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Per-request dependency timings for Server-Timing: {dependency: [total_seconds, calls]}
+_request_timings: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store (the schedulers record from their own threads)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._payload: Dict[Tuple[str, str], Histogram] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._requests: Dict[Tuple[str, str, str], Histogram] = {}
+
+    def observe(
+        self,
+        dependency: str,
+        operation: str,
+        seconds: float,
+        error: bool = False,
+        payload_bytes: Optional[int] = None
+    ) -> None:
+        key = (dependency, operation)
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(LATENCY_BUCKETS)
+                self._errors[key] = 0
+            histogram.observe(seconds)
+            if error:
+                self._errors[key] += 1
+            if payload_bytes is not None:
+                sizes = self._payload.get(key)
+                if sizes is None:
+                    sizes = self._payload[key] = Histogram(SIZE_BUCKETS)
+                sizes.observe(payload_bytes)
+
+        timings = _request_timings.get()
+        if timings is not None:
+            entry = timings.setdefault(dependency, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, f"{status // 100}xx")
+        with self._lock:
+            histogram = self._requests.get(key)
+            if histogram is None:
+                histogram = self._requests[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines: List[str] = []
+        with self._lock:
+            _render_histograms(
+                lines, "bos_dependency_latency_seconds", "External call latency by dependency and operation",
+                ("dependency", "operation"), self._latency
+            )
+            lines.append("# HELP bos_dependency_errors_total Failed external calls by dependency and operation")
+            lines.append("# TYPE bos_dependency_errors_total counter")
+            for (dependency, operation), errors in sorted(self._errors.items()):
+                lines.append(f"bos_dependency_errors_total{_labels(dependency=dependency, operation=operation)} {errors}")
+            _render_histograms(
+                lines, "bos_dependency_payload_bytes", "Response/payload size by dependency and operation",
+                ("dependency", "operation"), self._payload
+            )
+            _render_histograms(
+                lines, "bos_http_request_duration_seconds", "HTTP request latency by route",
+                ("method", "route", "status"), self._requests
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._payload.clear()
+            self._errors.clear()
+            self._requests.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _render_histograms(
+    lines: List[str],
+    name: str,
+    help_text: str,
+    label_names: Tuple[str, ...],
+    histograms: Dict[Tuple[str, ...], Histogram]
+) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        labels = dict(zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(**labels, le=f'{bound:g}')} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+metrics = MetricsRegistry()
+
+
+class track:
+    """Times a block (``with`` or ``async with``); exceptions count as errors"""
+
+    __slots__ = ("dependency", "operation", "payload_bytes", "error", "_started")
+
+    def __init__(self, dependency: str, operation: str):
+        self.dependency = dependency
+        self.operation = operation
+        self.payload_bytes: Optional[int] = None
+        self.error = False
+
+    def __enter__(self) -> "track":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        metrics.observe(
+            self.dependency, self.operation, time.perf_counter() - self._started,
+            error=self.error or exc_type is not None, payload_bytes=self.payload_bytes
+        )
+        return False
+
+    async def __aenter__(self) -> "track":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return self.__exit__(exc_type, exc, tb)
+
+
+def instrumented(dependency: str, operation: Optional[str] = None):
+    """Decorator form of ``track`` for sync and async functions"""
+
+    def decorator(func):
+        op = operation or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(dependency, op):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(dependency, op):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedClient:
+    """Proxy that times the given methods of a third-party client and delegates the rest"""
+
+    def __init__(self, client: Any, dependency: str, operation_prefix: str, methods: Iterable[str]):
+        self._client = client
+        for method in methods:
+            func = getattr(client, method, None)
+            if func is not None:
+                setattr(self, method, instrumented(dependency, f"{operation_prefix}.{method}")(func))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def instrument_client(client: Any, dependency: str, operation_prefix: str, methods: Iterable[str]) -> Any:
+    if client is None:
+        return None
+    return InstrumentedClient(client, dependency, operation_prefix, methods)
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware: records request latency per route and adds a Server-Timing header
+    with the time spent in each dependency (``supabase;dur=12.3;desc="3 calls"``) plus
+    the total time until the response started (``app``)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, List[float]] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - started
+                entries = [
+                    f'{name};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+                    for name, (seconds, calls) in sorted(timings.items())
+                ]
+                entries.append(f"app;dur={elapsed * 1000:.1f}")
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", ", ".join(entries).encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            route = scope.get("route")
+            # Route templates keep the label set bounded; unmatched paths share one label
+            route_path = getattr(route, "path", None) or "unmatched"
+            metrics.observe_request(scope.get("method", ""), route_path, status, time.perf_counter() - started)
@@ -0,0 +1,109 @@
+"""
+Local SQLite state for background services (monitoring scan ledger, scan policy, API budget)
+and host-wide locks for loops that must run in a single uvicorn worker.
+The files live under STATE_DIR, which must be a persistent disk in production (see
+render.yaml): on an ephemeral container disk every deploy would start from empty state.
+With REQUIRE_PERSISTENT_STATE set, a file that cannot be opened is a startup error
+instead of a silent fallback to an in-memory database.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+from typing import IO, Callable, Optional
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows dev servers run a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def check_state_dir() -> None:
+    """Fail fast when persistent state is required but STATE_DIR is not writable"""
+    if not settings.REQUIRE_PERSISTENT_STATE:
+        return
+    try:
+        os.makedirs(settings.STATE_DIR, exist_ok=True)
+        with tempfile.TemporaryFile(dir=settings.STATE_DIR):
+            pass
+    except OSError as e:
+        raise RuntimeError(
+            f"STATE_DIR {settings.STATE_DIR!r} is not writable ({e}); mount a persistent disk there "
+            f"or unset REQUIRE_PERSISTENT_STATE"
+        ) from e
+
+
+def connect_state_db(path: str, label: str, create: Callable[[sqlite3.Connection], None],
+                     isolation_level: Optional[str] = "") -> sqlite3.Connection:
+    """Open (and create) a state database shared by all workers on the host"""
+    if path:
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=isolation_level)
+            # WAL lets readers in other workers proceed while one of them writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            create(conn)
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            if settings.REQUIRE_PERSISTENT_STATE:
+                raise RuntimeError(f"{label} file {path!r} unavailable: {e}") from e
+            logger.warning(f"⚠️ {label} file unavailable ({e}), state will not survive restarts")
+    elif settings.REQUIRE_PERSISTENT_STATE:
+        raise RuntimeError(f"{label} path is empty but REQUIRE_PERSISTENT_STATE is set")
+    conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=isolation_level)
+    create(conn)
+    return conn
+
+
+class HostLock:
+    """
+    Exclusive, non-blocking lock on STATE_DIR/<name>.lock, shared by all workers on the host.
+    The OS drops it when the holder exits, so a crashed worker never leaves it stuck.
+    """
+
+    def __init__(self, name: str):
+        self.path = os.path.join(settings.STATE_DIR, f"{name}.lock")
+        self._handle: Optional[IO] = None
+
+    def acquire(self) -> bool:
+        """True if this process now holds the lock (or locking is unavailable here)"""
+        if self._handle is not None:
+            return True
+        if fcntl is None:
+            return True
+        try:
+            os.makedirs(settings.STATE_DIR, exist_ok=True)
+            handle = open(self.path, "a")
+        except OSError as e:
+            logger.warning(f"⚠️ Lock file {self.path} unavailable ({e}), continuing without it")
+            return True
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._handle = handle
+        return True
+
+    async def wait(self, timeout: float, poll_seconds: float = 0.1) -> bool:
+        """acquire(), retrying until ``timeout`` seconds have passed"""
+        deadline = time.monotonic() + timeout
+        while not self.acquire():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(poll_seconds)
+        return True
+
+    def release(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
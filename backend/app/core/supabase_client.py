@@ -3,6 +3,8 @@ Enhanced Supabase REST API client for all database operations
 Replaces SQLAlchemy models and provides direct database access
 """
 
+import asyncio
+import base64
 import httpx
 import json
 from typing import Optional, List, Dict, Any, Union
@@ -12,26 +14,58 @@ import logging
 import uuid
 from dotenv import load_dotenv
 
+from app.core.identity_cache import identity_cache
+from app.core.metrics import track
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Columns the /feed list view renders (MonitoringDataResponse without the hash bookkeeping);
+# the legacy /data endpoints select every column (the dashboard details show the hashes)
+MONITORING_FEED_COLUMNS = (
+    "id,competitor_id,platform,post_id,post_url,content_text,media_urls,engagement_metrics,"
+    "author_username,author_display_name,author_avatar_url,post_type,language,sentiment_score,"
+    "posted_at,detected_at,is_new_post,is_content_change"
+)
+
+
+def encode_feed_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the last row of a feed page: (detected_at, id)"""
+    raw = json.dumps([row["detected_at"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_feed_cursor(cursor: str) -> tuple:
+    """
+    Raises ValueError for a malformed cursor. The values end up in a PostgREST or=
+    expression, so they are returned re-serialized from a parsed timestamp and UUID.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        detected_at, row_id = json.loads(raw)
+        detected_at = datetime.fromisoformat(detected_at.replace("Z", "+00:00")).isoformat()
+        row_id = str(uuid.UUID(row_id))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return detected_at, row_id
+
+
 class SupabaseClient:
     """Enhanced client for Supabase REST API operations"""
     
     def __init__(self):
-        print("🔍 Initializing SupabaseClient...")
+        logger.debug("🔍 Initializing SupabaseClient...")
         self.supabase_url = os.getenv("SUPABASE_URL")
         self.supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
         
-        print(f"🔍 Loaded SUPABASE_URL: {self.supabase_url}")
-        print(f"🔍 Loaded SUPABASE_SERVICE_ROLE_KEY: {self.supabase_key[:20] if self.supabase_key else 'None'}...")
+        logger.debug(f"🔍 Loaded SUPABASE_URL: {self.supabase_url}")
         
         if not self.supabase_url or not self.supabase_key:
-            print("❌ Missing environment variables!")
+            logger.error("❌ Missing environment variables!")
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
             
-        print("✅ Environment variables loaded successfully")
+        logger.debug("✅ Environment variables loaded successfully")
         
         self.headers = {
             "apikey": self.supabase_key,
@@ -41,55 +75,132 @@ class SupabaseClient:
             "Prefer": "resolution=merge-duplicates,return=representation",
             "Prefer": "return=representation",
         }
+        # Cleared if the schema has no relationship to embed preferences/settings in users
+        self._identity_embedding = True
+        # Cleared if monitoring_data cannot be inner-joined to competitors (no foreign key)
+        self._feed_embedding = True
         
-        print("✅ SupabaseClient initialized successfully")
+        logger.debug("✅ SupabaseClient initialized successfully")
 
-    async def _make_request(self, method: str, endpoint: str, data: Optional[Dict] = None, params: Optional[Dict] = None):
-        """Make HTTP request to Supabase REST API"""
+    async def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Union[Dict, List[Dict]]] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """Make HTTP request to Supabase REST API (``headers`` override the defaults)"""
         # Fix: Use correct Supabase REST API structure
         # For table queries, endpoint should be the table name directly
         url = f"{self.supabase_url}/rest/v1/{endpoint}"
         
-        # Add debug logging to see what URL is being called
-        logger.info(f"🔍 Making {method} request to: {url}")
-        if data:
-            logger.info(f"📤 Request data: {data}")
-        if params:
-            logger.info(f"🔍 Request params: {params}")
-
-        async with httpx.AsyncClient() as client:
+        # Lazy %-formatting: nothing is rendered unless this logger is at DEBUG
+        logger.debug("🔍 Supabase %s %s params=%s", method, endpoint, params)
+
+        request_headers = {**self.headers, **headers} if headers else self.headers
+
+        timing = track("supabase", f"{method.upper()} {endpoint.split('?')[0]}")
+        async with httpx.AsyncClient() as client, timing:
             try:
                 if method.upper() == "GET":
-                    response = await client.get(url, headers=self.headers, params=params)
+                    response = await client.get(url, headers=request_headers, params=params)
                 elif method.upper() == "POST":
-                    response = await client.post(url, headers=self.headers, json=data, params=params)
+                    response = await client.post(url, headers=request_headers, json=data, params=params)
                 elif method.upper() == "PATCH":
-                    response = await client.patch(url, headers=self.headers, json=data, params=params)
+                    response = await client.patch(url, headers=request_headers, json=data, params=params)
                 elif method.upper() == "DELETE":
-                    response = await client.delete(url, headers=self.headers, params=params)
+                    response = await client.delete(url, headers=request_headers, params=params)
                 else:
                     raise ValueError(f"Unsupported HTTP method: {method}")
 
-                logger.info(f"📥 Response status: {response.status_code}")
+                logger.debug("📥 Supabase %s %s -> %s", method, endpoint, response.status_code)
+                timing.payload_bytes = len(response.content)
+                timing.error = response.status_code >= 400
                 
                 if response.status_code == 422:
                     error_content = response.text
-                    logger.error(f"❌ 422 Validation Error for {method} {endpoint}: {error_content}")
+                    logger.error("❌ 422 Validation Error for %s %s: %.500s", method, endpoint, error_content)
                     response.error_content = error_content
                 elif response.status_code >= 400:
-                    logger.error(f"❌ HTTP Error {response.status_code} for {method} {endpoint}: {response.text}")
-                    # Add more detailed error logging
-                    logger.error(f"❌ Full response: {response.text}")
-                    logger.error(f"❌ Response headers: {response.headers}")
+                    # Bodies are truncated and headers left out: they can carry row data and keys
+                    logger.error(
+                        "❌ HTTP Error %s for %s %s: %.500s", response.status_code, method, endpoint, response.text,
+                        extra={"status": response.status_code, "endpoint": endpoint.split("?")[0]}
+                    )
 
                 return response
             except Exception as e:
-                logger.error(f"❌ Request failed: {e}")
+                logger.error("❌ Supabase %s %s failed: %s", method, endpoint, e)
                 raise
 
     # User Operations
-    async def get_user_by_clerk_id(self, clerk_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_identity(self, clerk_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        User row plus preferences and monitoring settings for a Clerk ID
+        Returns {"user", "preferences", "monitoring_settings"} or None if the user does not exist.
+        """
+        if use_cache:
+            cached = identity_cache.get(clerk_id)
+            if cached is not None:
+                return cached
+        identity = await self._fetch_user_identity(clerk_id)
+        if identity is not None:
+            identity_cache.set(clerk_id, identity)
+        return identity
+
+    async def _fetch_user_identity(self, clerk_id: str) -> Optional[Dict[str, Any]]:
+        if self._identity_embedding:
+            try:
+                # One round trip: embed the preference/settings rows (keyed by clerk_id) in the user row
+                response = await self._make_request("GET", "users", params={
+                    "clerk_id": f"eq.{clerk_id}",
+                    "select": "*,user_preferences(*),user_monitoring_settings(*)"
+                })
+                if response.status_code == 200:
+                    rows = response.json()
+                    if not rows:
+                        return None
+                    user = rows[0]
+                    return {
+                        "user": user,
+                        "preferences": self._first_embedded(user.pop("user_preferences", None)),
+                        "monitoring_settings": self._first_embedded(user.pop("user_monitoring_settings", None))
+                    }
+                if response.status_code == 400:
+                    # No foreign key between the tables in this schema: fall back to separate queries
+                    logger.warning("⚠️ Identity embedding not available, using separate queries")
+                    self._identity_embedding = False
+                else:
+                    return None
+            except Exception as e:
+                logger.error(f"Error getting user identity: {e}")
+                return None
+
+        user = await self._get_user_by_clerk_id(clerk_id)
+        if not user:
+            return None
+        preferences, monitoring_settings = await asyncio.gather(
+            self._get_user_preferences(clerk_id),
+            self._get_user_monitoring_settings(clerk_id)
+        )
+        return {"user": user, "preferences": preferences, "monitoring_settings": monitoring_settings}
+
+    @staticmethod
+    def _first_embedded(value: Any) -> Optional[Dict[str, Any]]:
+        # PostgREST embeds one-to-many relations as lists and one-to-one relations as objects
+        if isinstance(value, list):
+            return value[0] if value else None
+        return value or None
+
+    async def get_user_by_clerk_id(self, clerk_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """Get user by Clerk ID"""
+        if not use_cache:
+            return await self._get_user_by_clerk_id(clerk_id)
+        identity = await self.get_user_identity(clerk_id)
+        return dict(identity["user"]) if identity else None
+
+    async def _get_user_by_clerk_id(self, clerk_id: str) -> Optional[Dict[str, Any]]:
         try:
             response = await self._make_request("GET", "users", params={"clerk_id": f"eq.{clerk_id}"})
             if response.status_code == 200 and response.json():
@@ -101,11 +212,15 @@ class SupabaseClient:
 
     async def upsert_user(self, user_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create or update user"""
+        clerk_id = user_data["clerk_id"]
         try:
-            # Check if user exists
-            existing_user = await self.get_user_by_clerk_id(user_data["clerk_id"])
+            # Check if user exists (a cached row is enough to know it does)
+            existing_user = await self.get_user_by_clerk_id(clerk_id)
             
             if existing_user:
+                if all(existing_user.get(key) == value for key, value in user_data.items()):
+                    # Nothing to change (e.g. the "make sure the user exists" calls)
+                    return existing_user
                 # Update existing user
                 response = await self._make_request(
                     "PATCH", 
@@ -117,10 +232,12 @@ class SupabaseClient:
                 user_data["id"] = str(uuid.uuid4())
                 response = await self._make_request("POST", "users", data=user_data)
             
+            identity_cache.invalidate(clerk_id)
             if response.status_code in [200, 201] and response.json():
                 return response.json()[0]
             return None
         except Exception as e:
+            identity_cache.invalidate(clerk_id)
             logger.error(f"Error upserting user: {e}")
             return None
 
@@ -256,6 +373,85 @@ class SupabaseClient:
             logger.error(f"Error getting monitoring data: {e}")
             return []
 
+    async def get_monitoring_feed(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        platform: Optional[str] = None,
+        competitor_id: Optional[str] = None,
+        columns: str = MONITORING_FEED_COLUMNS
+    ) -> Dict[str, Any]:
+        """
+        Monitoring data across all of a user's competitors, newest first, in one query
+        
+        Ownership is enforced by inner-joining competitors (``competitors.user_id``), and
+        pages are keyset-paginated on (detected_at, id), so the cost of a page does not
+        grow with the number of competitors or with how deep the user has scrolled.
+        Returns ``{"items": [...], "next_cursor": str | None}``; raises ValueError for a
+        malformed cursor.
+        """
+        params = {
+            "order": "detected_at.desc,id.desc",
+            # One extra row tells us whether there is another page
+            "limit": str(limit + 1)
+        }
+        if cursor:
+            detected_at, row_id = decode_feed_cursor(cursor)
+            params["or"] = f'(detected_at.lt."{detected_at}",and(detected_at.eq."{detected_at}",id.lt.{row_id}))'
+        if platform:
+            params["platform"] = f"eq.{platform}"
+        if competitor_id:
+            params["competitor_id"] = f"eq.{competitor_id}"
+
+        try:
+            rows = None
+            if self._feed_embedding:
+                response = await self._make_request("GET", "monitoring_data", params={
+                    **params,
+                    "select": f"{columns},competitors!inner(name)",
+                    "competitors.user_id": f"eq.{user_id}"
+                })
+                if response.status_code == 200:
+                    rows = response.json()
+                    for row in rows:
+                        competitor = self._first_embedded(row.pop("competitors", None)) or {}
+                        row["competitor_name"] = competitor.get("name")
+                elif response.status_code == 400:
+                    logger.warning("⚠️ Feed embedding not available, filtering by competitor IDs")
+                    self._feed_embedding = False
+                else:
+                    return {"items": [], "next_cursor": None}
+
+            if rows is None:
+                # Fallback: resolve the user's competitors first, then still one feed query
+                competitors = await self._make_request("GET", "competitors", params={
+                    "user_id": f"eq.{user_id}",
+                    "select": "id,name"
+                })
+                names = {c["id"]: c.get("name") for c in competitors.json()} if competitors.status_code == 200 else {}
+                if competitor_id and competitor_id not in names:
+                    return {"items": [], "next_cursor": None}
+                if not names:
+                    return {"items": [], "next_cursor": None}
+                if not competitor_id:
+                    params["competitor_id"] = f"in.({','.join(names)})"
+                response = await self._make_request("GET", "monitoring_data", params={
+                    **params,
+                    "select": columns
+                })
+                if response.status_code != 200:
+                    return {"items": [], "next_cursor": None}
+                rows = response.json()
+                for row in rows:
+                    row["competitor_name"] = names.get(row.get("competitor_id"))
+
+            next_cursor = encode_feed_cursor(rows[limit - 1]) if len(rows) > limit else None
+            return {"items": rows[:limit], "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"Error getting monitoring feed: {e}")
+            return {"items": [], "next_cursor": None}
+
     async def create_monitoring_alert(self, alert_data: Dict[str, Any]) -> Optional[str]:
         """Create monitoring alert"""
         try:
@@ -333,8 +529,16 @@ class SupabaseClient:
             return None
 
     # User Settings Operations
-    async def get_user_monitoring_settings(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_monitoring_settings(self, user_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """Get user monitoring settings"""
+        if use_cache:
+            identity = await self.get_user_identity(user_id)
+            if identity is not None:
+                settings = identity["monitoring_settings"]
+                return dict(settings) if settings else None
+        return await self._get_user_monitoring_settings(user_id)
+
+    async def _get_user_monitoring_settings(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
             response = await self._make_request("GET", "user_monitoring_settings", params={"user_id": f"eq.{user_id}"})
             if response.status_code == 200 and response.json():
@@ -347,7 +551,8 @@ class SupabaseClient:
     async def upsert_user_monitoring_settings(self, settings_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create or update user monitoring settings"""
         try:
-            existing_settings = await self.get_user_monitoring_settings(settings_data["user_id"])
+            # Read fresh: a stale "no settings yet" would insert a duplicate row
+            existing_settings = await self.get_user_monitoring_settings(settings_data["user_id"], use_cache=False)
             
             if existing_settings:
                 response = await self._make_request(
@@ -365,10 +570,20 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Error upserting user settings: {e}")
             return None
+        finally:
+            identity_cache.invalidate(settings_data.get("user_id"))
 
     # User Preferences Operations
-    async def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_user_preferences(self, user_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """Get user preferences"""
+        if use_cache:
+            identity = await self.get_user_identity(user_id)
+            if identity is not None:
+                preferences = identity["preferences"]
+                return dict(preferences) if preferences else None
+        return await self._get_user_preferences(user_id)
+
+    async def _get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
             response = await self._make_request("GET", "user_preferences", params={"user_id": f"eq.{user_id}"})
             if response.status_code == 200 and response.json():
@@ -381,7 +596,8 @@ class SupabaseClient:
     async def upsert_user_preferences(self, preferences_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Create or update user preferences"""
         try:
-            existing_preferences = await self.get_user_preferences(preferences_data["user_id"])
+            # Read fresh: a stale "no preferences yet" would insert a duplicate row
+            existing_preferences = await self.get_user_preferences(preferences_data["user_id"], use_cache=False)
             
             if existing_preferences:
                 response = await self._make_request(
@@ -399,6 +615,8 @@ class SupabaseClient:
         except Exception as e:
             logger.error(f"Error upserting user preferences: {e}")
             return None
+        finally:
+            identity_cache.invalidate(preferences_data.get("user_id"))
 
     # Campaign Operations
     async def update_campaign_by_name_and_user(self, user_id: str, campaign_name: str, update_data: Dict[str, Any]) -> bool:
@@ -482,6 +700,63 @@ class SupabaseClient:
         except Exception as e:
             raise Exception(f"Failed to create content upload: {str(e)}")
 
+    async def get_content_upload(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Get one content upload by id"""
+        try:
+            response = await self._make_request("GET", "content_uploads", params={"id": f"eq.{upload_id}"})
+            if response.status_code == 200:
+                rows = response.json()
+                return rows[0] if rows else None
+            raise Exception(f"Failed to get content upload: {response.status_code}")
+        except Exception as e:
+            raise Exception(f"Failed to get content upload: {str(e)}")
+
+    async def get_due_scheduled_uploads(self, due_before: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Scheduled, not yet posted uploads whose scheduled_at is at or before ``due_before``"""
+        try:
+            response = await self._make_request("GET", "content_uploads", params={
+                "status": "eq.scheduled",
+                "scheduled_at": f"lte.{due_before}",
+                "post_id": "is.null",
+                "order": "scheduled_at.asc",
+                "limit": str(limit)
+            })
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except Exception as e:
+            raise Exception(f"Failed to get due scheduled uploads: {str(e)}")
+
+    async def claim_content_upload(self, upload_id: str, claimed_at: str, stale_before: str,
+                                   free_statuses: tuple = ("draft", "failed")) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take an upload for publishing: a row in one of ``free_statuses``, or a
+        scheduled one whose last_attempt_at lease is older than ``stale_before``, becomes
+        "scheduled" with last_attempt_at = ``claimed_at``. Returns the row, or None when it
+        is posted, cancelled or held by another worker's live lease.
+        """
+        lease_free = f"last_attempt_at.is.null,last_attempt_at.lt.{stale_before}"
+        params = {"id": f"eq.{upload_id}", "post_id": "is.null"}
+        if free_statuses:
+            params["or"] = f"(status.in.({','.join(free_statuses)}),and(status.eq.scheduled,or({lease_free})))"
+        else:
+            params["status"] = "eq.scheduled"
+            params["or"] = f"({lease_free})"
+        try:
+            response = await self._make_request(
+                "PATCH",
+                "content_uploads",
+                {"status": "scheduled", "last_attempt_at": claimed_at},
+                params=params,
+                headers={"Prefer": "return=representation"}
+            )
+            if response.status_code == 200:
+                rows = response.json()
+                return rows[0] if rows else None
+            raise Exception(f"Failed to claim content upload: {response.status_code}")
+        except Exception as e:
+            raise Exception(f"Failed to claim content upload: {str(e)}")
+
     async def update_content_upload(self, upload_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a content upload"""
         try:
@@ -519,6 +794,99 @@ class SupabaseClient:
         except Exception as e:
             raise Exception(f"Failed to get user social accounts: {str(e)}")
 
+    async def get_active_social_accounts(self, platforms: List[str]) -> List[Dict[str, Any]]:
+        """Get every user's active accounts on the given platforms (background jobs)"""
+        try:
+            response = await self._make_request("GET", "social_media_accounts", params={
+                "platform": f"in.({','.join(platforms)})",
+                "is_active": "eq.true"
+            })
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except Exception as e:
+            raise Exception(f"Failed to get active social accounts: {str(e)}")
+
+    # Social Insights methods
+    INSIGHTS_CONFLICT_COLUMNS = "user_id,platform,account_id,period,window_start"
+
+    async def upsert_insights(self, rows: Union[Dict[str, Any], List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Insert or update insight windows; accepts one row or a batch"""
+        rows = [rows] if isinstance(rows, dict) else rows
+        if not rows:
+            return {"success": True, "count": 0}
+        try:
+            response = await self._make_request(
+                "POST",
+                "social_insights",
+                rows,
+                params={"on_conflict": self.INSIGHTS_CONFLICT_COLUMNS},
+                headers={"Prefer": "resolution=merge-duplicates,return=minimal"}
+            )
+            if response.status_code in [200, 201, 204]:
+                return {"success": True, "count": len(rows)}
+            raise Exception(f"Failed to upsert insights: {response.status_code}")
+        except Exception as e:
+            raise Exception(f"Failed to upsert insights: {str(e)}")
+
+    async def get_insights(
+        self,
+        user_id: str,
+        platform: str,
+        period: str,
+        since: str,
+        until: str,
+        account_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Get insight windows for a user and platform within [since, until)"""
+        try:
+            params = {
+                "user_id": f"eq.{user_id}",
+                "platform": f"eq.{platform}",
+                "period": f"eq.{period}",
+                "and": f"(window_start.gte.{since},window_start.lt.{until})",
+                "order": "window_start.asc"
+            }
+            if account_id:
+                params["account_id"] = f"eq.{account_id}"
+            response = await self._make_request("GET", "social_insights", params=params)
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except Exception as e:
+            raise Exception(f"Failed to get insights: {str(e)}")
+
+    async def get_insight_windows(self, period: str, window_starts: List[str], user_ids: List[str]) -> List[Dict[str, Any]]:
+        """Get insight rows of one period for a set of window starts and users (rollup updates)"""
+        if not window_starts or not user_ids:
+            return []
+        try:
+            quoted_starts = ",".join(f'"{start}"' for start in window_starts)
+            response = await self._make_request("GET", "social_insights", params={
+                "period": f"eq.{period}",
+                "window_start": f"in.({quoted_starts})",
+                "user_id": f"in.({','.join(user_ids)})"
+            })
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except Exception as e:
+            raise Exception(f"Failed to get insight windows: {str(e)}")
+
+    async def get_synced_insight_windows(self, period: str, window_start: str) -> List[Dict[str, Any]]:
+        """Keys of the insight rows that already exist for one window"""
+        try:
+            response = await self._make_request("GET", "social_insights", params={
+                "select": "user_id,platform,account_id",
+                "period": f"eq.{period}",
+                "window_start": f"eq.{window_start}"
+            })
+            if response.status_code == 200:
+                return response.json()
+            return []
+        except Exception as e:
+            raise Exception(f"Failed to get synced insight windows: {str(e)}")
+
     async def create_social_media_account(self, account_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new social media account"""
         try:
@@ -50,6 +50,18 @@ class MonitoringDataResponse(MonitoringDataBase):
         }
 
 
+class MonitoringFeedItem(MonitoringDataResponse):
+    """Monitoring data row as shown in the cross-competitor feed"""
+    competitor_name: Optional[str] = None
+
+
+class MonitoringFeedResponse(BaseModel):
+    """One page of the monitoring feed; pass ``next_cursor`` back as ``cursor`` for the next page"""
+    items: List[MonitoringFeedItem]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
 class MonitoringAlertBase(BaseModel):
     """Base monitoring alert schema"""
     alert_type: str = Field(..., max_length=50)
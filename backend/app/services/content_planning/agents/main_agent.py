@@ -12,6 +12,7 @@ from ..tools.content_generator import ContentGenerator
 from ..tools.competitor_analyzer import CompetitorAnalyzer  
 from ..tools.hashtag_researcher import HashtagResearcher
 from ..config.settings import settings
+from ..progress import ProgressCallback, report_progress
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,8 @@ class ContentPlanningAgent:
     async def analyze_competitor_landscape(
         self,
         clerk_id: str,
-        competitor_ids: Optional[List[str]] = None
+        competitor_ids: Optional[List[str]] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """
         Analyze the competitive landscape for content insights
@@ -47,10 +49,12 @@ class ContentPlanningAgent:
             analyzer = CompetitorAnalyzer()
             
             # Perform comprehensive analysis
+            report_progress(progress, "competitor_analysis")
             analysis_result = await analyzer._arun(
                 clerk_id=clerk_id,
                 competitor_ids=competitor_ids,
-                analysis_type="comprehensive_analysis"
+                analysis_type="comprehensive_analysis",
+                progress=progress
             )
             
             # Update data source tracking
@@ -79,7 +83,9 @@ class ContentPlanningAgent:
         clerk_id: str,
         platforms: List[str],
         content_goals: List[str],
-        target_audience: str
+        target_audience: str,
+        progress: Optional[ProgressCallback] = None,
+        industry: str = "technology"
     ) -> Dict[str, Any]:
         """
         Generate comprehensive content strategy based on competitive insights
@@ -87,7 +93,7 @@ class ContentPlanningAgent:
         
         try:
             # Step 1: Analyze competitors
-            competitor_analysis = await self.analyze_competitor_landscape(clerk_id)
+            competitor_analysis = await self.analyze_competitor_landscape(clerk_id, progress=progress)
             
             if not competitor_analysis["success"]:
                 return competitor_analysis
@@ -97,8 +103,9 @@ class ContentPlanningAgent:
             hashtag_researcher = HashtagResearcher()
             
             for platform in platforms:
+                report_progress(progress, "hashtag_research", platform=platform)
                 hashtag_result = await hashtag_researcher._arun(
-                    clerk_id=clerk_id, # Assuming clerk_id is the industry for hashtag research
+                    industry=industry,
                     content_type="promotional",  # Default type
                     platform=platform,
                     target_audience=target_audience
@@ -106,6 +113,7 @@ class ContentPlanningAgent:
                 hashtag_strategies[platform] = hashtag_result
             
             # Step 3: Generate content recommendations
+            report_progress(progress, "content_recommendations")
             content_recommendations = self._generate_content_recommendations(
                 competitor_analysis["analysis"],
                 hashtag_strategies,
@@ -66,6 +66,62 @@ RULES:
 Remember: Respond with ONLY the JSON object, no other text."""
 )
 
+# Batched Variation Prompt - several tones/platforms in one structured response
+BATCH_CONTENT_GENERATION_PROMPT = PromptTemplate(
+    input_variables=[
+        "industry", "competitor_insights", "content_type", "target_audience",
+        "variation_specs", "variation_count"
+    ],
+    template="""You are an expert social media content creator and marketing strategist. Your task is to generate {variation_count} distinct, original post variations in a single response, based on competitor analysis and industry best practices.
+
+CONTEXT:
+- Industry: {industry}
+- Content Type: {content_type}
+- Target Audience: {target_audience}
+
+COMPETITOR ANALYSIS INSIGHTS:
+{competitor_insights}
+
+VARIATIONS TO GENERATE (one post per line, in this order):
+{variation_specs}
+
+TASK:
+For every variation above, generate a compelling social media post that:
+1. Captures attention with a strong hook
+2. Delivers value to the target audience
+3. Uses the tone and platform given for that variation
+4. Includes the given number of relevant hashtags
+5. Stays within that variation's character limit
+6. Is clearly different from the other variations
+
+IMPORTANT: You MUST respond with ONLY a valid JSON object in the following format. Do not include any other text, explanations, or requests for more data.
+
+{{
+    "variations": [
+        {{
+            "variation_id": "var_1",
+            "platform": "linkedin",
+            "tone": "professional",
+            "post_content": "Your generated post content here.",
+            "hashtags": ["#Hashtag1", "#Hashtag2", "#Hashtag3"],
+            "character_count": 0,
+            "estimated_engagement": "High|Medium|Low",
+            "content_quality_score": 0.0,
+            "optimal_posting_time": "Tuesday-Thursday, 9-11 AM",
+            "platform_optimization_notes": "Brief notes on how this variation is optimized for its platform"
+        }}
+    ]
+}}
+
+RULES:
+- Generate actual content, not requests for more data
+- Echo each variation_id, platform and tone exactly as given
+- Return the variations in the order listed above
+- Use the competitor insights to inform your content strategy
+
+Remember: Respond with ONLY the JSON object, no other text."""
+)
+
 # Competitor Analysis Prompt
 COMPETITOR_ANALYSIS_PROMPT = PromptTemplate(
     input_variables=["industry", "competitor_data", "analysis_type", "time_period"],
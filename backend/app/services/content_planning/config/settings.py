@@ -16,12 +16,18 @@ class ContentPlanningSettings:
     temperature: float = 0.7
     max_tokens: int = 2048
     top_p: float = 0.9
+    batch_max_tokens: int = 8192
     
     # Content Generation Settings
     max_posts_per_request: int = 10
     default_hashtag_count: int = 10
     max_content_length: int = 2200
     
+    # Generation Result Cache Settings
+    result_cache_ttl_seconds: int = int(os.getenv("CONTENT_RESULT_CACHE_TTL", "900"))
+    result_cache_max_entries: int = 256
+    result_cache_similarity_threshold: float = 0.8
+    
     # Vector Store Settings
     vector_store_path: str = "./data/chroma_db"
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
@@ -54,6 +60,16 @@ class ContentPlanningSettings:
         "friendly", "authoritative", "playful", "educational", "promotional"
     ]
 
+    @property
+    def llm_params(self) -> Dict[str, Any]:
+        """Model and sampling parameters passed to the shared LLM gateway"""
+        return {
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": self.top_p
+        }
+
 # Platform-specific settings
 PLATFORM_CONFIGS: Dict[str, Dict[str, Any]] = {
     "linkedin": {
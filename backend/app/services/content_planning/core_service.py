@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
 import json
 import logging
+import time
 
 # Don't import AI agents on initialization - only when needed
 # from .agents.main_agent import ContentPlanningAgent
@@ -14,6 +15,8 @@ import logging
 # from .tools.competitor_analyzer import CompetitorAnalyzer
 # from .tools.hashtag_researcher import HashtagResearcher
 from .config.settings import settings
+from .progress import ProgressCallback, report_progress
+from .result_cache import ContentResultCache
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,11 @@ class ContentPlanningService:
         self._content_generator = None
         self._competitor_analyzer = None
         self._hashtag_researcher = None
+        self.result_cache = ContentResultCache(
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            max_entries=settings.result_cache_max_entries,
+            similarity_threshold=settings.result_cache_similarity_threshold
+        )
         logger.info("🔧 ContentPlanningService initialized (AI agents will be initialized when needed)")
     
     @property
@@ -103,7 +111,8 @@ class ContentPlanningService:
         target_audience: str,
         custom_requirements: Optional[str] = None,
         generate_variations: bool = False,
-        industry: Optional[str] = None  # Add industry parameter
+        industry: Optional[str] = None,  # Add industry parameter
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """Generate AI-optimized social media content based on competitor insights"""
         try:
@@ -124,45 +133,29 @@ class ContentPlanningService:
                     }
                 }
             
-            # First, get competitor insights for the user
-            competitor_analysis = await self.competitor_analyzer._arun(
+            # Serve recent identical (or paraphrased) requests against the same competitor data snapshot
+            cache_request = self.result_cache.normalize_request(
                 clerk_id=clerk_id,
-                analysis_type="trend_analysis"
+                platform=platform,
+                content_type=content_type,
+                tone=tone,
+                target_audience=target_audience,
+                custom_requirements=custom_requirements,
+                generate_variations=generate_variations,
+                industry=industry
             )
+            data_version = await self.competitor_analyzer.get_data_version(clerk_id)
+            use_cache = data_version != "unknown"
+            if use_cache:
+                cached_result = self.result_cache.get(cache_request, data_version)
+                if cached_result:
+                    report_progress(progress, "cache_hit", data_version=data_version)
+                    return cached_result
+            generation_started = time.perf_counter()
             
-            # Log competitor analysis results for debugging
-            logger.info(f"🔍 Competitor analysis result: success={competitor_analysis.get('success')}, data_source={competitor_analysis.get('data_source')}")
-            logger.info(f"🔍 Analysis data keys: {list(competitor_analysis.get('analysis_data', {}).keys()) if competitor_analysis.get('analysis_data') else 'None'}")
-            
-            # Prepare competitor insights with better fallback handling
-            if competitor_analysis.get("success") and competitor_analysis.get("analysis_data"):
-                competitor_insights = json.dumps(competitor_analysis.get("analysis_data", {}))
-                logger.info(f"✅ Using competitor analysis data: {len(competitor_insights)} characters")
-            else:
-                # Create fallback competitor insights when no data is available
-                fallback_insights = {
-                    "content_trends": {
-                        "successful_content_types": ["educational", "promotional", "behind_the_scenes"],
-                        "common_themes": ["innovation", "growth", "industry_trends", "best_practices"],
-                        "engagement_drivers": ["practical_tips", "industry_insights", "success_stories"]
-                    },
-                    "hashtag_analysis": {
-                        "trending_hashtags": ["#Innovation", "#Growth", "#IndustryTrends", "#BestPractices", "#Success"],
-                        "high_performing": ["#Leadership", "#Technology", "#Business", "#Strategy", "#Future"]
-                    },
-                    "timing_insights": {
-                        "optimal_posting_times": ["Tuesday-Thursday, 9-11 AM", "Monday-Wednesday, 5-7 PM"],
-                        "best_days": ["Tuesday", "Wednesday", "Thursday"]
-                    },
-                    "tone_voice": {
-                        "successful_approaches": ["professional", "authentic", "helpful", "insightful"],
-                        "engagement_patterns": ["question_posts", "tip_sharing", "industry_commentary"]
-                    },
-                    "data_source": "fallback_insights",
-                    "note": "Using industry best practices and general social media insights"
-                }
-                competitor_insights = json.dumps(fallback_insights)
-                logger.info(f"⚠️ Using fallback competitor insights: {len(competitor_insights)} characters")
+            # First, get competitor insights for the user
+            report_progress(progress, "competitor_insights")
+            competitor_insights = await self._get_competitor_insights(clerk_id)
             
             # Get user's industry - use provided industry or fetch from preferences
             user_industry = industry
@@ -181,7 +174,8 @@ class ContentPlanningService:
                 tone=tone,
                 target_audience=target_audience,
                 competitor_insights=competitor_insights,
-                custom_requirements=custom_requirements
+                custom_requirements=custom_requirements,
+                progress=progress
             )
             
             # Validate content result
@@ -215,6 +209,7 @@ class ContentPlanningService:
             # Generate variations if requested
             if generate_variations and content_result.get("success"):
                 try:
+                    report_progress(progress, "variations")
                     from .tools.content_generator import generate_content_variations
                     variations = await generate_content_variations(
                         {
@@ -222,7 +217,8 @@ class ContentPlanningService:
                             "platform": platform,
                             "content_type": content_type,
                             "target_audience": target_audience,
-                            "competitor_insights": competitor_insights
+                            "competitor_insights": competitor_insights,
+                            "custom_requirements": custom_requirements
                         },
                         variation_count=3
                     )
@@ -230,6 +226,14 @@ class ContentPlanningService:
                 except ImportError:
                     logger.warning("⚠️ Content variations not available")
             
+            if use_cache:
+                self.result_cache.set(
+                    cache_request,
+                    data_version,
+                    response_data,
+                    generation_ms=(time.perf_counter() - generation_started) * 1000
+                )
+            
             logger.info(f"✅ Content generated successfully for {platform}")
             return response_data
             
@@ -240,6 +244,99 @@ class ContentPlanningService:
                 "error": f"Content generation failed: {str(e)}"
             }
     
+    async def _get_competitor_insights(self, clerk_id: str) -> str:
+        """Competitor insights JSON for prompts, falling back to general best practices"""
+        competitor_analysis = await self.competitor_analyzer._arun(
+            clerk_id=clerk_id,
+            analysis_type="trend_analysis"
+        )
+        
+        # Log competitor analysis results for debugging
+        logger.info(f"🔍 Competitor analysis result: success={competitor_analysis.get('success')}, data_source={competitor_analysis.get('data_source')}")
+        logger.info(f"🔍 Analysis data keys: {list(competitor_analysis.get('analysis_data', {}).keys()) if competitor_analysis.get('analysis_data') else 'None'}")
+        
+        # Prepare competitor insights with better fallback handling
+        if competitor_analysis.get("success") and competitor_analysis.get("analysis_data"):
+            competitor_insights = json.dumps(competitor_analysis.get("analysis_data", {}))
+            logger.info(f"✅ Using competitor analysis data: {len(competitor_insights)} characters")
+        else:
+            # Create fallback competitor insights when no data is available
+            fallback_insights = {
+                "content_trends": {
+                    "successful_content_types": ["educational", "promotional", "behind_the_scenes"],
+                    "common_themes": ["innovation", "growth", "industry_trends", "best_practices"],
+                    "engagement_drivers": ["practical_tips", "industry_insights", "success_stories"]
+                },
+                "hashtag_analysis": {
+                    "trending_hashtags": ["#Innovation", "#Growth", "#IndustryTrends", "#BestPractices", "#Success"],
+                    "high_performing": ["#Leadership", "#Technology", "#Business", "#Strategy", "#Future"]
+                },
+                "timing_insights": {
+                    "optimal_posting_times": ["Tuesday-Thursday, 9-11 AM", "Monday-Wednesday, 5-7 PM"],
+                    "best_days": ["Tuesday", "Wednesday", "Thursday"]
+                },
+                "tone_voice": {
+                    "successful_approaches": ["professional", "authentic", "helpful", "insightful"],
+                    "engagement_patterns": ["question_posts", "tip_sharing", "industry_commentary"]
+                },
+                "data_source": "fallback_insights",
+                "note": "Using industry best practices and general social media insights"
+            }
+            competitor_insights = json.dumps(fallback_insights)
+            logger.info(f"⚠️ Using fallback competitor insights: {len(competitor_insights)} characters")
+        
+        return competitor_insights
+    
+    async def stream_content_variations(
+        self,
+        clerk_id: str,
+        platforms: List[str],
+        content_type: str,
+        target_audience: str,
+        tones: Optional[List[str]] = None,
+        variation_count: int = 3,
+        custom_requirements: Optional[str] = None,
+        industry: Optional[str] = None
+    ):
+        """
+        Generate content variations for several tones/platforms in one batched LLM call,
+        yielding each variation as soon as it is parsed
+        """
+        from .tools.content_generator import DEFAULT_VARIATION_TONES, build_variation_specs
+        
+        tones = (tones or DEFAULT_VARIATION_TONES)[:variation_count]
+        specs = build_variation_specs(platforms, tones)
+        logger.info(f"📝 Streaming {len(specs)} content variations for Clerk ID: {clerk_id}")
+        
+        if not self.competitor_analyzer or not self.content_generator:
+            logger.warning("⚠️ AI agents not available, returning mock variations")
+            for spec in specs:
+                yield {
+                    "variation_id": spec["variation_id"],
+                    "variation_type": f"tone_{spec['tone']}",
+                    "post_content": f"🎯 {content_type.title()} content for {spec['platform']}. This is AI-generated content optimized for {target_audience} with a {spec['tone']} tone. {custom_requirements or ''}",
+                    "hashtags": [f"#{spec['platform'].title()}", f"#{content_type.title()}"],
+                    "optimal_posting_time": "Tuesday-Thursday, 9-11 AM",
+                    "platform": spec["platform"],
+                    "content_type": content_type,
+                    "tone": spec["tone"],
+                    "fallback": True
+                }
+            return
+        
+        competitor_insights = await self._get_competitor_insights(clerk_id)
+        user_industry = industry or await self._get_user_industry(clerk_id) or "technology"
+        
+        async for variation in self.content_generator.astream_variations(
+            industry=user_industry,
+            content_type=content_type,
+            target_audience=target_audience,
+            competitor_insights=competitor_insights,
+            variation_specs=specs,
+            custom_requirements=custom_requirements
+        ):
+            yield variation
+    
     async def _get_user_industry(self, clerk_id: str) -> Optional[str]:
         """Get user's industry from preferences"""
         try:
@@ -277,7 +374,9 @@ class ContentPlanningService:
         industry: str,
         competitor_ids: Optional[List[str]] = None,
         analysis_type: str = "comprehensive_analysis",
-        time_period: str = "last_30_days"
+        time_period: str = "last_30_days",
+        clerk_id: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """Analyze competitor content for strategic insights"""
         try:
@@ -313,7 +412,11 @@ class ContentPlanningService:
                 }
             
             # Use AI agent for analysis
-            result = self.agent.analyze_competitor_landscape(industry)
+            result = await self.agent.analyze_competitor_landscape(
+                clerk_id or industry,
+                competitor_ids=competitor_ids,
+                progress=progress
+            )
             
             if not result.get("success"):
                 return result
@@ -367,17 +470,22 @@ class ContentPlanningService:
         clerk_id: str,
         platforms: List[str],
         content_goals: List[str],
-        target_audience: str
+        target_audience: str,
+        progress: Optional[ProgressCallback] = None,
+        industry: Optional[str] = None
     ) -> Dict[str, Any]:
         """Generate comprehensive content strategy based on competitive analysis"""
         try:
             logger.info(f"📋 Generating content strategy for Clerk ID: {clerk_id} across {len(platforms)} platforms")
             
-            strategy_result = self.agent.generate_content_strategy(
+            user_industry = industry or await self._get_user_industry(clerk_id) or "technology"
+            strategy_result = await self.agent.generate_content_strategy(
                 clerk_id=clerk_id,
                 platforms=platforms,
                 content_goals=content_goals,
-                target_audience=target_audience
+                target_audience=target_audience,
+                progress=progress,
+                industry=user_industry
             )
             
             logger.info(f"✅ Content strategy generated for Clerk ID: {clerk_id}")
@@ -606,6 +714,10 @@ class ContentPlanningService:
                 "error": f"Industry insights loading failed: {str(e)}"
             }
     
+    def get_generation_cache_stats(self) -> Dict[str, Any]:
+        """Hit rate and latency of the content generation result cache"""
+        return self.result_cache.get_stats()
+    
     def get_supported_options(self) -> Dict[str, List[str]]:
         """Get supported industries, platforms, content types, and tones"""
         return {
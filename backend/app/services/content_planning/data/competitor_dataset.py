@@ -0,0 +1,419 @@
+"""
+Shared competitor dataset for the content planning tools
+Loads mock_datasets/competitors_dataset.json once per process into an indexed,
+read-only snapshot with precomputed per-competitor aggregates. The snapshot is
+swapped for a fresh one when the file's modification time changes; inside the event
+loop that reload runs in a worker thread while requests keep using the old snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATASET_PATH = os.path.join(os.path.dirname(__file__), "mock_datasets", "competitors_dataset.json")
+DEFAULT_MOCK_CLERK_ID = "user_123"
+
+# How often get() is allowed to stat the file; keeps the hot path free of syscalls
+RELOAD_CHECK_INTERVAL_SECONDS = 2.0
+
+FALLBACK_DATASET: Dict[str, Any] = {
+    "competitors": [
+        {
+            "competitor_id": "comp_tech_001",
+            "company_name": "TechFlow Solutions",
+            "clerk_id": DEFAULT_MOCK_CLERK_ID,
+            "industry_sector": "technology",
+            "posts": [
+                {
+                    "post_content": "AI-powered automation increases productivity by 80%",
+                    "hashtags": ["#AI", "#Automation", "#Productivity"],
+                    "platform": "linkedin",
+                    "engagement_metrics": {"engagement_rate": 4.2}
+                }
+            ]
+        }
+    ],
+    "trending_hashtags": {"technology": ["#AI", "#Innovation", "#TechTrends"]},
+    "content_insights": {}
+}
+
+_TOPIC_KEYWORDS = (
+    ("product_launches", ("product", "launch")),
+    ("educational_tips", ("tip", "how to")),
+    ("behind_the_scenes", ("behind", "team"))
+)
+
+
+def posting_hour(posting_time: Optional[str]) -> Optional[int]:
+    """Hour of an ISO-8601 posting time, or None when missing/unparseable"""
+    if not posting_time:
+        return None
+    # Fast path for "YYYY-MM-DDTHH..." - the hour as written, same as fromisoformat().hour
+    if len(posting_time) >= 13 and posting_time[10] == "T" and posting_time[11:13].isdigit():
+        return int(posting_time[11:13])
+    try:
+        return datetime.fromisoformat(posting_time.replace('Z', '+00:00')).hour
+    except (ValueError, AttributeError):
+        return None
+
+
+def length_category(content_length: int) -> str:
+    return "short" if content_length < 100 else "medium" if content_length < 300 else "long"
+
+
+class RunningStat:
+    """Count/sum/min/max of engagement rates, mergeable without keeping the samples"""
+
+    __slots__ = ("count", "total", "minimum", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: "RunningStat") -> None:
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        if self.minimum is None or other.minimum < self.minimum:
+            self.minimum = other.minimum
+        if self.maximum is None or other.maximum > self.maximum:
+            self.maximum = other.maximum
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+def _merge_stats(target: Dict[Any, RunningStat], source: Dict[Any, RunningStat]) -> None:
+    for key, stat in source.items():
+        existing = target.get(key)
+        if existing is None:
+            existing = target[key] = RunningStat()
+        existing.merge(stat)
+
+
+def _merge_counts(target: Dict[Any, float], source: Dict[Any, float]) -> None:
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+class CompetitorAggregate:
+    """
+    Everything the analysis methods need from a set of posts. Dict keys keep
+    first-seen order, so merging aggregates in competitor order ranks ties the
+    same way a single pass over all posts would.
+    """
+
+    __slots__ = (
+        "post_count", "content_types", "tones", "posting_hours", "hashtag_counts",
+        "hashtag_engagement", "platform_engagement", "hour_engagement",
+        "length_engagement", "topics", "formats"
+    )
+
+    def __init__(self):
+        self.post_count = 0
+        self.content_types: Dict[str, RunningStat] = {}
+        self.tones: Dict[str, int] = {}
+        self.posting_hours: Dict[int, int] = {}
+        self.hashtag_counts: Dict[str, int] = {}
+        self.hashtag_engagement: Dict[str, float] = {}
+        self.platform_engagement: Dict[str, RunningStat] = {}
+        self.hour_engagement: Dict[int, RunningStat] = {}
+        self.length_engagement: Dict[str, RunningStat] = {}
+        self.topics: Set[str] = set()
+        self.formats: Set[str] = set()
+
+    @classmethod
+    def from_competitor(cls, competitor: Dict[str, Any]) -> "CompetitorAggregate":
+        aggregate = cls()
+        for post in competitor.get("posts", []) or []:
+            aggregate.add_post(post)
+        return aggregate
+
+    @classmethod
+    def combine(cls, aggregates: Iterable["CompetitorAggregate"]) -> "CompetitorAggregate":
+        combined = cls()
+        for aggregate in aggregates:
+            combined.merge(aggregate)
+        return combined
+
+    def add_post(self, post: Dict[str, Any]) -> None:
+        self.post_count += 1
+        engagement_rate = post.get("engagement_metrics", {}).get("engagement_rate", 0)
+
+        content_type = post.get("post_type", "unknown")
+        self.content_types.setdefault(content_type, RunningStat()).add(engagement_rate)
+        self.formats.add(content_type)
+
+        tone = post.get("tone", "unknown")
+        self.tones[tone] = self.tones.get(tone, 0) + 1
+
+        hour = posting_hour(post.get("posting_time", ""))
+        if hour is not None:
+            self.posting_hours[hour] = self.posting_hours.get(hour, 0) + 1
+            self.hour_engagement.setdefault(hour, RunningStat()).add(engagement_rate)
+
+        for hashtag in post.get("hashtags", []):
+            self.hashtag_counts[hashtag] = self.hashtag_counts.get(hashtag, 0) + 1
+            self.hashtag_engagement[hashtag] = self.hashtag_engagement.get(hashtag, 0) + engagement_rate
+
+        platform = post.get("platform", "unknown")
+        self.platform_engagement.setdefault(platform, RunningStat()).add(engagement_rate)
+        self.length_engagement.setdefault(
+            length_category(post.get("content_length", 0)), RunningStat()
+        ).add(engagement_rate)
+
+        content = post.get("post_content", "").lower()
+        for topic, keywords in _TOPIC_KEYWORDS:
+            if any(keyword in content for keyword in keywords):
+                self.topics.add(topic)
+
+    def merge(self, other: "CompetitorAggregate") -> None:
+        self.post_count += other.post_count
+        _merge_stats(self.content_types, other.content_types)
+        _merge_counts(self.tones, other.tones)
+        _merge_counts(self.posting_hours, other.posting_hours)
+        _merge_counts(self.hashtag_counts, other.hashtag_counts)
+        _merge_counts(self.hashtag_engagement, other.hashtag_engagement)
+        _merge_stats(self.platform_engagement, other.platform_engagement)
+        _merge_stats(self.hour_engagement, other.hour_engagement)
+        _merge_stats(self.length_engagement, other.length_engagement)
+        self.topics |= other.topics
+        self.formats |= other.formats
+
+    def top_hashtags(self, limit: int = 10) -> List[str]:
+        return [tag for tag, _ in sorted(self.hashtag_counts.items(), key=lambda x: x[1], reverse=True)[:limit]]
+
+
+class CompetitorDataset:
+    """
+    Indexed snapshot of the competitor dataset.
+    Shared by every request in the process: treat all returned objects as read-only.
+    """
+
+    def __init__(self, data: Dict[str, Any], path: Optional[str] = None, mtime: Optional[float] = None):
+        self.data = data
+        self.path = path
+        self.mtime = mtime
+        self.loaded_at = time.time()
+
+        self.trending_hashtags: Dict[str, List[str]] = data.get("trending_hashtags", {})
+        self.hashtag_performance: Dict[str, Any] = data.get("content_insights", {}).get("hashtag_performance", {})
+
+        competitors = data.get("competitors", [])
+        # Returned as-is by all_competitors(); identity lets aggregate_of() use the precomputed total
+        self._all: List[Dict[str, Any]] = competitors
+        self._positions: Dict[int, int] = {}
+        self._aggregates: Dict[int, CompetitorAggregate] = {}
+        self._names: List[str] = []
+
+        by_clerk_id = defaultdict(list)
+        by_industry = defaultdict(list)
+        by_hashtag = defaultdict(list)
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        industry_aggregates: Dict[str, CompetitorAggregate] = defaultdict(CompetitorAggregate)
+        total = CompetitorAggregate()
+
+        for position, competitor in enumerate(competitors):
+            # competitors.user_id references users.clerk_id; mock competitors without an
+            # owner belong to the default mock user
+            competitor.setdefault("clerk_id", competitor.get("user_id") or DEFAULT_MOCK_CLERK_ID)
+            key = id(competitor)
+            aggregate = CompetitorAggregate.from_competitor(competitor)
+            self._positions[key] = position
+            self._aggregates[key] = aggregate
+            self._names.append(competitor.get("company_name", "").lower())
+
+            for owner in {competitor.get("user_id"), competitor["clerk_id"]}:
+                if owner:
+                    by_clerk_id[owner].append(competitor)
+            industry = competitor.get("industry_sector") or competitor.get("industry")
+            if industry:
+                by_industry[industry].append(competitor)
+                industry_aggregates[industry].merge(aggregate)
+            if competitor.get("competitor_id"):
+                self._by_id[competitor["competitor_id"]] = competitor
+            for hashtag in aggregate.hashtag_counts:
+                by_hashtag[hashtag.lower()].append(competitor)
+            total.merge(aggregate)
+
+        self._by_clerk_id: Dict[str, Tuple[Dict[str, Any], ...]] = {k: tuple(v) for k, v in by_clerk_id.items()}
+        self._by_industry: Dict[str, Tuple[Dict[str, Any], ...]] = {k: tuple(v) for k, v in by_industry.items()}
+        self._by_hashtag: Dict[str, Tuple[Dict[str, Any], ...]] = {k: tuple(v) for k, v in by_hashtag.items()}
+        self._industry_aggregates: Dict[str, CompetitorAggregate] = dict(industry_aggregates)
+        self._total = total
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def all_competitors(self) -> List[Dict[str, Any]]:
+        return self._all
+
+    def competitors_for_clerk(self, clerk_id: str) -> List[Dict[str, Any]]:
+        return list(self._by_clerk_id.get(clerk_id, ()))
+
+    def competitors_in_industry(self, industry: str) -> List[Dict[str, Any]]:
+        return list(self._by_industry.get(industry, ()))
+
+    def competitors_with_hashtag(self, hashtag: str) -> List[Dict[str, Any]]:
+        return list(self._by_hashtag.get(hashtag.lower(), ()))
+
+    def competitors_matching_name(self, text: str) -> List[Dict[str, Any]]:
+        needle = text.lower()
+        return [self._all[i] for i, name in enumerate(self._names) if needle in name]
+
+    def get_competitor(self, competitor_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(competitor_id)
+
+    def select_ids(self, competitors: List[Dict[str, Any]], competitor_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Keep the competitors whose competitor_id is requested, preserving dataset order"""
+        if competitors is self._all:
+            selected = [c for c in (self._by_id.get(cid) for cid in set(competitor_ids)) if c is not None]
+            return sorted(selected, key=lambda c: self._positions[id(c)])
+        wanted = set(competitor_ids)
+        return [c for c in competitors if c.get("competitor_id") in wanted]
+
+    def aggregate_for(self, competitor: Dict[str, Any]) -> CompetitorAggregate:
+        """Precomputed aggregate for snapshot competitors, computed on the fly for anything else"""
+        aggregate = self._aggregates.get(id(competitor))
+        if aggregate is None or self._all[self._positions[id(competitor)]] is not competitor:
+            aggregate = CompetitorAggregate.from_competitor(competitor)
+        return aggregate
+
+    def aggregate_of(self, competitors: List[Dict[str, Any]]) -> CompetitorAggregate:
+        if competitors is self._all:
+            return self._total
+        return CompetitorAggregate.combine(self.aggregate_for(c) for c in competitors)
+
+    def industry_aggregate(self, industry: str) -> Optional[CompetitorAggregate]:
+        return self._industry_aggregates.get(industry)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "mtime": self.mtime,
+            "loaded_at": self.loaded_at,
+            "competitors": len(self._all),
+            "posts": self._total.post_count,
+            "industries": len(self._by_industry),
+            "hashtags": len(self._by_hashtag)
+        }
+
+
+def load_competitor_dataset(path: str = DEFAULT_DATASET_PATH) -> CompetitorDataset:
+    """Read and index a dataset file, falling back to a minimal dataset if it is missing or invalid"""
+    started = time.perf_counter()
+    try:
+        mtime = os.stat(path).st_mtime
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"⚠️ Mock data file not found, using minimal fallback: {e}")
+        return CompetitorDataset(json.loads(json.dumps(FALLBACK_DATASET)), path=path, mtime=None)
+
+    dataset = CompetitorDataset(data, path=path, mtime=mtime)
+    logger.info(
+        f"📁 Competitor dataset loaded: {len(dataset)} competitors in "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+    return dataset
+
+
+class CompetitorDatasetStore:
+    """
+    Holds the current snapshot for one file and swaps it when the file changes.
+    Reloads never block callers: inside an event loop the file check and reload run in a
+    worker thread, and the new snapshot replaces the old one in a single assignment.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATASET_PATH, check_interval: float = RELOAD_CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._dataset: Optional[CompetitorDataset] = None
+        self._checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get(self) -> CompetitorDataset:
+        dataset = self._dataset
+        if dataset is None:
+            return self._load_initial()
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._schedule_refresh()
+            # Without an event loop the refresh already ran, so hand out its result;
+            # a background refresh keeps serving the old snapshot until it lands
+            return self._dataset
+        return dataset
+
+    async def aget(self) -> CompetitorDataset:
+        """get() for async callers: the first load also happens in a worker thread"""
+        if self._dataset is None:
+            return await asyncio.to_thread(self._load_initial)
+        return self.get()
+
+    def _load_initial(self) -> CompetitorDataset:
+        with self._lock:
+            if self._dataset is None:
+                self._dataset = load_competitor_dataset(self.path)
+                self._checked_at = time.monotonic()
+            return self._dataset
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Scripts and benchmarks: no event loop to keep free
+            self._refresh()
+            return
+        loop.run_in_executor(None, self._refresh)
+
+    def _refresh(self) -> None:
+        try:
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                mtime = None
+            if mtime != self._dataset.mtime:
+                logger.info("🔄 Competitor dataset changed on disk, reloading")
+                self._dataset = load_competitor_dataset(self.path)
+        except Exception as e:
+            logger.warning(f"⚠️ Competitor dataset reload failed, keeping the current snapshot: {e}")
+        finally:
+            self._checked_at = time.monotonic()
+            self._refreshing = False
+
+
+_default_store = CompetitorDatasetStore()
+
+
+def get_competitor_dataset() -> CompetitorDataset:
+    """Process-wide competitor dataset snapshot"""
+    return _default_store.get()
+
+
+async def get_competitor_dataset_async() -> CompetitorDataset:
+    """Process-wide competitor dataset snapshot, loaded off the event loop"""
+    return await _default_store.aget()
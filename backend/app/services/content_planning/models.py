@@ -20,10 +20,23 @@ class ContentGenerationRequest(BaseModel):
     industry: Optional[str] = Field(None, description="User's industry sector")
 
 
+class ContentVariationsRequest(BaseModel):
+    """Request model for batched content variation generation"""
+    clerk_id: str = Field(..., description="User's Clerk ID")
+    platforms: List[str] = Field(..., description="Target platforms")
+    content_type: str = Field(..., description="Type of content to generate")
+    target_audience: str = Field(..., description="Target audience description")
+    tones: Optional[List[str]] = Field(None, description="Tones to vary (defaults to professional, casual, enthusiastic)")
+    variation_count: int = Field(default=3, ge=1, le=10, description="Variations per platform")
+    custom_requirements: Optional[str] = Field(None, description="Custom requirements")
+    industry: Optional[str] = Field(None, description="User's industry sector")
+
+
 class CompetitorAnalysisRequest(BaseModel):
     """Request model for competitor analysis"""
     clerk_id: str = Field(..., description="User's Clerk ID")
     competitor_ids: Optional[List[str]] = Field(None, description="Specific competitor IDs")
+    industry: Optional[str] = Field(None, description="User's industry sector")
     analysis_type: str = Field(default="comprehensive_analysis", description="Type of analysis")
     time_period: str = Field(default="last_30_days", description="Analysis time period")
 
@@ -43,6 +56,7 @@ class ContentStrategyRequest(BaseModel):
     platforms: List[str] = Field(..., description="Target platforms")
     content_goals: List[str] = Field(..., description="Content goals")
     target_audience: str = Field(..., description="Target audience")
+    industry: Optional[str] = Field(None, description="User's industry sector")
 
 
 class ContentCalendarRequest(BaseModel):
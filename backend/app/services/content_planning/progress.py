@@ -0,0 +1,33 @@
+"""
+Progress reporting for streamed content planning requests
+Service, agent and tool methods accept an optional ``progress`` callback; streaming
+endpoints pass one that forwards events to the client, everyone else passes nothing
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def report_progress(progress: Optional[ProgressCallback], stage: str, **details: Any) -> None:
+    """Report that a pipeline stage started or finished"""
+    _emit(progress, "progress", {"stage": stage, **details})
+
+
+def report_token(progress: Optional[ProgressCallback], text: str) -> None:
+    """Report a partial chunk of LLM output"""
+    if text:
+        _emit(progress, "token", {"text": text})
+
+
+def _emit(progress: Optional[ProgressCallback], event: str, payload: Dict[str, Any]) -> None:
+    if progress is None:
+        return
+    try:
+        progress(event, payload)
+    except Exception as e:
+        # A broken progress consumer must never fail the request itself
+        logger.warning(f"⚠️ Progress callback failed for {event}: {e}")
@@ -0,0 +1,269 @@
+"""
+Result cache for content generation requests
+Keyed on the normalized request plus a version stamp of the user's competitor data,
+with a near-duplicate lookup for paraphrased custom requirements
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Deliberately small: negations ("no", "not", "without") are kept so they change the meaning
+_STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "to", "for", "in", "on", "at", "by", "is", "are",
+    "be", "it", "its", "this", "that", "these", "those", "please", "make", "sure", "some",
+    "should", "would", "could", "can", "i", "we", "our", "my", "me", "us", "you", "your",
+    "also", "just", "very", "really", "use", "using", "include", "including", "add", "want"
+})
+
+# Words that flip or scale a requirement ("with emojis" / "without emojis", "more" / "fewer"):
+# near-duplicate requirements must use exactly the same ones
+_POLARITY_TOKENS = frozenset({
+    "no", "not", "non", "none", "nothing", "never", "neither", "nor", "without", "with",
+    "avoid", "exclude", "excluding", "except", "skip", "omit", "instead", "only",
+    "don't", "dont", "doesn't", "doesnt", "isn't", "aren't", "shouldn't", "won't",
+    "more", "less", "fewer", "fewest", "most", "least"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9#@']+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace"""
+    return " ".join((value or "").lower().split())
+
+
+def requirement_tokens(value: Optional[str]) -> FrozenSet[str]:
+    """Token set used for near-duplicate matching of custom requirements"""
+    tokens = set()
+    for token in _TOKEN_RE.findall(normalize_text(value)):
+        token = token.strip("'")
+        if not token or token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return frozenset(tokens)
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _numbers(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(token for token in tokens if token.isdigit())
+
+
+def _polarity(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return tokens & _POLARITY_TOKENS
+
+
+@dataclass
+class _CacheEntry:
+    base_key: str
+    tokens: FrozenSet[str]
+    value: Dict[str, Any]
+    created_at: float
+    expires_at: float
+
+
+class ContentResultCache:
+    """
+    Per-process cache of content generation results.
+
+    Exact hits require the same normalized request and data version. Near hits
+    require everything but ``custom_requirements`` to match exactly and the
+    requirement token sets to be similar (Jaccard >= threshold, same numbers and
+    the same negation/polarity words).
+    """
+
+    def __init__(self, ttl_seconds: int = 900, max_entries: int = 256, similarity_threshold: float = 0.8):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._buckets: Dict[str, List[str]] = {}
+
+        self._stats = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "near_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "hit_lookup_ms_total": 0.0,
+            "miss_generation_ms_total": 0.0,
+            "miss_generations": 0
+        }
+
+    @staticmethod
+    def normalize_request(
+        clerk_id: str,
+        platform: str,
+        content_type: str,
+        tone: str,
+        target_audience: str,
+        custom_requirements: Optional[str] = None,
+        generate_variations: bool = False,
+        industry: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Normalized view of a generation request used for cache keys"""
+        return {
+            "clerk_id": clerk_id or "",
+            "industry": normalize_text(industry),
+            "platform": normalize_text(platform),
+            "content_type": normalize_text(content_type),
+            "tone": normalize_text(tone),
+            "target_audience": normalize_text(target_audience),
+            "generate_variations": bool(generate_variations),
+            "custom_requirements": normalize_text(custom_requirements)
+        }
+
+    @staticmethod
+    def _keys(request: Dict[str, Any], data_version: str) -> Tuple[str, str]:
+        base = {k: v for k, v in request.items() if k != "custom_requirements"}
+        base["data_version"] = data_version
+        base_key = hashlib.sha256(json.dumps(base, sort_keys=True).encode("utf-8")).hexdigest()
+        exact_key = hashlib.sha256(
+            f"{base_key}:{request.get('custom_requirements', '')}".encode("utf-8")
+        ).hexdigest()
+        return base_key, exact_key
+
+    def get(self, request: Dict[str, Any], data_version: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result (deep copy) with cache metadata, or None"""
+        started = time.perf_counter()
+        self._stats["lookups"] += 1
+        base_key, exact_key = self._keys(request, data_version)
+        now = time.time()
+
+        match_type = None
+        entry = self._entries.get(exact_key)
+        if entry and entry.expires_at > now:
+            match_type = "exact"
+        else:
+            if entry:
+                self._remove(exact_key)
+            entry, _ = self._find_near_duplicate(base_key, request.get("custom_requirements"), now)
+            if entry:
+                match_type = "near_duplicate"
+
+        if not match_type:
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["exact_hits" if match_type == "exact" else "near_hits"] += 1
+        self._stats["hit_lookup_ms_total"] += (time.perf_counter() - started) * 1000
+
+        result = copy.deepcopy(entry.value)
+        content = result.get("content")
+        if isinstance(content, dict):
+            content["cache"] = {
+                "hit": match_type,
+                "age_seconds": round(now - entry.created_at, 1),
+                "data_version": data_version
+            }
+        logger.info(f"♻️ Content generation cache {match_type} hit for {request.get('platform')}")
+        return result
+
+    def _find_near_duplicate(self, base_key: str, custom_requirements: Optional[str], now: float):
+        tokens = requirement_tokens(custom_requirements)
+        best_entry, best_similarity = None, 0.0
+        for key in list(self._buckets.get(base_key, [])):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            if entry.expires_at <= now:
+                self._remove(key)
+                continue
+            if _numbers(entry.tokens) != _numbers(tokens) or _polarity(entry.tokens) != _polarity(tokens):
+                continue
+            similarity = _jaccard(entry.tokens, tokens)
+            if similarity >= self.similarity_threshold and similarity > best_similarity:
+                best_entry, best_similarity = entry, similarity
+        return best_entry, best_similarity
+
+    def set(
+        self,
+        request: Dict[str, Any],
+        data_version: str,
+        value: Dict[str, Any],
+        generation_ms: Optional[float] = None
+    ) -> None:
+        """Store a successful generation result"""
+        if generation_ms is not None:
+            self._stats["miss_generation_ms_total"] += generation_ms
+            self._stats["miss_generations"] += 1
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        base_key, exact_key = self._keys(request, data_version)
+        now = time.time()
+        if exact_key in self._entries:
+            self._remove(exact_key)
+
+        self._entries[exact_key] = _CacheEntry(
+            base_key=base_key,
+            tokens=requirement_tokens(request.get("custom_requirements")),
+            value=copy.deepcopy(value),
+            created_at=now,
+            expires_at=now + self.ttl_seconds
+        )
+        self._buckets.setdefault(base_key, []).append(exact_key)
+        self._stats["stores"] += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._stats["evictions"] += 1
+
+    def _remove(self, exact_key: str) -> None:
+        entry = self._entries.pop(exact_key, None)
+        if entry is None:
+            return
+        bucket = self._buckets.get(entry.base_key)
+        if bucket:
+            if exact_key in bucket:
+                bucket.remove(exact_key)
+            if not bucket:
+                self._buckets.pop(entry.base_key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and latency figures for the cache"""
+        stats = self._stats
+        hits = stats["exact_hits"] + stats["near_hits"]
+        avg_hit_ms = stats["hit_lookup_ms_total"] / hits if hits else None
+        avg_miss_ms = (
+            stats["miss_generation_ms_total"] / stats["miss_generations"] if stats["miss_generations"] else None
+        )
+        return {
+            "entries": len(self._entries),
+            "lookups": stats["lookups"],
+            "exact_hits": stats["exact_hits"],
+            "near_hits": stats["near_hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(hits / stats["lookups"], 3) if stats["lookups"] else 0.0,
+            "stores": stats["stores"],
+            "evictions": stats["evictions"],
+            "avg_hit_latency_ms": round(avg_hit_ms, 2) if avg_hit_ms is not None else None,
+            "avg_miss_latency_ms": round(avg_miss_ms, 1) if avg_miss_ms is not None else None,
+            "estimated_time_saved_ms": round(hits * avg_miss_ms, 1) if avg_miss_ms is not None else None,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold
+        }
@@ -10,6 +10,7 @@ import re
 import json
 from typing import Optional, Dict, Any
 from app.core.config import settings
+from app.services.llm import get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +30,9 @@ class ImageGenerationService:
         Use LLM to extract product information from text content
         """
         try:
-            # Check if we have Google API key
-            if not settings.gemini_api_key:
-                logger.warning("⚠️ Google/Gemini API key not found, falling back to simple extraction")
+            gateway = get_llm_gateway()
+            if not gateway.available:
+                logger.warning("⚠️ No LLM backend available, falling back to simple extraction")
                 return self._extract_product_simple_fallback(text_content, industry)
             
             # Prepare the prompt for LLM
@@ -48,63 +49,32 @@ Respond with JSON format:
 
 Example: For "Nike Air Force shoes" respond with {{"main_product": "Nike Air Force shoes", "product_type": "footwear", "photography_style": "product photography"}}"""
 
-            # Make request to Google Gemini
-            url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
-            headers = {
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.1,
-                    "maxOutputTokens": 200
-                }
-            }
-            
-            response = requests.post(
-                f"{url}?key={settings.gemini_api_key}",
-                headers=headers,
-                json=payload,
+            response = await gateway.ainvoke(
+                prompt,
+                model="gemini-1.5-flash",
+                temperature=0.1,
+                max_tokens=200,
                 timeout=10
             )
+            content = response.content
             
-            if response.status_code == 200:
-                result = response.json()
-                if "candidates" in result and len(result["candidates"]) > 0:
-                    content = result["candidates"][0]["content"]["parts"][0]["text"]
+            # Try to parse JSON from the response
+            try:
+                # Clean the response (remove markdown formatting if present)
+                clean_content = content.strip()
+                if clean_content.startswith("```json"):
+                    clean_content = clean_content.replace("```json", "").replace("```", "").strip()
+                elif clean_content.startswith("```"):
+                    clean_content = clean_content.replace("```", "").strip()
                     
-                    # Try to parse JSON from the response
-                    try:
-                        # Clean the response (remove markdown formatting if present)
-                        clean_content = content.strip()
-                        if clean_content.startswith("```json"):
-                            clean_content = clean_content.replace("```json", "").replace("```", "").strip()
-                        elif clean_content.startswith("```"):
-                            clean_content = clean_content.replace("```", "").strip()
-                            
-                        product_info = json.loads(clean_content)
-                        
-                        logger.info(f"🤖 LLM extracted product: {product_info.get('main_product', 'unknown')}")
-                        return product_info
-                        
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"⚠️ Failed to parse LLM JSON response: {e}")
-                        logger.warning(f"Raw response: {content}")
-                        
-            else:
-                # Log the full error response for debugging
-                try:
-                    error_response = response.json()
-                    logger.warning(f"⚠️ LLM API request failed: {response.status_code} - {error_response}")
-                except:
-                    logger.warning(f"⚠️ LLM API request failed: {response.status_code} - {response.text}")
-            
-            logger.warning(f"⚠️ LLM API request failed: {response.status_code}")
+                product_info = json.loads(clean_content)
+                
+                logger.info(f"🤖 LLM extracted product: {product_info.get('main_product', 'unknown')}")
+                return product_info
+                
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️ Failed to parse LLM JSON response: {e}")
+                logger.warning(f"Raw response: {content}")
             
         except Exception as e:
             logger.warning(f"⚠️ LLM extraction failed: {str(e)}")
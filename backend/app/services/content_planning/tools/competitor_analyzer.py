@@ -2,17 +2,20 @@
 Competitor Analyzer Tool - Analyzes competitor content for strategic insights
 """
 
-import json
+import hashlib
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, Field
 from collections import defaultdict
-import statistics
 from datetime import datetime, timedelta, timezone
-import os
 import logging
 
+from app.services.llm import get_llm_gateway
 from ..config.settings import settings
 from ..config.prompts import COMPETITOR_ANALYSIS_PROMPT, CONTENT_GAP_ANALYSIS_PROMPT
+from ..data.competitor_dataset import (
+    CompetitorAggregate, CompetitorDataset, get_competitor_dataset, get_competitor_dataset_async
+)
+from ..progress import ProgressCallback, report_progress, report_token
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +34,7 @@ class CompetitorAnalyzer:
     """
     
     def __init__(self):
-        # Initialize with mock data for fallback
-        self._load_competitor_data()
+        # Mock data for fallback comes from the shared, process-wide dataset snapshot
         self.llm = None  # Initialize lazily
         self.supabase_client = None  # Initialize lazily
         
@@ -52,45 +54,10 @@ class CompetitorAnalyzer:
                 self.supabase_client = None
         return self.supabase_client
     
-    def _load_competitor_data(self):
-        """Load competitor data from mock dataset as fallback"""
-        try:
-            # Try to load from the file
-            dataset_path = os.path.join(os.path.dirname(__file__), "..", "data", "mock_datasets", "competitors_dataset.json")
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                self.competitor_data = json.load(f)
-                # Ensure all competitors have clerk_id
-                self._ensure_clerk_id_in_mock_data()
-                logger.info("📁 Mock competitor data loaded successfully")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            # Fallback to minimal data structure if file not found
-            logger.warning(f"⚠️ Mock data file not found, using minimal fallback: {e}")
-            self.competitor_data = {
-                "competitors": [
-                    {
-                        "competitor_id": "comp_tech_001",
-                        "company_name": "TechFlow Solutions",
-                        "clerk_id": "user_123",  # Mock clerk ID
-                        "industry_sector": "technology",
-                        "posts": [
-                            {
-                                "post_content": "AI-powered automation increases productivity by 80%",
-                                "hashtags": ["#AI", "#Automation", "#Productivity"],
-                                "platform": "linkedin",
-                                "engagement_metrics": {"engagement_rate": 4.2}
-                            }
-                        ]
-                    }
-                ],
-                "trending_hashtags": {"technology": ["#AI", "#Innovation", "#TechTrends"]},
-                "content_insights": {}
-            }
-    
-    def _ensure_clerk_id_in_mock_data(self):
-        """Ensure all competitors in mock data have clerk_id field"""
-        for competitor in self.competitor_data.get("competitors", []):
-            if "clerk_id" not in competitor:
-                competitor["clerk_id"] = "user_123"  # Default mock clerk ID
+    @property
+    def competitor_data(self) -> Dict[str, Any]:
+        """Raw mock dataset (read-only, shared across the process)"""
+        return get_competitor_dataset().data
     
     async def _fetch_supabase_competitors(self, clerk_id: str) -> Optional[Dict[str, Any]]:
         """Fetch competitor data from Supabase based on Clerk ID"""
@@ -119,6 +86,44 @@ class CompetitorAnalyzer:
             logger.error(f"❌ Error fetching competitors from Supabase: {e}")
             return None
     
+    async def get_data_version(self, clerk_id: str) -> str:
+        """
+        Version stamp of the user's competitor data snapshot.
+        Every monitoring scan bumps competitors.last_scan_at, so a change here means new data may exist.
+        Users without Supabase competitors are analysed from the mock dataset, whose stamp is the
+        modification time of the loaded file.
+        """
+        try:
+            client = self._get_supabase_client()
+            if not client:
+                return await self._mock_data_version()
+            
+            response = await client._make_request(
+                "GET",
+                "competitors",
+                params={"user_id": f"eq.{clerk_id}", "select": "id,last_scan_at,updated_at"}
+            )
+            if response.status_code != 200:
+                return "unknown"
+            
+            rows = response.json() or []
+            if not rows:
+                return await self._mock_data_version()
+            
+            stamp = "|".join(
+                f"{row.get('id')}:{row.get('last_scan_at')}:{row.get('updated_at')}"
+                for row in sorted(rows, key=lambda r: str(r.get("id")))
+            )
+            return f"supabase:{hashlib.sha1(stamp.encode('utf-8')).hexdigest()[:16]}"
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Could not compute competitor data version: {e}")
+            return "unknown"
+    
+    @staticmethod
+    async def _mock_data_version() -> str:
+        return f"mock:{(await get_competitor_dataset_async()).mtime}"
+    
     async def _fetch_supabase_monitoring_data(self, competitor_ids: List[str], time_period: str = "last_30_days") -> Optional[List[Dict[str, Any]]]:
         """Fetch monitoring data from Supabase"""
         try:
@@ -348,20 +353,10 @@ class CompetitorAnalyzer:
             return None
     
     def _get_llm(self):
-        """Lazy initialization of LLM"""
+        """Lazy lookup of the shared LLM gateway ("mock" when no backend is configured)"""
         if self.llm is None:
-            try:
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                self.llm = ChatGoogleGenerativeAI(
-                    model=settings.model_name,
-                    temperature=settings.temperature,
-                    max_tokens=settings.max_tokens,
-                    top_p=settings.top_p,
-                    google_api_key=os.getenv("GOOGLE_API_KEY")
-                )
-            except Exception as e:
-                print(f"Warning: Could not initialize Google AI LLM: {e}")
-                self.llm = "mock"  # Use mock mode
+            gateway = get_llm_gateway()
+            self.llm = gateway if gateway.available else "mock"
         return self.llm
     
     async def _run(
@@ -369,7 +364,8 @@ class CompetitorAnalyzer:
         clerk_id: str,
         competitor_ids: Optional[List[str]] = None,
         analysis_type: str = "trend_analysis",
-        time_period: str = "last_30_days"
+        time_period: str = "last_30_days",
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """Analyze competitor data based on inputs"""
         
@@ -380,16 +376,19 @@ class CompetitorAnalyzer:
             if supabase_data:
                 # Use Supabase data
                 analysis_data = supabase_data
+                dataset = None
                 self.data_source = "supabase"
                 logger.info("🔍 Using Supabase data for competitor analysis")
             else:
                 # Fallback to mock data
-                analysis_data = self.competitor_data
+                dataset = await get_competitor_dataset_async()
+                analysis_data = dataset.data
                 self.data_source = "mock"
                 logger.info("🔍 Using mock data for competitor analysis (Supabase fallback)")
             
             # Filter competitors by industry
-            relevant_competitors = self._filter_competitors(clerk_id, competitor_ids, analysis_data)
+            relevant_competitors = self._filter_competitors(clerk_id, competitor_ids, analysis_data, dataset)
+            aggregate = self._aggregate(relevant_competitors, dataset)
             
             if not relevant_competitors:
                 return {
@@ -400,18 +399,20 @@ class CompetitorAnalyzer:
             
             # Perform analysis based on type
             if analysis_type == "trend_analysis":
-                analysis_result = self._perform_trend_analysis(relevant_competitors)
+                analysis_result = self._perform_trend_analysis(relevant_competitors, aggregate)
             elif analysis_type == "content_gap_analysis":
-                analysis_result = self._perform_gap_analysis(relevant_competitors)
+                analysis_result = self._perform_gap_analysis(relevant_competitors, aggregate)
             elif analysis_type == "hashtag_analysis":
-                analysis_result = self._perform_hashtag_analysis(relevant_competitors)
+                analysis_result = self._perform_hashtag_analysis(relevant_competitors, aggregate)
             elif analysis_type == "engagement_analysis":
-                analysis_result = self._perform_engagement_analysis(relevant_competitors)
+                analysis_result = self._perform_engagement_analysis(relevant_competitors, aggregate)
             else:
-                analysis_result = self._perform_comprehensive_analysis(relevant_competitors)
+                analysis_result = self._perform_comprehensive_analysis(relevant_competitors, aggregate)
+            
+            report_progress(progress, "competitor_data", competitor_count=len(relevant_competitors), data_source=self.data_source)
             
             # Enhance with AI insights
-            ai_insights = await self._get_ai_insights(relevant_competitors, analysis_type, time_period)
+            ai_insights = await self._get_ai_insights(relevant_competitors, analysis_type, time_period, progress)
             
             return {
                 "success": True,
@@ -435,11 +436,29 @@ class CompetitorAnalyzer:
                 "data_source": self.data_source
             }
     
-    def _filter_competitors(self, clerk_id: str, competitor_ids: Optional[List[str]], analysis_data: Dict[str, Any]) -> List[Dict]:
-        """Filter competitors based on Clerk ID and optional IDs"""
+    def _filter_competitors(
+        self,
+        clerk_id: str,
+        competitor_ids: Optional[List[str]],
+        analysis_data: Dict[str, Any],
+        dataset: Optional[CompetitorDataset] = None
+    ) -> List[Dict]:
+        """Filter competitors based on Clerk ID and optional IDs (indexed lookups for the mock dataset)"""
+        
+        if dataset is not None:
+            filtered = dataset.competitors_for_clerk(clerk_id)
+            if not filtered and clerk_id != "unknown":
+                filtered = dataset.competitors_matching_name(clerk_id)
+                if not filtered:
+                    filtered = dataset.all_competitors()
+                    logger.info(f"ℹ️ No Clerk ID match found for '{clerk_id}', using all {len(filtered)} competitors")
+            if competitor_ids:
+                filtered = dataset.select_ids(filtered, competitor_ids)
+            return filtered
         
         competitors = analysis_data.get("competitors", [])
         
+        
         # Filter by user_id (which references users.clerk_id via foreign key)
         filtered = [comp for comp in competitors if comp.get("user_id") == clerk_id]
         
@@ -459,77 +478,41 @@ class CompetitorAnalyzer:
         
         return filtered
     
-    def _perform_trend_analysis(self, competitors: List[Dict]) -> Dict[str, Any]:
+    def _aggregate(self, competitors: List[Dict], dataset: Optional[CompetitorDataset] = None) -> CompetitorAggregate:
+        """Post aggregates for a set of competitors (precomputed when they come from the dataset snapshot)"""
+        if dataset is not None:
+            return dataset.aggregate_of(competitors)
+        return CompetitorAggregate.combine(CompetitorAggregate.from_competitor(c) for c in competitors)
+    
+    def _perform_trend_analysis(self, competitors: List[Dict], aggregate: Optional[CompetitorAggregate] = None) -> Dict[str, Any]:
         """Analyze content trends across competitors"""
         
-        content_types = defaultdict(list)
-        tones = defaultdict(int)
-        posting_times = defaultdict(int)
-        hashtag_usage = defaultdict(int)
-        
-        for competitor in competitors:
-            for post in competitor.get("posts", []):
-                # Content type analysis
-                content_type = post.get("post_type", "unknown")
-                content_types[content_type].append(post.get("engagement_metrics", {}).get("engagement_rate", 0))
-                
-                # Tone analysis
-                tone = post.get("tone", "unknown")
-                tones[tone] += 1
-                
-                # Posting time analysis
-                posting_time = post.get("posting_time", "")
-                if posting_time:
-                    hour = datetime.fromisoformat(posting_time.replace('Z', '+00:00')).hour
-                    posting_times[hour] += 1
-                
-                # Hashtag analysis
-                for hashtag in post.get("hashtags", []):
-                    hashtag_usage[hashtag] += 1
+        aggregate = aggregate or self._aggregate(competitors)
         
         # Calculate averages and trends
         content_performance = {}
-        for content_type, engagement_rates in content_types.items():
-            if engagement_rates:
+        for content_type, stat in aggregate.content_types.items():
+            if stat.count:
                 content_performance[content_type] = {
-                    "avg_engagement": round(statistics.mean(engagement_rates), 2),
-                    "post_count": len(engagement_rates),
-                    "max_engagement": max(engagement_rates),
-                    "min_engagement": min(engagement_rates)
+                    "avg_engagement": round(stat.mean, 2),
+                    "post_count": stat.count,
+                    "max_engagement": stat.maximum,
+                    "min_engagement": stat.minimum
                 }
         
         return {
             "content_performance": content_performance,
-            "popular_tones": dict(sorted(tones.items(), key=lambda x: x[1], reverse=True)[:5]),
-            "optimal_posting_hours": dict(sorted(posting_times.items(), key=lambda x: x[1], reverse=True)[:5]),
-            "trending_hashtags": dict(sorted(hashtag_usage.items(), key=lambda x: x[1], reverse=True)[:15])
+            "popular_tones": dict(sorted(aggregate.tones.items(), key=lambda x: x[1], reverse=True)[:5]),
+            "optimal_posting_hours": dict(sorted(aggregate.posting_hours.items(), key=lambda x: x[1], reverse=True)[:5]),
+            "trending_hashtags": dict(sorted(aggregate.hashtag_counts.items(), key=lambda x: x[1], reverse=True)[:15])
         }
     
-    def _perform_gap_analysis(self, competitors: List[Dict]) -> Dict[str, Any]:
+    def _perform_gap_analysis(self, competitors: List[Dict], aggregate: Optional[CompetitorAggregate] = None) -> Dict[str, Any]:
         """Identify content gaps and opportunities"""
         
-        competitor_topics = set()
-        competitor_formats = set()
-        underrepresented_times = defaultdict(int)
-        
-        for competitor in competitors:
-            for post in competitor.get("posts", []):
-                # Extract topics from content (simplified)
-                content = post.get("post_content", "").lower()
-                if "product" in content or "launch" in content:
-                    competitor_topics.add("product_launches")
-                if "tip" in content or "how to" in content:
-                    competitor_topics.add("educational_tips")
-                if "behind" in content or "team" in content:
-                    competitor_topics.add("behind_the_scenes")
-                
-                competitor_formats.add(post.get("post_type", "unknown"))
-                
-                # Time gap analysis
-                posting_time = post.get("posting_time", "")
-                if posting_time:
-                    hour = datetime.fromisoformat(posting_time.replace('Z', '+00:00')).hour
-                    underrepresented_times[hour] += 1
+        aggregate = aggregate or self._aggregate(competitors)
+        competitor_topics = aggregate.topics
+        underrepresented_times = aggregate.posting_hours
         
         # Identify gaps (hours with fewer posts)
         all_hours = set(range(24))
@@ -542,7 +525,7 @@ class CompetitorAnalyzer:
         
         return {
             "covered_topics": list(competitor_topics),
-            "covered_formats": list(competitor_formats),
+            "covered_formats": list(aggregate.formats),
             "potential_topic_gaps": [
                 "user_testimonials", "industry_news_commentary", "seasonal_content",
                 "community_highlights", "expert_interviews", "trend_predictions"
@@ -554,29 +537,21 @@ class CompetitorAnalyzer:
             "opportunity_score": len(low_activity_hours) + (6 - len(competitor_topics))
         }
     
-    def _perform_hashtag_analysis(self, competitors: List[Dict]) -> Dict[str, Any]:
+    def _perform_hashtag_analysis(self, competitors: List[Dict], aggregate: Optional[CompetitorAggregate] = None) -> Dict[str, Any]:
         """Analyze hashtag usage and performance"""
         
-        hashtag_performance = defaultdict(list)
-        hashtag_frequency = defaultdict(int)
-        
-        for competitor in competitors:
-            for post in competitor.get("posts", []):
-                engagement_rate = post.get("engagement_metrics", {}).get("engagement_rate", 0)
-                
-                for hashtag in post.get("hashtags", []):
-                    hashtag_frequency[hashtag] += 1
-                    hashtag_performance[hashtag].append(engagement_rate)
+        aggregate = aggregate or self._aggregate(competitors)
+        hashtag_frequency = aggregate.hashtag_counts
         
         # Calculate hashtag effectiveness
         hashtag_stats = {}
-        for hashtag, engagement_rates in hashtag_performance.items():
-            if engagement_rates:
-                hashtag_stats[hashtag] = {
-                    "avg_engagement": round(statistics.mean(engagement_rates), 2),
-                    "usage_frequency": hashtag_frequency[hashtag],
-                    "reach_potential": hashtag_frequency[hashtag] * statistics.mean(engagement_rates)
-                }
+        for hashtag, frequency in hashtag_frequency.items():
+            avg_engagement = aggregate.hashtag_engagement[hashtag] / frequency
+            hashtag_stats[hashtag] = {
+                "avg_engagement": round(avg_engagement, 2),
+                "usage_frequency": frequency,
+                "reach_potential": frequency * avg_engagement
+            }
         
         # Sort by different metrics
         by_engagement = sorted(hashtag_stats.items(), key=lambda x: x[1]["avg_engagement"], reverse=True)[:10]
@@ -591,46 +566,26 @@ class CompetitorAnalyzer:
             "avg_hashtags_per_post": round(sum(hashtag_frequency.values()) / max(len(competitors), 1), 1)
         }
     
-    def _perform_engagement_analysis(self, competitors: List[Dict]) -> Dict[str, Any]:
+    def _perform_engagement_analysis(self, competitors: List[Dict], aggregate: Optional[CompetitorAggregate] = None) -> Dict[str, Any]:
         """Analyze engagement patterns and drivers"""
         
-        engagement_by_platform = defaultdict(list)
-        engagement_by_time = defaultdict(list)
-        engagement_by_length = defaultdict(list)
-        
-        for competitor in competitors:
-            for post in competitor.get("posts", []):
-                engagement_rate = post.get("engagement_metrics", {}).get("engagement_rate", 0)
-                platform = post.get("platform", "unknown")
-                content_length = post.get("content_length", 0)
-                
-                engagement_by_platform[platform].append(engagement_rate)
-                
-                # Time analysis
-                posting_time = post.get("posting_time", "")
-                if posting_time:
-                    hour = datetime.fromisoformat(posting_time.replace('Z', '+00:00')).hour
-                    engagement_by_time[hour].append(engagement_rate)
-                
-                # Length analysis
-                length_category = "short" if content_length < 100 else "medium" if content_length < 300 else "long"
-                engagement_by_length[length_category].append(engagement_rate)
+        aggregate = aggregate or self._aggregate(competitors)
         
         # Calculate averages
         platform_performance = {}
-        for platform, rates in engagement_by_platform.items():
-            if rates:
-                platform_performance[platform] = round(statistics.mean(rates), 2)
+        for platform, stat in aggregate.platform_engagement.items():
+            if stat.count:
+                platform_performance[platform] = round(stat.mean, 2)
         
         time_performance = {}
-        for hour, rates in engagement_by_time.items():
-            if rates:
-                time_performance[hour] = round(statistics.mean(rates), 2)
+        for hour, stat in aggregate.hour_engagement.items():
+            if stat.count:
+                time_performance[hour] = round(stat.mean, 2)
         
         length_performance = {}
-        for length_cat, rates in engagement_by_length.items():
-            if rates:
-                length_performance[length_cat] = round(statistics.mean(rates), 2)
+        for length_cat, stat in aggregate.length_engagement.items():
+            if stat.count:
+                length_performance[length_cat] = round(stat.mean, 2)
         
         return {
             "platform_performance": platform_performance,
@@ -643,17 +598,24 @@ class CompetitorAnalyzer:
             }
         }
     
-    def _perform_comprehensive_analysis(self, competitors: List[Dict]) -> Dict[str, Any]:
+    def _perform_comprehensive_analysis(self, competitors: List[Dict], aggregate: Optional[CompetitorAggregate] = None) -> Dict[str, Any]:
         """Perform comprehensive analysis combining all methods"""
         
+        aggregate = aggregate or self._aggregate(competitors)
         return {
-            "trend_analysis": self._perform_trend_analysis(competitors),
-            "gap_analysis": self._perform_gap_analysis(competitors),
-            "hashtag_analysis": self._perform_hashtag_analysis(competitors),
-            "engagement_analysis": self._perform_engagement_analysis(competitors)
+            "trend_analysis": self._perform_trend_analysis(competitors, aggregate),
+            "gap_analysis": self._perform_gap_analysis(competitors, aggregate),
+            "hashtag_analysis": self._perform_hashtag_analysis(competitors, aggregate),
+            "engagement_analysis": self._perform_engagement_analysis(competitors, aggregate)
         }
     
-    async def _get_ai_insights(self, competitors: List[Dict], analysis_type: str, time_period: str) -> str:
+    async def _get_ai_insights(
+        self,
+        competitors: List[Dict],
+        analysis_type: str,
+        time_period: str,
+        progress: Optional[ProgressCallback] = None
+    ) -> str:
         """Get AI-generated insights from competitor analysis"""
         
         # Prepare competitor data summary for AI analysis
@@ -669,9 +631,15 @@ class CompetitorAnalyzer:
             llm = self._get_llm()
             if llm == "mock":
                 return "AI analysis unavailable: Using mock mode"
+            elif progress:
+                chunks = []
+                async for chunk in llm.astream(prompt, **settings.llm_params):
+                    chunks.append(chunk)
+                    report_token(progress, chunk)
+                return "".join(chunks)
             else:
-                response = llm.invoke(prompt)
-                return response.content if hasattr(response, 'content') else str(response)
+                response = await llm.ainvoke(prompt, **settings.llm_params)
+                return response.content
         except Exception as e:
             return f"AI analysis unavailable: {str(e)}"
     
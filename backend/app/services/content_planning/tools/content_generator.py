@@ -2,17 +2,27 @@
 Content Generator Tool - Generates optimized social media content using AI
 """
 
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from pydantic import BaseModel, Field
-import os
 import logging
 from datetime import datetime, timezone
 
+from app.services.llm import get_llm_gateway
 from ..config.settings import settings, PLATFORM_CONFIGS
-from ..config.prompts import CONTENT_GENERATION_PROMPT
+from ..config.prompts import CONTENT_GENERATION_PROMPT, BATCH_CONTENT_GENERATION_PROMPT
+from ..progress import ProgressCallback, report_progress, report_token
+from .content_parser import StreamingContentParser, normalize_hashtags, parse_content_objects
 
 logger = logging.getLogger(__name__)
 
+# Phrases that mean the model asked for more data instead of writing the post
+REFUSAL_PHRASES = [
+    "please provide", "looking forward to receiving", "once you provide",
+    "competitor analysis data", "placeholder", "{}", "competitor analysis"
+]
+
+DEFAULT_VARIATION_TONES = ["professional", "casual", "enthusiastic"]
+
 class ContentGenerationInput(BaseModel):
     """Input schema for content generation"""
     industry: str = Field(description="Target industry sector")
@@ -36,26 +46,15 @@ class ContentGenerator:
         self.last_analysis_check = None
     
     def _get_llm(self):
-        """Lazy initialization of LLM"""
+        """Lazy lookup of the shared LLM gateway ("mock" when no backend is configured)"""
         if self.llm is None:
-            try:
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                google_api_key = os.getenv("GOOGLE_API_KEY")
-                if not google_api_key:
-                    logger.warning("⚠️ No GOOGLE_API_KEY found, using mock mode")
-                    self.llm = "mock"
-                else:
-                    self.llm = ChatGoogleGenerativeAI(
-                        model=settings.model_name,
-                        temperature=settings.temperature,
-                        max_tokens=settings.max_tokens,
-                        top_p=settings.top_p,
-                        google_api_key=google_api_key
-                    )
-                    logger.info("✅ Google AI LLM initialized successfully")
-            except Exception as e:
-                logger.warning(f"⚠️ Could not initialize Google AI LLM: {e}")
-                self.llm = "mock"  # Use mock mode
+            gateway = get_llm_gateway()
+            if gateway.available:
+                self.llm = gateway
+                logger.info(f"✅ Using shared LLM gateway ({gateway.backend_name})")
+            else:
+                logger.warning("⚠️ No LLM backend available, using mock mode")
+                self.llm = "mock"
         return self.llm
     
     async def _run(
@@ -66,7 +65,8 @@ class ContentGenerator:
         tone: str,
         target_audience: str,
         competitor_insights: str,
-        custom_requirements: Optional[str] = None
+        custom_requirements: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """Generate content based on inputs"""
         
@@ -122,51 +122,38 @@ class ContentGenerator:
                 content_text = self._generate_mock_content(industry, platform, content_type, tone)
                 logger.info(f"🔧 Using mock content generation for {platform}")
             else:
-                try:
-                    # Try to generate content with retry logic
-                    max_retries = 2
-                    content_text = None
-                    
-                    for attempt in range(max_retries):
-                        try:
-                            response = llm.invoke(prompt)
-                            content_text = response.content if hasattr(response, 'content') else str(response)
-                            
-                            # Validate that the response contains actual content, not just requests for more data
-                            if any(phrase in content_text.lower() for phrase in [
-                                "please provide", "looking forward to receiving", "once you provide", 
-                                "competitor analysis data", "placeholder", "{}", "competitor analysis"
-                            ]):
-                                logger.warning(f"⚠️ Attempt {attempt + 1}: LLM returned request for more data, retrying...")
-                                if attempt < max_retries - 1:
-                                    # Add more specific instructions for retry
-                                    retry_prompt = prompt + "\n\nCRITICAL: You must generate actual content now. Do not ask for more data. Generate the post content immediately."
-                                    response = llm.invoke(retry_prompt)
-                                    content_text = response.content if hasattr(response, 'content') else str(response)
-                                else:
-                                    logger.warning(f"⚠️ All attempts failed, using mock fallback")
-                                    content_text = self._generate_mock_content(industry, platform, content_type, tone)
-                                break
-                            else:
-                                logger.info(f"✅ LLM generated content successfully for {platform} on attempt {attempt + 1}")
-                                break
-                                
-                        except Exception as e:
-                            logger.warning(f"⚠️ Attempt {attempt + 1} failed: {e}")
-                            if attempt == max_retries - 1:
-                                logger.warning(f"⚠️ All attempts failed, using mock fallback")
-                                content_text = self._generate_mock_content(industry, platform, content_type, tone)
-                    
-                    if not content_text:
-                        content_text = self._generate_mock_content(industry, platform, content_type, tone)
-                        
-                except Exception as e:
-                    # Fallback to mock content generation for demo
-                    logger.warning(f"⚠️ LLM generation failed, using mock: {e}")
+                # Retry only on call failures; a refused or malformed answer is handled after parsing
+                max_retries = 2
+                content_text = None
+                
+                for attempt in range(max_retries):
+                    try:
+                        report_progress(progress, "generating", platform=platform, attempt=attempt + 1)
+                        if progress:
+                            chunks = []
+                            async for chunk in llm.astream(prompt, **settings.llm_params):
+                                chunks.append(chunk)
+                                report_token(progress, chunk)
+                            content_text = "".join(chunks)
+                        else:
+                            response = await llm.ainvoke(prompt, **settings.llm_params)
+                            content_text = response.content
+                        logger.info(f"✅ LLM generated content successfully for {platform} on attempt {attempt + 1}")
+                        break
+                    except Exception as e:
+                        logger.warning(f"⚠️ Attempt {attempt + 1} failed: {e}")
+                
+                if not content_text:
+                    logger.warning(f"⚠️ All attempts failed, using mock fallback")
                     content_text = self._generate_mock_content(industry, platform, content_type, tone)
             
             # Parse the response - now expecting JSON format
             content_result = self._parse_llm_response(content_text, platform)
+            if self._is_refusal(content_result["post_content"]):
+                logger.warning(f"⚠️ LLM returned request for more data, using mock fallback")
+                content_result = self._parse_llm_response(
+                    self._generate_mock_content(industry, platform, content_type, tone), platform
+                )
             
             # Add metadata
             content_result.update({
@@ -208,137 +195,150 @@ class ContentGenerator:
             self.data_source = "mock"
     
     def _parse_llm_response(self, content_text: str, platform: str) -> Dict[str, Any]:
-        """Parse LLM response to extract structured content from JSON"""
-        try:
-            # First, try to parse as JSON (expected format)
-            import json
-            
-            # Clean the response text - remove any markdown formatting or extra text
-            cleaned_text = content_text.strip()
-            
-            # Try to find JSON content if it's wrapped in other text
-            if cleaned_text.startswith('```json'):
-                # Extract content between ```json and ```
-                start = cleaned_text.find('```json') + 7
-                end = cleaned_text.find('```', start)
-                if end != -1:
-                    cleaned_text = cleaned_text[start:end].strip()
-            elif cleaned_text.startswith('```'):
-                # Extract content between ``` and ```
-                start = cleaned_text.find('```') + 3
-                end = cleaned_text.find('```', start)
-                if end != -1:
-                    cleaned_text = cleaned_text[start:end].strip()
+        """Parse LLM response (JSON, legacy labelled layout or plain text) into structured content"""
+        parsed = parse_content_objects(content_text or "")
+        return self._build_content_result(parsed[0] if parsed else {"post_content": ""}, platform)
+    
+    def _build_content_result(self, raw: Dict[str, Any], platform: str) -> Dict[str, Any]:
+        """Normalize one parsed content object into the content result shape"""
+        post_content = str(raw.get("post_content") or "").strip()
+        hashtags = normalize_hashtags(raw.get("hashtags"))
+        if not hashtags and raw.get("_parsed_from") == "text":
+            hashtags = normalize_hashtags(post_content)
+        
+        quality_score = raw.get("content_quality_score")
+        if not isinstance(quality_score, (int, float)) or quality_score <= 0:
+            quality_score = self._calculate_content_quality_score(post_content, hashtags)
+        
+        return {
+            "success": True,
+            "post_content": post_content,
+            "hashtags": hashtags,
+            "character_count": len(post_content),
+            "estimated_engagement": raw.get("estimated_engagement") or "Medium",
+            "optimal_posting_time": raw.get("optimal_posting_time") or self._get_optimal_posting_time(platform),
+            "content_quality_score": quality_score,
+            "platform_optimization_notes": raw.get("platform_optimization_notes", "")
+        }
+    
+    @staticmethod
+    def _is_refusal(post_content: str) -> bool:
+        """True when the model asked for more data instead of writing the post"""
+        lowered = (post_content or "").lower()
+        return not lowered or any(phrase in lowered for phrase in REFUSAL_PHRASES)
+    
+    async def astream_variations(
+        self,
+        industry: str,
+        content_type: str,
+        target_audience: str,
+        competitor_insights: str,
+        variation_specs: List[Dict[str, str]],
+        custom_requirements: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate every variation in ``variation_specs`` (variation_id/platform/tone) with a
+        single streamed LLM call, yielding each variation as soon as it has been parsed.
+        Variations the model skipped or refused are filled with flagged mock content.
+        """
+        self._update_data_source_from_insights(competitor_insights)
+        pending = {spec["variation_id"]: spec for spec in variation_specs}
+        
+        llm = self._get_llm()
+        if llm != "mock" and pending:
+            spec_lines = []
+            for spec in variation_specs:
+                platform_config = PLATFORM_CONFIGS.get(spec["platform"], PLATFORM_CONFIGS["linkedin"])
+                spec_lines.append(
+                    f"- variation_id: {spec['variation_id']} | platform: {spec['platform']} | tone: {spec['tone']}"
+                    f" | max_length: {platform_config['max_length']} | hashtags: {platform_config['optimal_hashtags']}"
+                )
+            prompt = BATCH_CONTENT_GENERATION_PROMPT.format(
+                industry=industry,
+                competitor_insights=competitor_insights,
+                content_type=content_type,
+                target_audience=target_audience,
+                variation_specs="\n".join(spec_lines),
+                variation_count=len(variation_specs)
+            )
+            if custom_requirements:
+                prompt += f"\n\nADDITIONAL REQUIREMENTS:\n{custom_requirements}"
             
-            # Try to parse as JSON
+            llm_params = dict(settings.llm_params, max_tokens=max(settings.max_tokens, settings.batch_max_tokens))
+            parser = StreamingContentParser()
+            logger.info(f"🔧 Generating {len(variation_specs)} variations in one batched call")
             try:
-                parsed_content = json.loads(cleaned_text)
-                
-                # Validate required fields
-                required_fields = ["post_content", "hashtags"]
-                missing_fields = [field for field in required_fields if field not in parsed_content]
-                
-                if missing_fields:
-                    logger.warning(f"⚠️ JSON response missing required fields: {missing_fields}")
-                    raise ValueError(f"Missing required fields: {missing_fields}")
-                
-                # Ensure hashtags is a list
-                hashtags = parsed_content.get("hashtags", [])
-                if isinstance(hashtags, str):
-                    # If hashtags is a string, split it
-                    hashtags = [tag.strip() for tag in hashtags.split() if tag.strip().startswith("#")]
-                elif not isinstance(hashtags, list):
-                    hashtags = []
-                
-                # Build the result
-                result = {
-                    "success": True,
-                    "post_content": parsed_content.get("post_content", ""),
-                    "hashtags": hashtags,
-                    "character_count": parsed_content.get("character_count", len(parsed_content.get("post_content", ""))),
-                    "estimated_engagement": parsed_content.get("estimated_engagement", "Medium"),
-                    "optimal_posting_time": parsed_content.get("optimal_posting_time", self._get_optimal_posting_time(platform)),
-                    "content_quality_score": parsed_content.get("content_quality_score", 0.8),
-                    "platform_optimization_notes": parsed_content.get("platform_optimization_notes", "")
-                }
-                
-                logger.info(f"✅ Successfully parsed JSON response with {len(hashtags)} hashtags")
-                return result
-                
-            except json.JSONDecodeError as e:
-                logger.warning(f"⚠️ Failed to parse JSON response: {e}")
-                # Fall through to legacy parsing
-                
-        except Exception as e:
-            logger.warning(f"⚠️ Error in JSON parsing: {e}")
+                async for chunk in llm.astream(prompt, **llm_params):
+                    for raw in parser.feed(chunk):
+                        result = self._claim_variation(raw, pending, industry, content_type, target_audience)
+                        if result:
+                            yield result
+                for raw in parser.close():
+                    result = self._claim_variation(raw, pending, industry, content_type, target_audience)
+                    if result:
+                        yield result
+            except Exception as e:
+                logger.warning(f"⚠️ Batched variation generation failed, using mock for remaining variations: {e}")
         
-        # Fallback: try legacy parsing for backward compatibility
-        try:
-            # Try to parse structured response (old format)
-            if "Post Content:" in content_text and "Hashtags:" in content_text:
-                # Extract post content
-                content_start = content_text.find("Post Content:") + len("Post Content:")
-                content_end = content_text.find("Hashtags:")
-                post_content = content_text[content_start:content_end].strip()
-                
-                # Extract hashtags
-                hashtags_start = content_text.find("Hashtags:") + len("Hashtags:")
-                hashtags_end = content_text.find("Character Count:") if "Character Count:" in content_text else len(content_text)
-                hashtags_text = content_text[hashtags_start:hashtags_end].strip()
-                
-                # Parse hashtags
-                hashtags = []
-                if hashtags_text:
-                    # Extract hashtags from text
-                    words = hashtags_text.split()
-                    hashtags = [word for word in words if word.startswith("#")]
-                
-                # Extract character count
-                char_count = len(post_content)
-                
-                # Extract engagement estimate
-                engagement_estimate = "Medium"
-                if "Estimated Engagement:" in content_text:
-                    engagement_start = content_text.find("Estimated Engagement:") + len("Estimated Engagement:")
-                    engagement_end = content_text.find("\n", engagement_start) if "\n" in content_text[engagement_start:] else len(content_text)
-                    engagement_text = content_text[engagement_start:engagement_end].strip()
-                    if engagement_text:
-                        engagement_estimate = engagement_text
-                
-                return {
-                    "success": True,
-                    "post_content": post_content,
-                    "hashtags": hashtags,
-                    "character_count": char_count,
-                    "estimated_engagement": engagement_estimate,
-                    "optimal_posting_time": self._get_optimal_posting_time(platform),
-                    "content_quality_score": self._calculate_content_quality_score(post_content, hashtags)
-                }
-            else:
-                # Fallback: treat entire response as content
-                hashtags = [word for word in content_text.split() if word.startswith("#")]
-                return {
-                    "success": True,
-                    "post_content": content_text,
-                    "hashtags": hashtags,
-                    "character_count": len(content_text),
-                    "estimated_engagement": "Medium",
-                    "optimal_posting_time": self._get_optimal_posting_time(platform),
-                    "content_quality_score": self._calculate_content_quality_score(content_text, hashtags)
-                }
-                
-        except Exception as e:
-            logger.error(f"❌ Error parsing LLM response: {e}")
-            # Return fallback content
-            return {
-                "success": True,
-                "post_content": content_text,
-                "hashtags": [],
-                "character_count": len(content_text),
-                "estimated_engagement": "Medium",
-                "optimal_posting_time": self._get_optimal_posting_time(platform),
-                "content_quality_score": 0.7
-            }
+        for spec in list(pending.values()):
+            mock_text = self._generate_mock_content(industry, spec["platform"], content_type, spec["tone"])
+            result = self._variation_result(
+                parse_content_objects(mock_text)[0], spec, industry, content_type, target_audience
+            )
+            result["fallback"] = True
+            yield result
+    
+    def _claim_variation(
+        self,
+        raw: Dict[str, Any],
+        pending: Dict[str, Dict[str, str]],
+        industry: str,
+        content_type: str,
+        target_audience: str
+    ) -> Optional[Dict[str, Any]]:
+        """Match a parsed object to a pending spec (by id, then platform/tone, then order)"""
+        if not pending:
+            return None
+        
+        spec = pending.get(str(raw.get("variation_id", "")))
+        if spec is None:
+            platform = str(raw.get("platform", "")).lower()
+            tone = str(raw.get("tone", "")).lower()
+            spec = next(
+                (s for s in pending.values() if s["platform"] == platform and s["tone"] == tone),
+                next(iter(pending.values()))
+            )
+        
+        result = self._variation_result(raw, spec, industry, content_type, target_audience)
+        if self._is_refusal(result["post_content"]):
+            logger.warning(f"⚠️ Variation {spec['variation_id']} was refused, will use mock fallback")
+            return None
+        
+        del pending[spec["variation_id"]]
+        return result
+    
+    def _variation_result(
+        self,
+        raw: Dict[str, Any],
+        spec: Dict[str, str],
+        industry: str,
+        content_type: str,
+        target_audience: str
+    ) -> Dict[str, Any]:
+        result = self._build_content_result(raw, spec["platform"])
+        result.update({
+            "variation_id": spec["variation_id"],
+            "variation_type": f"tone_{spec['tone']}",
+            "industry": industry,
+            "platform": spec["platform"],
+            "content_type": content_type,
+            "tone": spec["tone"],
+            "target_audience": target_audience,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "data_source": self.data_source,
+            "data_freshness": self.last_analysis_check.isoformat() if self.last_analysis_check else None
+        })
+        return result
     
     def _generate_mock_content(self, industry: str, platform: str, content_type: str, tone: str) -> str:
         """Generate mock content when LLM is unavailable"""
@@ -487,7 +487,8 @@ class ContentGenerator:
                 tone=kwargs['tone'],
                 target_audience=kwargs['target_audience'],
                 competitor_insights=kwargs['competitor_insights'],
-                custom_requirements=kwargs.get('custom_requirements')
+                custom_requirements=kwargs.get('custom_requirements'),
+                progress=kwargs.get('progress')
             )
             
         except Exception as e:
@@ -498,34 +499,45 @@ class ContentGenerator:
             }
 
 
+def build_variation_specs(platforms: List[str], tones: List[str]) -> List[Dict[str, str]]:
+    """One variation per platform/tone pair, numbered var_1..var_N"""
+    specs = []
+    for platform in platforms:
+        for tone in tones:
+            specs.append({"variation_id": f"var_{len(specs) + 1}", "platform": platform, "tone": tone})
+    return specs
+
+
 async def generate_content_variations(
     base_content: Dict[str, Any],
-    variation_count: int = 3
+    variation_count: int = 3,
+    platforms: Optional[List[str]] = None,
+    tones: Optional[List[str]] = None
 ) -> List[Dict[str, Any]]:
     """
     Generate multiple variations of content for A/B testing
+    All variations (across tones and platforms) come from one batched LLM call
     """
     
-    variations = []
     generator = ContentGenerator()
     
     # Create variations with different tones
-    tones = ["professional", "casual", "enthusiastic"]
+    tones = (tones or DEFAULT_VARIATION_TONES)[:variation_count]
+    specs = build_variation_specs(platforms or [base_content.get("platform", "linkedin")], tones)
     
-    for i, tone in enumerate(tones[:variation_count]):
-        variation = await generator._run(
+    variations = [
+        variation async for variation in generator.astream_variations(
             industry=base_content.get("industry", "technology"),
-            platform=base_content.get("platform", "linkedin"),
             content_type=base_content.get("content_type", "promotional"),
-            tone=tone,
             target_audience=base_content.get("target_audience", "professionals"),
-            competitor_insights=base_content.get("competitor_insights", "")
+            competitor_insights=base_content.get("competitor_insights", ""),
+            variation_specs=specs,
+            custom_requirements=base_content.get("custom_requirements")
         )
-        
-        variation["variation_id"] = f"var_{i+1}"
-        variation["variation_type"] = f"tone_{tone}"
-        variations.append(variation)
+    ]
     
+    order = {spec["variation_id"]: index for index, spec in enumerate(specs)}
+    variations.sort(key=lambda variation: order[variation["variation_id"]])
     return variations
 
 
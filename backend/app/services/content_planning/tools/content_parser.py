@@ -0,0 +1,165 @@
+"""
+Content Parser - Tolerant, incremental parser for LLM content responses
+Handles JSON (fenced, embedded in prose, or streamed), the legacy
+"Post Content: / Hashtags:" layout and plain text with one code path
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+_LEGACY_LABELS = {
+    "post content": "post_content",
+    "hashtags": "hashtags",
+    "character count": "character_count",
+    "estimated engagement": "estimated_engagement"
+}
+
+CONTENT_KEY = "post_content"
+
+
+def _loads_tolerant(text: str) -> Optional[Any]:
+    """json.loads that accepts raw newlines inside strings and trailing commas"""
+    for candidate in (text, _TRAILING_COMMA_RE.sub(r"\1", text)):
+        try:
+            return json.loads(candidate, strict=False)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+class StreamingContentParser:
+    """
+    Incrementally extracts content objects (JSON objects with a "post_content" key)
+    from LLM output. Feed text chunks as they arrive; each complete object is
+    returned by the ``feed`` call that completes it, so callers can forward
+    variations before the model has finished the whole response.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._scan_pos = 0
+        self._open_positions: List[int] = []
+        self._in_string = False
+        self._escaped = False
+        self._emitted_spans: List[tuple] = []
+        self.objects_emitted = 0
+
+    @property
+    def text(self) -> str:
+        if len(self._buffer) > 1:
+            self._buffer = ["".join(self._buffer)]
+        return self._buffer[0] if self._buffer else ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a chunk and return any content objects completed by it"""
+        if not chunk:
+            return []
+        self._buffer.append(chunk)
+
+        text = self.text
+        completed = []
+        for pos in range(self._scan_pos, len(text)):
+            char = text[pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._open_positions.append(pos)
+            elif char == "}" and self._open_positions:
+                start = self._open_positions.pop()
+                obj = self._content_object(text, start, pos + 1)
+                if obj is not None:
+                    completed.append(obj)
+        self._scan_pos = len(text)
+
+        self.objects_emitted += len(completed)
+        return completed
+
+    def _content_object(self, text: str, start: int, end: int) -> Optional[Dict[str, Any]]:
+        if any(s <= start and end <= e for s, e in self._emitted_spans):
+            return None
+        parsed = _loads_tolerant(text[start:end])
+        if not isinstance(parsed, dict) or CONTENT_KEY not in parsed:
+            return None
+        self._emitted_spans.append((start, end))
+        return parsed
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Finish parsing. If no JSON content object was found, fall back to the
+        legacy labelled layout and finally to treating the text as the post.
+        """
+        if self.objects_emitted:
+            return []
+
+        text = self.text.strip()
+        if not text:
+            return []
+
+        parsed = _parse_legacy_layout(text)
+        if parsed is None:
+            parsed = {CONTENT_KEY: _strip_code_fence(text)}
+        parsed["_parsed_from"] = "legacy" if "_legacy" in parsed else "text"
+        parsed.pop("_legacy", None)
+        self.objects_emitted += 1
+        return [parsed]
+
+
+def _strip_code_fence(text: str) -> str:
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
+        if text.rstrip().endswith("```"):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def _parse_legacy_layout(text: str) -> Optional[Dict[str, Any]]:
+    """Parse the older 'Post Content: ... Hashtags: ...' response layout"""
+    lowered = text.lower()
+    if "post content:" not in lowered or "hashtags:" not in lowered:
+        return None
+
+    positions = []
+    for label, key in _LEGACY_LABELS.items():
+        index = lowered.find(f"{label}:")
+        if index != -1:
+            positions.append((index, index + len(label) + 1, key))
+    positions.sort()
+
+    parsed: Dict[str, Any] = {"_legacy": True}
+    for i, (_, value_start, key) in enumerate(positions):
+        value_end = positions[i + 1][0] if i + 1 < len(positions) else len(text)
+        value = text[value_start:value_end].strip()
+        if key == "estimated_engagement":
+            value = value.split("\n", 1)[0].strip()
+        parsed[key] = value
+    return parsed
+
+
+def normalize_hashtags(value: Any) -> List[str]:
+    """Hashtags may come back as a list, a space/comma separated string or be missing"""
+    if isinstance(value, str):
+        return [tag.strip(",;") for tag in value.split() if tag.startswith("#")]
+    if isinstance(value, list):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    return []
+
+
+def parse_content_objects(text: str) -> List[Dict[str, Any]]:
+    """Parse a complete (non-streamed) LLM response into content objects"""
+    parser = StreamingContentParser()
+    return parser.feed(text) + parser.close()
@@ -5,13 +5,13 @@ Hashtag Researcher Tool - Researches and optimizes hashtag strategies
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel, Field
 from collections import defaultdict
-import json
-import os
 import logging
 from datetime import datetime, timezone, timedelta
 
+from app.services.llm import get_llm_gateway
 from ..config.settings import settings, INDUSTRY_HASHTAGS
 from ..config.prompts import HASHTAG_RESEARCH_PROMPT
+from ..data.competitor_dataset import get_competitor_dataset, get_competitor_dataset_async
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +31,6 @@ class HashtagResearcher:
     """
     
     def __init__(self):
-        self._load_hashtag_data()
         self.llm = None  # Initialize lazily
         self.supabase_client = None  # Initialize lazily
         
@@ -51,20 +50,24 @@ class HashtagResearcher:
                 self.supabase_client = None
         return self.supabase_client
     
-    def _load_hashtag_data(self):
-        """Load hashtag performance data from mock dataset"""
-        try:
-            # Load from competitor dataset for trending data
-            dataset_path = os.path.join(os.path.dirname(__file__), "..", "data", "mock_datasets", "competitors_dataset.json")
-            with open(dataset_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.trending_data = data.get("trending_hashtags", {})
-                self.performance_data = data.get("content_insights", {}).get("hashtag_performance", {})
-                logger.info("📁 Mock hashtag data loaded successfully")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.warning(f"⚠️ Mock hashtag data file not found, using minimal fallback: {e}")
-            self.trending_data = {"technology": ["#AI", "#Innovation", "#TechTrends"]}
-            self.performance_data = {}
+    @property
+    def trending_data(self) -> Dict[str, List[str]]:
+        """Trending hashtags by industry from the shared mock dataset"""
+        return get_competitor_dataset().trending_hashtags
+    
+    @property
+    def performance_data(self) -> Dict[str, Any]:
+        """Hashtag performance insights from the shared mock dataset"""
+        return get_competitor_dataset().hashtag_performance
+    
+    def _mock_trending_hashtags(self, industry: str) -> List[str]:
+        """Curated trending list, or the industry's most used competitor hashtags when none is curated"""
+        dataset = get_competitor_dataset()
+        trending = dataset.trending_hashtags.get(industry)
+        if trending:
+            return trending
+        aggregate = dataset.industry_aggregate(industry)
+        return aggregate.top_hashtags(10) if aggregate else []
     
     async def _fetch_supabase_hashtag_data(self, industry: str, time_period: str = "last_30_days") -> Optional[Dict[str, Any]]:
         """Fetch hashtag data from Supabase monitoring data"""
@@ -198,20 +201,10 @@ class HashtagResearcher:
             return None
     
     def _get_llm(self):
-        """Lazy initialization of LLM"""
+        """Lazy lookup of the shared LLM gateway ("mock" when no backend is configured)"""
         if self.llm is None:
-            try:
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                self.llm = ChatGoogleGenerativeAI(
-                    model=settings.model_name,
-                    temperature=settings.temperature,
-                    max_tokens=settings.max_tokens,
-                    top_p=settings.top_p,
-                    google_api_key=os.getenv("GOOGLE_API_KEY")
-                )
-            except Exception as e:
-                print(f"Warning: Could not initialize Google AI LLM: {e}")
-                self.llm = "mock"  # Use mock mode
+            gateway = get_llm_gateway()
+            self.llm = gateway if gateway.available else "mock"
         return self.llm
 
     async def _run(
@@ -235,9 +228,10 @@ class HashtagResearcher:
                 self.last_supabase_check = datetime.now()
                 logger.info("🔍 Using Supabase data for hashtag research")
             else:
-                # Fallback to mock data
+                # Fallback to mock data (loaded off the event loop on first use)
+                await get_competitor_dataset_async()
                 analysis_data = {
-                    "trending_hashtags": self.trending_data,
+                    "trending_hashtags": {**self.trending_data, industry: self._mock_trending_hashtags(industry)},
                     "hashtag_performance": self.performance_data,
                     "platform_specific_trends": {},
                     "total_hashtags_analyzed": 0,
@@ -266,7 +260,7 @@ class HashtagResearcher:
             )
             
             # Get AI-enhanced recommendations
-            ai_recommendations = self._get_ai_hashtag_insights(
+            ai_recommendations = await self._get_ai_hashtag_insights(
                 industry=industry,
                 content_type=content_type,
                 platform=platform,
@@ -470,7 +464,7 @@ class HashtagResearcher:
         
         return strategy
     
-    def _get_ai_hashtag_insights(
+    async def _get_ai_hashtag_insights(
         self,
         industry: str,
         content_type: str,
@@ -491,8 +485,8 @@ class HashtagResearcher:
             if llm == "mock":
                 return "AI insights unavailable: Using mock mode"
             else:
-                response = llm.invoke(prompt)
-                return response.content if hasattr(response, 'content') else str(response)
+                response = await llm.ainvoke(prompt, **settings.llm_params)
+                return response.content
         except Exception as e:
             return f"AI insights unavailable: {str(e)}"
     
@@ -534,7 +528,7 @@ class HashtagResearcher:
     
     async def _arun(self, *args, **kwargs) -> Dict[str, Any]:
         """Async version of the tool"""
-        return self._run(*args, **kwargs)
+        return await self._run(*args, **kwargs)
 
 
 def optimize_hashtags_for_platform(
@@ -0,0 +1,26 @@
+"""
+Shared LLM Gateway Package
+Async, cached and concurrency-limited access to LLM backends for all agents
+"""
+
+from .backends import BackendResult, FakeLLMBackend, GeminiBackend
+from .gateway import (
+    LLMGateway,
+    LLMGatewayError,
+    LLMResponse,
+    LLMTimeoutError,
+    get_llm_gateway,
+    set_llm_gateway
+)
+
+__all__ = [
+    "BackendResult",
+    "FakeLLMBackend",
+    "GeminiBackend",
+    "LLMGateway",
+    "LLMGatewayError",
+    "LLMResponse",
+    "LLMTimeoutError",
+    "get_llm_gateway",
+    "set_llm_gateway"
+]
@@ -0,0 +1,108 @@
+"""
+LLM backends used by the shared LLM gateway
+Each backend turns one prompt into text plus token usage
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BackendResult:
+    """Raw result returned by a backend before the gateway adds timing"""
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for backends without usage data"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class GeminiBackend:
+    """Google Gemini through langchain_google_genai, using the async client"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        from langchain_google_genai import ChatGoogleGenerativeAI  # noqa: F401 - fail fast if missing
+        self.api_key = api_key
+        self._clients: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], Any] = {}
+
+    def _get_client(self, model: str, params: Dict[str, Any]):
+        """One ChatGoogleGenerativeAI instance per model/parameter combination"""
+        key = (model, tuple(sorted(params.items())))
+        client = self._clients.get(key)
+        if client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            client = ChatGoogleGenerativeAI(model=model, google_api_key=self.api_key, **params)
+            self._clients[key] = client
+            logger.info(f"✅ Gemini client created for {model}")
+        return client
+
+    async def agenerate(self, prompt: str, model: str, params: Dict[str, Any]) -> BackendResult:
+        response = await self._get_client(model, params).ainvoke(prompt)
+        content = response.content if hasattr(response, "content") else str(response)
+        if not isinstance(content, str):
+            content = str(content)
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        return BackendResult(
+            content=content,
+            prompt_tokens=usage.get("input_tokens") or estimate_tokens(prompt),
+            completion_tokens=usage.get("output_tokens") or estimate_tokens(content)
+        )
+
+    async def astream(self, prompt: str, model: str, params: Dict[str, Any]) -> AsyncIterator[str]:
+        async for chunk in self._get_client(model, params).astream(prompt):
+            content = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if content:
+                yield content if isinstance(content, str) else str(content)
+
+
+class FakeLLMBackend:
+    """
+    Offline backend for tests and local development.
+    Returns deterministic text (or whatever ``responder`` returns) and records every call.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str], str]] = None,
+        latency_seconds: float = 0.0,
+        fail_times: int = 0,
+        chunk_size: int = 64
+    ):
+        self.responder = responder
+        self.latency_seconds = latency_seconds
+        self.fail_times = fail_times
+        self.chunk_size = chunk_size
+        self.calls: List[Dict[str, Any]] = []
+
+    async def agenerate(self, prompt: str, model: str, params: Dict[str, Any]) -> BackendResult:
+        self.calls.append({"prompt": prompt, "model": model, "params": dict(params)})
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("Fake LLM backend failure")
+
+        content = self.responder(prompt) if self.responder else f"[fake:{model}] {prompt[:200]}"
+        return BackendResult(
+            content=content,
+            prompt_tokens=estimate_tokens(prompt),
+            completion_tokens=estimate_tokens(content)
+        )
+
+    async def astream(self, prompt: str, model: str, params: Dict[str, Any]) -> AsyncIterator[str]:
+        result = await self.agenerate(prompt, model, params)
+        for start in range(0, len(result.content), self.chunk_size):
+            yield result.content[start:start + self.chunk_size]
+            await asyncio.sleep(0)
@@ -0,0 +1,424 @@
+"""
+Shared LLM gateway
+Every agent goes through one gateway so concurrency, caching and metrics are process-wide
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics as dependency_metrics
+from .backends import FakeLLMBackend, GeminiBackend, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-2.5-flash-lite"
+
+
+class LLMGatewayError(Exception):
+    """Raised when the gateway cannot produce a response"""
+
+
+class LLMTimeoutError(LLMGatewayError):
+    """Raised when a call exceeds its per-call timeout"""
+
+
+@dataclass
+class LLMResponse:
+    """Response returned by the gateway"""
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    cached: bool = False
+
+
+@dataclass
+class _ModelMetrics:
+    requests: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms_total: float = 0.0
+    latencies_ms: deque = field(default_factory=lambda: deque(maxlen=512))
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        backend_calls = len(latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 1)
+
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "avg_latency_ms": round(self.latency_ms_total / backend_calls, 1) if backend_calls else None,
+            "p50_latency_ms": percentile(0.50),
+            "p95_latency_ms": percentile(0.95)
+        }
+
+
+class _LoopState:
+    """Semaphores and in-flight futures belong to one event loop"""
+
+    def __init__(self, max_concurrency: int):
+        self.global_semaphore = asyncio.Semaphore(max_concurrency)
+        self.model_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+
+class LLMGateway:
+    """
+    Async gateway in front of an LLM backend.
+
+    - global and per-model semaphores bound concurrent calls
+    - successful responses are cached by prompt + params with a TTL
+    - concurrent identical calls are merged (single-flight)
+    - every call has a timeout
+    - token usage and latency are recorded per model
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        max_concurrency: int = 8,
+        per_model_concurrency: int = 4,
+        default_timeout: float = 30.0,
+        cache_ttl_seconds: int = 600,
+        cache_max_entries: int = 512
+    ):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.per_model_concurrency = per_model_concurrency
+        self.default_timeout = default_timeout
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.cache_max_entries = cache_max_entries
+
+        self._cache: "OrderedDict[str, Tuple[float, LLMResponse]]" = OrderedDict()
+        self._metrics: Dict[str, _ModelMetrics] = {}
+        # The monitoring scheduler runs its own event loop in a thread, so
+        # loop-bound primitives are kept per loop while cache/metrics are shared.
+        self._lock = threading.Lock()
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+    @property
+    def available(self) -> bool:
+        return self.backend is not None
+
+    @property
+    def backend_name(self) -> str:
+        return getattr(self.backend, "name", "none") if self.backend else "none"
+
+    async def ainvoke(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> LLMResponse:
+        """Invoke the LLM with concurrency limits, caching and single-flight"""
+        if not self.backend:
+            raise LLMGatewayError("No LLM backend configured")
+
+        model = model or DEFAULT_MODEL
+        params = self._params(temperature, max_tokens, top_p)
+        key = self._cache_key(prompt, model, params)
+        metrics = self._model_metrics(model)
+
+        with self._lock:
+            metrics.requests += 1
+
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                with self._lock:
+                    metrics.cache_hits += 1
+                return cached
+
+        state = self._loop_state()
+        inflight = state.inflight.get(key)
+        if inflight is not None:
+            with self._lock:
+                metrics.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        state.inflight[key] = future
+        try:
+            response = await self._call_backend(state, prompt, model, params, timeout or self.default_timeout)
+            if use_cache:
+                self._cache_set(key, response)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            if not future.done():
+                future.set_exception(LLMGatewayError("LLM call was cancelled"))
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            state.inflight.pop(key, None)
+            # Followers retrieve the exception themselves; avoid "never retrieved" warnings
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    async def astream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        top_p: Optional[float] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text chunks. Cached responses are replayed as a single chunk and
+        complete streams are written to the same cache used by ainvoke. The timeout
+        applies to the gap between chunks.
+        """
+        if not self.backend:
+            raise LLMGatewayError("No LLM backend configured")
+
+        model = model or DEFAULT_MODEL
+        params = self._params(temperature, max_tokens, top_p)
+        key = self._cache_key(prompt, model, params)
+        metrics = self._model_metrics(model)
+        timeout = timeout or self.default_timeout
+
+        with self._lock:
+            metrics.requests += 1
+
+        if use_cache:
+            cached = self._cache_get(key)
+            if cached is not None:
+                with self._lock:
+                    metrics.cache_hits += 1
+                yield cached.content
+                return
+
+        if not hasattr(self.backend, "astream"):
+            response = await self.ainvoke(prompt, model, temperature, max_tokens, top_p, timeout, use_cache)
+            yield response.content
+            return
+
+        state = self._loop_state()
+        model_semaphore = state.model_semaphores.setdefault(model, asyncio.Semaphore(self.per_model_concurrency))
+        chunks = []
+        async with state.global_semaphore, model_semaphore:
+            started = time.perf_counter()
+            stream = self.backend.astream(prompt, model, params).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    chunks.append(chunk)
+                    yield chunk
+            except asyncio.TimeoutError:
+                with self._lock:
+                    metrics.timeouts += 1
+                    metrics.errors += 1
+                logger.warning(f"⚠️ LLM stream from {model} stalled for {timeout}s")
+                raise LLMTimeoutError(f"LLM stream from {model} stalled for {timeout}s")
+            except Exception:
+                with self._lock:
+                    metrics.errors += 1
+                raise
+            latency_ms = (time.perf_counter() - started) * 1000
+
+        content = "".join(chunks)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        with self._lock:
+            metrics.prompt_tokens += prompt_tokens
+            metrics.completion_tokens += completion_tokens
+            metrics.latency_ms_total += latency_ms
+            metrics.latencies_ms.append(latency_ms)
+
+        if use_cache:
+            self._cache_set(key, LLMResponse(
+                content=content,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                latency_ms=round(latency_ms, 1)
+            ))
+
+    async def _call_backend(
+        self,
+        state: _LoopState,
+        prompt: str,
+        model: str,
+        params: Dict[str, Any],
+        timeout: float
+    ) -> LLMResponse:
+        metrics = self._model_metrics(model)
+        model_semaphore = state.model_semaphores.setdefault(model, asyncio.Semaphore(self.per_model_concurrency))
+
+        async with state.global_semaphore, model_semaphore:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self.backend.agenerate(prompt, model, params), timeout=timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    metrics.timeouts += 1
+                    metrics.errors += 1
+                dependency_metrics.observe(self.backend_name, model, time.perf_counter() - started, error=True)
+                logger.warning(f"⚠️ LLM call to {model} timed out after {timeout}s")
+                raise LLMTimeoutError(f"LLM call to {model} timed out after {timeout}s")
+            except Exception:
+                with self._lock:
+                    metrics.errors += 1
+                dependency_metrics.observe(self.backend_name, model, time.perf_counter() - started, error=True)
+                raise
+            latency_ms = (time.perf_counter() - started) * 1000
+            dependency_metrics.observe(
+                self.backend_name, model, latency_ms / 1000, payload_bytes=len(result.content.encode())
+            )
+
+        with self._lock:
+            metrics.prompt_tokens += result.prompt_tokens
+            metrics.completion_tokens += result.completion_tokens
+            metrics.latency_ms_total += latency_ms
+            metrics.latencies_ms.append(latency_ms)
+
+        return LLMResponse(
+            content=result.content,
+            model=model,
+            prompt_tokens=result.prompt_tokens,
+            completion_tokens=result.completion_tokens,
+            latency_ms=round(latency_ms, 1)
+        )
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = _LoopState(self.max_concurrency)
+            self._loop_states[loop] = state
+        return state
+
+    def _model_metrics(self, model: str) -> _ModelMetrics:
+        with self._lock:
+            return self._metrics.setdefault(model, _ModelMetrics())
+
+    @staticmethod
+    def _params(temperature: Optional[float], max_tokens: Optional[int], top_p: Optional[float]) -> Dict[str, Any]:
+        params = {"temperature": temperature, "max_tokens": max_tokens, "top_p": top_p}
+        return {key: value for key, value in params.items() if value is not None}
+
+    @staticmethod
+    def _cache_key(prompt: str, model: str, params: Dict[str, Any]) -> str:
+        raw = json.dumps({"prompt": prompt, "model": model, "params": params}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[LLMResponse]:
+        with self._lock:
+            item = self._cache.get(key)
+            if not item:
+                return None
+            expires_at, response = item
+            if time.time() > expires_at:
+                self._cache.pop(key, None)
+                return None
+            self._cache.move_to_end(key)
+        return LLMResponse(
+            content=response.content,
+            model=response.model,
+            prompt_tokens=response.prompt_tokens,
+            completion_tokens=response.completion_tokens,
+            latency_ms=0.0,
+            cached=True
+        )
+
+    def _cache_set(self, key: str, response: LLMResponse) -> None:
+        if self.cache_ttl_seconds <= 0 or self.cache_max_entries <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.time() + self.cache_ttl_seconds, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_max_entries:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Token, latency and cache metrics per model"""
+        with self._lock:
+            return {
+                "backend": self.backend_name,
+                "cache_entries": len(self._cache),
+                "models": {model: metrics.snapshot() for model, metrics in self._metrics.items()}
+            }
+
+
+def _create_backend():
+    """Pick the backend from settings; None means callers should use their mock paths"""
+    backend_name = (settings.LLM_BACKEND or "gemini").lower()
+    if backend_name == "fake":
+        logger.info("🧪 LLM gateway using fake backend")
+        return FakeLLMBackend()
+
+    if not settings.gemini_api_key:
+        logger.warning("⚠️ No GOOGLE_API_KEY found, LLM gateway has no backend")
+        return None
+    try:
+        return GeminiBackend(settings.gemini_api_key)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not initialize Gemini backend: {e}")
+        return None
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide LLM gateway, created on first use"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    backend=_create_backend(),
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    per_model_concurrency=settings.LLM_PER_MODEL_CONCURRENCY,
+                    default_timeout=settings.LLM_TIMEOUT_SECONDS,
+                    cache_ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                    cache_max_entries=settings.LLM_CACHE_MAX_ENTRIES
+                )
+    return _gateway
+
+
+def set_llm_gateway(gateway: Optional[LLMGateway]) -> None:
+    """Replace the process-wide gateway (e.g. with a FakeLLMBackend gateway in tests)"""
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
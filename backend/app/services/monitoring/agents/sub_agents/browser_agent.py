@@ -30,7 +30,12 @@ except ImportError as e:
     TAVILY_AVAILABLE = False
 
 from app.core.config import settings
+from app.core.metrics import instrument_client
 from app.services.monitoring.supabase_client import supabase_client
+from app.services.monitoring.alert_pipeline import resolve_alert_user_id, submit_alert
+from app.services.monitoring.api_budget import TAVILY_COSTS, api_budget, budgeted_client
+from app.services.monitoring.analysis_cache import analysis_cache, cached_analysis, content_fingerprint
+from app.services.monitoring.near_duplicates import cluster_urls, near_duplicate_index
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +43,9 @@ logger = logging.getLogger(__name__)
 class BrowserAgent:
     """Intelligent browser-based agent for competitor web intelligence using Tavily search"""
 
+    # Bump when the analysis prompt changes so cached analyses stop matching
+    ANALYSIS_PROMPT_VERSION = "1"
+
     def __init__(self):
         logger.info("🌐 Intelligent BrowserAgent initializing...")
         self.search_count = 0
@@ -52,6 +60,9 @@ class BrowserAgent:
                     api_key=settings.GOOGLE_API_KEY,
                     temperature=0.3  # Slightly creative for search terms
                 )
+                self.llm = instrument_client(self.llm, "gemini", "browser_agent", ["ainvoke"])
+                # Shared Gemini budget; BudgetExhausted falls into the heuristic fallbacks
+                self.llm = budgeted_client(self.llm, "gemini", ["ainvoke"])
                 logger.info("✅ LLM initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize LLM: {e}")
@@ -61,6 +72,7 @@ class BrowserAgent:
         if TAVILY_AVAILABLE and hasattr(settings, 'TAVILY_API_KEY') and settings.TAVILY_API_KEY:
             try:
                 self.tavily_client = TavilyClient(api_key=settings.TAVILY_API_KEY)
+                self.tavily_client = instrument_client(self.tavily_client, "tavily", "browser_agent", ["search"])
                 logger.info("✅ Tavily search client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Tavily client: {e}")
@@ -81,6 +93,7 @@ class BrowserAgent:
             Dict containing analysis results and extracted content
         """
         self.search_count = 0  # Reset search count for each analysis
+        cache_stats = analysis_cache.start_scan()
 
         try:
             logger.info(f"🌐 Starting intelligent web analysis for {competitor_name}")
@@ -102,6 +115,8 @@ class BrowserAgent:
             # Step 2: Search for recent content (today's focus)
             all_content = await self._search_recent_content(search_queries, competitor_name)
             logger.info(f"📰 Found {len(all_content)} recent web content items")
+            # Collapse syndicated copies of the same story before analysis and alerting
+            all_content, duplicate_stats = near_duplicate_index.collapse(competitor_id, 'browser', all_content)
 
             if not all_content:
                 logger.info(f"ℹ️  No recent web content found for {competitor_name}")
@@ -138,7 +153,8 @@ class BrowserAgent:
                             "source": content_item.get('source', ''),
                             "ai_analysis": analysis_result['summary'],
                             "is_alert_worthy": analysis_result['is_alert_worthy'],
-                            "alert_reason": analysis_result.get('alert_reason', '')
+                            "alert_reason": analysis_result.get('alert_reason', ''),
+                            "cluster_urls": cluster_urls(content_item)
                         })
                         
                         logger.info(f"✅ Saved web content: {content_item.get('title', 'Unknown')[:50]}...")
@@ -168,6 +184,8 @@ class BrowserAgent:
                     "total_content_analyzed": len(processed_posts),
                     "alerts_created": alerts_created,
                     "search_queries_used": len(search_queries),
+                    "analysis_cache": cache_stats.report(),
+                    "near_duplicates": duplicate_stats,
                     "analysis_timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
@@ -254,6 +272,10 @@ Example format:
                 try:
                     logger.info(f"🔍 Searching web for: '{query}'")
                     
+                    # Shared Tavily budget across all concurrent scans
+                    if not await api_budget.acquire("tavily", TAVILY_COSTS["advanced"]):
+                        break
+                    
                     search_results = self.tavily_client.search(
                         query=query,
                         search_depth="advanced",  # More thorough search
@@ -314,7 +336,18 @@ Example format:
             return self._heuristic_content_analysis(content_item, competitor_name)
 
     async def _ai_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
-        """Use AI to analyze content for competitive intelligence"""
+        """AI analysis, reused across scans while the content is unchanged; heuristic fallback on failure"""
+        analysis = await cached_analysis(
+            "browser", self.ANALYSIS_PROMPT_VERSION, competitor_name,
+            content_item.get('content_hash') or content_fingerprint(content_item.get('title', ''), content_item.get('content', '')),
+            lambda: self._request_ai_content_analysis(content_item, competitor_name)
+        )
+        if analysis is None:
+            return self._heuristic_content_analysis(content_item, competitor_name)
+        return analysis
+
+    async def _request_ai_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Optional[Dict[str, Any]]:
+        """Use AI to analyze content for competitive intelligence; None when the model call or its answer fails"""
         try:
             title = content_item.get('title', '')
             content = content_item.get('content', '')[:800]  # First 800 chars
@@ -380,15 +413,15 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                     return analysis
                 else:
                     logger.warning(f"⚠️  AI response missing required fields, using fallback")
-                    return self._heuristic_content_analysis(content_item, competitor_name)
+                    return None
                     
             except (json.JSONDecodeError, ValueError) as e:
                 logger.error(f"❌ Failed to parse AI response: {e}")
-                return self._heuristic_content_analysis(content_item, competitor_name)
+                return None
                 
         except Exception as e:
             logger.error(f"❌ Error in AI content analysis: {e}")
-            return self._heuristic_content_analysis(content_item, competitor_name)
+            return None
 
     def _heuristic_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
         """Heuristic analysis when AI is not available"""
@@ -478,7 +511,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
             'media_urls': [],  # Web content typically doesn't have direct media URLs
             'engagement_metrics': {
                 'relevance_score': content_item.get('score', 0),
-                'significance_score': analysis_result.get('significance_score', 0)
+                'significance_score': analysis_result.get('significance_score', 0),
+                'cluster_urls': cluster_urls(content_item)
             },
             'author_username': content_item.get('source', ''),
             'author_display_name': content_item.get('source', ''),
@@ -494,9 +528,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
     async def _create_intelligent_alert(self, competitor_id: str, content_item: Dict[str, Any], analysis_result: Dict[str, Any], data_id: str):
         """Create an intelligent alert for significant web content"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -511,6 +544,7 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                     'content_url': content_item.get('url', ''),
                     'source': content_item.get('source', ''),
                     'relevance_score': content_item.get('score', 0),
+                    'cluster_urls': cluster_urls(content_item),
                     'ai_analysis': {
                         'significance_score': analysis_result.get('significance_score', 0),
                         'content_type': analysis_result.get('content_type', 'unknown'),
@@ -524,9 +558,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            alert_id = await supabase_client.create_alert(alert_data)
-            if alert_id:
-                logger.info(f"🚨 Created intelligent web alert: {alert_id}")
+            if await submit_alert(alert_data):
+                logger.info("🚨 Queued intelligent web alert")
             else:
                 logger.error("❌ Failed to create alert in Supabase")
                 
@@ -14,6 +14,8 @@ import sys
 import concurrent.futures
 import threading
 
+from app.core.metrics import instrumented
+
 logger = logging.getLogger(__name__)
 
 
@@ -238,6 +240,7 @@ class SimpleIsolatedCrawlerManager:
             return []
 
 
+@instrumented("crawl4ai", "crawl_isolated")
 async def crawl_websites_isolated(urls: List[str], extraction_config: Dict[str, Any] = None, max_concurrent: int = 3) -> List[Dict[str, Any]]:
     """
     Convenience function to crawl websites in isolated environment
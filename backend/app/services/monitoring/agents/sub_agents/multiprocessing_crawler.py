@@ -15,6 +15,8 @@ import sys
 from concurrent.futures import ProcessPoolExecutor, as_completed
 import time
 
+from app.core.metrics import instrumented
+
 logger = logging.getLogger(__name__)
 
 
@@ -322,6 +324,7 @@ class MultiprocessingCrawlerManager:
 
 
 # Convenience functions for easy use
+@instrumented("crawl4ai", "crawl_multiprocessing")
 def crawl_websites_multiprocessing(urls: List[str], extraction_config: Dict[str, Any] = None, max_workers: int = None) -> List[Dict[str, Any]]:
     """
     Convenience function to crawl websites using multiprocessing
@@ -346,6 +349,7 @@ def crawl_websites_multiprocessing(urls: List[str], extraction_config: Dict[str,
         } for url in urls]
 
 
+@instrumented("crawl4ai", "crawl_multiprocessing_batched")
 def crawl_websites_multiprocessing_batched(urls: List[str], extraction_config: Dict[str, Any] = None, max_workers: int = None, batch_size: int = 2) -> List[Dict[str, Any]]:
     """
     Convenience function to crawl websites using batched multiprocessing
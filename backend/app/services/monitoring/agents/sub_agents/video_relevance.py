@@ -0,0 +1,148 @@
+"""
+Lexical relevance scoring for YouTube search results
+First stage of the YouTubeAgent relevance cascade: a cheap scorer over title, channel
+and description that accepts clear matches (the competitor's own channel, or the name
+in both title and description alongside business/product wording) and rejects clear
+misses (no exact or fuzzy mention anywhere). Only the ambiguous middle band is sent to
+the LLM.
+"""
+
+import re
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+ACCEPT_THRESHOLD = 0.85
+REJECT_THRESHOLD = 0.2
+
+# Scores for each kind of evidence (see score_video_relevance)
+CHANNEL_MATCH_SCORE = 0.95
+TITLE_MATCH_SCORE = 0.6
+TITLE_AND_DESCRIPTION_BONUS = 0.15
+INDICATOR_BONUS = 0.1
+DESCRIPTION_MATCH_SCORE = 0.4
+FUZZY_MATCH_SCORE = 0.45
+PARTIAL_TOKEN_SCORE = 0.3
+NO_MATCH_SCORE = 0.05
+
+SHORT_NAME_SCORE = 0.5
+FUZZY_RATIO = 0.8
+
+# Corporate suffixes that rarely appear in video titles ("Acme Inc." -> "acme")
+NAME_SUFFIXES = {"inc", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "plc", "gmbh", "sdn", "bhd", "group"}
+
+# Same wording as YouTubeAgent._is_video_relevant_to_competitor_heuristic
+INDICATORS = {
+    "official", "company", "corporate", "business", "news", "announcement", "announces",
+    "earnings", "quarterly", "annual", "report", "update", "launch", "launches",
+    "product", "release", "new", "review", "unboxing", "test", "comparison",
+    "revenue", "profit", "partnership", "acquisition", "merger", "investment",
+    "funding", "ipo", "stock", "ceo"
+}
+
+CHANNEL_NOISE = {"official", "tv", "channel", "hq", "global", "videos"}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def name_tokens(competitor_name: str) -> List[str]:
+    tokens = _tokens(competitor_name)
+    stripped = [token for token in tokens if token not in NAME_SUFFIXES]
+    return stripped or tokens
+
+
+def _contains_phrase(tokens: List[str], phrase: List[str]) -> bool:
+    """Whole-word phrase match; also matches the name written as one word ("coca cola" / "cocacola")"""
+    if not phrase:
+        return False
+    size = len(phrase)
+    for i in range(len(tokens) - size + 1):
+        if tokens[i:i + size] == phrase:
+            return True
+    joined = "".join(phrase)
+    return size > 1 and joined in tokens
+
+
+def _fuzzy_ratio(tokens: List[str], phrase: List[str]) -> float:
+    """Best similarity between the name and any window of the same number of words"""
+    if not phrase or not tokens:
+        return 0.0
+    target = " ".join(phrase)
+    size = len(phrase)
+    best = 0.0
+    for i in range(max(1, len(tokens) - size + 1)):
+        window = " ".join(tokens[i:i + size])
+        # Cheap length check before the quadratic comparison
+        if abs(len(window) - len(target)) > len(target) * (1 - FUZZY_RATIO) + 1:
+            continue
+        best = max(best, SequenceMatcher(None, window, target).ratio())
+    return best
+
+
+def score_video_relevance(title: str, description: str, channel_title: str, competitor_name: str) -> float:
+    """Relevance in [0, 1]; >= ACCEPT_THRESHOLD is a clear match, <= REJECT_THRESHOLD a clear miss"""
+    name = name_tokens(competitor_name)
+    if not name:
+        return 0.5  # Nothing to match on: let the LLM decide
+
+    # The competitor's own channel ("Acme", "AcmeOfficial", "Acme TV")
+    channel = [token for token in _tokens(channel_title) if token not in CHANNEL_NOISE]
+    joined_channel, joined_name = "".join(channel), "".join(name)
+    short_name = name[:1] if len(name) > 1 and len(name[0]) >= 4 else None
+    if channel and (joined_channel in (joined_name, joined_name + "official") or channel == short_name or (
+        # Fuzzy only for longer names: "apples" is not Apple's channel
+        len(joined_name) >= 8 and SequenceMatcher(None, joined_channel, joined_name).ratio() >= 0.9
+    )):
+        return CHANNEL_MATCH_SCORE
+
+    title_tokens = _tokens(title)
+    description_tokens = _tokens(description)
+    has_indicator = bool(INDICATORS.intersection(title_tokens))
+
+    in_title = _contains_phrase(title_tokens, name)
+    in_description = _contains_phrase(description_tokens, name)
+    if in_title:
+        score = TITLE_MATCH_SCORE
+        if in_description:
+            score += TITLE_AND_DESCRIPTION_BONUS
+        if has_indicator:
+            score += INDICATOR_BONUS
+        # Only title + description + business/product wording reaches ACCEPT_THRESHOLD
+        return round(score, 3)
+    if in_description:
+        return DESCRIPTION_MATCH_SCORE + (INDICATOR_BONUS if has_indicator else 0.0)
+
+    # "Notion Labs" is usually just "Notion" in titles; ambiguous on its own ("the notion of ...")
+    if short_name and (_contains_phrase(title_tokens, short_name) or _contains_phrase(description_tokens, short_name)):
+        return SHORT_NAME_SCORE + (INDICATOR_BONUS if has_indicator else 0.0)
+
+    if _fuzzy_ratio(title_tokens, name) >= FUZZY_RATIO:
+        return FUZZY_MATCH_SCORE
+
+    if len(name) > 1:
+        present = set(title_tokens) | set(description_tokens)
+        if sum(token in present for token in name) / len(name) >= 0.5:
+            return PARTIAL_TOKEN_SCORE
+
+    return NO_MATCH_SCORE
+
+
+def classify_videos(videos: List[Dict], competitor_name: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Split search results into (accepted, ambiguous, rejected) by lexical score"""
+    accepted, ambiguous, rejected = [], [], []
+    for video in videos:
+        snippet = video.get("snippet", {})
+        score = score_video_relevance(
+            snippet.get("title", ""), snippet.get("description", ""), snippet.get("channelTitle", ""), competitor_name
+        )
+        video["relevance_score"] = round(score, 3)
+        if score >= ACCEPT_THRESHOLD:
+            accepted.append(video)
+        elif score <= REJECT_THRESHOLD:
+            rejected.append(video)
+        else:
+            ambiguous.append(video)
+    return accepted, ambiguous, rejected
@@ -40,7 +40,11 @@ except ImportError as e:
     LANGCHAIN_AVAILABLE = False
 
 from app.core.config import settings
+from app.core.metrics import instrument_client
 from app.services.monitoring.supabase_client import supabase_client
+from app.services.monitoring.alert_pipeline import resolve_alert_user_id, submit_alert
+from app.services.monitoring.api_budget import budgeted_client
+from app.services.monitoring.analysis_cache import analysis_cache, cached_analysis, content_fingerprint
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +52,9 @@ logger = logging.getLogger(__name__)
 class WebsiteAgent:
     """Intelligent website agent for competitor website intelligence using Crawl4AI"""
 
+    # Bump when the analysis prompt changes so cached analyses stop matching
+    ANALYSIS_PROMPT_VERSION = "1"
+
     def __init__(self):
         logger.info("🌐 Intelligent WebsiteAgent initializing...")
         self.crawl_count = 0
@@ -67,6 +74,9 @@ class WebsiteAgent:
                     api_key=settings.GOOGLE_API_KEY,
                     temperature=0.3
                 )
+                self.llm = instrument_client(self.llm, "gemini", "website_agent", ["ainvoke"])
+                # Shared Gemini budget; BudgetExhausted falls into the heuristic fallbacks
+                self.llm = budgeted_client(self.llm, "gemini", ["ainvoke"])
                 logger.info("✅ LLM initialized successfully")
             except Exception as e:
                 logger.warning(f"Failed to initialize LLM: {e}")
@@ -109,6 +119,7 @@ class WebsiteAgent:
             Dict containing analysis results and extracted content
         """
         self.crawl_count = 0  # Reset crawl count for each analysis
+        cache_stats = analysis_cache.start_scan()
 
         try:
             logger.info(f"🌐 Starting intelligent website analysis for {competitor_name}")
@@ -223,6 +234,7 @@ class WebsiteAgent:
                     "total_pages_analyzed": len(processed_posts),
                     "alerts_created": alerts_created,
                     "urls_crawled": len(urls_to_crawl),
+                    "analysis_cache": cache_stats.report(),
                     "analysis_timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
@@ -673,7 +685,18 @@ https://www.{competitor_name.lower().replace(' ', '')}.com/products
             return self._heuristic_content_analysis(content_item, competitor_name)
 
     async def _ai_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
-        """Use AI to analyze website content for competitive intelligence"""
+        """AI analysis, reused across scans while the content is unchanged; heuristic fallback on failure"""
+        analysis = await cached_analysis(
+            "website", self.ANALYSIS_PROMPT_VERSION, competitor_name,
+            content_item.get('content_hash') or content_fingerprint(content_item.get('title', ''), content_item.get('content', '')),
+            lambda: self._request_ai_content_analysis(content_item, competitor_name)
+        )
+        if analysis is None:
+            return self._heuristic_content_analysis(content_item, competitor_name)
+        return analysis
+
+    async def _request_ai_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Optional[Dict[str, Any]]:
+        """Use AI to analyze website content for competitive intelligence; None when the model call or its answer fails"""
         try:
             title = content_item.get('title', '')
             content = content_item.get('content', '')[:1500]  # First 1500 chars
@@ -758,15 +781,15 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                     return analysis
                 else:
                     logger.warning(f"⚠️  AI response missing required fields, using fallback")
-                    return self._heuristic_content_analysis(content_item, competitor_name)
+                    return None
                     
             except (json.JSONDecodeError, ValueError) as e:
                 logger.error(f"❌ Failed to parse AI response: {e}")
-                return self._heuristic_content_analysis(content_item, competitor_name)
+                return None
                 
         except Exception as e:
             logger.error(f"❌ Error in AI content analysis: {e}")
-            return self._heuristic_content_analysis(content_item, competitor_name)
+            return None
 
     def _heuristic_content_analysis(self, content_item: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
         """Heuristic analysis when AI is not available"""
@@ -936,9 +959,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
     async def _create_intelligent_alert(self, competitor_id: str, content_item: Dict[str, Any], analysis_result: Dict[str, Any], data_id: str):
         """Create an intelligent alert for significant website content"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -965,9 +987,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            alert_id = await supabase_client.create_alert(alert_data)
-            if alert_id:
-                logger.info(f"🚨 Created intelligent website alert: {alert_id}")
+            if await submit_alert(alert_data):
+                logger.info("🚨 Queued intelligent website alert")
             else:
                 logger.error("❌ Failed to create alert in Supabase")
                 
@@ -977,9 +998,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
     async def _create_content_change_alert(self, competitor_id: str, content_item: Dict[str, Any], analysis_result: Dict[str, Any], data_id: str):
         """Create an alert for website content changes"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -1000,9 +1020,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            alert_id = await supabase_client.create_alert(alert_data)
-            if alert_id:
-                logger.info(f"🔄 Created website content change alert: {alert_id}")
+            if await submit_alert(alert_data):
+                logger.info("🔄 Queued website content change alert")
                 
         except Exception as e:
             logger.error(f"❌ Error creating content change alert: {e}")
@@ -4,8 +4,12 @@ Uses YouTube Data API intelligently to analyze competitor videos from today only
 """
 
 import asyncio
+import io
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta, timezone
 import hashlib
 import json
@@ -31,13 +35,74 @@ except ImportError as e:
     logger.warning(f"⚠️  Google API dependencies not available: {e}")
     GOOGLE_API_AVAILABLE = False
 
+try:
+    import httplib2
+except ImportError:
+    httplib2 = None
+
 from app.core.config import settings
+from app.core.metrics import instrument_client, track
 from app.services.monitoring.supabase_client import supabase_client
+from app.services.monitoring.alert_pipeline import resolve_alert_user_id, submit_alert
+from app.services.monitoring.api_budget import YOUTUBE_COSTS, BudgetExhausted, api_budget, budgeted_client
+from app.services.monitoring.analysis_cache import analysis_cache, cached_analysis, content_fingerprint
+from app.services.monitoring.agents.sub_agents.video_relevance import classify_videos
+
+
+# videos.list accepts up to 50 ids per call
+VIDEOS_LIST_MAX_IDS = 50
+YOUTUBE_HTTP_TIMEOUT = 30
+
+_thread_local = threading.local()
+
+
+class CaptionCache:
+    """
+    Bounded LRU of caption text by video id. Captions of a published video do not
+    change, so hits never expire; "no captions" results expire after ``empty_ttl_seconds``
+    because auto-generated captions can appear later.
+    """
+
+    def __init__(self, max_size: int = 1000, empty_ttl_seconds: float = 6 * 3600):
+        self.max_size = max_size
+        self.empty_ttl_seconds = empty_ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[video_id]
+                return None
+            self._entries.move_to_end(video_id)
+            return text
+
+    def set(self, video_id: str, text: str) -> None:
+        expires_at = None if text else time.monotonic() + self.empty_ttl_seconds
+        with self._lock:
+            self._entries[video_id] = (expires_at, text)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+caption_cache = CaptionCache()
 
 
 class YouTubeAgent:
     """Intelligent YouTube agent for competitor analysis using YouTube Data API"""
     
+    # Ambiguous videos per LLM relevance call (clear matches/misses never reach the LLM)
+    RELEVANCE_LLM_BATCH_SIZE = 15
+    # Caption downloads in flight per scan
+    CAPTION_CONCURRENCY = 4
+    # Bump when the analysis prompt changes so cached analyses stop matching
+    ANALYSIS_PROMPT_VERSION = "1"
+    
     def __init__(self):
         logger.info("🎬 Intelligent YouTubeAgent initializing...")
         
@@ -50,6 +115,9 @@ class YouTubeAgent:
                     api_key=settings.GOOGLE_API_KEY,
                     temperature=0.3  # Slightly more creative for search terms
                 )
+                self.llm = instrument_client(self.llm, "gemini", "youtube_agent", ["ainvoke"])
+                # Shared Gemini budget; BudgetExhausted falls into the heuristic fallbacks
+                self.llm = budgeted_client(self.llm, "gemini", ["ainvoke"])
                 logger.info("✅ LLM initialized successfully")
             except Exception as e:
                 logger.warning(f"⚠️  Failed to initialize LLM: {e}")
@@ -88,6 +156,8 @@ class YouTubeAgent:
         Returns:
             Dict containing analysis results and extracted videos
         """
+        cache_stats = analysis_cache.start_scan()
+
         try:
             logger.info(f"🎬 Starting intelligent YouTube analysis for competitor {competitor_id}")
             
@@ -161,7 +231,7 @@ class YouTubeAgent:
                 }
             
             # Step 2.5: Filter videos for relevance to competitor
-            relevant_videos = await self._filter_relevant_videos_ai(today_videos, competitor_name)
+            relevant_videos, relevance_stats = await self._filter_relevant_videos_cascade(today_videos, competitor_name)
             logger.info(f"🎯 Filtered to {len(relevant_videos)} relevant videos for {competitor_name}")
             
             if not relevant_videos:
@@ -177,6 +247,7 @@ class YouTubeAgent:
                         "total_videos_found": len(today_videos),
                         "relevant_videos_analyzed": 0,
                         "relevance_filtering_applied": True,
+                        "relevance_cascade": relevance_stats,
                         "search_queries_used": len(search_queries),
                         "analysis_timestamp": datetime.now(timezone.utc).isoformat()
                     }
@@ -186,10 +257,12 @@ class YouTubeAgent:
             processed_posts = []
             alerts_created = 0
             
+            # Details for all relevant videos in batched videos.list calls, captions concurrently
+            details_by_id = await self._get_videos_details([video['video_id'] for video in relevant_videos])
+            
             for video in relevant_videos:
                 try:
-                    # Get detailed video information
-                    video_details = await self._get_video_details(video['video_id'])
+                    video_details = details_by_id.get(video['video_id'])
                     if not video_details:
                         continue
                     
@@ -243,6 +316,8 @@ class YouTubeAgent:
                     "alerts_created": alerts_created,
                     "search_queries_used": len(search_queries),
                     "relevance_filtering_applied": True,
+                    "relevance_cascade": relevance_stats,
+                    "analysis_cache": cache_stats.report(),
                     "analysis_timestamp": datetime.now(timezone.utc).isoformat()
                 }
             }
@@ -358,14 +433,15 @@ Example format:
                 try:
                     logger.info(f"🔍 Searching YouTube for: '{query}' (today only)")
                     
-                    search_response = self.youtube_api.search().list(
-                        q=query,
-                        part='snippet',
-                        type='video',
-                        publishedAfter=published_after,
-                        order='relevance',
-                        maxResults=10
-                    ).execute()
+                    with track("youtube_api", "search.list"):
+                        search_response = await self._execute(self.youtube_api.search().list(
+                            q=query,
+                            part='snippet',
+                            type='video',
+                            publishedAfter=published_after,
+                            order='relevance',
+                            maxResults=10
+                        ), "search.list")
                     
                     videos = search_response.get('items', [])
                     logger.info(f"   📹 Found {len(videos)} videos for query: '{query}'")
@@ -380,6 +456,9 @@ Example format:
                                 'snippet': video['snippet']
                             })
                     
+                except BudgetExhausted as e:
+                    logger.warning(f"🪫 Stopping YouTube search early: {e}")
+                    break
                 except HttpError as e:
                     logger.error(f"❌ YouTube API error for query '{query}': {e}")
                     continue
@@ -395,89 +474,79 @@ Example format:
             return []
     
     async def _filter_relevant_videos_ai(self, videos: List[Dict[str, Any]], competitor_name: str) -> List[Dict[str, Any]]:
-        """Use AI to filter videos for relevance to the competitor in batches of 5"""
+        """Filter videos for relevance to the competitor (lexical pre-filter, then AI for the ambiguous ones)"""
+        relevant_videos, _ = await self._filter_relevant_videos_cascade(videos, competitor_name)
+        return relevant_videos
+
+    async def _filter_relevant_videos_cascade(self, videos: List[Dict[str, Any]], competitor_name: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Relevance cascade: the lexical scorer accepts clear matches and rejects clear
+        misses; only the ambiguous middle band goes to the LLM (in batches of
+        RELEVANCE_LLM_BATCH_SIZE). Returns the relevant videos and per-stage counts.
+        """
+        stats = {
+            "candidates": len(videos),
+            "lexical_accepted": 0,
+            "lexical_rejected": 0,
+            "sent_to_llm": 0,
+            "llm_accepted": 0,
+            "llm_calls": 0,
+            "heuristic_fallback": 0
+        }
+        if not videos:
+            return [], stats
+        
         try:
-            if not videos:
-                return []
-            
-            if not self.llm:
-                logger.info("🤖 LLM not available, using heuristic filtering")
-                return self._filter_relevant_videos_heuristic(videos, competitor_name)
-            
-            relevant_videos = []
-            competitor_name_lower = competitor_name.lower()
-            
-            logger.info(f"🧠 Using AI to filter {len(videos)} videos for relevance to {competitor_name} in batches of 5")
-            
-            # Process videos in batches of 5
-            batch_size = 5
-            total_batches = (len(videos) + batch_size - 1) // batch_size
-            logger.info(f"📦 Starting batch processing: {len(videos)} videos in {total_batches} batches of {batch_size}")
-            
-            for i in range(0, len(videos), batch_size):
-                batch = videos[i:i + batch_size]
-                current_batch = i//batch_size + 1
-                batch_range = f"{i+1}-{min(i+batch_size, len(videos))}"
-                logger.info(f"📦 Processing batch {current_batch}/{total_batches}: videos {batch_range}")
-                
-                try:
-                    # Process batch of 5 videos together
-                    batch_results = await self._ai_video_relevance_check_batch(batch, competitor_name)
-                    
-                    # Add relevant videos from this batch
-                    batch_relevant = 0
-                    for j, is_relevant in enumerate(batch_results):
-                        if is_relevant:
-                            relevant_videos.append(batch[j])
-                            batch_relevant += 1
-                            title = batch[j].get('snippet', {}).get('title', 'Unknown')[:50]
-                            logger.info(f"   ✅ AI Relevant: {title}...")
-                        else:
-                            title = batch[j].get('snippet', {}).get('title', 'Unknown')[:50]
-                            logger.info(f"   ❌ AI Irrelevant: {title}...")
-                    
-                    logger.info(f"   📊 Batch {current_batch} results: {batch_relevant}/{len(batch)} videos relevant")
-                            
-                except Exception as e:
-                    logger.error(f"   ❌ Error in AI relevance check for batch {current_batch}: {e}")
-                    # Fallback to individual heuristic checks for this batch
-                    logger.info(f"   🔄 Falling back to heuristic checks for batch {current_batch}")
-                    batch_relevant = 0
-                    for video in batch:
-                        try:
-                            snippet = video.get('snippet', {})
-                            title = snippet.get('title', '')
-                            description = snippet.get('description', '')
-                            channel_title = snippet.get('channelTitle', '')
-                            
-                            if self._is_video_relevant_to_competitor_heuristic(
-                                title, description, channel_title, competitor_name_lower
-                            ):
-                                relevant_videos.append(video)
-                                batch_relevant += 1
-                                logger.info(f"   ✅ Heuristic Relevant: {title[:50]}...")
-                            else:
-                                logger.info(f"   ❌ Heuristic Irrelevant: {title[:50]}...")
-                        except Exception as batch_e:
-                            logger.error(f"   ❌ Error in heuristic check: {batch_e}")
-                            continue
-                    
-                    logger.info(f"   📊 Batch {current_batch} heuristic results: {batch_relevant}/{len(batch)} videos relevant")
-            
-            logger.info(f"🧠 AI filtered {len(videos)} videos to {len(relevant_videos)} relevant ones")
-            
-            # Log batch processing efficiency
-            if len(videos) > 0:
-                efficiency = (len(relevant_videos) / len(videos)) * 100
-                logger.info(f"📊 Batch processing efficiency: {efficiency:.1f}% of videos were relevant")
-                logger.info(f"📊 Processed {len(videos)} videos in {total_batches} batches of {batch_size}")
-            
-            return relevant_videos
-            
+            accepted, ambiguous, rejected = classify_videos(videos, competitor_name)
         except Exception as e:
-            logger.error(f"❌ Error in AI video filtering: {e}")
-            logger.info("🔄 Falling back to heuristic filtering")
-            return self._filter_relevant_videos_heuristic(videos, competitor_name)
+            logger.error(f"❌ Error in lexical relevance scoring: {e}")
+            accepted, ambiguous, rejected = [], list(videos), []
+        stats["lexical_accepted"] = len(accepted)
+        stats["lexical_rejected"] = len(rejected)
+        logger.info(
+            f"🎯 Lexical pre-filter for {competitor_name}: {len(accepted)} accepted, "
+            f"{len(rejected)} rejected, {len(ambiguous)} ambiguous of {len(videos)} videos"
+        )
+        
+        relevant_videos = list(accepted)
+        if ambiguous and not self.llm:
+            logger.info("🤖 LLM not available, using heuristic filtering for ambiguous videos")
+            heuristic = self._filter_relevant_videos_heuristic(ambiguous, competitor_name)
+            stats["heuristic_fallback"] = len(ambiguous)
+            relevant_videos.extend(heuristic)
+            ambiguous = []
+        
+        batch_size = self.RELEVANCE_LLM_BATCH_SIZE
+        for i in range(0, len(ambiguous), batch_size):
+            batch = ambiguous[i:i + batch_size]
+            stats["sent_to_llm"] += len(batch)
+            stats["llm_calls"] += 1
+            try:
+                batch_results = await self._ai_video_relevance_check_batch(batch, competitor_name)
+                for video, is_relevant in zip(batch, batch_results):
+                    title = video.get('snippet', {}).get('title', 'Unknown')[:50]
+                    if is_relevant:
+                        relevant_videos.append(video)
+                        stats["llm_accepted"] += 1
+                        logger.info(f"   ✅ AI Relevant: {title}...")
+                    else:
+                        logger.info(f"   ❌ AI Irrelevant: {title}...")
+            except Exception as e:
+                logger.error(f"   ❌ Error in AI relevance check for batch {i // batch_size + 1}: {e}")
+                logger.info("   🔄 Falling back to heuristic checks for this batch")
+                heuristic = self._filter_relevant_videos_heuristic(batch, competitor_name)
+                stats["heuristic_fallback"] += len(batch)
+                relevant_videos.extend(heuristic)
+        
+        candidates = stats["candidates"]
+        stats["lexical_pass_rate"] = round(len(accepted) / candidates, 3)
+        stats["llm_share"] = round(stats["sent_to_llm"] / candidates, 3)
+        stats["llm_pass_rate"] = round(stats["llm_accepted"] / stats["sent_to_llm"], 3) if stats["sent_to_llm"] else None
+        logger.info(
+            f"🧠 Relevance cascade: {candidates} candidates -> {len(relevant_videos)} relevant "
+            f"({stats['sent_to_llm']} sent to the LLM in {stats['llm_calls']} calls)"
+        )
+        return relevant_videos, stats
 
     def _filter_relevant_videos_heuristic(self, videos: List[Dict[str, Any]], competitor_name: str) -> List[Dict[str, Any]]:
         """Fallback heuristic filtering when AI is not available"""
@@ -558,97 +627,151 @@ Example format:
             logger.error(f"❌ Error checking video relevance: {e}")
             return False
     
+    async def _execute(self, request, method: str):
+        """
+        Run a googleapiclient request off the event loop (each worker thread has its own
+        connection), charging its quota units to the shared YouTube budget first
+        """
+        await api_budget.require("youtube", YOUTUBE_COSTS[method])
+        def execute():
+            http = getattr(_thread_local, "http", None)
+            if http is None and httplib2 is not None:
+                http = _thread_local.http = httplib2.Http(timeout=YOUTUBE_HTTP_TIMEOUT)
+            # httplib2.Http is not thread-safe, so never share the client's default one across threads
+            return request.execute(http=http) if http is not None else request.execute()
+        return await asyncio.to_thread(execute)
+
     async def _get_video_details(self, video_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific video including captions"""
-        try:
-            # Get basic video information
-            video_response = self.youtube_api.videos().list(
-                part='snippet,statistics,contentDetails',
-                id=video_id
-            ).execute()
-            
-            if not video_response.get('items'):
-                return None
-            
-            video = video_response['items'][0]
-            snippet = video['snippet']
-            statistics = video.get('statistics', {})
-            
-            # Get video captions/transcripts if available
-            captions = await self._get_video_captions(video_id)
-            
-            return {
-                'video_id': video_id,
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'channel_title': snippet.get('channelTitle', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'thumbnail': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
-                'url': f"https://www.youtube.com/watch?v={video_id}",
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'comment_count': int(statistics.get('commentCount', 0)),
-                'duration': video.get('contentDetails', {}).get('duration', ''),
-                'tags': snippet.get('tags', []),
-                'captions': captions
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Error getting video details for {video_id}: {e}")
-            return None
+        return (await self._get_videos_details([video_id])).get(video_id)
+
+    async def _get_videos_details(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Details for many videos: videos.list in batches of up to 50 ids, then captions
+        fetched concurrently (bounded by CAPTION_CONCURRENCY). Keyed by video id; videos
+        that could not be loaded are missing.
+        """
+        video_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        details: Dict[str, Dict[str, Any]] = {}
+        
+        for start in range(0, len(video_ids), VIDEOS_LIST_MAX_IDS):
+            chunk = video_ids[start:start + VIDEOS_LIST_MAX_IDS]
+            try:
+                with track("youtube_api", "videos.list"):
+                    video_response = await self._execute(self.youtube_api.videos().list(
+                        part='snippet,statistics,contentDetails',
+                        id=','.join(chunk),
+                        maxResults=len(chunk)
+                    ), "videos.list")
+            except Exception as e:
+                logger.error(f"❌ Error getting video details for {len(chunk)} videos: {e}")
+                continue
+            
+            for video in video_response.get('items', []):
+                video_id = video['id']
+                snippet = video['snippet']
+                statistics = video.get('statistics', {})
+                details[video_id] = {
+                    'video_id': video_id,
+                    'title': snippet.get('title', ''),
+                    'description': snippet.get('description', ''),
+                    'channel_title': snippet.get('channelTitle', ''),
+                    'published_at': snippet.get('publishedAt', ''),
+                    'thumbnail': snippet.get('thumbnails', {}).get('high', {}).get('url', ''),
+                    'url': f"https://www.youtube.com/watch?v={video_id}",
+                    'view_count': int(statistics.get('viewCount', 0)),
+                    'like_count': int(statistics.get('likeCount', 0)),
+                    'comment_count': int(statistics.get('commentCount', 0)),
+                    'duration': video.get('contentDetails', {}).get('duration', ''),
+                    'tags': snippet.get('tags', []),
+                    'captions': ''
+                }
+        
+        # Get video captions/transcripts if available
+        semaphore = asyncio.Semaphore(self.CAPTION_CONCURRENCY)
+        
+        async def fetch_captions(video_id: str) -> None:
+            async with semaphore:
+                details[video_id]['captions'] = await self._get_video_captions(video_id)
+        
+        await asyncio.gather(*(fetch_captions(video_id) for video_id in list(details)))
+        logger.info(f"📹 Enriched {len(details)}/{len(video_ids)} videos")
+        return details
 
     async def _get_video_captions(self, video_id: str) -> str:
-        """Get video captions/transcripts if available"""
+        """Get video captions/transcripts if available (cached by video id)"""
+        cached = caption_cache.get(video_id)
+        if cached is not None:
+            return cached
         try:
             # First, check if captions are available
-            captions_response = self.youtube_api.captions().list(
-                part='snippet',
-                videoId=video_id
-            ).execute()
+            with track("youtube_api", "captions.list"):
+                captions_response = await self._execute(self.youtube_api.captions().list(
+                    part='snippet',
+                    videoId=video_id
+                ), "captions.list")
             
             if not captions_response.get('items'):
                 logger.info(f"📝 No captions available for video {video_id}")
+                caption_cache.set(video_id, "")
                 return ""
             
             # Get the first available caption track (usually auto-generated)
             caption_id = captions_response['items'][0]['id']
             
             # Download the caption content
-            caption_response = self.youtube_api.captions().download(
-                id=caption_id,
-                tfmt='srt'
-            ).execute()
-            
+            with track("youtube_api", "captions.download") as timing:
+                caption_response = await self._execute(self.youtube_api.captions().download(
+                    id=caption_id,
+                    tfmt='srt'
+                ), "captions.download")
+                timing.payload_bytes = len(caption_response or b"")
+            
+            caption_text = ""
             if caption_response:
                 # Parse SRT format and extract text
-                caption_text = self._parse_srt_captions(caption_response.decode('utf-8'))
+                caption_text = self._parse_srt_captions(caption_response)
                 logger.info(f"📝 Retrieved captions for video {video_id}: {len(caption_text)} characters")
-                return caption_text
-            else:
-                return ""
+            caption_cache.set(video_id, caption_text)
+            return caption_text
                 
+        except BudgetExhausted as e:
+            # Captions are optional enrichment: skip them (uncached) while the quota is tight
+            logger.info(f"🪫 Skipping captions for video {video_id}: {e}")
+            return ""
         except Exception as e:
             logger.warning(f"⚠️  Could not retrieve captions for video {video_id}: {e}")
+            # Usually a permissions error that will repeat: remember it for a while
+            caption_cache.set(video_id, "")
             return ""
 
-    def _parse_srt_captions(self, srt_content: str) -> str:
-        """Parse SRT caption format and extract clean text"""
+    def _parse_srt_captions(self, srt_content: Union[str, bytes]) -> str:
+        """
+        Parse SRT caption format and extract clean text
+        
+        Streams over the content line by line (bytes are decoded incrementally), so a
+        long transcript is never split into a full list of lines.
+        """
         try:
-            lines = srt_content.split('\n')
-            text_lines = []
+            if isinstance(srt_content, bytes):
+                stream = io.TextIOWrapper(io.BytesIO(srt_content), encoding='utf-8', errors='replace')
+            else:
+                stream = io.StringIO(srt_content)
             
-            for i, line in enumerate(lines):
-                # Skip timestamp lines and empty lines
-                if (line.strip().isdigit() or 
-                    '-->' in line or 
-                    not line.strip()):
+            text = io.StringIO()
+            for line in stream:
+                line = line.strip()
+                # Skip cue numbers, timestamp lines and empty lines
+                if not line or line.isdigit() or '-->' in line:
                     continue
-                text_lines.append(line.strip())
+                if text.tell():
+                    text.write(' ')
+                text.write(line)
             
-            return ' '.join(text_lines)
+            return text.getvalue()
         except Exception as e:
             logger.warning(f"⚠️  Error parsing SRT captions: {e}")
-            return srt_content
+            return srt_content.decode('utf-8', errors='replace') if isinstance(srt_content, bytes) else srt_content
     
     async def _analyze_video_intelligence(self, video_details: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
         """Analyze video content using AI to determine significance and generate insights"""
@@ -665,7 +788,18 @@ Example format:
             return self._heuristic_video_analysis(video_details, competitor_name)
     
     async def _ai_video_analysis(self, video_details: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
-        """Use AI to analyze video content for competitive intelligence and sentiment"""
+        """AI analysis, reused across scans while the content is unchanged; heuristic fallback on failure"""
+        analysis = await cached_analysis(
+            "youtube", self.ANALYSIS_PROMPT_VERSION, competitor_name,
+            content_fingerprint(video_details.get('title', ''), video_details.get('description', ''), video_details.get('captions', '')),
+            lambda: self._request_ai_video_analysis(video_details, competitor_name)
+        )
+        if analysis is None:
+            return self._heuristic_video_analysis(video_details, competitor_name)
+        return analysis
+
+    async def _request_ai_video_analysis(self, video_details: Dict[str, Any], competitor_name: str) -> Optional[Dict[str, Any]]:
+        """Use AI to analyze video content for competitive intelligence and sentiment; None when the model call or its answer fails"""
         try:
             title = video_details.get('title', '')
             description = video_details.get('description', '')
@@ -753,15 +887,15 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                     return analysis
                 else:
                     logger.warning(f"⚠️  AI response missing required fields, using fallback")
-                    return self._heuristic_video_analysis(video_details, competitor_name)
+                    return None
                     
             except (json.JSONDecodeError, ValueError) as e:
                 logger.error(f"❌ Failed to parse AI response: {e}")
-                return self._heuristic_video_analysis(video_details, competitor_name)
+                return None
                 
         except Exception as e:
             logger.error(f"❌ Error in AI video analysis: {e}")
-            return self._heuristic_video_analysis(video_details, competitor_name)
+            return None
     
     def _heuristic_video_analysis(self, video_details: Dict[str, Any], competitor_name: str) -> Dict[str, Any]:
         """Heuristic analysis when AI is not available"""
@@ -886,9 +1020,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
     async def _create_intelligent_alert(self, competitor_id: str, video_details: Dict[str, Any], analysis_result: Dict[str, Any], data_id: str):
         """Create an intelligent alert for significant videos"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -920,9 +1053,8 @@ Be selective with alerts - only flag truly significant competitive intelligence.
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            alert_id = await supabase_client.create_alert(alert_data)
-            if alert_id:
-                logger.info(f"🚨 Created intelligent YouTube alert: {alert_id}")
+            if await submit_alert(alert_data):
+                logger.info("🚨 Queued intelligent YouTube alert")
             else:
                 logger.error("❌ Failed to create alert in Supabase")
                 
@@ -930,7 +1062,7 @@ Be selective with alerts - only flag truly significant competitive intelligence.
             logger.error(f"❌ Error creating intelligent alert: {e}")
 
     async def _ai_video_relevance_check_batch(self, videos: List[Dict[str, Any]], competitor_name: str) -> List[bool]:
-        """Use AI to determine relevance for a batch of 5 videos at once"""
+        """Use AI to determine relevance for a batch of videos at once"""
         try:
             if not videos or len(videos) == 0:
                 return []
@@ -952,7 +1084,7 @@ Be selective with alerts - only flag truly significant competitive intelligence.
             
             # Create comprehensive prompt for batch analysis
             prompt = f"""
-Analyze these 5 YouTube videos to determine if they are DIRECTLY relevant to the company "{competitor_name}".
+Analyze these {len(videos)} YouTube videos to determine if they are DIRECTLY relevant to the company "{competitor_name}".
 
 For each video, determine if it is ONLY relevant if it is:
 1. DIRECTLY about the company "{competitor_name}" (not just similar words)
@@ -978,7 +1110,7 @@ Channel: {video_data['channel']}
 """
             
             prompt += f"""
-Respond with ONLY a JSON array of 5 boolean values (true/false) indicating relevance for each video in order.
+Respond with ONLY a JSON array of {len(videos)} boolean values (true/false) indicating relevance for each video in order.
 Example: [true, false, true, false, true]
 
 Be selective - only mark as relevant if the video is clearly and directly about "{competitor_name}".
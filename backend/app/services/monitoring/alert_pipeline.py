@@ -0,0 +1,172 @@
+"""
+Alert pipeline for monitoring scans
+Agents used to look up the competitor (for its owning user_id) and insert every alert
+on its own: two round trips per alert. During a scan, alerts are now buffered in an
+AlertBatch that resolves competitor -> user once, drops near-identical alerts and
+inserts the rest in one bulk request at the end of the scan (or when the buffer fills).
+
+Outside a scan (no active batch) alerts are resolved and inserted immediately.
+"""
+
+import contextvars
+import logging
+import re
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.monitoring.supabase_client import supabase_client
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+_current_batch: contextvars.ContextVar[Optional["AlertBatch"]] = contextvars.ContextVar(
+    "alert_batch", default=None
+)
+
+
+def _normalize(text: Any) -> str:
+    return re.sub(r"[\W_]+", " ", str(text or "").lower()).strip()
+
+
+class AlertBatch:
+    """Per-scan alert buffer with memoized competitor -> user_id resolution"""
+
+    def __init__(self, max_size: int = 100):
+        self.max_size = max_size
+        self._owners: Dict[str, Optional[str]] = {}
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        # Keys already inserted by an earlier flush in this scan
+        self._flushed: set = set()
+        self.created = 0
+        self.duplicates = 0
+        self.failed = 0
+
+    def remember_competitor(self, competitor: Optional[Dict[str, Any]]) -> None:
+        """Seed the owner lookup with a competitor row the caller already has"""
+        if competitor and competitor.get("id"):
+            self._owners[str(competitor["id"])] = competitor.get("user_id")
+
+    async def resolve_user_id(self, competitor_id: str) -> Optional[str]:
+        competitor_id = str(competitor_id)
+        if competitor_id not in self._owners:
+            competitor = await supabase_client.get_competitor_details(competitor_id)
+            self._owners[competitor_id] = competitor.get("user_id") if competitor else None
+        return self._owners[competitor_id]
+
+    @staticmethod
+    def dedupe_key(alert_data: Dict[str, Any]) -> tuple:
+        # The same post or URL reported twice in one scan (e.g. by two agents) with the
+        # same kind of alert and wording is one alert
+        metadata = alert_data.get("alert_metadata") or {}
+        subject = (
+            metadata.get("content_url")
+            or metadata.get("post_id")
+            or alert_data.get("monitoring_data_id")
+            or ""
+        )
+        return (
+            alert_data.get("user_id"),
+            str(alert_data.get("competitor_id")),
+            alert_data.get("alert_type"),
+            str(subject),
+            _normalize(alert_data.get("title"))
+        )
+
+    async def add(self, alert_data: Dict[str, Any]) -> bool:
+        if not alert_data.get("user_id") and alert_data.get("competitor_id"):
+            alert_data["user_id"] = await self.resolve_user_id(alert_data["competitor_id"])
+
+        key = self.dedupe_key(alert_data)
+        if key in self._flushed:
+            self.duplicates += 1
+            return True
+        existing = self._pending.get(key)
+        if existing is not None:
+            self.duplicates += 1
+            # Keep the first alert, at the highest priority any duplicate asked for
+            if PRIORITY_RANK.get(alert_data.get("priority"), 1) > PRIORITY_RANK.get(existing.get("priority"), 1):
+                existing["priority"] = alert_data["priority"]
+            metadata = dict(existing.get("alert_metadata") or {})
+            metadata["duplicate_count"] = metadata.get("duplicate_count", 0) + 1
+            existing["alert_metadata"] = metadata
+            return True
+
+        self._pending[key] = alert_data
+        if len(self._pending) >= self.max_size:
+            await self.flush()
+        return True
+
+    async def flush(self) -> List[str]:
+        if not self._pending:
+            return []
+        alerts = list(self._pending.values())
+        self._flushed.update(self._pending)
+        self._pending = {}
+
+        alert_ids = await supabase_client.create_alerts(alerts)
+        if alert_ids is None:
+            # Bulk insert rejected (e.g. one malformed row): insert one by one so the rest survive
+            logger.warning(f"⚠️ Bulk alert insert failed, retrying {len(alerts)} alerts individually")
+            alert_ids = []
+            for alert_data in alerts:
+                alert_id = await supabase_client.create_alert(alert_data)
+                if alert_id:
+                    alert_ids.append(alert_id)
+
+        self.created += len(alert_ids)
+        self.failed += len(alerts) - len(alert_ids)
+        logger.info(f"🚨 Flushed {len(alert_ids)}/{len(alerts)} alerts")
+        return alert_ids
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "pending": len(self._pending)
+        }
+
+
+@asynccontextmanager
+async def alert_batch(competitor: Optional[Dict[str, Any]] = None):
+    """Buffer alerts raised inside the block; flushed on exit. Nested blocks share the outer batch."""
+    batch = _current_batch.get()
+    if batch is not None:
+        batch.remember_competitor(competitor)
+        yield batch
+        return
+
+    batch = AlertBatch(max_size=settings.ALERT_BATCH_MAX_SIZE)
+    batch.remember_competitor(competitor)
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+        try:
+            await batch.flush()
+        except Exception as e:
+            logger.error(f"❌ Error flushing alert batch: {e}")
+        if batch.duplicates:
+            logger.info(f"🚨 Dropped {batch.duplicates} duplicate alerts")
+
+
+async def resolve_alert_user_id(competitor_id: str) -> Optional[str]:
+    """Owning user of a competitor; memoized for the duration of the current scan"""
+    batch = _current_batch.get()
+    if batch is not None:
+        return await batch.resolve_user_id(competitor_id)
+    competitor = await supabase_client.get_competitor_details(competitor_id)
+    return competitor.get("user_id") if competitor else None
+
+
+async def submit_alert(alert_data: Dict[str, Any]) -> bool:
+    """Queue an alert on the current scan's batch, or insert it right away outside a scan"""
+    batch = _current_batch.get()
+    if batch is not None:
+        return await batch.add(alert_data)
+    if not alert_data.get("user_id") and alert_data.get("competitor_id"):
+        alert_data["user_id"] = await resolve_alert_user_id(alert_data["competitor_id"])
+    return bool(await supabase_client.create_alert(alert_data))
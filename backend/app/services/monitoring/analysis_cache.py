@@ -0,0 +1,190 @@
+"""
+Cross-scan cache for LLM content analyses
+The same Tavily result, tweet, page or video comes back unchanged on every daily scan
+and for every user tracking the same competitor, and each agent used to send it to
+Gemini again. Successful analyses are now stored under
+(platform, prompt version, competitor name, content hash) in a small SQLite file under
+STATE_DIR, so they survive restarts and are shared by all workers on the host. Entries expire after
+ANALYSIS_CACHE_TTL_HOURS and the least recently used ones are evicted beyond
+ANALYSIS_CACHE_MAX_ENTRIES.
+
+Agents go through ``cached_analysis``, which does the SQLite I/O in a worker thread so a
+busy cache file never blocks the event loop. Hits only record their use time in memory;
+those are written in one batch every TOUCH_FLUSH_EVERY hits or with the next write.
+
+Bump an agent's ANALYSIS_PROMPT_VERSION whenever its analysis prompt changes so old
+answers stop matching.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.state_db import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+# Expired/over-limit rows are pruned every this many writes rather than on each one
+PRUNE_EVERY = 200
+# Hits update used_at (for LRU eviction) in batches of this many
+TOUCH_FLUSH_EVERY = 100
+
+
+class AnalysisCacheStats:
+    """Hits and misses for one agent scan"""
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def report(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+_scan_stats: contextvars.ContextVar[Optional[AnalysisCacheStats]] = contextvars.ContextVar(
+    "analysis_cache_stats", default=None
+)
+
+
+def content_fingerprint(*parts: Optional[str]) -> str:
+    """md5 of the non-empty parts, joined the way the agents build content_hash"""
+    return hashlib.md5("\n\n".join(part for part in parts if part).encode()).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, path: str = "", ttl_seconds: float = 72 * 3600, max_entries: int = 20000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._touched: Dict[str, float] = {}
+        self._conn = connect_state_db(path, "Analysis cache", self._create_table)
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS analyses_used_at ON analyses (used_at)")
+        conn.commit()
+
+    @staticmethod
+    def make_key(platform: str, prompt_version: str, competitor_name: str, content_hash: str) -> str:
+        competitor = " ".join((competitor_name or "").lower().split())
+        return hashlib.sha256(f"{platform}|{prompt_version}|{competitor}|{content_hash}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis (a fresh copy) or None; counted on the current scan's stats"""
+        if self.ttl_seconds <= 0:
+            return None
+        now = time.time()
+        row = None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT analysis FROM analyses WHERE key = ? AND created_at > ?", (key, now - self.ttl_seconds)
+                ).fetchone()
+                if row is not None:
+                    self._touched[key] = now
+                    if len(self._touched) >= TOUCH_FLUSH_EVERY:
+                        self._flush_touched()
+                        self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Analysis cache read failed: {e}")
+
+        stats = _scan_stats.get()
+        if stats is not None:
+            if row is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def set(self, key: str, analysis: Dict[str, Any]) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        now = time.time()
+        try:
+            payload = json.dumps(analysis, default=str)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses (key, analysis, created_at, used_at) VALUES (?, ?, ?, ?)",
+                    (key, payload, now, now)
+                )
+                self._writes += 1
+                self._flush_touched()
+                if self._writes % PRUNE_EVERY == 0:
+                    self._prune(now)
+                self._conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Analysis cache write failed: {e}")
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            touched, self._touched = self._touched, {}
+            self._conn.executemany(
+                "UPDATE analyses SET used_at = ? WHERE key = ?", [(used_at, key) for key, used_at in touched.items()]
+            )
+
+    def _prune(self, now: float) -> None:
+        self._conn.execute("DELETE FROM analyses WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM analyses WHERE key IN ("
+            "SELECT key FROM analyses ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses")
+            self._conn.commit()
+
+    @staticmethod
+    def start_scan() -> AnalysisCacheStats:
+        """Fresh hit/miss counters for the calling agent scan (and the tasks it spawns)"""
+        stats = AnalysisCacheStats()
+        _scan_stats.set(stats)
+        return stats
+
+
+async def cached_analysis(platform: str, prompt_version: str, competitor_name: str, content_hash: str,
+                          compute: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+    """
+    Cached analysis of the content, or the result of `compute()` (stored unless it is
+    None, i.e. the model call failed and the agent falls back to heuristics)
+    """
+    key = AnalysisCache.make_key(platform, prompt_version, competitor_name, content_hash)
+    cached = await asyncio.to_thread(analysis_cache.get, key)
+    if cached is not None:
+        logger.info(f"🧠 Reused cached AI analysis: Significance {cached.get('significance_score', 0)}/10")
+        return cached
+    analysis = await compute()
+    if analysis is not None:
+        await asyncio.to_thread(analysis_cache.set, key, analysis)
+    return analysis
+
+
+analysis_cache = AnalysisCache(
+    path=settings.ANALYSIS_CACHE_PATH,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_HOURS * 3600,
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES
+)
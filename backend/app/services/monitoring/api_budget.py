@@ -0,0 +1,261 @@
+"""
+Shared budget for the monitoring agents' external APIs (Tavily, YouTube Data API, Gemini)
+Each agent used to cap only its own searches per scan, so concurrent scans for many
+users ran into YouTube quota and Tavily limits together and then fell back to
+heuristics anyway. Every call now goes through one manager per process:
+
+- a token bucket per provider (requests per second, with a small burst)
+- a daily quota ledger per provider in SQLite (API_BUDGET_PATH, under the persistent
+  STATE_DIR), updated with one atomic conditional UPDATE so all workers on the host
+  share it and it survives restarts and deploys
+- priority classes: scheduled scans may only use the quota left after the
+  API_BUDGET_MANUAL_RESERVE share kept for manual scans, and leave the same share of
+  each token bucket free so a manual scan is not queued behind a scheduled sweep
+
+Callers either ``await api_budget.acquire(...)`` and skip the call when it returns
+False, or let ``BudgetExhausted`` from ``budgeted_client``/``require`` fall into their
+existing heuristic fallback.
+
+    async with scan_priority(SCHEDULED):
+        await service.run_monitoring_for_competitor(...)
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+from app.core.state_db import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+MANUAL = "manual"
+SCHEDULED = "scheduled"
+
+# Longest a caller waits for a rate-limit token before giving up on the call
+MAX_WAIT_SECONDS = {MANUAL: 10.0, SCHEDULED: 30.0}
+
+# YouTube Data API v3 quota units per method
+YOUTUBE_COSTS = {"search.list": 100, "videos.list": 1, "captions.list": 50, "captions.download": 200}
+# Tavily credits per search
+TAVILY_COSTS = {"basic": 1, "advanced": 2}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("api_priority", default=MANUAL)
+
+
+class BudgetExhausted(Exception):
+    """The provider's daily quota (or this priority's share of it) is used up, or no rate token came in time"""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} budget exhausted: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+class ProviderBudget:
+    """Token bucket plus daily quota for one provider"""
+
+    def __init__(self, name: str, rate_per_second: float, daily_quota: float, burst: Optional[float] = None,
+                 reset_timezone: str = "UTC"):
+        self.name = name
+        self.rate = rate_per_second
+        self.burst = burst or max(1.0, rate_per_second)
+        self.daily_quota = daily_quota
+        self.reset_timezone = reset_timezone
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def day(self) -> str:
+        """Quota day in the provider's reset time zone (YouTube resets at midnight Pacific)"""
+        tz = timezone.utc if self.reset_timezone == "UTC" else ZoneInfo(self.reset_timezone)
+        return datetime.now(tz).date().isoformat()
+
+    def take_token(self, reserve: float) -> float:
+        """0 if a token was taken, otherwise seconds until one is available"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Scheduled calls leave `reserve` tokens in the bucket for manual ones
+            if self._tokens - reserve >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 + reserve - self._tokens) / self.rate
+
+
+class ApiBudget:
+    def __init__(self, path: str = "", manual_reserve: float = 0.2):
+        self.manual_reserve = min(max(manual_reserve, 0.0), 0.9)
+        self.providers: Dict[str, ProviderBudget] = {}
+        self._lock = threading.Lock()
+        self._conn = connect_state_db(path, "API budget ledger", self._create_table, isolation_level=None)
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS api_usage ("
+            "day TEXT NOT NULL, provider TEXT NOT NULL, used REAL NOT NULL DEFAULT 0, "
+            "calls INTEGER NOT NULL DEFAULT 0, denied INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (day, provider))"
+        )
+
+    def register(self, provider: ProviderBudget) -> None:
+        self.providers[provider.name] = provider
+
+    def _quota_limit(self, provider: ProviderBudget, priority: str) -> float:
+        if priority == SCHEDULED:
+            return provider.daily_quota * (1 - self.manual_reserve)
+        return provider.daily_quota
+
+    def _charge(self, provider: ProviderBudget, cost: float, priority: str) -> bool:
+        """Atomically add `cost` to today's usage if it stays within this priority's quota"""
+        day = provider.day()
+        limit = self._quota_limit(provider, priority)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO api_usage (day, provider) VALUES (?, ?)", (day, provider.name)
+                )
+                updated = self._conn.execute(
+                    "UPDATE api_usage SET used = used + ?, calls = calls + 1 "
+                    "WHERE day = ? AND provider = ? AND used + ? <= ?",
+                    (cost, day, provider.name, cost, limit)
+                ).rowcount
+                if not updated:
+                    self._conn.execute(
+                        "UPDATE api_usage SET denied = denied + 1 WHERE day = ? AND provider = ?",
+                        (day, provider.name)
+                    )
+                return bool(updated)
+        except sqlite3.Error as e:
+            # A broken ledger must not stop monitoring
+            logger.warning(f"⚠️ API budget ledger error, allowing {provider.name} call: {e}")
+            return True
+
+    async def acquire(self, provider_name: str, cost: float = 1, priority: Optional[str] = None,
+                      max_wait: Optional[float] = None) -> bool:
+        """
+        Reserve one call costing `cost` quota units. Waits up to `max_wait` seconds for a
+        rate token; returns False when the quota is spent or no token came in time.
+        """
+        provider = self.providers.get(provider_name)
+        if provider is None:
+            return True
+        priority = priority or _priority.get()
+        if max_wait is None:
+            max_wait = MAX_WAIT_SECONDS.get(priority, MAX_WAIT_SECONDS[MANUAL])
+        # Never reserve the last whole token, or a burst of 1 would shut scheduled calls out entirely
+        reserve = min(provider.burst * self.manual_reserve, provider.burst - 1) if priority == SCHEDULED else 0.0
+
+        waited = 0.0
+        while True:
+            delay = provider.take_token(reserve)
+            if delay == 0:
+                break
+            if waited + delay > max_wait:
+                logger.warning(f"⏳ {provider_name} rate limit: gave up after {waited:.1f}s ({priority})")
+                return False
+            await asyncio.sleep(delay)
+            waited += delay
+        provider.waited_seconds += waited
+
+        # The ledger write can wait on another worker's lock: keep it off the event loop
+        if not await asyncio.to_thread(self._charge, provider, cost, priority):
+            logger.warning(f"🪫 {provider_name} daily budget spent for {priority} calls, skipping call")
+            return False
+        return True
+
+    async def require(self, provider_name: str, cost: float = 1, priority: Optional[str] = None) -> None:
+        """``acquire`` that raises BudgetExhausted instead of returning False"""
+        if not await self.acquire(provider_name, cost, priority):
+            raise BudgetExhausted(provider_name, "daily quota or rate limit")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Today's quota burn per provider"""
+        providers = {}
+        for name, provider in self.providers.items():
+            day = provider.day()
+            row = None
+            try:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT used, calls, denied FROM api_usage WHERE day = ? AND provider = ?", (day, name)
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Could not read API budget ledger: {e}")
+            used, calls, denied = row or (0, 0, 0)
+            providers[name] = {
+                "day": day,
+                "used": used,
+                "calls": calls,
+                "denied": denied,
+                "daily_quota": provider.daily_quota,
+                "scheduled_quota": self._quota_limit(provider, SCHEDULED),
+                "remaining": max(0, provider.daily_quota - used),
+                "burn_pct": round(100 * used / provider.daily_quota, 1) if provider.daily_quota else None,
+                "rate_per_second": provider.rate,
+                "rate_wait_seconds": round(provider.waited_seconds, 1)
+            }
+        return {"manual_reserve": self.manual_reserve, "providers": providers}
+
+
+@asynccontextmanager
+async def scan_priority(priority: str):
+    """Run the block (and the agent calls inside it) under the given priority class"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class BudgetedClient:
+    """Proxy that charges the budget before the given async methods and delegates the rest"""
+
+    def __init__(self, client: Any, provider: str, methods: Iterable[str], cost: float = 1):
+        self._client = client
+        for method in methods:
+            func = getattr(client, method, None)
+            if func is not None:
+                setattr(self, method, self._wrap(func, provider, cost))
+
+    @staticmethod
+    def _wrap(func, provider: str, cost: float):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            await api_budget.require(provider, cost)
+            return await func(*args, **kwargs)
+        return wrapper
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+def budgeted_client(client: Any, provider: str, methods: Iterable[str], cost: float = 1) -> Any:
+    if client is None:
+        return None
+    return BudgetedClient(client, provider, methods, cost)
+
+
+api_budget = ApiBudget(path=settings.API_BUDGET_PATH, manual_reserve=settings.API_BUDGET_MANUAL_RESERVE)
+api_budget.register(ProviderBudget(
+    "tavily", settings.TAVILY_REQUESTS_PER_SECOND, settings.TAVILY_DAILY_CREDITS
+))
+api_budget.register(ProviderBudget(
+    "youtube", settings.YOUTUBE_REQUESTS_PER_SECOND, settings.YOUTUBE_DAILY_QUOTA_UNITS,
+    reset_timezone="America/Los_Angeles"
+))
+api_budget.register(ProviderBudget(
+    "gemini", settings.GEMINI_REQUESTS_PER_MINUTE / 60, settings.GEMINI_DAILY_REQUESTS,
+    burst=max(1.0, settings.GEMINI_REQUESTS_PER_MINUTE / 10)
+))
@@ -0,0 +1,202 @@
+"""
+Near-duplicate clustering for monitoring content
+One announcement syndicated across dozens of sites used to come back as dozens of
+items (the agents only de-duplicated by exact URL), each with its own monitoring_data
+row, LLM analysis and alert. Items are now fingerprinted with MinHash over word
+shingles of the normalized title + text and looked up through LSH bands in an index of
+recent signatures per competitor, shared by the Browser, Twitter and Instagram agents.
+
+- Copies within one batch collapse into the first (highest ranked) item, which keeps
+  every copy's URL in item["cluster"]["members"]
+- Copies of something another agent or an earlier scan already picked up within
+  NEAR_DUPLICATE_WINDOW_HOURS are dropped and recorded as members of that cluster.
+  The same URL coming back is left alone so content-change detection still sees it.
+"""
+
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 Jaccard almost always share a band
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 3
+MAX_TOKENS = 2000
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(1729)  # Fixed seed: signatures must be comparable across processes
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercased word tokens without URLs and punctuation"""
+    text = _URL.sub(" ", (text or "").lower())
+    return _NON_WORD.sub(" ", text).split()[:MAX_TOKENS]
+
+
+def minhash_signature(text: str) -> Optional[Tuple[int, ...]]:
+    tokens = normalize_text(text)
+    if not tokens:
+        return None
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimated_similarity(left: Tuple[int, ...], right: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the two shingle sets"""
+    return sum(x == y for x, y in zip(left, right)) / NUM_PERMUTATIONS
+
+
+def _bands(signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+    return [(band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]) for band in range(BANDS)]
+
+
+def content_text(item: Dict[str, Any]) -> str:
+    return f"{item.get('title', '')}\n{item.get('content', '')}"
+
+
+class _Entry:
+    __slots__ = ("signature", "url", "cluster", "created_at", "member_urls")
+
+    def __init__(self, signature: Tuple[int, ...], url: str, cluster: Dict[str, Any], created_at: float):
+        self.signature = signature
+        self.url = url
+        self.cluster = cluster
+        self.created_at = created_at
+        self.member_urls = {url}
+
+
+class NearDuplicateIndex:
+    """Recent MinHash signatures per competitor with LSH lookup"""
+
+    def __init__(self, window_seconds: float = 48 * 3600, max_per_competitor: int = 1000, threshold: float = 0.6):
+        self.window_seconds = window_seconds
+        self.max_per_competitor = max_per_competitor
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[_Entry]] = {}
+        self._buckets: Dict[str, Dict[Tuple[int, Tuple[int, ...]], List[_Entry]]] = {}
+
+    def _prune(self, competitor_id: str, now: float) -> None:
+        entries = self._entries.get(competitor_id, [])
+        kept = [entry for entry in entries if now - entry.created_at < self.window_seconds][-self.max_per_competitor:]
+        if len(kept) == len(entries):
+            return
+        self._entries[competitor_id] = kept
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[_Entry]] = {}
+        for entry in kept:
+            for band in _bands(entry.signature):
+                buckets.setdefault(band, []).append(entry)
+        self._buckets[competitor_id] = buckets
+
+    def _find(self, competitor_id: str, signature: Tuple[int, ...]) -> Optional[_Entry]:
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for band in _bands(signature):
+            for entry in self._buckets.get(competitor_id, {}).get(band, ()):
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+                similarity = estimated_similarity(signature, entry.signature)
+                if similarity >= best_similarity:
+                    best, best_similarity = entry, similarity
+        return best
+
+    def _add(self, competitor_id: str, entry: _Entry) -> None:
+        self._entries.setdefault(competitor_id, []).append(entry)
+        buckets = self._buckets.setdefault(competitor_id, {})
+        for band in _bands(entry.signature):
+            buckets.setdefault(band, []).append(entry)
+
+    def collapse(self, competitor_id: str, platform: str, items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """
+        One representative per cluster of near-identical items (input order is kept, so
+        rank the items first). Representatives get item["cluster"] with every member URL.
+        """
+        competitor_id = str(competitor_id)
+        now = time.time()
+        representatives: List[Dict[str, Any]] = []
+        stats = {"input": len(items), "clusters": 0, "collapsed": 0, "already_seen": 0}
+        batch_clusters = set()
+
+        with self._lock:
+            self._prune(competitor_id, now)
+            for item in items:
+                signature = minhash_signature(content_text(item))
+                url = item.get("url", "")
+                member = {"url": url, "source": item.get("source", ""), "platform": platform}
+                if signature is None:
+                    representatives.append(item)
+                    continue
+
+                match = self._find(competitor_id, signature)
+                if match is not None and match.url == url:
+                    # Same page again: pass it through (change detection happens downstream)
+                    match.created_at = now
+                    item["cluster"] = match.cluster
+                    batch_clusters.add(id(match.cluster))
+                    representatives.append(item)
+                    continue
+                if match is not None:
+                    # A known copy coming back in a later scan is not added again
+                    if url not in match.member_urls:
+                        match.member_urls.add(url)
+                        match.cluster["members"].append(member)
+                    if id(match.cluster) in batch_clusters:
+                        stats["collapsed"] += 1
+                    else:
+                        stats["already_seen"] += 1
+                    continue
+
+                cluster = {"id": hashlib.md5(f"{competitor_id}:{url}".encode()).hexdigest(), "members": [member]}
+                item["cluster"] = cluster
+                batch_clusters.add(id(cluster))
+                self._add(competitor_id, _Entry(signature, url, cluster, now))
+                representatives.append(item)
+
+        stats["clusters"] = len(batch_clusters)
+        if stats["collapsed"] or stats["already_seen"]:
+            logger.info(
+                f"🧬 {platform}: {len(items)} items -> {len(representatives)} "
+                f"({stats['collapsed']} syndicated copies, {stats['already_seen']} already covered)"
+            )
+        return representatives, stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+
+def cluster_urls(item: Dict[str, Any]) -> List[str]:
+    """URLs of every copy in the item's cluster, the item's own first"""
+    members = (item.get("cluster") or {}).get("members") or []
+    return [member["url"] for member in members if member.get("url")]
+
+
+near_duplicate_index = NearDuplicateIndex(
+    window_seconds=settings.NEAR_DUPLICATE_WINDOW_HOURS * 3600,
+    max_per_competitor=settings.NEAR_DUPLICATE_MAX_PER_COMPETITOR,
+    threshold=settings.NEAR_DUPLICATE_THRESHOLD
+)
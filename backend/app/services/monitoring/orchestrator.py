@@ -4,6 +4,7 @@ Runs platform-specific agents one by one instead of complex multi-agent system
 """
 
 import logging
+import time
 from typing import Dict, List, Any
 import hashlib
 from datetime import datetime, timezone
@@ -14,6 +15,9 @@ from app.services.monitoring.agents.sub_agents.browser_agent import BrowserAgent
 from app.services.monitoring.agents.sub_agents.instagram_agent import InstagramAgent
 from app.services.monitoring.agents.sub_agents.twitter_agent import TwitterAgent
 from app.services.monitoring.supabase_client import supabase_client
+from app.services.monitoring.alert_pipeline import alert_batch, resolve_alert_user_id, submit_alert
+from app.services.monitoring.scan_policy import DEFAULT_PLATFORMS, scan_policy
+from app.services.monitoring.scan_ledger import DONE, FAILED, FETCHED, current_run, scan_ledger
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +25,9 @@ logger = logging.getLogger(__name__)
 class SimpleMonitoringService:
     """Simple sequential monitoring service that runs agents one by one"""
     
+    # Concurrent monitoring_data updates while processing one platform result
+    UPDATE_CONCURRENCY = 8
+    
     def __init__(self):
         logger.info("🤖 SimpleMonitoringService initializing...")
         
@@ -66,6 +73,11 @@ class SimpleMonitoringService:
     
     async def run_monitoring_for_competitor(self, competitor_id: str, competitor_name: str = None, platforms: List[str] = None) -> Dict[str, Any]:
         """Run monitoring for a specific competitor using the three core agents (youtube, browser, website)"""
+        # Alerts raised during the scan are buffered, deduplicated and inserted in bulk on exit
+        async with alert_batch() as batch:
+            return await self._run_monitoring_for_competitor(competitor_id, competitor_name, platforms, batch)
+    
+    async def _run_monitoring_for_competitor(self, competitor_id: str, competitor_name: str, platforms: List[str], batch) -> Dict[str, Any]:
         try:
             logger.info(f"🚀 Starting sequential monitoring for competitor {competitor_id}")
             
@@ -80,6 +92,9 @@ class SimpleMonitoringService:
                     "error": "Competitor not found in database"
                 }
             
+            # The alert pipeline reuses this row instead of looking the owner up per alert
+            batch.remember_competitor(competitor_details)
+            
             # Use competitor details from database
             competitor_name = competitor_details.get('name', competitor_name)
             website_url = competitor_details.get('website_url')
@@ -105,11 +120,20 @@ class SimpleMonitoringService:
             
             # Use provided platforms or default to all three core agents
             if platforms is None:
-                platforms = ["youtube", "browser", "website"]
+                platforms = list(DEFAULT_PLATFORMS)
                 logger.info(f"🎯 Using default core monitoring platforms: {platforms}")
             else:
                 logger.info(f"🎯 Using specified monitoring platforms: {platforms}")
             
+            # Inside a resumed scan run, platforms finished before the restart are not rescanned
+            run = current_run()
+            if run is not None:
+                finished = [platform for platform in platforms if run.status(competitor_id, platform) == DONE]
+                if finished:
+                    logger.info(f"⏭️ Already done in scan run {run.run_id}: {finished}")
+                    platforms = [platform for platform in platforms if platform not in finished]
+            scan_policy.mark_started(competitor_id, [platform for platform in platforms if self.agents.get(platform)])
+            
             results = {}
             errors = []
             monitoring_data_count = 0
@@ -121,8 +145,12 @@ class SimpleMonitoringService:
                         logger.info(f"🔍 Running {platform} agent for competitor {competitor_name}")
                         agent = self.agents[platform]
                         
+                        # A result checkpointed before a restart is processed again instead of refetched
+                        result = run.fetched_result(competitor_id, platform) if run is not None else None
+                        if result is not None:
+                            logger.info(f"♻️ Reusing checkpointed {platform} result for {competitor_name}")
                         # Prepare platform-specific parameters
-                        if platform == 'youtube':
+                        elif platform == 'youtube':
                             # Get YouTube handle from social media handles, handle null case
                             youtube_handle = None
                             if social_media_handles and isinstance(social_media_handles, dict):
@@ -139,8 +167,22 @@ class SimpleMonitoringService:
                         
                         # Process and save monitoring data
                         if result and result.get('status') == 'completed':
-                            platform_data_count = await self._process_agent_results(competitor_id, platform, result)
-                            monitoring_data_count += platform_data_count
+                            if run is not None:
+                                run.mark(competitor_id, platform, FETCHED, result)
+                            processing = await self._process_agent_results(competitor_id, platform, result)
+                            monitoring_data_count += processing["saved"]
+                            result['processing'] = processing
+                            schedule = scan_policy.record_scan(
+                                competitor_details, platform, processing["saved"], processing["updated"]
+                            )
+                            if run is not None:
+                                run.mark(competitor_id, platform, DONE)
+                        else:
+                            schedule = scan_policy.record_scan(competitor_details, platform, failed=True)
+                            if run is not None:
+                                run.mark(competitor_id, platform, FAILED)
+                        if result is not None:
+                            result['next_scan'] = schedule.to_dict()
                         
                         results[platform] = result
                         logger.info(f"✅ {platform} agent completed for competitor {competitor_name}")
@@ -151,6 +193,9 @@ class SimpleMonitoringService:
                         logger.error(f"   🔍 Error type: {type(e).__name__}")
                         logger.error(f"   📍 Platform: {platform}, Competitor: {competitor_name}")
                         errors.append(error_msg)
+                        scan_policy.record_scan(competitor_details, platform, failed=True)
+                        if run is not None:
+                            run.mark(competitor_id, platform, FAILED)
                         results[platform] = {
                             "error": str(e),
                             "error_type": type(e).__name__,
@@ -246,13 +291,32 @@ class SimpleMonitoringService:
     
     async def run_monitoring_for_all_active_competitors(self, user_id: str) -> Dict[str, Any]:
         """Run monitoring for all active competitors of a user"""
+        run = None
         try:
             logger.info(f"🚀 Starting monitoring for all active competitors of user {user_id}")
             
+            # Progress is checkpointed per competitor and platform; a run interrupted by a
+            # restart is resumed here instead of starting over
+            run = scan_ledger.start_run("user", str(user_id))
+            if run.already_running:
+                return {
+                    "user_id": user_id,
+                    "status": "skipped",
+                    "scan_run_id": run.run_id,
+                    "message": "A scan of all competitors is already running for this user"
+                }
+            
             # Get all active competitors for the user
             competitors = await supabase_client.get_competitors_due_for_scan()
-            
-            if not competitors:
+            run.add_competitors({
+                str(competitor['id']): competitor.get('due_platforms') or list(DEFAULT_PLATFORMS)
+                for competitor in competitors
+            })
+            # Due competitors plus whatever an interrupted run left unfinished
+            plan = run.pending()
+            
+            if not plan:
+                run.finish()
                 logger.info(f"ℹ️ No active competitors found for user {user_id}")
                 return {
                     "user_id": user_id,
@@ -264,21 +328,22 @@ class SimpleMonitoringService:
                     "message": "No active competitors to scan"
                 }
             
-            logger.info(f"📊 Found {len(competitors)} active competitors for user {user_id}")
+            logger.info(f"📊 Found {len(plan)} active competitors for user {user_id}")
             
+            names = {str(competitor['id']): competitor.get('name') for competitor in competitors}
             results = {}
             successful_scans = 0
             failed_scans = 0
             
             # Run monitoring for each competitor
-            for competitor in competitors:
-                competitor_id = competitor['id']
-                competitor_name = competitor.get('name', f'Competitor_{competitor_id}')
+            for competitor_id, platforms in plan.items():
+                competitor_name = names.get(competitor_id) or f'Competitor_{competitor_id}'
                 
                 try:
                     logger.info(f"🔍 Running monitoring for competitor {competitor_name} (ID: {competitor_id})")
                     
-                    result = await self.run_monitoring_for_competitor(competitor_id, competitor_name)
+                    with run.active():
+                        result = await self.run_monitoring_for_competitor(competitor_id, competitor_name, platforms)
                     results[competitor_id] = result
                     
                     if result.get('status') == 'completed':
@@ -297,17 +362,20 @@ class SimpleMonitoringService:
                         "error": error_msg
                     }
             
+            run.finish()
             logger.info(f"✅ Monitoring completed for all competitors of user {user_id}")
             
             return {
                 "user_id": user_id,
                 "status": "completed",
-                "total_competitors": len(competitors),
-                "competitors_scanned": len(competitors),
+                "scan_run_id": run.run_id,
+                "resumed": run.resumed,
+                "total_competitors": len(plan),
+                "competitors_scanned": len(plan),
                 "successful_scans": successful_scans,
                 "failed_scans": failed_scans,
                 "competitor_results": results,
-                "message": f"Monitoring completed for {len(competitors)} competitors"
+                "message": f"Monitoring completed for {len(plan)} competitors"
             }
             
         except Exception as e:
@@ -317,101 +385,147 @@ class SimpleMonitoringService:
                 "status": "failed",
                 "error": str(e)
             }
+        finally:
+            # An unfinished run stays resumable
+            if run is not None:
+                run.release()
     
-    async def _process_agent_results(self, competitor_id: str, platform: str, result: Dict[str, Any]) -> int:
-        """Process and save agent results to database"""
+    async def _process_agent_results(self, competitor_id: str, platform: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process and save agent results to database
+        
+        Pipelined: all posts are classified against existing rows with one batched
+        lookup, new posts are inserted in one request, changed posts are updated with
+        bounded concurrency and alerts go to the scan's alert batch. Returns counts
+        and per-stage timings (ms).
+        """
+        stats = {"saved": 0, "updated": 0, "unchanged": 0, "failed": 0, "timings_ms": {}}
+        timings = stats["timings_ms"]
+        
+        def stage_done(stage: str, started: float) -> float:
+            now = time.perf_counter()
+            timings[stage] = round((now - started) * 1000, 1)
+            return now
+        
         try:
-            data_count = 0
-            
             # Extract posts/data from agent result
             posts = result.get('posts', [])
             if not posts:
                 logger.info(f"   ℹ️ No posts found for {platform}")
-                return 0
+                return stats
             
             # Check if posts are already processed (have 'id' field)
             if posts and 'id' in posts[0]:
                 logger.info(f"   ℹ️ Posts for {platform} are already processed and saved")
-                return len(posts)  # Return count of already processed posts
-            
-            for post in posts:
+                # The agent re-inserts posts seen on earlier scans: only genuinely new or
+                # changed ones count, otherwise the scan policy never sees a quiet competitor
                 try:
-                    # Generate content hash
-                    content_text = post.get('content_text', '')
-                    content_hash = hashlib.md5(content_text.encode()).hexdigest()
-                    
-                    # Check if post already exists
-                    existing_post = await supabase_client.check_existing_post(
-                        competitor_id, platform, post.get('post_id', '')
+                    counts = await supabase_client.classify_saved_posts(
+                        competitor_id, platform, [post['id'] for post in posts]
                     )
-                    
-                    if existing_post:
-                        # Check if content has changed
-                        if existing_post.get('content_hash') != content_hash:
-                            logger.info(f"   ✏️ Content change detected for {platform} post")
-                            
-                            # Update existing post
-                            updated_data = {
-                                'content_hash': content_hash,
-                                'content_text': content_text,
-                                'is_content_change': True,
-                                'previous_content_hash': existing_post.get('content_hash'),
-                                'updated_at': datetime.now(timezone.utc).isoformat()
-                            }
-                            
-                            await supabase_client.update_post_content(existing_post['id'], updated_data)
-                            
-                            # Create content change alert
-                            await self._create_content_change_alert(competitor_id, platform, post)
-                        else:
-                            logger.info(f"   ✅ No changes detected for {platform} post")
-                    else:
-                        # New post - save to database
-                        monitoring_data = {
-                            'competitor_id': str(competitor_id),
-                            'platform': platform,
-                            'post_id': post.get('post_id'),
-                            'post_url': post.get('post_url'),
-                            'content_text': content_text,
-                            'content_hash': content_hash,
-                            'media_urls': post.get('media_urls', []),
-                            'engagement_metrics': post.get('engagement_metrics', {}),
-                            'author_username': post.get('author_username'),
-                            'author_display_name': post.get('author_display_name'),
-                            'author_avatar_url': post.get('author_avatar_url'),
-                            'post_type': post.get('post_type', 'post'),
-                            'language': post.get('language', 'en'),
-                            'sentiment_score': post.get('sentiment_score', 0.0),
-                            'detected_at': datetime.now(timezone.utc).isoformat(),
-                            'posted_at': post.get('posted_at'),
-                            'is_new_post': True,
-                            'is_content_change': False
-                        }
-                        
-                        data_id = await supabase_client.save_monitoring_data(monitoring_data)
-                        if data_id:
-                            data_count += 1
-                            
-                            # Create new post alert
-                            await self._create_new_post_alert(competitor_id, platform, post, data_id)
-                            
                 except Exception as e:
-                    logger.error(f"   ❌ Error processing {platform} post: {e}")
-                    continue
+                    logger.warning(f"   ⚠️ Could not classify saved {platform} posts, counting all as new: {e}")
+                    counts = {"new": len(posts), "changed": 0, "unchanged": 0}
+                stats["saved"] = counts["new"]
+                stats["updated"] = counts["changed"]
+                stats["unchanged"] = counts["unchanged"]
+                return stats
+            
+            started = time.perf_counter()
+            
+            # Stage 1: classify every post against existing rows in one batched lookup
+            hashed = []
+            seen_post_ids = set()
+            for post in posts:
+                post_id = post.get('post_id') or ''
+                if post_id and post_id in seen_post_ids:
+                    continue  # Same post returned twice in one result
+                seen_post_ids.add(post_id)
+                content_text = post.get('content_text', '') or ''
+                hashed.append((post, content_text, hashlib.md5(content_text.encode()).hexdigest()))
+            
+            existing_posts = await supabase_client.get_existing_posts(
+                competitor_id, platform, [post.get('post_id') for post, _, _ in hashed]
+            )
+            
+            new_posts = []
+            changed_posts = []
+            for post, content_text, content_hash in hashed:
+                existing_post = existing_posts.get(post.get('post_id'))
+                if existing_post is None:
+                    new_posts.append((post, content_text, content_hash))
+                elif existing_post.get('content_hash') != content_hash:
+                    changed_posts.append((post, content_text, content_hash, existing_post))
+                else:
+                    stats["unchanged"] += 1
+            started = stage_done("classify", started)
             
-            logger.info(f"   📊 Processed {data_count} new posts for {platform}")
-            return data_count
+            # Stage 2: insert all new posts in one request
+            now = datetime.now(timezone.utc).isoformat()
+            rows = [{
+                'competitor_id': str(competitor_id),
+                'platform': platform,
+                'post_id': post.get('post_id'),
+                'post_url': post.get('post_url'),
+                'content_text': content_text,
+                'content_hash': content_hash,
+                'media_urls': post.get('media_urls', []),
+                'engagement_metrics': post.get('engagement_metrics', {}),
+                'author_username': post.get('author_username'),
+                'author_display_name': post.get('author_display_name'),
+                'author_avatar_url': post.get('author_avatar_url'),
+                'post_type': post.get('post_type', 'post'),
+                'language': post.get('language', 'en'),
+                'sentiment_score': post.get('sentiment_score', 0.0),
+                'detected_at': now,
+                'posted_at': post.get('posted_at'),
+                'is_new_post': True,
+                'is_content_change': False
+            } for post, content_text, content_hash in new_posts]
+            saved_rows = await supabase_client.save_monitoring_data_batch(rows, self.UPDATE_CONCURRENCY)
+            stats["saved"] = len(saved_rows)
+            stats["failed"] += len(rows) - len(saved_rows)
+            started = stage_done("insert", started)
+            
+            # Stage 3: update changed posts (bounded concurrency)
+            updates = [(existing_post['id'], {
+                'content_hash': content_hash,
+                'content_text': content_text,
+                'is_content_change': True,
+                'previous_content_hash': existing_post.get('content_hash'),
+                'updated_at': now
+            }) for _, content_text, content_hash, existing_post in changed_posts]
+            if updates:
+                logger.info(f"   ✏️ Content change detected for {len(updates)} {platform} posts")
+            stats["updated"] = await supabase_client.update_posts_content(updates, self.UPDATE_CONCURRENCY)
+            stats["failed"] += len(updates) - stats["updated"]
+            started = stage_done("update", started)
+            
+            # Stage 4: alerts (buffered by the scan's alert batch, inserted in bulk)
+            saved_ids = {row.get('post_id'): row.get('id') for row in saved_rows}
+            for post, _, _ in new_posts:
+                data_id = saved_ids.get(post.get('post_id'))
+                if data_id:
+                    await self._create_new_post_alert(competitor_id, platform, post, data_id)
+            for post, _, _, _ in changed_posts:
+                await self._create_content_change_alert(competitor_id, platform, post)
+            stage_done("alerts", started)
+            
+            logger.info(
+                f"   📊 {platform}: {stats['saved']} new, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged posts; stage timings (ms): {timings}"
+            )
+            return stats
             
         except Exception as e:
             logger.error(f"❌ Error processing agent results for {platform}: {e}")
-            return 0
+            return stats
     
     async def _create_new_post_alert(self, competitor_id: str, platform: str, post: Dict[str, Any], data_id: str):
         """Create alert for new post"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -430,8 +544,8 @@ class SimpleMonitoringService:
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            await supabase_client.create_alert(alert_data)
-            logger.info(f"   🚨 Created new post alert for {platform}")
+            await submit_alert(alert_data)
+            logger.info(f"   🚨 Queued new post alert for {platform}")
             
         except Exception as e:
             logger.error(f"   ❌ Error creating new post alert: {e}")
@@ -439,9 +553,8 @@ class SimpleMonitoringService:
     async def _create_content_change_alert(self, competitor_id: str, platform: str, post: Dict[str, Any]):
         """Create alert for content change"""
         try:
-            # Get competitor details to get user_id
-            competitor_details = await supabase_client.get_competitor_details(competitor_id)
-            user_id = competitor_details.get('user_id') if competitor_details else None
+            # Owner is resolved once per scan by the alert pipeline
+            user_id = await resolve_alert_user_id(competitor_id)
             
             alert_data = {
                 'user_id': user_id,
@@ -460,8 +573,8 @@ class SimpleMonitoringService:
                 'created_at': datetime.now(timezone.utc).isoformat()
             }
             
-            await supabase_client.create_alert(alert_data)
-            logger.info(f"   🚨 Created content change alert for {platform}")
+            await submit_alert(alert_data)
+            logger.info(f"   🚨 Queued content change alert for {platform}")
             
         except Exception as e:
             logger.error(f"   ❌ Error creating content change alert: {e}")
@@ -0,0 +1,325 @@
+"""
+Crash-safe ledger for multi-competitor scan runs
+The daily sweep and "scan all competitors" used to keep their progress in memory, so a
+deploy or crash halfway through lost it and the next run started over, re-spending
+search and LLM budget on competitors that were already done. A run now records one
+row per competitor and platform in SQLite (SCAN_LEDGER_PATH):
+
+    pending -> fetched (agent finished; its result is stored as the cursor) -> done
+                                                                            -> failed
+
+Starting a run of the same kind and scope while an earlier one is unfinished resumes
+it: done platforms are skipped, fetched ones are re-processed from the stored result
+without calling the agent again, and failed ones are retried up to MAX_ATTEMPTS times.
+A run whose owning process is gone (or that has not been touched for
+SCAN_LEDGER_STALE_MINUTES) counts as interrupted; the scheduler resumes those on start.
+A run that is still executing, in this process or another one, is never resumed: the
+second caller gets `already_running` and skips. The file lives under STATE_DIR, which
+has to be a persistent disk for runs to survive a deploy.
+
+    run = scan_ledger.start_run("daily", "all")
+    if run.already_running:
+        return
+    try:
+        run.add_competitors({competitor_id: ["youtube", "browser"]})
+        with run.active():
+            await service.run_monitoring_for_competitor(competitor_id, platforms=...)
+        run.finish()
+    finally:
+        run.release()
+"""
+
+import contextvars
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.state_db import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+FETCHED = "fetched"
+DONE = "done"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 3
+# Unfinished runs older than this are abandoned instead of resumed
+RESUME_WINDOW_HOURS = 24
+KEEP_RUNS_DAYS = 7
+
+_current_run: contextvars.ContextVar[Optional["ScanRun"]] = contextvars.ContextVar("scan_run", default=None)
+
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def _owner_alive(owner: str) -> bool:
+    """Whether the process that owns a run is still running (only knowable on this host)"""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def current_run() -> Optional["ScanRun"]:
+    """The scan run the current task is working for, if any"""
+    return _current_run.get()
+
+
+class ScanRun:
+    def __init__(self, ledger: "ScanLedger", run_id: str, kind: str, scope: str, resumed: bool = False,
+                 already_running: bool = False):
+        self.ledger = ledger
+        self.run_id = run_id
+        self.kind = kind
+        self.scope = scope
+        self.resumed = resumed
+        self.already_running = already_running
+
+    def add_competitors(self, plan: Dict[str, List[str]]) -> None:
+        """Register the platforms to scan per competitor (already known items are kept)"""
+        self.ledger._add_items(self.run_id, plan)
+
+    def pending(self) -> Dict[str, List[str]]:
+        """Competitor -> platforms still to do, in the order they were added"""
+        return self.ledger._pending(self.run_id)
+
+    def status(self, competitor_id: str, platform: str) -> Optional[str]:
+        return self.ledger._item(self.run_id, competitor_id, platform)[0]
+
+    def fetched_result(self, competitor_id: str, platform: str) -> Optional[Dict[str, Any]]:
+        status, cursor = self.ledger._item(self.run_id, competitor_id, platform)
+        if status == FETCHED and cursor:
+            return json.loads(cursor)
+        return None
+
+    def mark(self, competitor_id: str, platform: str, status: str, cursor: Optional[Dict[str, Any]] = None) -> None:
+        self.ledger._mark(self.run_id, competitor_id, platform, status, cursor)
+
+    def finish(self) -> Dict[str, int]:
+        return self.ledger._finish(self.run_id)
+
+    def release(self) -> None:
+        """Stop executing the run in this process; unless finished it can be resumed later"""
+        if not self.already_running:
+            self.ledger._executing.discard(self.run_id)
+
+    @contextmanager
+    def active(self):
+        """Make this run the current one for the block and the tasks created inside it"""
+        token = _current_run.set(self)
+        try:
+            yield self
+        finally:
+            _current_run.reset(token)
+
+
+class ScanLedger:
+    def __init__(self, path: str = "", stale_minutes: float = 30):
+        self.stale_seconds = stale_minutes * 60
+        self._lock = threading.Lock()
+        # Runs this process is executing right now (a same-owner row is not proof of that:
+        # container PIDs repeat across restarts)
+        self._executing = set()
+        self._conn = connect_state_db(path, "Scan ledger", self._create_tables)
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scan_runs ("
+            "run_id TEXT PRIMARY KEY, kind TEXT NOT NULL, scope TEXT NOT NULL, status TEXT NOT NULL, "
+            "owner TEXT NOT NULL, started_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scan_items ("
+            "run_id TEXT NOT NULL, seq INTEGER NOT NULL, competitor_id TEXT NOT NULL, platform TEXT NOT NULL, "
+            "status TEXT NOT NULL, cursor TEXT, attempts INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (run_id, competitor_id, platform))"
+        )
+        conn.commit()
+
+    def _running(self, run_id: str, owner: str, updated_at: float, now: float) -> bool:
+        """Whether an unfinished run is still being executed by some process"""
+        if now - updated_at > self.stale_seconds:
+            return False
+        if owner == _OWNER:
+            return run_id in self._executing
+        return _owner_alive(owner)
+
+    def start_run(self, kind: str, scope: str) -> ScanRun:
+        """New run, or the unfinished run of the same kind and scope (resumed by this process)"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM scan_items WHERE run_id IN (SELECT run_id FROM scan_runs WHERE started_at < ?)",
+                (now - KEEP_RUNS_DAYS * 86400,)
+            )
+            self._conn.execute("DELETE FROM scan_runs WHERE started_at < ?", (now - KEEP_RUNS_DAYS * 86400,))
+            row = self._conn.execute(
+                "SELECT run_id, owner, started_at, updated_at FROM scan_runs "
+                "WHERE kind = ? AND scope = ? AND status = 'running' ORDER BY started_at DESC LIMIT 1",
+                (kind, scope)
+            ).fetchone()
+
+            if row is not None:
+                run_id, owner, started_at, updated_at = row
+                if self._running(run_id, owner, updated_at, now):
+                    self._conn.commit()
+                    logger.info(f"⏭️ {kind} scan run for {scope} is already in progress ({owner})")
+                    return ScanRun(self, run_id, kind, scope, already_running=True)
+                if now - started_at < RESUME_WINDOW_HOURS * 3600:
+                    self._conn.execute(
+                        "UPDATE scan_runs SET owner = ?, updated_at = ? WHERE run_id = ?", (_OWNER, now, run_id)
+                    )
+                    self._conn.commit()
+                    self._executing.add(run_id)
+                    logger.info(f"♻️ Resuming {kind} scan run {run_id} for {scope}")
+                    return ScanRun(self, run_id, kind, scope, resumed=True)
+                self._conn.execute("UPDATE scan_runs SET status = 'abandoned' WHERE run_id = ?", (run_id,))
+
+            run_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO scan_runs (run_id, kind, scope, status, owner, started_at, updated_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?, ?)",
+                (run_id, kind, scope, _OWNER, now, now)
+            )
+            self._conn.commit()
+            self._executing.add(run_id)
+        return ScanRun(self, run_id, kind, scope)
+
+    def _add_items(self, run_id: str, plan: Dict[str, List[str]]) -> None:
+        now = time.time()
+        with self._lock:
+            seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM scan_items WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            for competitor_id, platforms in plan.items():
+                for platform in platforms:
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO scan_items (run_id, seq, competitor_id, platform, status, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (run_id, seq, str(competitor_id), platform, PENDING, now)
+                    )
+                seq += 1
+            self._conn.execute("UPDATE scan_runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+            self._conn.commit()
+
+    def _pending(self, run_id: str) -> Dict[str, List[str]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT competitor_id, platform FROM scan_items WHERE run_id = ? "
+                "AND (status IN (?, ?) OR (status = ? AND attempts < ?)) ORDER BY seq, platform",
+                (run_id, PENDING, FETCHED, FAILED, MAX_ATTEMPTS)
+            ).fetchall()
+        pending: Dict[str, List[str]] = {}
+        for competitor_id, platform in rows:
+            pending.setdefault(competitor_id, []).append(platform)
+        return pending
+
+    def _item(self, run_id: str, competitor_id: str, platform: str) -> tuple:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, cursor FROM scan_items WHERE run_id = ? AND competitor_id = ? AND platform = ?",
+                (run_id, str(competitor_id), platform)
+            ).fetchone()
+        return row or (None, None)
+
+    def _mark(self, run_id: str, competitor_id: str, platform: str, status: str,
+              cursor: Optional[Dict[str, Any]]) -> None:
+        now = time.time()
+        payload = json.dumps(cursor, default=str) if cursor is not None else None
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO scan_items (run_id, seq, competitor_id, platform, status, updated_at) "
+                    "VALUES (?, (SELECT COALESCE(MAX(seq), -1) + 1 FROM scan_items WHERE run_id = ?), ?, ?, ?, ?)",
+                    (run_id, run_id, str(competitor_id), platform, PENDING, now)
+                )
+                self._conn.execute(
+                    "UPDATE scan_items SET status = ?, cursor = ?, updated_at = ?, "
+                    "attempts = attempts + ? WHERE run_id = ? AND competitor_id = ? AND platform = ?",
+                    (status, payload, now, 1 if status == FAILED else 0, run_id, str(competitor_id), platform)
+                )
+                self._conn.execute("UPDATE scan_runs SET updated_at = ? WHERE run_id = ?", (now, run_id))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not checkpoint {platform} for competitor {competitor_id}: {e}")
+
+    def _finish(self, run_id: str) -> Dict[str, int]:
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM scan_items WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall())
+            # Drop the stored agent results; only statuses are kept for the status page
+            self._conn.execute("UPDATE scan_items SET cursor = NULL WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "UPDATE scan_runs SET status = 'completed', updated_at = ?, finished_at = ? WHERE run_id = ?",
+                (now, now, run_id)
+            )
+            self._conn.commit()
+            self._executing.discard(run_id)
+        logger.info(f"🏁 Scan run {run_id} finished: {counts}")
+        return counts
+
+    def interrupted_runs(self) -> List[Dict[str, Any]]:
+        """Unfinished runs whose owner is gone or that stopped making progress"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, kind, scope, owner, started_at, updated_at FROM scan_runs "
+                "WHERE status = 'running' AND started_at > ?",
+                (now - RESUME_WINDOW_HOURS * 3600,)
+            ).fetchall()
+        return [
+            {"run_id": run_id, "kind": kind, "scope": scope, "started_at": _iso(started_at)}
+            for run_id, kind, scope, owner, started_at, updated_at in rows
+            if not self._running(run_id, owner, updated_at, now)
+        ]
+
+    def snapshot(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            runs = self._conn.execute(
+                "SELECT run_id, kind, scope, status, owner, started_at, updated_at, finished_at FROM scan_runs "
+                "ORDER BY started_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+            snapshot = []
+            for run_id, kind, scope, status, owner, started_at, updated_at, finished_at in runs:
+                counts = dict(self._conn.execute(
+                    "SELECT status, COUNT(*) FROM scan_items WHERE run_id = ? GROUP BY status", (run_id,)
+                ).fetchall())
+                snapshot.append({
+                    "run_id": run_id,
+                    "kind": kind,
+                    "scope": scope,
+                    "status": status,
+                    "owner": owner,
+                    "started_at": _iso(started_at),
+                    "updated_at": _iso(updated_at),
+                    "finished_at": _iso(finished_at),
+                    "items": counts
+                })
+        return snapshot
+
+
+scan_ledger = ScanLedger(path=settings.SCAN_LEDGER_PATH, stale_minutes=settings.SCAN_LEDGER_STALE_MINUTES)
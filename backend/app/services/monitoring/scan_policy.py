@@ -0,0 +1,286 @@
+"""
+Adaptive scan scheduling
+Every competitor used to be rescanned on its fixed scan_frequency_minutes on every
+platform, so quiet competitors burned agent, search and LLM budget while busy ones
+waited a full day. The policy keeps, per competitor and platform, an exponentially
+weighted estimate of how many new or changed posts appear per hour and schedules the
+next scan of that platform so that about one change is expected by then, clamped to
+bounds around the user's scan_frequency_minutes:
+
+    min interval: competitor["min_scan_frequency_minutes"] or scan_frequency / ADAPTIVE_SCAN_MAX_SPEEDUP (>= 15 min)
+    max interval: competitor["max_scan_frequency_minutes"] or scan_frequency * ADAPTIVE_SCAN_MAX_SLOWDOWN (<= 7 days)
+
+Only the platforms whose next scan time has passed are scanned. State lives in a small
+SQLite file (SCAN_POLICY_PATH, under the persistent STATE_DIR) so schedules survive
+restarts and deploys and every worker reads and updates the same rows; platforms without history fall back to the competitor's
+last_scan_at + scan_frequency_minutes.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.state_db import connect_state_db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLATFORMS = ["youtube", "browser", "website"]
+
+MIN_INTERVAL_MINUTES = 15
+MAX_INTERVAL_MINUTES = 7 * 24 * 60
+EWMA_ALPHA = 0.3
+TARGET_CHANGES_PER_SCAN = 1.0
+# A started scan holds its platform for this long; if it never reports back it is retried
+IN_FLIGHT_GRACE_MINUTES = 60
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value.timestamp()
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def _format_minutes(minutes: float) -> str:
+    return f"{minutes / 60:.1f}h" if minutes >= 60 else f"{minutes:.0f}m"
+
+
+class PlatformSchedule:
+    __slots__ = (
+        "competitor_id", "platform", "rate_per_hour", "scans", "quiet_streak",
+        "interval_minutes", "reason", "last_completed_at", "next_scan_at"
+    )
+
+    def __init__(self, competitor_id: str, platform: str, **fields):
+        self.competitor_id = competitor_id
+        self.platform = platform
+        self.rate_per_hour: Optional[float] = fields.get("rate_per_hour")
+        self.scans: int = fields.get("scans") or 0
+        self.quiet_streak: int = fields.get("quiet_streak") or 0
+        self.interval_minutes: Optional[float] = fields.get("interval_minutes")
+        self.reason: str = fields.get("reason") or ""
+        self.last_completed_at: Optional[float] = fields.get("last_completed_at")
+        self.next_scan_at: Optional[float] = fields.get("next_scan_at")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "competitor_id": self.competitor_id,
+            "platform": self.platform,
+            "interval_minutes": round(self.interval_minutes, 1) if self.interval_minutes else None,
+            "reason": self.reason,
+            "changes_per_day": round(self.rate_per_hour * 24, 2) if self.rate_per_hour is not None else None,
+            "scans": self.scans,
+            "quiet_streak": self.quiet_streak,
+            "last_scan_at": _iso(self.last_completed_at),
+            "next_scan_at": _iso(self.next_scan_at)
+        }
+
+
+class ScanPolicy:
+    def __init__(self, path: str = "", enabled: bool = True, max_speedup: float = 4.0, max_slowdown: float = 4.0):
+        self.enabled = enabled
+        self.max_speedup = max(1.0, max_speedup)
+        self.max_slowdown = max(1.0, max_slowdown)
+        self._lock = threading.Lock()
+        # No in-process copy: every worker on the host reads and updates the same rows
+        self._conn = connect_state_db(path, "Scan policy", self._create_table, isolation_level=None)
+
+    @staticmethod
+    def _create_table(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS platform_schedules ("
+            "competitor_id TEXT NOT NULL, platform TEXT NOT NULL, rate_per_hour REAL, scans INTEGER, "
+            "quiet_streak INTEGER, interval_minutes REAL, reason TEXT, last_completed_at REAL, next_scan_at REAL, "
+            "PRIMARY KEY (competitor_id, platform))"
+        )
+        conn.commit()
+
+    def _select(self, where: str = "", params: tuple = ()) -> List[PlatformSchedule]:
+        rows = self._conn.execute(
+            "SELECT competitor_id, platform, rate_per_hour, scans, quiet_streak, interval_minutes, reason, "
+            "last_completed_at, next_scan_at FROM platform_schedules" + where,
+            params
+        ).fetchall()
+        schedules = []
+        for competitor_id, platform, *values in rows:
+            fields = dict(zip(
+                ("rate_per_hour", "scans", "quiet_streak", "interval_minutes", "reason", "last_completed_at", "next_scan_at"),
+                values
+            ))
+            schedules.append(PlatformSchedule(competitor_id, platform, **fields))
+        return schedules
+
+    def _get(self, competitor_id: str, platform: str) -> PlatformSchedule:
+        rows = self._select(" WHERE competitor_id = ? AND platform = ?", (competitor_id, platform))
+        return rows[0] if rows else PlatformSchedule(competitor_id, platform)
+
+    def _save(self, schedule: PlatformSchedule) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO platform_schedules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                schedule.competitor_id, schedule.platform, schedule.rate_per_hour, schedule.scans,
+                schedule.quiet_streak, schedule.interval_minutes, schedule.reason,
+                schedule.last_completed_at, schedule.next_scan_at
+            )
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """Read-modify-write under SQLite's write lock, taken up front so workers cannot interleave"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def base_interval(competitor: Dict[str, Any]) -> float:
+        return float(competitor.get('scan_frequency_minutes') or settings.DEFAULT_SCAN_FREQUENCY_MINUTES)
+
+    def bounds(self, competitor: Dict[str, Any]) -> tuple:
+        base = self.base_interval(competitor)
+        low = competitor.get('min_scan_frequency_minutes') or base / self.max_speedup
+        high = competitor.get('max_scan_frequency_minutes') or base * self.max_slowdown
+        low = max(MIN_INTERVAL_MINUTES, float(low))
+        high = min(MAX_INTERVAL_MINUTES, max(low, float(high)))
+        return low, high
+
+    def due_platforms(self, competitor: Dict[str, Any], now: Optional[datetime] = None,
+                      platforms: Optional[List[str]] = None) -> List[str]:
+        """Platforms of the competitor whose next scan time has passed"""
+        now_ts = (now or datetime.now(timezone.utc)).timestamp()
+        competitor_id = str(competitor.get('id'))
+        last_scan = _parse_time(competitor.get('last_scan_at'))
+        fallback_due = last_scan is None or now_ts >= last_scan + self.base_interval(competitor) * 60
+
+        try:
+            with self._lock:
+                schedules = {
+                    schedule.platform: schedule
+                    for schedule in self._select(" WHERE competitor_id = ?", (competitor_id,))
+                }
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not read scan schedules: {e}")
+            schedules = {}
+
+        due = []
+        for platform in platforms or DEFAULT_PLATFORMS:
+            schedule = schedules.get(platform)
+            if schedule is None or schedule.next_scan_at is None or not self.enabled:
+                if fallback_due:
+                    due.append(platform)
+            elif now_ts >= schedule.next_scan_at:
+                due.append(platform)
+        return due
+
+    def mark_started(self, competitor_id: str, platforms: List[str]) -> None:
+        """Keep the platforms off the due list while their scan runs"""
+        hold_until = time.time() + IN_FLIGHT_GRACE_MINUTES * 60
+        try:
+            with self._transaction():
+                for platform in platforms:
+                    schedule = self._get(str(competitor_id), platform)
+                    schedule.next_scan_at = max(schedule.next_scan_at or 0, hold_until)
+                    schedule.reason = "scan in progress"
+                    self._save(schedule)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not persist scan schedule: {e}")
+
+    def record_scan(self, competitor: Dict[str, Any], platform: str, new_posts: int = 0,
+                    changed_posts: int = 0, failed: bool = False) -> PlatformSchedule:
+        """Update the change rate from a finished scan and schedule the platform's next one"""
+        now = time.time()
+        competitor_id = str(competitor.get('id'))
+        base = self.base_interval(competitor)
+        low, high = self.bounds(competitor)
+
+        schedule = PlatformSchedule(competitor_id, platform)
+        try:
+            with self._transaction():
+                # Re-read inside the transaction: another worker may have recorded a scan since
+                schedule = self._get(competitor_id, platform)
+                self._reschedule(schedule, now, new_posts + changed_posts, failed, base, low, high)
+                self._save(schedule)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not persist scan schedule: {e}")
+        return schedule
+
+    def _reschedule(self, schedule: PlatformSchedule, now: float, changes: int, failed: bool,
+                    base: float, low: float, high: float) -> None:
+        if not self.enabled:
+            interval, reason = base, "adaptive scheduling disabled: user scan frequency"
+        elif failed:
+            # No signal from a failed scan: keep the estimate, retry on the user's cadence
+            interval = min(base, schedule.interval_minutes or base)
+            reason = f"last scan failed: retry in {_format_minutes(interval)}"
+        else:
+            elapsed_hours = (now - schedule.last_completed_at) / 3600 if schedule.last_completed_at else base / 60
+            observed = changes / max(elapsed_hours, 0.25)
+            # Prior of one change per user interval so a single quiet scan doesn't jump to the max
+            previous = schedule.rate_per_hour if schedule.rate_per_hour is not None else 60 / base
+            schedule.rate_per_hour = EWMA_ALPHA * observed + (1 - EWMA_ALPHA) * previous
+            schedule.scans += 1
+            schedule.quiet_streak = 0 if changes else schedule.quiet_streak + 1
+            schedule.last_completed_at = now
+
+            wanted = TARGET_CHANGES_PER_SCAN / schedule.rate_per_hour * 60 if schedule.rate_per_hour > 0 else high
+            interval = min(high, max(low, wanted))
+            per_day = schedule.rate_per_hour * 24
+            if interval <= low and wanted < low:
+                reason = f"busy: ~{per_day:.1f} changes/day, held at minimum {_format_minutes(low)}"
+            elif interval >= high and wanted > high:
+                reason = f"quiet: ~{per_day:.2f} changes/day ({schedule.quiet_streak} quiet scans), held at maximum {_format_minutes(high)}"
+            elif interval < base:
+                reason = f"busy: ~{per_day:.1f} changes/day, scanning every {_format_minutes(interval)}"
+            elif interval > base:
+                reason = f"quiet: ~{per_day:.2f} changes/day, scanning every {_format_minutes(interval)}"
+            else:
+                reason = f"~{per_day:.1f} changes/day matches the user scan frequency"
+
+        schedule.interval_minutes = interval
+        schedule.reason = reason
+        schedule.next_scan_at = now + interval * 60
+
+    def snapshot(self, limit: int = 100) -> Dict[str, Any]:
+        try:
+            with self._lock:
+                tracked = self._conn.execute("SELECT COUNT(*) FROM platform_schedules").fetchone()[0]
+                schedules = self._select(" ORDER BY COALESCE(next_scan_at, 0) LIMIT ?", (limit,))
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Could not read scan schedules: {e}")
+            tracked, schedules = 0, []
+        return {
+            "enabled": self.enabled,
+            "max_speedup": self.max_speedup,
+            "max_slowdown": self.max_slowdown,
+            "tracked_platforms": tracked,
+            "schedules": [schedule.to_dict() for schedule in schedules]
+        }
+
+    def forget(self, competitor_id: str) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM platform_schedules WHERE competitor_id = ?", (str(competitor_id),))
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Could not delete scan schedules: {e}")
+
+
+scan_policy = ScanPolicy(
+    path=settings.SCAN_POLICY_PATH,
+    enabled=settings.ADAPTIVE_SCAN_ENABLED,
+    max_speedup=settings.ADAPTIVE_SCAN_MAX_SPEEDUP,
+    max_slowdown=settings.ADAPTIVE_SCAN_MAX_SLOWDOWN
+)
@@ -14,6 +14,9 @@ import json
 
 from .orchestrator import SimpleMonitoringService
 from .supabase_client import supabase_client
+from .scan_policy import DEFAULT_PLATFORMS, scan_policy
+from .api_budget import MANUAL, SCHEDULED, api_budget, scan_priority
+from .scan_ledger import ScanRun, scan_ledger
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,8 @@ class MonitoringScheduler:
         self._shutdown_event = asyncio.Event()
         self.monitoring_service = SimpleMonitoringService()
         self.daily_scan_task = None
+        # Resumed scan runs; kept out of current_tasks so they don't take a scan slot themselves
+        self.resume_tasks = set()
         self.last_daily_scan = None
         
         # Setup signal handlers for graceful shutdown
@@ -75,6 +80,9 @@ class MonitoringScheduler:
         logger.info("Starting monitoring scheduler...")
         
         try:
+            # Pick up multi-competitor scans a previous process left unfinished
+            self._resume_interrupted_runs()
+            
             # Start daily scan scheduler
             await self._start_daily_scan_scheduler()
             
@@ -144,8 +152,25 @@ class MonitoringScheduler:
         
         self.daily_scan_task = asyncio.create_task(daily_scan_loop())
     
+    def _resume_interrupted_runs(self):
+        """Restart scan runs whose process died before they finished (they skip finished work)"""
+        for interrupted in scan_ledger.interrupted_runs():
+            logger.info(f"♻️ Resuming interrupted {interrupted['kind']} scan run {interrupted['run_id']} from {interrupted['started_at']}")
+            if interrupted['kind'] == "daily":
+                task = asyncio.create_task(self._run_daily_scan_for_all_users())
+            else:
+                task = asyncio.create_task(self._resume_user_scan(interrupted['scope']))
+            self.resume_tasks.add(task)
+            task.add_done_callback(self.resume_tasks.discard)
+    
+    async def _resume_user_scan(self, user_id: str):
+        async with scan_priority(SCHEDULED):
+            result = await self.monitoring_service.run_monitoring_for_all_active_competitors(user_id)
+        logger.info(f"Resumed scan of all competitors for user {user_id}: {result.get('status')}")
+    
     async def _run_daily_scan_for_all_users(self):
         """Run daily scan for all users with monitoring enabled"""
+        run = None
         try:
             logger.info("Starting daily scan for all users with monitoring enabled...")
             
@@ -154,28 +179,43 @@ class MonitoringScheduler:
                 logger.warning("⚠️ Supabase client not available - skipping daily scan")
                 return
             
+            # Progress is checkpointed per competitor and platform so a restart resumes the sweep
+            run = scan_ledger.start_run("daily", "all")
+            if run.already_running:
+                logger.info("Daily scan is already running - skipping")
+                return
+            
             # Get all users with monitoring enabled
             users_with_monitoring = await self._get_users_with_monitoring_enabled()
             
             if not users_with_monitoring:
                 logger.info("✅ No users have monitoring enabled - skipping daily scan")
                 logger.info("💡 Enable monitoring for users in user_monitoring_settings table to start automatic scanning")
+                run.finish()
                 return
             
             logger.info(f"✅ Found {len(users_with_monitoring)} users with monitoring enabled")
             
             # Run monitoring for each user's competitors
+            tasks = []
             for user_id in users_with_monitoring:
                 try:
-                    await self._run_daily_scan_for_user(user_id)
+                    tasks.extend(await self._run_daily_scan_for_user(user_id, run))
                 except Exception as e:
                     logger.error(f"Error running daily scan for user {user_id}: {e}")
                     continue
             
+            # The run only counts as finished once every competitor task has checkpointed
+            await asyncio.gather(*tasks, return_exceptions=True)
+            run.finish()
             logger.info("✅ Daily scan completed for all users")
             
         except Exception as e:
             logger.error(f"Error in daily scan for all users: {e}")
+        finally:
+            # An unfinished run (error or shutdown) stays resumable
+            if run is not None:
+                run.release()
     
     async def _get_users_with_monitoring_enabled(self) -> List[str]:
         """Get list of user IDs with monitoring enabled"""
@@ -191,8 +231,9 @@ class MonitoringScheduler:
             logger.error(f"Error getting users with monitoring enabled: {e}")
             return []
     
-    async def _run_daily_scan_for_user(self, user_id: str):
-        """Run daily scan for a specific user's competitors"""
+    async def _run_daily_scan_for_user(self, user_id: str, run: ScanRun) -> List[asyncio.Task]:
+        """Start daily scan tasks for a specific user's competitors and return them"""
+        tasks = []
         try:
             logger.info(f"Running daily scan for user {user_id}")
             
@@ -201,23 +242,39 @@ class MonitoringScheduler:
             
             if not competitors:
                 logger.info(f"No competitors found for user {user_id}")
-                return
+                return tasks
             
             logger.info(f"Found {len(competitors)} competitors for user {user_id}")
             
+            # With adaptive scheduling the daily sweep only covers platforms that are due
+            run.add_competitors({
+                str(competitor['id']): scan_policy.due_platforms(competitor) if scan_policy.enabled else list(DEFAULT_PLATFORMS)
+                for competitor in competitors
+            })
+            # Includes platforms an interrupted run of this sweep left unfinished
+            pending = run.pending()
+            
             # Run monitoring for each competitor using core agents
             for competitor in competitors:
                 try:
-                    if len(self.current_tasks) >= self.config.max_concurrent_scans:
+                    platforms = pending.get(str(competitor['id']))
+                    if not platforms:
+                        logger.info(f"Skipping {competitor.get('name', 'Unknown')}: no platform due yet")
+                        continue
+                    
+                    # Wait for a free slot instead of dropping the competitor from the sweep
+                    while len(self.current_tasks) >= self.config.max_concurrent_scans:
                         logger.info(f"At maximum capacity, waiting for tasks to complete...")
                         await asyncio.sleep(10)
-                        continue
+                        await self._cleanup_completed_tasks()
                     
-                    # Start monitoring task for this competitor
-                    task = asyncio.create_task(
-                        self._run_competitor_monitoring(competitor['id'])
-                    )
+                    # Start monitoring task for this competitor (it checkpoints into the run)
+                    with run.active():
+                        task = asyncio.create_task(
+                            self._run_competitor_monitoring(competitor['id'], platforms)
+                        )
                     self.current_tasks.add(task)
+                    tasks.append(task)
                     
                     logger.info(f"Started daily monitoring for competitor {competitor.get('name', 'Unknown')} ({competitor['id']})")
                     
@@ -227,6 +284,7 @@ class MonitoringScheduler:
             
         except Exception as e:
             logger.error(f"Error running daily scan for user {user_id}: {e}")
+        return tasks
     
     async def _run_scheduler_loop(self):
         """Main scheduler loop"""
@@ -278,23 +336,26 @@ class MonitoringScheduler:
                     break
                 
                 # Start monitoring task
+                # Only the platforms the adaptive policy considers due
                 task = asyncio.create_task(
-                    self._run_competitor_monitoring(competitor['id'])
+                    self._run_competitor_monitoring(competitor['id'], competitor.get('due_platforms'))
                 )
                 self.current_tasks.add(task)
                 
-                logger.info(f"Started monitoring task for competitor {competitor.get('name', 'Unknown')} ({competitor['id']})")
+                logger.info(f"Started monitoring task for competitor {competitor.get('name', 'Unknown')} ({competitor['id']}) on {competitor.get('due_platforms')}")
         
         except Exception as e:
             logger.error(f"Error in _process_scheduled_scans: {e}")
     
-    async def _run_competitor_monitoring(self, competitor_id: str):
-        """Run monitoring for a specific competitor"""
+    async def _run_competitor_monitoring(self, competitor_id: str, platforms: Optional[List[str]] = None,
+                                         priority: str = SCHEDULED):
+        """Run monitoring for a specific competitor (all core platforms unless given)"""
         try:
             logger.info(f"Running monitoring for competitor {competitor_id}")
             
-            # Run monitoring using the monitoring service
-            result = await self.monitoring_service.run_monitoring_for_competitor(competitor_id)
+            # Run monitoring using the monitoring service; API calls are budgeted at this priority
+            async with scan_priority(priority):
+                result = await self.monitoring_service.run_monitoring_for_competitor(competitor_id, platforms=platforms)
             
             logger.info(f"Completed monitoring for competitor {competitor_id}: {result['status']}")
             
@@ -343,7 +404,7 @@ class MonitoringScheduler:
             
             # Start immediate monitoring task
             task = asyncio.create_task(
-                self._run_competitor_monitoring(competitor_id)
+                self._run_competitor_monitoring(competitor_id, priority=MANUAL)
             )
             self.current_tasks.add(task)
             
@@ -385,7 +446,7 @@ class MonitoringScheduler:
             for competitor in competitors:
                 try:
                     task = asyncio.create_task(
-                        self._run_competitor_monitoring(competitor['id'])
+                        self._run_competitor_monitoring(competitor['id'], priority=MANUAL)
                     )
                     self.current_tasks.add(task)
                     started_tasks += 1
@@ -423,7 +484,13 @@ class MonitoringScheduler:
                 "scan_interval_hours": self.config.daily_scan_interval_hours,
                 "retry_after_minutes": self.config.retry_failed_after_minutes,
                 "max_failures": self.config.max_consecutive_failures
-            }
+            },
+            # Per competitor/platform interval, next scan time and why it was chosen
+            "adaptive_scheduling": scan_policy.snapshot(),
+            # Today's Tavily / YouTube / Gemini quota burn shared by all scans
+            "api_budget": api_budget.snapshot(),
+            # Recent multi-competitor scan runs and their per-platform checkpoint counts
+            "scan_runs": scan_ledger.snapshot()
         }
     
     def _calculate_next_daily_scan(self) -> Optional[str]:
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta, timezone
 import asyncio
 from dotenv import load_dotenv
 
+from app.services.monitoring.scan_policy import scan_policy
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,8 @@ except ImportError as e:
 class SupabaseMonitoringClient:
     """Direct Supabase client for monitoring operations"""
     
+    IN_FILTER_CHUNK = 100
+    
     def __init__(self):
         if not SUPABASE_AVAILABLE:
             raise ValueError("Supabase client not available. Install supabase package to enable monitoring features.")
@@ -64,7 +68,8 @@ class SupabaseMonitoringClient:
             return None
     
     async def get_competitors_due_for_scan(self) -> List[Dict[str, Any]]:
-        """Get all active competitors that are due for scanning, respecting user monitoring settings"""
+        """Get all active competitors that are due for scanning, respecting user monitoring settings.
+        Each competitor carries the platforms that are due in 'due_platforms'."""
         try:
             current_time = datetime.now(timezone.utc)
             
@@ -94,25 +99,11 @@ class SupabaseMonitoringClient:
                             if competitor.get('status') != 'active':
                                 continue
                             
-                            # Check if due for scan based on scan frequency
-                            scan_frequency_minutes = competitor.get('scan_frequency_minutes', 1440)  # Default 24 hours
-                            last_scan_at = competitor.get('last_scan_at')
-                            
-                            if not last_scan_at:
-                                # Never scanned before - add to scan queue
-                                competitors_due.append(competitor)
-                                continue
-                            
-                            # Parse last scan time
-                            if isinstance(last_scan_at, str):
-                                last_scan_time = datetime.fromisoformat(last_scan_at.replace('Z', '+00:00'))
-                            else:
-                                last_scan_time = last_scan_at
-                            
-                            # Check if scan frequency has elapsed
-                            next_scan_time = last_scan_time + timedelta(minutes=scan_frequency_minutes)
-                            
-                            if current_time >= next_scan_time:
+                            # Due when any platform's adaptive next scan time has passed (never
+                            # scanned platforms fall back to last_scan_at + scan_frequency_minutes)
+                            due_platforms = scan_policy.due_platforms(competitor, current_time)
+                            if due_platforms:
+                                competitor['due_platforms'] = due_platforms
                                 competitors_due.append(competitor)
                                 
                         except Exception as e:
@@ -164,6 +155,21 @@ class SupabaseMonitoringClient:
             logger.error(f"❌ Error creating alert: {e}")
             return None
     
+    async def create_alerts(self, alerts: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """Create monitoring alerts in one bulk insert; returns None if the insert failed"""
+        if not alerts:
+            return []
+        try:
+            response = self.client.table('monitoring_alerts').insert(alerts).execute()
+            
+            alert_ids = [row['id'] for row in (response.data or [])]
+            logger.info(f"✅ Created {len(alert_ids)} alerts in one insert")
+            return alert_ids
+                
+        except Exception as e:
+            logger.error(f"❌ Error creating {len(alerts)} alerts: {e}")
+            return None
+    
     async def update_competitor_scan_time(self, competitor_id: str) -> bool:
         """Update competitor's last scan time"""
         try:
@@ -251,6 +257,123 @@ class SupabaseMonitoringClient:
             logger.error(f"❌ Error updating post content: {e}")
             return False
     
+    async def get_existing_posts(self, competitor_id: str, platform: str, post_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Existing monitoring rows (id, post_id, content_hash) for many posts, keyed by post_id"""
+        existing = {}
+        ids = [post_id for post_id in dict.fromkeys(post_ids) if post_id]
+        
+        def select(chunk: List[str]):
+            return self.client.table('monitoring_data').select('id,post_id,content_hash') \
+                .eq('competitor_id', competitor_id).eq('platform', platform).in_('post_id', chunk).execute()
+        
+        try:
+            # Chunked so the in.(...) filter stays well below URL length limits
+            for start in range(0, len(ids), self.IN_FILTER_CHUNK):
+                chunk = ids[start:start + self.IN_FILTER_CHUNK]
+                # The Supabase client is synchronous: run the request off the event loop
+                response = await asyncio.to_thread(select, chunk)
+                for row in response.data or []:
+                    existing.setdefault(row['post_id'], row)
+            return existing
+            
+        except Exception as e:
+            logger.error(f"❌ Error checking existing posts: {e}")
+            raise
+    
+    async def classify_saved_posts(self, competitor_id: str, platform: str, data_ids: List[str]) -> Dict[str, int]:
+        """
+        Count rows an agent just inserted as new, changed or unchanged posts
+        
+        Agents that save their own results insert every item they find on every scan. A
+        saved row is new when no other row has its post_id, changed when the other rows
+        all hold a different content_hash, and unchanged otherwise.
+        """
+        counts = {"new": 0, "changed": 0, "unchanged": 0}
+        ids = [data_id for data_id in dict.fromkeys(data_ids) if data_id]
+        
+        def select(column: str, chunk: List[str]):
+            return self.client.table('monitoring_data').select('id,post_id,content_hash') \
+                .eq('competitor_id', competitor_id).eq('platform', platform).in_(column, chunk).execute()
+        
+        async def select_chunked(column: str, values: List[str]) -> List[Dict[str, Any]]:
+            rows = []
+            for start in range(0, len(values), self.IN_FILTER_CHUNK):
+                response = await asyncio.to_thread(select, column, values[start:start + self.IN_FILTER_CHUNK])
+                rows.extend(response.data or [])
+            return rows
+        
+        saved = await select_chunked('id', ids)
+        post_ids = list(dict.fromkeys(row['post_id'] for row in saved if row.get('post_id')))
+        earlier_hashes: Dict[str, set] = {}
+        saved_ids = set(ids)
+        for row in await select_chunked('post_id', post_ids):
+            if row['id'] not in saved_ids:
+                earlier_hashes.setdefault(row['post_id'], set()).add(row.get('content_hash'))
+        
+        for row in saved:
+            hashes = earlier_hashes.get(row.get('post_id'))
+            if not hashes:
+                counts["new"] += 1
+            elif row.get('content_hash') in hashes:
+                counts["unchanged"] += 1
+            else:
+                counts["changed"] += 1
+        return counts
+    
+    async def save_monitoring_data_batch(self, rows: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        Insert many monitoring rows in one request; returns the inserted rows (with ids).
+        If the batch is rejected (one malformed row, a unique-key race with another scan)
+        the rows are inserted one by one so the rest still get saved.
+        """
+        if not rows:
+            return []
+        
+        def insert(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            return self.client.table('monitoring_data').insert(batch).execute().data or []
+        
+        try:
+            saved = await asyncio.to_thread(insert, rows)
+            logger.info(f"✅ Saved {len(saved)} monitoring rows in one insert")
+            return saved
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk insert of {len(rows)} monitoring rows failed ({e}), retrying individually")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def insert_one(row: Dict[str, Any]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(insert, [row])
+                except Exception as e:
+                    logger.error(f"❌ Error saving monitoring row for post {row.get('post_id')}: {e}")
+                    return []
+        
+        results = await asyncio.gather(*(insert_one(row) for row in rows))
+        saved = [row for result in results for row in result]
+        logger.info(f"✅ Saved {len(saved)}/{len(rows)} monitoring rows individually")
+        return saved
+    
+    async def update_posts_content(self, updates: List[tuple], max_concurrency: int = 8) -> int:
+        """Apply (data_id, updated_data) updates concurrently (bounded); returns how many succeeded"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        def update(data_id: str, updated_data: Dict[str, Any]) -> bool:
+            response = self.client.table('monitoring_data').update(updated_data).eq('id', data_id).execute()
+            return bool(response.data)
+        
+        async def bounded(data_id: str, updated_data: Dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    # The Supabase client is synchronous: run each request off the event loop
+                    return await asyncio.to_thread(update, data_id, updated_data)
+                except Exception as e:
+                    logger.error(f"❌ Error updating post content for ID {data_id}: {e}")
+                    return False
+        
+        results = await asyncio.gather(*(bounded(data_id, data) for data_id, data in updates))
+        return sum(results)
+    
     async def _get_users_with_monitoring_enabled(self) -> List[str]:
         """Get list of user IDs with monitoring enabled"""
         try:
@@ -12,6 +12,7 @@ from decimal import Decimal
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 from app.core.config import settings
+from app.core.metrics import instrument_client
 from app.services.monitoring.supabase_client import supabase_client
 import uuid
 
@@ -49,6 +50,7 @@ class AIService:
                 max_tokens=2048
                 # Removed deprecated convert_system_message_to_human parameter
             )
+            self.llm = instrument_client(self.llm, "gemini", "ai_service", ["ainvoke"])
             logger.info("✅ AI Service initialized successfully with Gemini")
         except Exception as e:
             logger.error(f"❌ Failed to initialize AI Service: {e}")
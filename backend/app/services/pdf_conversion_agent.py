@@ -12,39 +12,42 @@ import json
 import logging
 import re
 
+from app.core.metrics import track
+
+logger = logging.getLogger(__name__)
+
 # Test xhtml2pdf import
 try:
     from xhtml2pdf import pisa
     XHTML2PDF_AVAILABLE = True
-    print("✅ xhtml2pdf import successful in enhanced agent")
+    logger.debug("✅ xhtml2pdf import successful in enhanced agent")
 except ImportError:
     XHTML2PDF_AVAILABLE = False
     pisa = None
-    print("❌ xhtml2pdf import failed in enhanced agent")
+    logger.warning("❌ xhtml2pdf import failed in enhanced agent")
 
 # Test Google GenAI import
 try:
     import google.generativeai as genai
     GEMINI_AVAILABLE = True
-    print("✅ Google GenAI import successful in enhanced agent")
+    logger.debug("✅ Google GenAI import successful in enhanced agent")
 except ImportError:
     GEMINI_AVAILABLE = False
     genai = None
-    print("⚠️  Google GenAI import failed in enhanced agent")
+    logger.warning("⚠️  Google GenAI import failed in enhanced agent")
 
 # Import Supabase client and services
 try:
     from app.core.supabase_client import supabase_client
     from app.services.youtube_data_service import YouTubeDataService
     SUPABASE_AVAILABLE = True
-    print("✅ Supabase client and services imported successfully")
+    logger.debug("✅ Supabase client and services imported successfully")
 except ImportError as e:
     SUPABASE_AVAILABLE = False
-    print(f"⚠️  Supabase imports failed: {e}")
+    logger.warning(f"⚠️  Supabase imports failed: {e}")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 
 class EnhancedPDFAgent:
     """Enhanced PDF conversion agent with YouTube and Instagram data integration"""
@@ -211,7 +214,10 @@ class EnhancedPDFAgent:
         
         try:
             pdf_bytes_io = BytesIO()
-            error = pisa.CreatePDF(src=html_content, dest=pdf_bytes_io)
+            with track("xhtml2pdf", "create_pdf") as timing:
+                error = pisa.CreatePDF(src=html_content, dest=pdf_bytes_io)
+                timing.payload_bytes = pdf_bytes_io.tell()
+                timing.error = bool(error.err)
             
             if error.err:
                 raise Exception(f"PDF generation failed: {error.err}")
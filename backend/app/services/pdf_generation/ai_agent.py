@@ -13,6 +13,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 import logging
 
+logger = logging.getLogger(__name__)
+
 # Add the backend directory to the path
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
@@ -21,17 +23,17 @@ try:
     from langchain_google_genai import ChatGoogleGenerativeAI
     from langchain_core.messages import HumanMessage,SystemMessage
     GOOGLE_GENAI_AVAILABLE = True
-    print("✅ Google Generative AI available")
+    logger.debug("✅ Google Generative AI available")
 except ImportError:
     GOOGLE_GENAI_AVAILABLE = False
-    print("❌ Google Generative AI not available")
+    logger.warning("❌ Google Generative AI not available")
 
 from app.core.supabase_client import supabase_client
 from app.core.config import settings
+from app.core.metrics import instrument_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 
 class ROIReportAgent:
     """
@@ -51,6 +53,7 @@ class ROIReportAgent:
                     temperature=0.3,  # Very low temperature for highly consistent output
                     max_output_tokens=8192
                 )
+                self.model = instrument_client(self.model, "gemini", "roi_report_agent", ["ainvoke"])
                 logger.info("✅ Google Generative AI model initialized")
             except Exception as e:
                 logger.error(f"❌ Failed to initialize Google Generative AI: {e}")
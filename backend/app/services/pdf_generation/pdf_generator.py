@@ -13,6 +13,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 import logging
 
+logger = logging.getLogger(__name__)
+
 # Add the backend directory to the path
 sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 
@@ -20,27 +22,27 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 try:
     from xhtml2pdf import pisa
     XHTML2PDF_AVAILABLE = True
-    print("✅ xhtml2pdf import successful")
+    logger.debug("✅ xhtml2pdf import successful")
 except ImportError as e:
     XHTML2PDF_AVAILABLE = False
-    print(f"❌ xhtml2pdf import failed: {e}")
+    logger.warning(f"❌ xhtml2pdf import failed: {e}")
     # Try alternative import
     try:
         import xhtml2pdf
         from xhtml2pdf import pisa
         XHTML2PDF_AVAILABLE = True
-        print("✅ xhtml2pdf import successful (alternative method)")
+        logger.debug("✅ xhtml2pdf import successful (alternative method)")
     except ImportError:
         XHTML2PDF_AVAILABLE = False
-        print("❌ xhtml2pdf import failed (alternative method also failed)")
+        logger.warning("❌ xhtml2pdf import failed (alternative method also failed)")
 
 # Now import app modules
 from app.core.supabase_client import supabase_client
 from app.services.pdf_generation.ai_agent import ROIReportAgent
+from app.core.metrics import track
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 
 class PDFGenerator:
     """
@@ -132,15 +134,18 @@ class PDFGenerator:
             pdf_buffer = BytesIO()
             
              # Convert HTML to PDF with portrait orientation
-            conversion_result = pisa.CreatePDF(
-                 html_content,
-                 dest=pdf_buffer,
-                 encoding='utf-8',
-                 showBoundary=0,  # Hide page boundaries
-                 pdf_background=None,  # No background
-                 # Portrait orientation settings
-                 orientation='portrait'
-             )
+            with track("xhtml2pdf", "create_pdf") as timing:
+                conversion_result = pisa.CreatePDF(
+                     html_content,
+                     dest=pdf_buffer,
+                     encoding='utf-8',
+                     showBoundary=0,  # Hide page boundaries
+                     pdf_background=None,  # No background
+                     # Portrait orientation settings
+                     orientation='portrait'
+                 )
+                timing.payload_bytes = pdf_buffer.tell()
+                timing.error = bool(conversion_result.err)
             
             if conversion_result.err:
                 logger.error(f"❌ PDF conversion failed: {conversion_result.err}")
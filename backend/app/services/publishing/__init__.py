@@ -0,0 +1,28 @@
+"""
+Publishing Services Package
+Media forwarding and publishing to social platforms
+"""
+
+from .graph_media import (
+    GraphMediaForwarder,
+    StreamingMultipart,
+    close_graph_client,
+    get_graph_client,
+    graph_media_forwarder,
+    graph_url
+)
+from .jobs import PublishAPIError, PublishJob, PublishJobEngine, PublishTarget, publish_job_engine
+
+__all__ = [
+    "GraphMediaForwarder",
+    "PublishAPIError",
+    "PublishJob",
+    "PublishJobEngine",
+    "PublishTarget",
+    "StreamingMultipart",
+    "close_graph_client",
+    "get_graph_client",
+    "graph_media_forwarder",
+    "graph_url",
+    "publish_job_engine"
+]
@@ -0,0 +1,184 @@
+"""
+Graph API media forwarding
+Streams spooled upload files straight to the Facebook/Instagram Graph API through one
+pooled client per event loop, instead of reading every file into memory first.
+
+Memory per concurrent publish: each in-flight media upload holds one read chunk
+(MEDIA_CHUNK_SIZE, 256 KiB) plus httpx's socket buffers, and a carousel uploads at
+most ``max_concurrency`` items at once - about 1 MiB of media bytes for the default of
+four, independent of file sizes. The files themselves stay in Starlette's spooled
+temporary files (up to 1 MiB each in memory, the rest on disk).
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+import weakref
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GRAPH_API_BASE = "https://graph.facebook.com"
+MEDIA_CHUNK_SIZE = 256 * 1024
+MAX_CONCURRENT_MEDIA_UPLOADS = 4
+
+_graph_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def graph_url(node_id: str, edge: str, version: Optional[str] = None) -> str:
+    return f"{GRAPH_API_BASE}/{version or settings.META_APP_VERSION}/{node_id}/{edge}"
+
+
+def get_graph_client() -> httpx.AsyncClient:
+    """
+    Pooled Graph API client for the running event loop
+    Connections are kept alive across publishes; the monitoring scheduler's own
+    loop gets its own client because httpx clients are bound to one loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _graph_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        _graph_clients[loop] = client
+    return client
+
+
+async def close_graph_client() -> None:
+    """Close the running loop's pooled client (application shutdown)"""
+    client = _graph_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+class StreamingMultipart:
+    """
+    multipart/form-data body that reads its file part lazily
+
+    Produces the same encoding as httpx's ``files=``/``data=`` but as an async byte
+    stream: file reads happen in a worker thread one chunk at a time, and the
+    Content-Length is computed up front so the Graph API never sees chunked encoding.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_field: str,
+        file_obj: BinaryIO,
+        filename: str,
+        file_content_type: Optional[str],
+        chunk_size: int = MEDIA_CHUNK_SIZE
+    ):
+        self.boundary = uuid.uuid4().hex
+        self.file_obj = file_obj
+        self.chunk_size = chunk_size
+        self.bytes_sent = 0
+
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n'.encode()
+                + str(value).encode("utf-8") + b"\r\n"
+            )
+        parts.append(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(file_field)}"; '
+            f'filename="{_quote(filename or "upload")}"\r\n'
+            f'Content-Type: {file_content_type or "application/octet-stream"}\r\n\r\n'.encode("utf-8")
+        )
+        self._head = b"".join(parts)
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode()
+
+        file_obj.seek(0, os.SEEK_END)
+        self.file_size = file_obj.tell()
+        file_obj.seek(0)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": f"multipart/form-data; boundary={self.boundary}",
+            "Content-Length": str(len(self._head) + self.file_size + len(self._tail))
+        }
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self._head
+        await asyncio.to_thread(self.file_obj.seek, 0)
+        while True:
+            chunk = await asyncio.to_thread(self.file_obj.read, self.chunk_size)
+            if not chunk:
+                break
+            self.bytes_sent += len(chunk)
+            yield chunk
+        yield self._tail
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class GraphMediaForwarder:
+    """Uploads media files to Graph API edges as streams over the pooled client"""
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, max_concurrency: int = MAX_CONCURRENT_MEDIA_UPLOADS):
+        self._client = client
+        self.max_concurrency = max_concurrency
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_graph_client()
+
+    async def upload(
+        self,
+        url: str,
+        upload: Any,
+        fields: Dict[str, str],
+        file_field: str = "source",
+        timeout: float = 60.0
+    ) -> httpx.Response:
+        """
+        Stream one upload (a Starlette UploadFile or anything with .file, .filename
+        and .content_type) to a Graph API edge such as /{page_id}/photos
+        """
+        body = StreamingMultipart(fields, file_field, upload.file, upload.filename, upload.content_type)
+        response = await self.client.post(url, content=body, headers=body.headers, timeout=timeout)
+        logger.info(f"📤 Streamed {body.bytes_sent} bytes of {upload.filename} to Graph API ({response.status_code})")
+        return response
+
+    async def upload_unpublished_photos(
+        self,
+        url: str,
+        uploads: List[Any],
+        access_token: str,
+        timeout: float = 60.0
+    ) -> List[Optional[str]]:
+        """
+        Upload carousel/album photos unpublished, at most ``max_concurrency`` at a time
+
+        Returns the media ids in the order of ``uploads``; failed items are None.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _upload_one(upload: Any) -> Optional[str]:
+            async with semaphore:
+                try:
+                    response = await self.upload(
+                        url, upload, {"published": "false", "access_token": access_token}, timeout=timeout
+                    )
+                except httpx.HTTPError as e:
+                    logger.warning(f"⚠️ Photo upload failed for {upload.filename}: {e}")
+                    return None
+                if response.status_code in (200, 201):
+                    return response.json().get("id")
+                logger.warning(f"⚠️ Photo upload failed for {upload.filename}: {response.status_code} {response.text[:200]}")
+                return None
+
+        return list(await asyncio.gather(*(_upload_one(upload) for upload in uploads)))
+
+
+graph_media_forwarder = GraphMediaForwarder()
@@ -0,0 +1,567 @@
+"""
+Publish job engine
+Fans one content item out to many platforms in the background: accounts are loaded
+once, targets publish concurrently under per-platform rate limits with retries, every
+state change is persisted to its content_uploads row and pushed to SSE subscribers.
+
+Targets due within one scheduler poll wait in-process; later ones stay "scheduled" in
+content_uploads and the scheduler loop publishes them once due, so a restart loses
+nothing. Every row is claimed atomically before publishing (a conditional update that
+only succeeds from a claimable status or an expired lease), the lease is refreshed
+while the upload runs, and a row that already has a post_id is never published again.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.state_db import HostLock
+from app.core.supabase_client import supabase_client
+
+logger = logging.getLogger(__name__)
+
+Publisher = Callable[[Dict[str, Any], Dict[str, Any], Optional[str]], Awaitable[Dict[str, Any]]]
+
+# (concurrent publishes, minimum seconds between publish starts) per platform, process-wide
+PLATFORM_RATE_LIMITS = {
+    "facebook": (4, 1.0),
+    "instagram": (2, 2.0),
+    "twitter": (2, 1.0),
+    "linkedin": (2, 2.0),
+    "youtube": (1, 5.0)
+}
+DEFAULT_RATE_LIMIT = (2, 1.0)
+STAGGER_INTERVAL = timedelta(minutes=15)
+
+# A claimed upload whose lease (last_attempt_at) is older than this is considered
+# abandoned (the worker publishing it died) and may be claimed again; live publishes
+# refresh the lease every CLAIM_HEARTBEAT
+CLAIM_TIMEOUT = timedelta(minutes=5)
+CLAIM_HEARTBEAT = timedelta(minutes=1)
+SCHEDULER_BATCH_SIZE = 100
+
+TERMINAL_TARGET_STATES = {"posted", "failed", "skipped", "scheduled"}
+
+
+class PublishAPIError(Exception):
+    """A platform API rejected a publish request with this HTTP status"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Transport failures and 429/5xx responses are retried; anything else (4xx, missing
+    credentials, unsupported content) would fail the same way again. Publishers wrap
+    errors in plain Exceptions, so the whole exception chain is inspected.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        if isinstance(error, httpx.HTTPStatusError):
+            status = error.response.status_code
+            return status == 429 or status >= 500
+        if isinstance(error, PublishAPIError) and error.status_code is not None:
+            return error.status_code == 429 or error.status_code >= 500
+        error = error.__cause__ or error.__context__
+    return False
+
+
+async def publish_to_platform(upload: Dict[str, Any], account: Dict[str, Any], user_id: Optional[str]) -> Dict[str, Any]:
+    """Publisher used for scheduled uploads (imported lazily: the endpoint module is heavy)"""
+    from app.api.v1.endpoints.social_media import post_to_social_media
+    return await post_to_social_media(upload, account, user_id)
+
+
+class PlatformRateLimiter:
+    """Caps concurrent publishes and spaces out their start times for one platform"""
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.min_interval = min_interval
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        await self._semaphore.acquire()
+        async with self._lock:
+            wait = self._next_start - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = time.monotonic() + self.min_interval
+        return self
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+@dataclass
+class PublishTarget:
+    """One platform a job publishes to, backed by one content_uploads row"""
+    platform: str
+    account: Optional[Dict[str, Any]]
+    upload: Dict[str, Any]
+    not_before: Optional[datetime] = None
+    status: str = "queued"  # queued, waiting, publishing, retrying, posted, failed, skipped, scheduled
+    claimed: bool = False
+    attempts: int = 0
+    post_id: Optional[str] = None
+    post_url: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def upload_id(self) -> Optional[str]:
+        return self.upload.get("id")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "platform": self.platform,
+            "upload_id": self.upload_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "scheduled_at": self.not_before.isoformat() if self.not_before else None,
+            "post_id": self.post_id,
+            "post_url": self.post_url,
+            "error": self.error
+        }
+
+
+@dataclass
+class PublishJob:
+    job_id: str
+    user_id: str
+    targets: List[PublishTarget]
+    publish: Publisher
+    status: str = "queued"  # queued, running, completed, scheduled, partial, failed
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "targets": [target.snapshot() for target in self.targets]
+        }
+
+
+class PublishJobEngine:
+    """Runs publish jobs as background tasks and keeps their state for status/SSE lookups"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        rate_limits: Optional[Dict[str, tuple]] = None,
+        job_ttl_seconds: float = 3600.0,
+        scheduler_enabled: bool = settings.PUBLISH_SCHEDULER_ENABLED,
+        scheduler_poll_seconds: float = settings.PUBLISH_SCHEDULER_POLL_SECONDS
+    ):
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.rate_limits = rate_limits or PLATFORM_RATE_LIMITS
+        self.job_ttl_seconds = job_ttl_seconds
+        self.scheduler_enabled = scheduler_enabled
+        self.scheduler_poll_seconds = scheduler_poll_seconds
+        self._jobs: Dict[str, PublishJob] = {}
+        self._limiters: Dict[str, PlatformRateLimiter] = {}
+        self._tasks: set = set()
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._scheduler_lock = HostLock("publish_scheduler")
+
+    # ------------------------------------------------------------------
+    # Submitting jobs
+    # ------------------------------------------------------------------
+
+    async def submit_bulk(
+        self,
+        user_id: str,
+        content: Dict[str, Any],
+        platforms: List[str],
+        publish: Publisher,
+        schedule_strategy: str = "simultaneous",
+        custom_schedule: Optional[Dict[str, datetime]] = None
+    ) -> PublishJob:
+        """
+        Create one content_uploads row per platform and start publishing
+
+        The user's accounts are loaded once for all platforms. Platforms without a
+        connected account are reported as skipped instead of failing the job.
+        """
+        accounts = await supabase_client.get_user_social_accounts(user_id)
+        accounts_by_platform: Dict[str, Dict[str, Any]] = {}
+        for account in accounts:
+            if account.get("is_active", True):
+                accounts_by_platform.setdefault(account.get("platform"), account)
+
+        base_time = content.get("scheduled_at")
+        targets = []
+        for index, platform in enumerate(dict.fromkeys(platforms)):
+            not_before = self._schedule_for(platform, index, schedule_strategy, custom_schedule, base_time)
+            account = accounts_by_platform.get(platform)
+            upload = {**content, "user_id": user_id, "platform": platform}
+            if account:
+                upload["account_id"] = account["id"]
+            if not_before:
+                upload["scheduled_at"] = not_before
+            targets.append(PublishTarget(platform=platform, account=account, upload=upload, not_before=not_before))
+
+        await asyncio.gather(*(self._create_upload_row(target) for target in targets))
+        return self._start(user_id, targets, publish)
+
+    def submit_upload(
+        self,
+        user_id: str,
+        upload: Dict[str, Any],
+        account: Dict[str, Any],
+        publish: Publisher
+    ) -> PublishJob:
+        """Publish an existing content_uploads row now, in the background"""
+        target = PublishTarget(platform=upload.get("platform") or account.get("platform"), account=account, upload=upload)
+        return self._start(user_id, [target], publish)
+
+    def _start(self, user_id: str, targets: List[PublishTarget], publish: Publisher) -> PublishJob:
+        self._prune()
+        job = PublishJob(job_id=uuid.uuid4().hex, user_id=user_id, targets=targets, publish=publish)
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"📤 Publish job {job.job_id} queued for {[t.platform for t in targets]}")
+        return job
+
+    @staticmethod
+    def _schedule_for(
+        platform: str,
+        index: int,
+        strategy: str,
+        custom_schedule: Optional[Dict[str, datetime]],
+        base_time: Optional[datetime]
+    ) -> Optional[datetime]:
+        if strategy == "custom" and custom_schedule and custom_schedule.get(platform):
+            return custom_schedule[platform]
+        if strategy == "staggered":
+            start = base_time or datetime.now(timezone.utc)
+            return start + STAGGER_INTERVAL * index if index or base_time else None
+        return base_time
+
+    async def _create_upload_row(self, target: PublishTarget) -> None:
+        if not target.account:
+            target.status = "skipped"
+            target.error = f"No connected {target.platform} account"
+            return
+        row = {key: value for key, value in target.upload.items() if value is not None}
+        row["status"] = "scheduled"
+        try:
+            result = await supabase_client.create_content_upload(json.loads(json.dumps(row, default=str)))
+            created = result.get("data")
+            if isinstance(created, list) and created:
+                created = created[0]
+            if isinstance(created, dict):
+                target.upload = {**target.upload, **created}
+        except Exception as e:
+            target.status = "failed"
+            target.error = f"Could not create upload record: {e}"
+
+    # ------------------------------------------------------------------
+    # Status and streaming
+    # ------------------------------------------------------------------
+
+    def get(self, job_id: str, user_id: Optional[str] = None) -> Optional[PublishJob]:
+        job = self._jobs.get(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    async def events(self, job: PublishJob) -> AsyncIterator[Dict[str, Any]]:
+        """Snapshot first, then every change until the job finishes"""
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            yield {"event": "snapshot", "payload": job.snapshot()}
+            while not job.finished:
+                event = await queue.get()
+                yield event
+                if event["event"] == "job_finished":
+                    return
+        finally:
+            if queue in job.subscribers:
+                job.subscribers.remove(queue)
+
+    def _emit(self, job: PublishJob, event: str, payload: Dict[str, Any]) -> None:
+        for queue in list(job.subscribers):
+            queue.put_nowait({"event": event, "payload": payload})
+
+    def _prune(self) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.job_ttl_seconds)
+        for job_id in [k for k, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    # ------------------------------------------------------------------
+    # Running jobs
+    # ------------------------------------------------------------------
+
+    async def _run(self, job: PublishJob) -> None:
+        job.status = "running"
+        self._emit(job, "job_started", job.snapshot())
+        pending = [t for t in job.targets if t.status not in TERMINAL_TARGET_STATES]
+        await asyncio.gather(*(self._run_target(job, target) for target in pending))
+
+        posted = sum(1 for t in job.targets if t.status == "posted")
+        scheduled = sum(1 for t in job.targets if t.status == "scheduled")
+        if posted == len(job.targets):
+            job.status = "completed"
+        elif scheduled and posted + scheduled == len(job.targets):
+            job.status = "scheduled"
+        elif posted:
+            job.status = "partial"
+        else:
+            job.status = "failed"
+        job.finished_at = datetime.now(timezone.utc)
+        logger.info(f"✅ Publish job {job.job_id} {job.status}: {posted}/{len(job.targets)} posted")
+        self._emit(job, "job_finished", job.snapshot())
+
+    async def _run_target(self, job: PublishJob, target: PublishTarget) -> None:
+        try:
+            if not await self._wait_until_due(job, target):
+                return
+            if not await self._claim(job, target):
+                return
+            heartbeat = asyncio.create_task(self._heartbeat(target)) if target.claimed else None
+            try:
+                async with self._limiter(target.platform):
+                    await self._publish_with_retries(job, target)
+            finally:
+                if heartbeat is not None:
+                    heartbeat.cancel()
+        except Exception as e:
+            # Never let one target take the job down with it
+            logger.error(f"❌ Publish job {job.job_id} target {target.platform} crashed: {e}")
+            target.status = "failed"
+            target.error = str(e)
+            await self._persist(job, target, {"status": "failed", "error_message": str(e)})
+
+    async def _wait_until_due(self, job: PublishJob, target: PublishTarget) -> bool:
+        """
+        Sleep until a target is due if that is within one scheduler poll; False when it
+        is left "scheduled" in content_uploads for the scheduler loop instead
+        """
+        if not target.not_before:
+            return True
+        not_before = target.not_before
+        if not_before.tzinfo is None:
+            not_before = not_before.replace(tzinfo=timezone.utc)
+        delay = (not_before - datetime.now(timezone.utc)).total_seconds()
+        if delay <= 0:
+            return True
+        if self.scheduler_enabled and target.upload_id and delay > self.scheduler_poll_seconds:
+            target.status = "scheduled"
+            self._emit(job, "target_update", target.snapshot())
+            return False
+        target.status = "waiting"
+        self._emit(job, "target_update", target.snapshot())
+        await asyncio.sleep(delay)
+        return True
+
+    async def _claim(self, job: PublishJob, target: PublishTarget) -> bool:
+        """Take the upload row for this worker so no other request, worker or the scheduler publishes it too"""
+        if target.claimed or not target.upload_id:
+            return True
+        now = datetime.now(timezone.utc)
+        row = await supabase_client.claim_content_upload(
+            target.upload_id, now.isoformat(), (now - CLAIM_TIMEOUT).isoformat()
+        )
+        if row is not None:
+            target.upload = {**target.upload, **row}
+            target.claimed = True
+            return True
+        if not await self._already_posted(job, target):
+            target.status = "skipped"
+            target.error = "Already being published, or no longer publishable"
+            self._emit(job, "target_update", target.snapshot())
+        return False
+
+    async def _heartbeat(self, target: PublishTarget) -> None:
+        """Refresh the claim's lease until cancelled, so a slow publish is never taken for abandoned"""
+        while True:
+            await asyncio.sleep(CLAIM_HEARTBEAT.total_seconds())
+            try:
+                await supabase_client.update_content_upload(
+                    target.upload_id, {"last_attempt_at": datetime.now(timezone.utc).isoformat()}
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Could not refresh the claim on upload {target.upload_id}: {e}")
+
+    async def _already_posted(self, job: PublishJob, target: PublishTarget) -> bool:
+        """Adopt the post_id stored on the upload row, if an earlier attempt or worker already published it"""
+        if not target.upload_id:
+            return False
+        try:
+            row = await supabase_client.get_content_upload(target.upload_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not check upload {target.upload_id} before publishing: {e}")
+            return False
+        if not row or not row.get("post_id"):
+            return False
+        target.status = "posted"
+        target.post_id = row.get("post_id")
+        target.post_url = row.get("post_url")
+        target.error = None
+        if row.get("status") == "posted":
+            self._emit(job, "target_update", target.snapshot())
+        else:
+            await self._persist(job, target, {"status": "posted", "error_message": None})
+        logger.info(f"ℹ️ Upload {target.upload_id} already posted as {target.post_id}, not publishing again")
+        return True
+
+    async def _publish_with_retries(self, job: PublishJob, target: PublishTarget) -> None:
+        while True:
+            if await self._already_posted(job, target):
+                return
+            target.attempts += 1
+            target.status = "publishing"
+            self._emit(job, "target_update", target.snapshot())
+            try:
+                result = await job.publish(target.upload, target.account, job.user_id)
+            except Exception as e:
+                target.error = str(e)
+                if not is_retryable(e) or target.attempts >= self.max_attempts:
+                    target.status = "failed"
+                    await self._persist(job, target, {"status": "failed", "error_message": target.error})
+                    return
+                target.status = "retrying"
+                await self._persist(job, target, {"error_message": target.error})
+                delay = self.retry_backoff * (2 ** (target.attempts - 1))
+                await asyncio.sleep(delay + random.uniform(0, self.retry_backoff))
+                continue
+
+            target.status = "posted"
+            target.post_id = result.get("post_id")
+            target.post_url = result.get("post_url")
+            target.error = None
+            await self._persist(job, target, {
+                "status": "posted",
+                "post_id": target.post_id,
+                "post_url": target.post_url,
+                "error_message": None
+            })
+            return
+
+    async def _persist(self, job: PublishJob, target: PublishTarget, update: Dict[str, Any]) -> None:
+        """Write the target's state to its content_uploads row and notify subscribers"""
+        self._emit(job, "target_update", target.snapshot())
+        if not target.upload_id:
+            return
+        update = {
+            **update,
+            "upload_attempts": target.upload.get("upload_attempts", 0) + target.attempts,
+            "last_attempt_at": datetime.now(timezone.utc).isoformat()
+        }
+        try:
+            await supabase_client.update_content_upload(target.upload_id, update)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not persist publish status for upload {target.upload_id}: {e}")
+
+    # ------------------------------------------------------------------
+    # Scheduled uploads
+    # ------------------------------------------------------------------
+
+    def start_scheduler(self, publish: Publisher = publish_to_platform) -> None:
+        """Poll content_uploads for due scheduled rows (one worker per host runs the loop)"""
+        if not self.scheduler_enabled or (self._scheduler_task and not self._scheduler_task.done()):
+            return
+        if not self._scheduler_lock.acquire():
+            logger.info("ℹ️ Publish scheduler already runs in another worker")
+            return
+        self._scheduler_task = asyncio.create_task(self._scheduler_loop(publish))
+        logger.info(f"✅ Publish scheduler started (every {self.scheduler_poll_seconds}s)")
+
+    async def stop_scheduler(self) -> None:
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+            try:
+                await self._scheduler_task
+            except asyncio.CancelledError:
+                pass
+            self._scheduler_task = None
+            logger.info("🛑 Publish scheduler stopped")
+        self._scheduler_lock.release()
+
+    async def _scheduler_loop(self, publish: Publisher) -> None:
+        while True:
+            try:
+                await self.publish_due(publish)
+            except Exception as e:
+                logger.error(f"❌ Publish scheduler run failed: {e}")
+            await asyncio.sleep(self.scheduler_poll_seconds)
+
+    async def publish_due(self, publish: Publisher = publish_to_platform) -> List[PublishJob]:
+        """
+        Start a job for every scheduled upload that is due and can be claimed.
+        Rows due within the last poll are left to the job that is sleeping on them.
+        """
+        now = datetime.now(timezone.utc)
+        due_before = now - timedelta(seconds=self.scheduler_poll_seconds)
+        rows = await supabase_client.get_due_scheduled_uploads(due_before.isoformat(), SCHEDULER_BATCH_SIZE)
+        if not rows:
+            return []
+
+        accounts_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        jobs = []
+        for row in rows:
+            # Only rows still scheduled: one that failed since the query is not retried here
+            claimed = await supabase_client.claim_content_upload(
+                row["id"], now.isoformat(), (now - CLAIM_TIMEOUT).isoformat(), free_statuses=()
+            )
+            if claimed is None:
+                continue
+            user_id = claimed.get("user_id")
+            if user_id not in accounts_by_user:
+                accounts_by_user[user_id] = await supabase_client.get_user_social_accounts(user_id)
+            accounts = accounts_by_user[user_id]
+            account = next((acc for acc in accounts if acc.get("id") == claimed.get("account_id")), None) or next(
+                (acc for acc in accounts if acc.get("platform") == claimed.get("platform") and acc.get("is_active", True)),
+                None
+            )
+            target = PublishTarget(platform=claimed.get("platform"), account=account, upload=claimed, claimed=True)
+            if account is None:
+                target.status = "failed"
+                target.error = f"No connected {target.platform} account"
+                await supabase_client.update_content_upload(
+                    target.upload_id, {"status": "failed", "error_message": target.error}
+                )
+                continue
+            jobs.append(self._start(user_id, [target], publish))
+        if jobs:
+            logger.info(f"⏰ Publish scheduler started {len(jobs)} due uploads")
+        return jobs
+
+    def _limiter(self, platform: str) -> PlatformRateLimiter:
+        limiter = self._limiters.get(platform)
+        if limiter is None:
+            limiter = PlatformRateLimiter(*self.rate_limits.get(platform, DEFAULT_RATE_LIMIT))
+            self._limiters[platform] = limiter
+        return limiter
+
+
+publish_job_engine = PublishJobEngine()
@@ -14,10 +14,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from typing import Dict, Literal, Tuple, List
+import logging
 import math
 import random
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
 Platform = Literal["facebook", "instagram", "youtube"]
 PerformanceLevel = Literal["poor", "average", "good", "excellent", "viral"]
 
@@ -336,8 +339,8 @@ def simulate_content_growth(initial_metrics: BaseMetrics, content_age_days: int,
     
     # Debug: Show initial state
     if content_age_days > 30:  # Only show for longer content
-        print(f"      🚀 Starting growth simulation for {platform} ({performance}):")
-        print(f"         Initial: views={current_metrics.views}, likes={current_metrics.likes}")
+        logger.debug("🚀 Starting growth simulation for %s (%s):", platform, performance)
+        logger.debug("Initial: views=%s, likes=%s", current_metrics.views, current_metrics.likes)
     
     # Simulate daily growth
     for day in range(content_age_days):
@@ -374,18 +377,18 @@ def simulate_content_growth(initial_metrics: BaseMetrics, content_age_days: int,
             # FINAL SAFETY CHECK: Ensure we never go backwards
             if new_value <= current_value:
                 new_value = current_value + 1
-                print(f"         ⚠️  Safety check: {metric_name} would have decreased, forcing +1")
+                logger.debug("⚠️  Safety check: %s would have decreased, forcing +1", metric_name)
             
             setattr(current_metrics, metric_name, new_value)
         
         # Debug: Show progress every 30 days for longer content
         if content_age_days > 30 and day % 30 == 0 and day > 0:
-            print(f"         Day {day}: views={current_metrics.views}, likes={current_metrics.likes} (phase: {phase})")
+            logger.debug("Day %s: views=%s, likes=%s (phase: %s)", day, current_metrics.views, current_metrics.likes, phase)
     
     # Debug: Show final state
     if content_age_days > 30:
-        print(f"         Final: views={current_metrics.views}, likes={current_metrics.likes}")
-        print(f"         Growth: views +{current_metrics.views - initial_metrics.views}, likes +{current_metrics.likes - initial_metrics.likes}")
+        logger.debug("Final: views=%s, likes=%s", current_metrics.views, current_metrics.likes)
+        logger.debug("Growth: views +%s, likes +%s", current_metrics.views - initial_metrics.views, current_metrics.likes - initial_metrics.likes)
     
     return current_metrics
 
@@ -440,11 +443,11 @@ def calculate_realistic_financials(metrics: BaseMetrics, platform: Platform,
     max_safe_value = 99_999_999.99
     if ad_spend > max_safe_value:
         ad_spend = max_safe_value
-        print(f"      ⚠️  Capped ad_spend at {max_safe_value} to prevent overflow")
+        logger.warning("⚠️  Capped ad_spend at %s to prevent overflow", max_safe_value)
     
     if actual_revenue > max_safe_value:
         actual_revenue = max_safe_value
-        print(f"      ⚠️  Capped revenue at {max_safe_value} to prevent overflow")
+        logger.warning("⚠️  Capped revenue at %s to prevent overflow", max_safe_value)
 
     return {
         "ad_spend": round(ad_spend, 2),
@@ -537,7 +540,7 @@ async def fetch_latest_platform_metrics(supabase_client, user_id: str) -> Dict[s
     platforms = ["youtube", "facebook", "instagram"]
     latest_metrics = {}
     
-    print(f"      🔍 Fetching latest metrics for user: {user_id}")
+    logger.debug("🔍 Fetching latest metrics for user: %s", user_id)
     
     for platform in platforms:
         try:
@@ -553,11 +556,11 @@ async def fetch_latest_platform_metrics(supabase_client, user_id: str) -> Dict[s
                 }
             )
             
-            print(f"         🔍 {platform} query response: {response.status_code}")
+            logger.debug("🔍 %s query response: %s", platform, response.status_code)
             
             if response.status_code == 200 and response.json():
                 data = response.json()[0]
-                print(f"         📊 {platform} raw data: {data}")
+                logger.debug("📊 %s raw data: %s", platform, data)
                 
                 # Create BaseMetrics object from database row
                 metrics = BaseMetrics(
@@ -570,11 +573,11 @@ async def fetch_latest_platform_metrics(supabase_client, user_id: str) -> Dict[s
                 )
                 
                 latest_metrics[platform] = metrics
-                print(f"         📊 {platform}: views={metrics.views}, likes={metrics.likes}, content_type={data.get('content_type', 'unknown')}")
+                logger.debug("📊 %s: views=%s, likes=%s, content_type=%s", platform, metrics.views, metrics.likes, data.get('content_type', 'unknown'))
                 
             else:
-                print(f"         ⚠️  No data found for {platform}, using realistic default metrics")
-                print(f"         🔍 Response: {response.status_code} - {response.text if hasattr(response, 'text') else 'No text'}")
+                logger.warning("⚠️  No data found for %s, using realistic default metrics", platform)
+                logger.debug("🔍 Response: %s - %s", response.status_code, response.text if hasattr(response, 'text') else 'No text')
                 # Use realistic default metrics if no data found
                 # These will be used as starting points for new content
                 if platform == "youtube":
@@ -585,10 +588,10 @@ async def fetch_latest_platform_metrics(supabase_client, user_id: str) -> Dict[s
                     default_metrics = BaseMetrics(views=200, likes=25, comments=10, shares=15, clicks=18, saves=8)
                 
                 latest_metrics[platform] = default_metrics
-                print(f"         🚀 {platform}: using defaults - views={default_metrics.views}, likes={default_metrics.likes}")
+                logger.debug("🚀 %s: using defaults - views=%s, likes=%s", platform, default_metrics.views, default_metrics.likes)
                 
         except Exception as e:
-            print(f"         ❌ Error fetching {platform} metrics: {e}")
+            logger.error("❌ Error fetching %s metrics: %s", platform, e)
             # Use realistic default metrics on error
             if platform == "youtube":
                 default_metrics = BaseMetrics(views=150, likes=15, comments=8, shares=5, clicks=12, saves=3)
@@ -598,9 +601,9 @@ async def fetch_latest_platform_metrics(supabase_client, user_id: str) -> Dict[s
                 default_metrics = BaseMetrics(views=200, likes=25, comments=10, shares=15, clicks=18, saves=8)
             
             latest_metrics[platform] = default_metrics
-            print(f"         🚀 {platform}: using fallback defaults - views={default_metrics.views}, likes={default_metrics.likes}")
+            logger.debug("🚀 %s: using fallback defaults - views=%s, likes=%s", platform, default_metrics.views, default_metrics.likes)
     
-    print(f"      ✅ Fetched metrics for {len(latest_metrics)} platforms")
+    logger.debug("✅ Fetched metrics for %s platforms", len(latest_metrics))
     return latest_metrics
 
 def apply_10min_growth(current_metrics: BaseMetrics, platform: Platform, 
@@ -615,7 +618,7 @@ def apply_10min_growth(current_metrics: BaseMetrics, platform: Platform,
     # Use provided content_age_days or default to 1 if not provided
     if content_age_days is None:
         content_age_days = 1
-        print(f"         ⚠️  No content age provided, using default: {content_age_days} day")
+        logger.warning("⚠️  No content age provided, using default: %s day", content_age_days)
     
     phase = determine_lifecycle_phase(current_views, content_age_days)
     daily_growth = get_growth_multipliers(phase, performance)
@@ -671,7 +674,7 @@ async def generate_next_10min_update(supabase_client, user_id: str) -> List[Dict
     3. Calculating new financial metrics
     4. Returning 3 records ready for insertion
     """
-    print(f"🔄 Generating next 10-minute update for user: {user_id}")
+    logger.debug("🔄 Generating next 10-minute update for user: %s", user_id)
     
     # Fetch latest metrics from database
     latest_metrics = await fetch_latest_platform_metrics(supabase_client, user_id)
@@ -691,7 +694,7 @@ async def generate_next_10min_update(supabase_client, user_id: str) -> List[Dict
         else:
             performance = "poor"
         
-        print(f"      📊 {platform.title()}: {performance} performance (engagement: {engagement_rate:.3f})")
+        logger.debug("📊 %s: %s performance (engagement: %.3f)", platform.title(), performance, engagement_rate)
         
         # Use default content age since we don't need precise calculation
         content_age_days = 1
@@ -730,10 +733,10 @@ async def generate_next_10min_update(supabase_client, user_id: str) -> List[Dict
         
         next_updates.append(record)
         
-        print(f"         Growth: views {current_metrics.views} → {updated_metrics.views} (+{updated_metrics.views - current_metrics.views})")
-        print(f"         Growth: likes {current_metrics.likes} → {updated_metrics.likes} (+{updated_metrics.likes - current_metrics.likes})")
+        logger.debug("Growth: views %s → %s (+%s)", current_metrics.views, updated_metrics.views, updated_metrics.views - current_metrics.views)
+        logger.debug("Growth: likes %s → %s (+%s)", current_metrics.likes, updated_metrics.likes, updated_metrics.likes - current_metrics.likes)
     
-    print(f"      ✅ Generated {len(next_updates)} platform updates")
+    logger.debug("✅ Generated %s platform updates", len(next_updates))
     return next_updates
 
 class DataGeneratorService:
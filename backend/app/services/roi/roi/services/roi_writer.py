@@ -11,10 +11,13 @@ from __future__ import annotations
 
 import os
 import asyncio
+import logging
 from dataclasses import asdict
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Tuple
 
+logger = logging.getLogger(__name__)
+
 # Import Supabase client instead of asyncpg
 try:
     from app.core.supabase_client import supabase_client
@@ -80,7 +83,7 @@ async def get_latest_roi_metrics_all() -> List[Dict[str, Any]]:
             return list(latest_metrics.values())
         return []
     except Exception as e:
-        print(f"Error getting latest ROI metrics: {e}")
+        logger.error("Error getting latest ROI metrics: %s", e)
         return []
 
 async def get_latest_roi_metrics_user(user_id: str) -> List[Dict[str, Any]]:
@@ -107,7 +110,7 @@ async def get_latest_roi_metrics_user(user_id: str) -> List[Dict[str, Any]]:
             return list(latest_metrics.values())
         return []
     except Exception as e:
-        print(f"Error getting latest ROI metrics for user {user_id}: {e}")
+        logger.error("Error getting latest ROI metrics for user %s: %s", user_id, e)
         return []
 
 async def insert_roi_metric(
@@ -158,7 +161,7 @@ async def insert_roi_metric(
             return result[0]["id"] if result else None
         return None
     except Exception as e:
-        print(f"Error inserting ROI metric: {e}")
+        logger.error("Error inserting ROI metric: %s", e)
         return None
 
 async def get_most_recent_user() -> str | None:
@@ -195,7 +198,7 @@ async def get_most_recent_user() -> str | None:
         
         return None
     except Exception as e:
-        print(f"Error getting most recent user: {e}")
+        logger.error("Error getting most recent user: %s", e)
         return None
 
 async def execute_roi_update() -> int:
@@ -205,15 +208,15 @@ async def execute_roi_update() -> int:
         only_user: str | None = await get_most_recent_user()
 
         if not only_user:
-            print("⚠️  No target user found, processing all users")
+            logger.warning("⚠️  No target user found, processing all users")
             # For now, use a default user if none found
             only_user = "user_31VgZVmUnz3XYl4DnOB1NQG5TwP"
 
-        print(f"🎯 ROI Writer targeting user: {only_user}")
-        print("🔄 Using NEW LIVE 10-MINUTE UPDATE LOGIC!")
-        print("   📊 Fetches latest 3 rows (1 per platform)")
-        print("   📈 Applies growth multipliers to existing values")
-        print("   ⏰ Inserts 3 new rows every 10 minutes")
+        logger.info("🎯 ROI Writer targeting user: %s", only_user)
+        logger.debug("🔄 Using NEW LIVE 10-MINUTE UPDATE LOGIC!")
+        logger.debug("📊 Fetches latest 3 rows (1 per platform)")
+        logger.debug("📈 Applies growth multipliers to existing values")
+        logger.debug("⏰ Inserts 3 new rows every 10 minutes")
         
         # Use the new live update logic
         data_service = DataGeneratorService()
@@ -232,7 +235,7 @@ async def execute_roi_update() -> int:
                     views = update_record["views"]
                     likes = update_record["likes"]
                     
-                    print(f"✅ Inserted {platform}: views={views}, likes={likes}")
+                    logger.debug("✅ Inserted %s: views=%s, likes=%s", platform, views, likes)
                     
                     # Publish status for real-time updates
                     publish_status("roi_update", {
@@ -244,17 +247,17 @@ async def execute_roi_update() -> int:
                     })
                     
                 else:
-                    print(f"❌ Failed to insert {update_record['platform']}: {response.status_code}")
+                    logger.error("❌ Failed to insert %s: %s", update_record['platform'], response.status_code)
                     
             except Exception as e:
-                print(f"❌ Error inserting {update_record['platform']}: {e}")
+                logger.error("❌ Error inserting %s: %s", update_record['platform'], e)
                 continue
         
-        print(f"🎉 Live update completed: {inserted}/3 platform updates inserted")
+        logger.info("🎉 Live update completed: %s/3 platform updates inserted", inserted)
         return inserted
 
     except Exception as e:
-        print(f"Error in execute_roi_update: {e}")
+        logger.error("Error in execute_roi_update: %s", e)
         raise
 
 if __name__ == "__main__":
@@ -0,0 +1,63 @@
+-- Social insights (hourly Graph API snapshots and their day/week rollups)
+-- Written by app/services/social_insights: sync.py upserts hourly rows, rollups.py the
+-- day/week rows. Upserts resolve conflicts on social_insights_window_key, so PostgREST's
+-- on_conflict=user_id,platform,account_id,period,window_start needs this exact constraint.
+
+CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+CREATE TABLE IF NOT EXISTS social_insights (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id VARCHAR(255) NOT NULL,
+    platform VARCHAR(50) NOT NULL,
+    account_id VARCHAR(255) NOT NULL,
+    period VARCHAR(10) NOT NULL CHECK (period IN ('hour', 'day', 'week')),
+    window_start TIMESTAMPTZ NOT NULL,
+    window_end TIMESTAMPTZ NOT NULL,
+    metrics JSONB NOT NULL DEFAULT '{}',
+    derived JSONB NOT NULL DEFAULT '{}',
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT social_insights_window_key UNIQUE (user_id, platform, account_id, period, window_start)
+);
+
+-- /insights reads: one user and platform, one period, a window_start range
+CREATE INDEX IF NOT EXISTS idx_social_insights_user_platform_period_start
+    ON social_insights(user_id, platform, period, window_start);
+-- Sync skip check and rollup loads: every account's row for one window
+CREATE INDEX IF NOT EXISTS idx_social_insights_period_start ON social_insights(period, window_start);
+
+-- updated_at trigger (update_updated_at_column() is defined in 02_roi_triggers.sql)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'update_updated_at_column') THEN
+        IF EXISTS (
+            SELECT 1 FROM pg_trigger WHERE tgname = 'trg_social_insights_updated_at'
+        ) THEN
+            DROP TRIGGER trg_social_insights_updated_at ON social_insights;
+        END IF;
+        CREATE TRIGGER trg_social_insights_updated_at
+        BEFORE UPDATE ON social_insights
+        FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+    END IF;
+END$$;
+
+-- Optional FK to users by clerk_id (assumes public.users exists)
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema='public' AND table_name='users' AND column_name='clerk_id'
+    ) THEN
+        IF NOT EXISTS (
+            SELECT 1 FROM information_schema.table_constraints
+            WHERE constraint_name='fk_social_insights_user' AND table_name='social_insights'
+        ) THEN
+            ALTER TABLE social_insights
+            ADD CONSTRAINT fk_social_insights_user FOREIGN KEY (user_id) REFERENCES users(clerk_id) ON DELETE CASCADE;
+        END IF;
+    END IF;
+END $$;
+
+COMMENT ON TABLE social_insights IS 'Facebook/Instagram insight windows per user, platform and account (hour, day and week periods)';
+COMMENT ON COLUMN social_insights.metrics IS 'Metric values for the window; day/week rows hold the rolled-up values';
+COMMENT ON COLUMN social_insights.derived IS 'Sync metadata; rollups keep their source windows and per-metric stats here';
@@ -0,0 +1,15 @@
+"""
+Social Insights Services Package
+Background sync of Facebook/Instagram insights and their day/week rollups
+"""
+
+from .rollups import InsightsRollupService, choose_resolution, insights_rollup_service
+from .sync import InsightsSyncService, insights_sync_service
+
+__all__ = [
+    "InsightsRollupService",
+    "InsightsSyncService",
+    "choose_resolution",
+    "insights_rollup_service",
+    "insights_sync_service"
+]
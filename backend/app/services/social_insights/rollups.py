@@ -0,0 +1,339 @@
+"""
+Insights rollups
+Maintains day and week aggregates per user, platform and account next to the hourly
+insight rows (same table, period "day"/"week"), updated incrementally whenever hourly
+windows are written, and answers /insights reads at the resolution that fits the span.
+
+Each rollup row keeps its inputs in ``derived.sources`` (at most 24 hours for a day, 7
+days for a week), so re-syncing an hour replaces its contribution instead of adding it
+twice; the per-metric stats are recomputed from those few sources on every update.
+
+Hourly rows are snapshots of what the Graph API reports at sync time, mostly running
+daily totals, so values are not simply summed: METRIC_KINDS says how each metric
+collapses within a day and combines across days and weeks. Rollup updates are
+read-modify-write, so they are serialized per worker and across workers on the host.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.state_db import HostLock
+from app.core.supabase_client import supabase_client
+
+logger = logging.getLogger(__name__)
+
+PERIOD_LENGTHS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1)
+}
+
+# Largest span (in hours) served from each resolution; beyond the last, weeks are used
+RESOLUTION_LIMITS = [("hour", 48), ("day", 24 * 60)]
+
+ROLLUP_COLUMNS = ("user_id", "platform", "account_id", "period", "window_start", "window_end", "metrics", "derived")
+
+RollupKey = Tuple[str, str, str, str]  # user_id, platform, account_id, window_start
+
+# How a metric aggregates. Within a day every kind but "delta" keeps the latest snapshot;
+# across days/weeks "daily" and "delta" add up, "unique" takes the max (the same people
+# are counted again each day) and "cumulative" keeps the latest value.
+#   daily       the value for the current day so far (Graph API period=day)
+#   unique      daily count of distinct users (reach)
+#   cumulative  lifetime counter (followers_count)
+#   delta       activity within the hourly window itself
+METRIC_KINDS = {
+    "page_impressions": "daily",
+    "page_engaged_users": "daily",
+    "impressions": "daily",
+    "profile_views": "daily",
+    "reach": "unique",
+    "followers_count": "cumulative"
+}
+DEFAULT_METRIC_KIND = "daily"
+
+# How long apply() waits for another worker's rollup update before giving up
+ROLLUP_LOCK_TIMEOUT_SECONDS = 60.0
+
+
+def period_start(dt: datetime, period: str) -> datetime:
+    """Start of the day (UTC midnight) or ISO week (Monday) containing ``dt``"""
+    dt = dt.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if period == "hour":
+        return dt
+    dt = dt.replace(hour=0)
+    if period == "week":
+        dt -= timedelta(days=dt.weekday())
+    return dt
+
+
+def choose_resolution(hours: int) -> str:
+    """Pick the coarsest resolution that still gives a useful number of points"""
+    for period, max_hours in RESOLUTION_LIMITS:
+        if hours <= max_hours:
+            return period
+    return "week"
+
+
+def _parse_time(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _numeric(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def metric_kind(name: str) -> str:
+    return METRIC_KINDS.get(name, DEFAULT_METRIC_KIND)
+
+
+def combine_values(name: str, earlier: float, later: float) -> float:
+    """Value of two consecutive day/week windows of one metric"""
+    kind = metric_kind(name)
+    if kind == "unique":
+        return max(earlier, later)
+    if kind == "cumulative":
+        return later
+    return earlier + later
+
+
+def metric_stats(sources: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """
+    sum/count/min/max/last per numeric metric over the hourly windows of one day, plus
+    ``value``: the sum for delta metrics, the latest snapshot for everything else
+    """
+    stats: Dict[str, Dict[str, float]] = {}
+    for window in sorted(sources):
+        for name, raw in sources[window].items():
+            value = _numeric(raw)
+            if value is None:
+                continue
+            s = stats.get(name)
+            if s is None:
+                stats[name] = {"sum": value, "count": 1, "min": value, "max": value, "last": value}
+            else:
+                s["sum"] += value
+                s["count"] += 1
+                s["min"] = min(s["min"], value)
+                s["max"] = max(s["max"], value)
+                s["last"] = value
+    for name, s in stats.items():
+        s["value"] = s["sum"] if metric_kind(name) == "delta" else s["last"]
+    return stats
+
+
+def combine_stats(sources: Dict[str, Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Merge per-day stats into week stats"""
+    stats: Dict[str, Dict[str, float]] = {}
+    for window in sorted(sources):
+        for name, day in sources[window].items():
+            # Day stats stored before ``value`` existed only have the raw snapshot stats
+            day_value = day.get("value", day["sum"] if metric_kind(name) == "delta" else day["last"])
+            s = stats.get(name)
+            if s is None:
+                stats[name] = {**day, "value": day_value}
+            else:
+                s["sum"] += day["sum"]
+                s["count"] += day["count"]
+                s["min"] = min(s["min"], day["min"])
+                s["max"] = max(s["max"], day["max"])
+                s["last"] = day["last"]
+                s["value"] = combine_values(name, s["value"], day_value)
+    return stats
+
+
+def window_totals(rows: List[Dict[str, Any]], period: str) -> Dict[str, float]:
+    """Per-metric totals over consecutive windows of one period"""
+    ordered = sorted(rows, key=lambda r: _parse_time(r["window_start"]))
+    if period == "hour":
+        # Hourly rows are snapshots: collapse each day to its value first
+        days: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for row in ordered:
+            start = _parse_time(row["window_start"])
+            days.setdefault(period_start(start, "day").isoformat(), {})[start.isoformat()] = row.get("metrics") or {}
+        windows = [
+            {name: s["value"] for name, s in metric_stats(days[day]).items()}
+            for day in sorted(days)
+        ]
+    else:
+        windows = [row.get("metrics") or {} for row in ordered]
+
+    totals: Dict[str, float] = {}
+    for metrics in windows:
+        for name, raw in metrics.items():
+            value = _numeric(raw)
+            if value is None:
+                continue
+            totals[name] = combine_values(name, totals[name], value) if name in totals else value
+    return totals
+
+
+class InsightsRollupService:
+    """Incremental hour -> day -> week rollups and resolution-aware reads"""
+
+    def __init__(self):
+        self._apply_lock = asyncio.Lock()
+        self._host_lock = HostLock("insights_rollups")
+
+    async def apply(self, hourly_rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Fold freshly written hourly rows into their day and week rollups
+
+        Reads the affected rollup rows once per period, updates them in memory and
+        batch-upserts them. Only one update runs at a time on the host, so a concurrent
+        sync cannot overwrite the sources another one just added. Returns the number of
+        rollup rows written.
+        """
+        hourly_rows = [row for row in hourly_rows if row.get("period") == "hour"]
+        if not hourly_rows:
+            return 0
+
+        async with self._apply_lock:
+            if not await self._host_lock.wait(ROLLUP_LOCK_TIMEOUT_SECONDS):
+                raise TimeoutError(f"another worker held the rollup lock for {ROLLUP_LOCK_TIMEOUT_SECONDS:.0f}s")
+            try:
+                return await self._apply(hourly_rows)
+            finally:
+                self._host_lock.release()
+
+    async def _apply(self, hourly_rows: List[Dict[str, Any]]) -> int:
+        days = await self._load_rollups("day", hourly_rows)
+        touched_days = set()
+        for row in hourly_rows:
+            key = self._key(row, "day")
+            rollup = days.setdefault(key, self._new_rollup(row, "day"))
+            rollup["derived"]["sources"][_parse_time(row["window_start"]).isoformat()] = row.get("metrics") or {}
+            touched_days.add(key)
+        for key in touched_days:
+            rollup = days[key]
+            rollup["derived"]["stats"] = metric_stats(rollup["derived"]["sources"])
+            rollup["metrics"] = {name: s["value"] for name, s in rollup["derived"]["stats"].items()}
+
+        day_rows = [days[key] for key in touched_days]
+        weeks = await self._load_rollups("week", day_rows)
+        touched_weeks = set()
+        for day in day_rows:
+            key = self._key(day, "week")
+            rollup = weeks.setdefault(key, self._new_rollup(day, "week"))
+            rollup["derived"]["sources"][day["window_start"]] = day["derived"]["stats"]
+            touched_weeks.add(key)
+        for key in touched_weeks:
+            rollup = weeks[key]
+            rollup["derived"]["stats"] = combine_stats(rollup["derived"]["sources"])
+            rollup["metrics"] = {name: s["value"] for name, s in rollup["derived"]["stats"].items()}
+
+        # Bulk upserts need identical keys on every row, so drop server-side columns
+        updated = [
+            {column: rollup.get(column) for column in ROLLUP_COLUMNS}
+            for rollup in day_rows + [weeks[key] for key in touched_weeks]
+        ]
+        await supabase_client.upsert_insights(updated)
+        return len(updated)
+
+    async def _load_rollups(self, period: str, rows: List[Dict[str, Any]]) -> Dict[RollupKey, Dict[str, Any]]:
+        keys = {self._key(row, period) for row in rows}
+        existing = await supabase_client.get_insight_windows(
+            period,
+            window_starts=sorted({key[3] for key in keys}),
+            user_ids=sorted({key[0] for key in keys})
+        )
+        loaded = {}
+        for row in existing:
+            key = (row.get("user_id"), row.get("platform"), row.get("account_id"),
+                   _parse_time(row["window_start"]).isoformat())
+            if key in keys:
+                row["derived"] = {**(row.get("derived") or {})}
+                row["derived"].setdefault("sources", {})
+                row["window_start"] = key[3]
+                loaded[key] = row
+        return loaded
+
+    @staticmethod
+    def _key(row: Dict[str, Any], period: str) -> RollupKey:
+        start = period_start(_parse_time(row["window_start"]), period)
+        return (row.get("user_id"), row.get("platform"), row.get("account_id"), start.isoformat())
+
+    def _new_rollup(self, row: Dict[str, Any], period: str) -> Dict[str, Any]:
+        start = period_start(_parse_time(row["window_start"]), period)
+        return {
+            "user_id": row.get("user_id"),
+            "platform": row.get("platform"),
+            "account_id": row.get("account_id"),
+            "period": period,
+            "window_start": start.isoformat(),
+            "window_end": (start + PERIOD_LENGTHS[period]).isoformat(),
+            "metrics": {},
+            "derived": {"sources": {}}
+        }
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def read(
+        self,
+        user_id: str,
+        platform: str,
+        hours: int,
+        period: Optional[str] = None,
+        account_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Series for the last ``hours`` at ``period`` (chosen from the span if omitted),
+        plus totals for the span and deltas against the span before it
+        """
+        period = period or choose_resolution(hours)
+        until = datetime.now(timezone.utc)
+        since = until - timedelta(hours=hours)
+        # Rollup windows start on period boundaries, so widen the query to include the
+        # window that contains ``since`` and the matching previous span
+        previous_since = period_start(since - timedelta(hours=hours), period)
+
+        rows = await supabase_client.get_insights(
+            user_id=user_id,
+            platform=platform,
+            period=period,
+            since=previous_since.isoformat(),
+            until=until.isoformat(),
+            account_id=account_id
+        )
+        current_from = period_start(since, period)
+        current = [r for r in rows if _parse_time(r["window_start"]) >= current_from]
+        previous = [r for r in rows if _parse_time(r["window_start"]) < current_from]
+
+        current_totals = window_totals(current, period)
+        previous_totals = window_totals(previous, period)
+        deltas = {}
+        for name, value in current_totals.items():
+            before = previous_totals.get(name)
+            deltas[name] = {
+                "previous": before,
+                "change": value - before if before is not None else None,
+                "change_pct": round((value - before) * 100.0 / before, 1) if before else None
+            }
+
+        return {
+            "platform": platform,
+            "period": period,
+            "series": [
+                {"window_start": r.get("window_start"), "metrics": r.get("metrics", {})}
+                for r in current
+            ],
+            "aggregates": {
+                "totals": current_totals,
+                "deltas": deltas,
+                "points": len(current),
+                "since": since.isoformat(),
+                "until": until.isoformat()
+            },
+        }
+
+
+insights_rollup_service = InsightsRollupService()
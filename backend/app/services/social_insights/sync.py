@@ -0,0 +1,266 @@
+"""
+Background social insights sync
+Fetches hourly Facebook Page / Instagram insights for every connected account of every
+user concurrently under a Graph API rate limit, skips windows that are already stored
+and batch-upserts the rest (then folds them into the day/week rollups), so /insights
+reads never wait for the Graph API.
+
+Only one uvicorn worker per host runs the periodic loop (it holds a lock under
+STATE_DIR); the others serve /insights reads and manual syncs. The social_insights
+table is defined in app/services/roi/roi/sql/04_social_insights.sql.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.state_db import HostLock
+from app.core.supabase_client import supabase_client
+from app.services.publishing import get_graph_client
+from .rollups import insights_rollup_service
+
+logger = logging.getLogger(__name__)
+
+SYNC_PLATFORMS = ["facebook", "instagram"]
+FACEBOOK_METRICS = ["page_impressions", "page_engaged_users"]
+INSTAGRAM_METRICS = ["impressions", "reach", "profile_views"]
+UPSERT_BATCH_SIZE = 500
+
+
+def floor_to_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+class GraphRateLimiter:
+    """Token bucket shared by all sync fetches: ``rate`` calls per second, bursts up to ``burst``"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_facebook_page_insights(client: httpx.AsyncClient, access_token: str) -> dict:
+    try:
+        # With a Page access token, 'me' refers to the Page
+        resp = await client.get(
+            "https://graph.facebook.com/me/insights",
+            params={"access_token": access_token, "metric": ",".join(FACEBOOK_METRICS)},
+        )
+        if resp.status_code != 200:
+            return {"error": resp.text}
+        return _latest_values(resp.json().get("data", []))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def fetch_instagram_user_insights(client: httpx.AsyncClient, ig_user_id: str, access_token: str) -> dict:
+    try:
+        resp = await client.get(
+            f"https://graph.facebook.com/{ig_user_id}/insights",
+            params={"access_token": access_token, "metric": ",".join(INSTAGRAM_METRICS), "period": "day"},
+        )
+        if resp.status_code != 200:
+            return {"error": resp.text}
+        return _latest_values(resp.json().get("data", []))
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def _latest_values(data: List[Dict[str, Any]]) -> dict:
+    out = {}
+    for m in data:
+        values = m.get("values", [])
+        if values:
+            out[m.get("name")] = values[0].get("value")
+    return out
+
+
+class InsightsSyncService:
+    """Periodic, concurrent insights sync for all users"""
+
+    def __init__(
+        self,
+        interval_seconds: int = settings.INSIGHTS_SYNC_INTERVAL_SECONDS,
+        max_concurrency: int = settings.INSIGHTS_SYNC_CONCURRENCY,
+        graph_calls_per_second: float = settings.INSIGHTS_SYNC_GRAPH_CALLS_PER_SECOND
+    ):
+        self.interval_seconds = interval_seconds
+        self.max_concurrency = max_concurrency
+        self.graph_calls_per_second = graph_calls_per_second
+        self._task: Optional[asyncio.Task] = None
+        self._limiter: Optional[GraphRateLimiter] = None
+        self._lock = HostLock("insights_sync")
+        self.last_run: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Background loop
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        if not self._lock.acquire():
+            logger.info("ℹ️ Insights sync already runs in another worker")
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"✅ Insights sync started (every {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("🛑 Insights sync stopped")
+        self._lock.release()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.sync_all()
+            except Exception as e:
+                logger.error(f"❌ Insights sync run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    # ------------------------------------------------------------------
+    # Sync runs
+    # ------------------------------------------------------------------
+
+    async def sync_all(self) -> Dict[str, Any]:
+        """Sync the current hour for every active account that does not have it yet"""
+        accounts = await supabase_client.get_active_social_accounts(SYNC_PLATFORMS)
+        return await self._sync_accounts(accounts, force=False)
+
+    async def sync_user(self, user_id: str, force: bool = True) -> Dict[str, Any]:
+        """Sync one user's accounts now (the manual /insights/sync endpoint)"""
+        accounts = await supabase_client.get_user_social_accounts(user_id)
+        return await self._sync_accounts(accounts, force=force)
+
+    async def _sync_accounts(self, accounts: List[Dict[str, Any]], force: bool) -> Dict[str, Any]:
+        started = time.monotonic()
+        now = datetime.now(timezone.utc)
+        window_start = floor_to_hour(now)
+        window_end = window_start + timedelta(hours=1)
+
+        accounts = [
+            acc for acc in accounts
+            if acc.get("platform") in SYNC_PLATFORMS and acc.get("access_token") and acc.get("account_id")
+        ]
+        already_synced: Set[Tuple[str, str, str]] = set()
+        if not force and accounts:
+            existing = await supabase_client.get_synced_insight_windows("hour", window_start.isoformat())
+            already_synced = {(r.get("user_id"), r.get("platform"), r.get("account_id")) for r in existing}
+        pending = [
+            acc for acc in accounts
+            if (acc.get("user_id"), acc.get("platform"), acc.get("account_id")) not in already_synced
+        ]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _fetch(acc: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                await self._rate_limiter().acquire()
+                return await self._fetch_account(acc, window_start, window_end)
+
+        rows = await asyncio.gather(*(_fetch(acc) for acc in pending))
+        # Failed fetches are not stored, so the next run retries them instead of skipping
+        fetched = [row for row in rows if "error" not in row["metrics"]]
+        for row in rows:
+            if "error" in row["metrics"]:
+                logger.warning(f"⚠️ Insights fetch failed for {row['platform']} {row['account_id']}: {row['metrics']['error'][:200]}")
+
+        written: List[Dict[str, Any]] = []
+        for i in range(0, len(fetched), UPSERT_BATCH_SIZE):
+            batch = fetched[i:i + UPSERT_BATCH_SIZE]
+            try:
+                await supabase_client.upsert_insights(batch)
+                written.extend(batch)
+            except Exception as e:
+                logger.error(f"❌ Insights upsert of {len(batch)} rows failed: {e}")
+
+        if written:
+            try:
+                await insights_rollup_service.apply(written)
+            except Exception as e:
+                logger.error(f"❌ Insights rollup update failed: {e}")
+
+        synced = {platform: 0 for platform in SYNC_PLATFORMS}
+        for row in written:
+            synced[row["platform"]] += 1
+        lags = [row["derived"]["sync_lag_seconds"] for row in written]
+        self.last_run = {
+            "ran_at": now.isoformat(),
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+            "accounts": len(accounts),
+            "skipped_already_synced": len(accounts) - len(pending),
+            "synced": synced,
+            "errors": len(rows) - len(written),
+            "max_sync_lag_seconds": max(lags) if lags else None,
+            "duration_ms": round((time.monotonic() - started) * 1000, 1)
+        }
+        logger.info(
+            f"📊 Insights sync: {len(written)}/{len(pending)} rows written, "
+            f"{len(accounts) - len(pending)} already synced, {self.last_run['duration_ms']} ms"
+        )
+        return self.last_run
+
+    async def _fetch_account(self, acc: Dict[str, Any], window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+        client = get_graph_client()
+        platform = acc["platform"]
+        if platform == "facebook":
+            metrics = await fetch_facebook_page_insights(client, acc["access_token"])
+        else:
+            metrics = await fetch_instagram_user_insights(client, acc["account_id"], acc["access_token"])
+
+        fetched_at = datetime.now(timezone.utc)
+        return {
+            "user_id": acc.get("user_id"),
+            "platform": platform,
+            "account_id": acc.get("account_id"),
+            "period": "hour",
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+            "metrics": metrics,
+            "derived": {
+                "synced_at": fetched_at.isoformat(),
+                # How far into the window the data was captured
+                "sync_lag_seconds": round((fetched_at - window_start).total_seconds(), 1)
+            },
+        }
+
+    def _rate_limiter(self) -> GraphRateLimiter:
+        if self._limiter is None:
+            self._limiter = GraphRateLimiter(self.graph_calls_per_second)
+        return self._limiter
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "interval_seconds": self.interval_seconds,
+            "last_run": self.last_run
+        }
+
+
+insights_sync_service = InsightsSyncService()
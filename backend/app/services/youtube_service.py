@@ -2,22 +2,98 @@
 YouTube Service - Handles YouTube video uploads and API interactions
 """
 
+import asyncio
 import httpx
-import json
+import io
 import os
+import random
+import tempfile
+import time
+import uuid
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, BinaryIO, AsyncIterator, Tuple
+from datetime import datetime, timezone
 from app.services.youtube_data_service import youtube_data_service
 
 logger = logging.getLogger(__name__)
 
+# Resumable uploads send the file in chunks of this size; YouTube requires every
+# chunk except the last to be a multiple of 256 KiB. Memory per upload stays at
+# a few read blocks regardless of the video size: each chunk is streamed from the
+# file in UPLOAD_READ_BLOCK_SIZE pieces rather than read into one buffer.
+UPLOAD_CHUNK_GRANULARITY = 256 * 1024
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_READ_BLOCK_SIZE = 256 * 1024
+UPLOAD_MAX_RETRIES = 8
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class ResumableUploadError(Exception):
+    """The resumable upload could not be completed"""
+
+
+class UploadProgressTracker:
+    """In-process registry of resumable upload progress, keyed by (user id, upload id)"""
+
+    def __init__(self, ttl_seconds: float = 3600.0):
+        self.ttl_seconds = ttl_seconds
+        self._uploads: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+
+    def start(self, user_id: Optional[str], upload_id: str, total_bytes: int, title: str) -> None:
+        """Register a new upload; an id the user already has in the registry is rejected"""
+        self._prune()
+        key = (user_id, upload_id)
+        if key in self._uploads:
+            raise ResumableUploadError(f"Upload id {upload_id} is already in use")
+        now = datetime.now(timezone.utc).isoformat()
+        self._uploads[key] = {
+            "upload_id": upload_id,
+            "user_id": user_id,
+            "title": title,
+            "status": "initializing",
+            "bytes_sent": 0,
+            "total_bytes": total_bytes,
+            "percent": 0.0,
+            "retries": 0,
+            "video_id": None,
+            "error": None,
+            "started_at": now,
+            "updated_at": now,
+            "_touched": time.monotonic()
+        }
+
+    def update(self, user_id: Optional[str], upload_id: str, **changes: Any) -> None:
+        entry = self._uploads.get((user_id, upload_id))
+        if entry is None:
+            return
+        entry.update(changes)
+        if entry["total_bytes"]:
+            entry["percent"] = round(entry["bytes_sent"] * 100.0 / entry["total_bytes"], 1)
+        entry["updated_at"] = datetime.now(timezone.utc).isoformat()
+        entry["_touched"] = time.monotonic()
+
+    def get(self, user_id: Optional[str], upload_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._uploads.get((user_id, upload_id))
+        if entry is None:
+            return None
+        return {key: value for key, value in entry.items() if not key.startswith("_")}
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - self.ttl_seconds
+        for key in [k for k, v in self._uploads.items() if v["_touched"] < cutoff]:
+            del self._uploads[key]
+
+
+upload_progress = UploadProgressTracker()
+
+
 class YouTubeService:
     """Service for YouTube API operations"""
     
     def __init__(self):
         self.api_base_url = "https://www.googleapis.com/youtube/v3"
         self.upload_url = "https://www.googleapis.com/upload/youtube/v3/videos"
+        self.retry_backoff = 1.0  # seconds, doubled per consecutive failure
     
     async def upload_video_from_file(
         self,
@@ -31,22 +107,74 @@ class YouTubeService:
         user_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Upload a video to YouTube using the YouTube Data API v3
+        Upload in-memory video bytes to YouTube
+        
+        Kept for callers that already hold the bytes; the upload itself goes through
+        upload_video_stream so no second copy of the video is built.
+        """
+        return await self.upload_video_stream(
+            access_token=access_token,
+            video_file=io.BytesIO(video_content),
+            title=title,
+            description=description,
+            tags=tags,
+            privacy_status=privacy_status,
+            content_type=content_type,
+            user_id=user_id
+        )
+    
+    async def upload_video_stream(
+        self,
+        access_token: str,
+        video_file: BinaryIO,
+        title: str,
+        description: str,
+        tags: Optional[List[str]] = None,
+        privacy_status: str = "private",
+        content_type: str = "video/mp4",
+        user_id: Optional[str] = None,
+        upload_id: Optional[str] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        max_retries: int = UPLOAD_MAX_RETRIES
+    ) -> Dict[str, Any]:
+        """
+        Upload a video to YouTube with the resumable upload protocol
+        
+        The file is sent in fixed-size chunks, each streamed from the file in small
+        blocks, so memory use stays flat however large the video is. A failed chunk (network error or 5xx) is
+        retried with exponential backoff from the last offset YouTube acknowledged.
+        Progress is published to ``upload_progress`` under ``(user_id, upload_id)``;
+        an upload id the user already has in flight is rejected.
         
         Args:
             access_token: OAuth access token for YouTube API
-            video_content: Video file content as bytes
+            video_file: Seekable binary file object (e.g. UploadFile.file)
             title: Video title
             description: Video description
             tags: List of tags for the video
             privacy_status: Privacy setting (private, unlisted, public)
             content_type: MIME type of the video file
             user_id: User ID for database recording (optional)
+            upload_id: Client-chosen id for progress lookups (generated if omitted)
+            chunk_size: Bytes per chunk, rounded down to a multiple of 256 KiB
+            max_retries: Consecutive failures tolerated before giving up
             
         Returns:
             Dictionary with upload result including video_id, url, etc.
         """
+        upload_id = upload_id or uuid.uuid4().hex
+        chunk_size = max(UPLOAD_CHUNK_GRANULARITY, chunk_size - chunk_size % UPLOAD_CHUNK_GRANULARITY)
+        tracked = False
+        
         try:
+            video_file.seek(0, os.SEEK_END)
+            total_bytes = video_file.tell()
+            video_file.seek(0)
+            if total_bytes == 0:
+                raise ResumableUploadError("Video file is empty")
+            
+            upload_progress.start(user_id, upload_id, total_bytes, title)
+            tracked = True
             video_metadata = {
                 "snippet": {
                     "title": title,
@@ -60,100 +188,264 @@ class YouTubeService:
                 }
             }
             
-            async with httpx.AsyncClient(timeout=600.0) as client:  # 10 minute timeout for large uploads
-                # Create multipart boundary
-                boundary = "----formdata-youtube-" + os.urandom(16).hex()
-                
-                # Build multipart body manually for YouTube API
-                multipart_body = []
-                
-                # Add metadata part
-                multipart_body.append(f'--{boundary}'.encode())
-                multipart_body.append(b'Content-Type: application/json; charset=UTF-8')
-                multipart_body.append(b'')
-                multipart_body.append(json.dumps(video_metadata).encode())
-                
-                # Add media part
-                multipart_body.append(f'--{boundary}'.encode())
-                multipart_body.append(f'Content-Type: {content_type}'.encode())
-                multipart_body.append(b'')
-                multipart_body.append(video_content)
-                multipart_body.append(f'--{boundary}--'.encode())
-                
-                body = b'\r\n'.join(multipart_body)
-                
-                upload_response = await client.post(
+            # Generous write timeout per chunk; the read timeout covers YouTube's
+            # processing pause after the final chunk
+            timeout = httpx.Timeout(60.0, write=300.0, read=300.0)
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                session_uri = await self._start_resumable_session(
+                    client, access_token, video_metadata, content_type, total_bytes, max_retries
+                )
+                upload_progress.update(user_id, upload_id, status="uploading")
+                upload_data = await self._send_chunks(
+                    client, session_uri, video_file, total_bytes, chunk_size, max_retries, user_id, upload_id
+                )
+            
+            video_id = upload_data.get("id")
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            upload_status = upload_data.get("status", {}).get("uploadStatus")
+            privacy_status_result = upload_data.get("status", {}).get("privacyStatus")
+            
+            # Record the upload in the database if user_id is provided
+            if user_id and video_id:
+                await self._record_upload(
+                    access_token, user_id, video_id, title, description, tags,
+                    privacy_status_result, upload_status, video_url
+                )
+            
+            upload_progress.update(user_id, upload_id, status="completed", bytes_sent=total_bytes, video_id=video_id)
+            logger.info(f"✅ YouTube upload {upload_id} completed: {video_id} ({total_bytes} bytes)")
+            return {
+                "success": True,
+                "upload_id": upload_id,
+                "video_id": video_id,
+                "title": upload_data.get("snippet", {}).get("title"),
+                "video_url": video_url,
+                "upload_status": upload_status,
+                "privacy_status": privacy_status_result,
+                "bytes_uploaded": total_bytes,
+                "upload_data": upload_data
+            }
+            
+        except Exception as e:
+            logger.error(f"YouTube upload error: {str(e)}")
+            # A rejected duplicate id must not mark the upload already using it as failed
+            if tracked:
+                upload_progress.update(user_id, upload_id, status="failed", error=str(e))
+            return {
+                "success": False,
+                "upload_id": upload_id,
+                "error": str(e)
+            }
+    
+    async def _start_resumable_session(
+        self,
+        client: httpx.AsyncClient,
+        access_token: str,
+        video_metadata: Dict[str, Any],
+        content_type: str,
+        total_bytes: int,
+        max_retries: int
+    ) -> str:
+        """Open a resumable upload session and return its session URI"""
+        for attempt in range(max_retries + 1):
+            try:
+                response = await client.post(
                     self.upload_url,
                     params={
                         "part": "snippet,status",
-                        "uploadType": "multipart"
+                        "uploadType": "resumable"
                     },
                     headers={
                         "Authorization": f"Bearer {access_token}",
-                        "Content-Type": f"multipart/related; boundary={boundary}"
+                        "X-Upload-Content-Type": content_type,
+                        "X-Upload-Content-Length": str(total_bytes)
                     },
-                    content=body
+                    json=video_metadata
                 )
-                
-                if upload_response.status_code not in [200, 201]:
-                    error_detail = upload_response.text
-                    logger.error(f"YouTube video upload failed: {error_detail}")
-                    raise Exception(f"Failed to upload video to YouTube: {error_detail}")
-                
-                upload_data = upload_response.json()
-                video_id = upload_data.get("id")
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                upload_status = upload_data.get("status", {}).get("uploadStatus")
-                privacy_status_result = upload_data.get("status", {}).get("privacyStatus")
-                
-                # Record the upload in the database if user_id is provided
-                if user_id and video_id:
-                    try:
-                        # Get channel info to ensure we have the channel_id
-                        channel_info = await self.get_channel_info(access_token)
-                        channel_id = None
-                        
-                        if channel_info.get("success"):
-                            channel_data = channel_info.get("channel", {})
-                            channel_id = await youtube_data_service.get_or_create_channel_for_user(
-                                user_id, channel_data
-                            )
-                        
-                        # Record the video upload
-                        await youtube_data_service.record_video_upload(
-                            user_id=user_id,
-                            video_id=video_id,
-                            title=title,
-                            description=description,
-                            tags=tags,
-                            privacy_status=privacy_status_result,
-                            channel_id=channel_id,
-                            upload_status=upload_status,
-                            video_url=video_url
-                        )
-                        
-                        logger.info(f"Successfully recorded video upload in database: {video_id}")
-                        
-                    except Exception as db_error:
-                        logger.error(f"Failed to record video upload in database: {db_error}")
-                        # Don't fail the upload if database recording fails
-                
-                return {
-                    "success": True,
-                    "video_id": video_id,
-                    "title": upload_data.get("snippet", {}).get("title"),
-                    "video_url": video_url,
-                    "upload_status": upload_status,
-                    "privacy_status": privacy_status_result,
-                    "upload_data": upload_data
-                }
-                
-        except Exception as e:
-            logger.error(f"YouTube upload error: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            except httpx.TransportError as e:
+                logger.warning(f"⚠️ Could not open YouTube upload session (attempt {attempt + 1}): {e}")
+            else:
+                session_uri = response.headers.get("location")
+                if response.status_code == 200 and session_uri:
+                    return session_uri
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    logger.error(f"YouTube upload session failed: {response.text}")
+                    raise ResumableUploadError(f"Failed to start YouTube upload: {response.text}")
+                logger.warning(f"⚠️ YouTube upload session returned {response.status_code} (attempt {attempt + 1})")
+            
+            if attempt < max_retries:
+                await self._backoff(attempt)
+        
+        raise ResumableUploadError(f"Failed to start YouTube upload after {max_retries + 1} attempts")
+    
+    async def _send_chunks(
+        self,
+        client: httpx.AsyncClient,
+        session_uri: str,
+        video_file: BinaryIO,
+        total_bytes: int,
+        chunk_size: int,
+        max_retries: int,
+        user_id: Optional[str],
+        upload_id: str
+    ) -> Dict[str, Any]:
+        """PUT the file chunk by chunk, resuming from the acknowledged offset after failures"""
+        offset = 0
+        failures = 0
+        total_retries = 0
+        
+        while True:
+            length = min(chunk_size, total_bytes - offset)
+            sent_from = offset
+            try:
+                response = await client.put(
+                    session_uri,
+                    headers={
+                        "Content-Range": f"bytes {offset}-{offset + length - 1}/{total_bytes}",
+                        "Content-Length": str(length)
+                    },
+                    content=self._stream_chunk(video_file, offset, length)
+                )
+            except httpx.TransportError as e:
+                response = None
+                logger.warning(f"⚠️ YouTube upload {upload_id} chunk at {offset} failed: {e}")
+            
+            if response is not None:
+                if response.status_code in (200, 201):
+                    return response.json()
+                if response.status_code == 308:
+                    offset = self._acknowledged_offset(response)
+                    if offset > sent_from:
+                        failures = 0
+                        upload_progress.update(user_id, upload_id, status="uploading", bytes_sent=offset)
+                        continue
+                    # Nothing of the chunk was stored: retry it, but count it against max_retries
+                    logger.warning(f"⚠️ YouTube upload {upload_id} chunk at {sent_from} was not acknowledged")
+                elif response.status_code not in RETRYABLE_STATUS_CODES:
+                    logger.error(f"YouTube video upload failed: {response.text}")
+                    raise ResumableUploadError(f"Failed to upload video to YouTube: {response.text}")
+                else:
+                    logger.warning(f"⚠️ YouTube upload {upload_id} chunk at {offset} returned {response.status_code}")
+            
+            failures += 1
+            total_retries += 1
+            if failures > max_retries:
+                raise ResumableUploadError(
+                    f"YouTube upload gave up after {max_retries} retries at byte {offset} of {total_bytes}"
+                )
+            upload_progress.update(user_id, upload_id, status="retrying", retries=total_retries)
+            await self._backoff(failures - 1)
+            
+            # Ask YouTube how much it actually stored before resending anything
+            status = await self._query_upload_status(client, session_uri, total_bytes)
+            if status is None:
+                continue
+            if isinstance(status, dict):
+                return status
+            if status > offset:
+                # Part of the failed chunk was stored after all
+                failures = 0
+            offset = status
+            upload_progress.update(user_id, upload_id, status="uploading", bytes_sent=offset)
+    
+    async def _stream_chunk(self, video_file: BinaryIO, offset: int, length: int) -> AsyncIterator[bytes]:
+        """Yield one chunk of the file in small blocks, so no chunk-sized buffer is ever held"""
+        end = offset + length
+        while offset < end:
+            # Reads from a spooled/disk file block, so keep them off the event loop
+            block = await asyncio.to_thread(
+                self._read_chunk, video_file, offset, min(UPLOAD_READ_BLOCK_SIZE, end - offset)
+            )
+            if not block:
+                raise ResumableUploadError(f"Video file ended at byte {offset}")
+            offset += len(block)
+            yield block
+    
+    async def _query_upload_status(self, client: httpx.AsyncClient, session_uri: str, total_bytes: int):
+        """
+        Ask the session for its acknowledged offset
+        
+        Returns the next byte to send, the final video resource if the upload had in
+        fact completed, or None if the status request itself failed.
+        """
+        try:
+            response = await client.put(
+                session_uri,
+                headers={"Content-Range": f"bytes */{total_bytes}"},
+                content=b""
+            )
+        except httpx.TransportError as e:
+            logger.warning(f"⚠️ YouTube upload status check failed: {e}")
+            return None
+        
+        if response.status_code in (200, 201):
+            return response.json()
+        if response.status_code == 308:
+            return self._acknowledged_offset(response)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            return None
+        # 404/410: the session expired and the upload has to start over
+        raise ResumableUploadError(f"YouTube upload session is no longer valid: {response.status_code} {response.text}")
+    
+    @staticmethod
+    def _acknowledged_offset(response: httpx.Response) -> int:
+        """Next byte to send, from a 308 response's 'Range: bytes=0-N' header"""
+        range_header = response.headers.get("range")
+        if not range_header or "-" not in range_header:
+            return 0
+        return int(range_header.rsplit("-", 1)[1]) + 1
+    
+    @staticmethod
+    def _read_chunk(video_file: BinaryIO, offset: int, size: int) -> bytes:
+        video_file.seek(offset)
+        return video_file.read(size)
+    
+    async def _backoff(self, attempt: int) -> None:
+        delay = min(self.retry_backoff * (2 ** attempt), 60.0)
+        await asyncio.sleep(delay + random.uniform(0, self.retry_backoff))
+    
+    async def _record_upload(
+        self,
+        access_token: str,
+        user_id: str,
+        video_id: str,
+        title: str,
+        description: str,
+        tags: Optional[List[str]],
+        privacy_status: Optional[str],
+        upload_status: Optional[str],
+        video_url: str
+    ) -> None:
+        """Record a finished upload in the database; never fails the upload itself"""
+        try:
+            # Get channel info to ensure we have the channel_id
+            channel_info = await self.get_channel_info(access_token)
+            channel_id = None
+            
+            if channel_info.get("success"):
+                channel_data = channel_info.get("channel", {})
+                channel_id = await youtube_data_service.get_or_create_channel_for_user(
+                    user_id, channel_data
+                )
+            
+            # Record the video upload
+            await youtube_data_service.record_video_upload(
+                user_id=user_id,
+                video_id=video_id,
+                title=title,
+                description=description,
+                tags=tags,
+                privacy_status=privacy_status,
+                channel_id=channel_id,
+                upload_status=upload_status,
+                video_url=video_url
+            )
+            
+            logger.info(f"Successfully recorded video upload in database: {video_id}")
+            
+        except Exception as db_error:
+            logger.error(f"Failed to record video upload in database: {db_error}")
+            # Don't fail the upload if database recording fails
     
     async def upload_video_from_url(
         self,
@@ -168,6 +460,9 @@ class YouTubeService:
         """
         Download a video from URL and upload to YouTube
         
+        The download is streamed into a spooled temporary file (in memory up to one
+        upload chunk, on disk beyond that) and then uploaded with upload_video_stream.
+        
         Args:
             access_token: OAuth access token for YouTube API
             video_url: URL of the video to download and upload
@@ -181,20 +476,21 @@ class YouTubeService:
             Dictionary with upload result
         """
         try:
-            # Download video from URL
-            async with httpx.AsyncClient(timeout=300.0) as client:
-                download_response = await client.get(video_url)
-                
-                if download_response.status_code != 200:
-                    raise Exception(f"Failed to download video from URL: {video_url}")
-                
-                video_content = download_response.content
-                content_type = download_response.headers.get("content-type", "video/mp4")
+            with tempfile.SpooledTemporaryFile(max_size=UPLOAD_CHUNK_SIZE) as video_file:
+                # Download video from URL
+                async with httpx.AsyncClient(timeout=300.0) as client:
+                    async with client.stream("GET", video_url) as download_response:
+                        if download_response.status_code != 200:
+                            raise Exception(f"Failed to download video from URL: {video_url}")
+                        
+                        content_type = download_response.headers.get("content-type", "video/mp4")
+                        async for data in download_response.aiter_bytes(UPLOAD_CHUNK_GRANULARITY):
+                            video_file.write(data)
                 
                 # Upload to YouTube
-                return await self.upload_video_from_file(
+                return await self.upload_video_stream(
                     access_token=access_token,
-                    video_content=video_content,
+                    video_file=video_file,
                     title=title,
                     description=description,
                     tags=tags,
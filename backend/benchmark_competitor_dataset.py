@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared competitor dataset against the old per-tool loading
+
+Generates a synthetic competitors_dataset.json (100k competitors by default) and compares:
+- legacy: json.load per tool construction + linear filtering + scanning every post per request
+- shared: one indexed snapshot per process, indexed lookups and precomputed aggregates
+
+Usage: python benchmark_competitor_dataset.py [--competitors 100000] [--posts 5] [--requests 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.content_planning.data.competitor_dataset import (  # noqa: E402
+    CompetitorAggregate,
+    CompetitorDatasetStore,
+)
+
+INDUSTRIES = [
+    "technology", "fashion_beauty", "food_beverage", "finance_fintech", "healthcare_wellness",
+    "automotive", "travel_hospitality", "fitness_sports", "education_elearning", "real_estate_construction"
+]
+PLATFORMS = ["linkedin", "twitter", "instagram", "facebook", "tiktok", "youtube"]
+POST_TYPES = ["product_announcement", "educational", "promotional", "behind_the_scenes", "industry_news"]
+TONES = ["professional", "casual", "playful", "inspirational", "educational"]
+WORDS = ["launch", "tip", "how to", "team", "behind", "growth", "innovation", "product", "guide", "news"]
+
+
+def generate_dataset(competitor_count: int, posts_per_competitor: int, user_count: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    hashtag_pool = [f"#Tag{i}" for i in range(5000)]
+    competitors = []
+    for i in range(competitor_count):
+        posts = []
+        for j in range(posts_per_competitor):
+            content = " ".join(rng.choice(WORDS) for _ in range(20))
+            posts.append({
+                "post_id": f"post_{i}_{j}",
+                "post_content": content,
+                "hashtags": rng.sample(hashtag_pool, 6),
+                "platform": rng.choice(PLATFORMS),
+                "post_type": rng.choice(POST_TYPES),
+                "tone": rng.choice(TONES),
+                "engagement_metrics": {"engagement_rate": round(rng.uniform(0.5, 9.5), 2)},
+                "posting_time": f"2025-08-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+                "content_length": len(content)
+            })
+        competitors.append({
+            "competitor_id": f"comp_{i:06d}",
+            "company_name": f"Company {i}",
+            "user_id": f"user_{i % user_count}",
+            "industry_sector": INDUSTRIES[i % len(INDUSTRIES)],
+            "posts": posts
+        })
+    return {
+        "dataset_meta": {"synthetic": True, "competitors": competitor_count},
+        "competitors": competitors,
+        "trending_hashtags": {industry: hashtag_pool[:10] for industry in INDUSTRIES},
+        "content_insights": {"hashtag_performance": {}}
+    }
+
+
+def legacy_request(path: str, clerk_id: str) -> CompetitorAggregate:
+    """What every request used to do: load the file, filter linearly, scan every post"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    competitors = [c for c in data.get("competitors", []) if c.get("user_id") == clerk_id]
+    return CompetitorAggregate.combine(CompetitorAggregate.from_competitor(c) for c in competitors)
+
+
+def shared_request(store: CompetitorDatasetStore, clerk_id: str) -> CompetitorAggregate:
+    dataset = store.get()
+    return dataset.aggregate_of(dataset.competitors_for_clerk(clerk_id))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def summarize(label: str, samples_ms: list) -> None:
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    print(f"  {label:<36} n={len(samples_ms):<5} mean={statistics.mean(samples_ms):9.3f} ms  p95={p95:9.3f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--competitors", type=int, default=100_000)
+    parser.add_argument("--posts", type=int, default=5)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--legacy-requests", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.competitors:,} competitors x {args.posts} posts ...")
+    data = generate_dataset(args.competitors, args.posts, args.users)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as f:
+        json.dump(data, f)
+        path = f.name
+    del data
+    print(f"  file size: {os.path.getsize(path) / 1_048_576:.1f} MiB")
+
+    rng = random.Random(7)
+    clerk_ids = [f"user_{rng.randrange(args.users)}" for _ in range(args.requests)]
+
+    try:
+        print("Legacy (load + linear scan per request):")
+        legacy_samples = [timed(legacy_request, path, clerk_id)[1] for clerk_id in clerk_ids[:args.legacy_requests]]
+        summarize("request", legacy_samples)
+
+        print("Shared snapshot:")
+        store = CompetitorDatasetStore(path)
+        dataset, load_ms = timed(store.get)
+        print(f"  initial load + index: {load_ms:.0f} ms ({dataset.stats()['posts']:,} posts, "
+              f"{dataset.stats()['hashtags']:,} hashtags)")
+        summarize("request (clerk lookup + aggregates)", [timed(shared_request, store, c)[1] for c in clerk_ids])
+        summarize("competitors_in_industry", [timed(dataset.competitors_in_industry, i)[1] for i in INDUSTRIES])
+        summarize("competitors_with_hashtag", [timed(dataset.competitors_with_hashtag, f"#tag{i}")[1] for i in range(100)])
+        summarize("aggregate_of(all competitors)", [timed(dataset.aggregate_of, dataset.all_competitors())[1]])
+
+        legacy_result = legacy_request(path, clerk_ids[0])
+        shared_result = shared_request(store, clerk_ids[0])
+        assert legacy_result.hashtag_counts == shared_result.hashtag_counts, "aggregates differ"
+        assert legacy_result.posting_hours == shared_result.posting_hours, "aggregates differ"
+
+        print("Reload on change:")
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        store.check_interval = 0
+        reloaded, reload_ms = timed(store.get)
+        print(f"  reload detected: {reloaded is not dataset}, took {reload_ms:.0f} ms "
+              f"(other callers keep the old snapshot meanwhile)")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
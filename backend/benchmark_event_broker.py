@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Load test for the SSE event broker
+
+Simulates thousands of SSE subscribers (5k by default) spread over many users, a share
+of which never read (abandoned tabs), while a separate thread publishes events the way
+the ROI scheduler does. Reports fan-out latency and memory, and asserts that:
+- every reading subscriber received exactly its own user's events plus broadcasts
+- stalled subscribers stay capped at the ring-buffer size and are told about drops
+- a reconnect with Last-Event-ID replays exactly the missed events
+
+Usage: python benchmark_event_broker.py [--subscribers 5000] [--users 1000] [--events 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.event_broker import EventBroker  # noqa: E402
+
+
+async def reader(broker: EventBroker, user_id: str, received: list, latencies: list):
+    async for chunk in broker.stream(user_id=user_id, heartbeat_seconds=1.0):
+        if chunk.startswith(":"):
+            continue
+        data = json.loads(chunk.split("data: ", 1)[1])
+        if data["event"] == "done":
+            return
+        if data["event"] == "events_dropped":
+            continue
+        payload = data["payload"]
+        received.append(payload["seq"])
+        latencies.append(time.perf_counter() - payload["sent"])
+
+
+def publisher(broker: EventBroker, users: list, events: int, broadcast_every: int, rate: float, expected: dict):
+    """Runs in its own thread like the ROI scheduler"""
+    rng = random.Random(3)
+    for seq in range(events):
+        if broadcast_every and seq % broadcast_every == 0:
+            broker.publish("notice", {"seq": seq, "sent": time.perf_counter()})
+            expected.setdefault(None, []).append(seq)
+        else:
+            user_id = rng.choice(users)
+            broker.publish("roi_update", {"user_id": user_id, "seq": seq, "sent": time.perf_counter()})
+            expected.setdefault(user_id, []).append(seq)
+        if rate:
+            time.sleep(1 / rate)
+
+
+async def run(args) -> None:
+    broker = EventBroker(buffer_size=args.buffer, history_size=args.history)
+    users = [f"user_{i}" for i in range(args.users)]
+    stalled_count = int(args.subscribers * args.stalled)
+
+    if args.trace_memory:
+        tracemalloc.start()
+    latencies = []
+    readers = []
+    for i in range(args.subscribers - stalled_count):
+        received = []
+        task = asyncio.create_task(reader(broker, users[i % len(users)], received, latencies))
+        readers.append((users[i % len(users)], received, task))
+    stalled = [broker.subscribe(user_id=users[i % len(users)]) for i in range(stalled_count)]
+    await asyncio.sleep(0.2)
+    baseline, _ = tracemalloc.get_traced_memory() if args.trace_memory else (0, 0)
+
+    expected = {}
+    started = time.perf_counter()
+    thread = threading.Thread(
+        target=publisher, args=(broker, users, args.events, args.broadcast_every, args.rate, expected)
+    )
+    thread.start()
+    while thread.is_alive():
+        await asyncio.sleep(0.05)
+    broker.publish("done", {})
+    await asyncio.wait_for(asyncio.gather(*(task for _, _, task in readers)), timeout=60)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory() if args.trace_memory else (0, 0)
+
+    latencies.sort()
+    deliveries = len(latencies)
+    print(f"Subscribers: {args.subscribers} ({stalled_count} stalled) over {args.users} users, "
+          f"{args.events} events ({args.events // args.broadcast_every if args.broadcast_every else 0} broadcasts)")
+    print(f"  {deliveries:,} deliveries in {elapsed:.2f} s ({deliveries / elapsed:,.0f}/s)")
+    print(f"  latency p50={latencies[len(latencies) // 2] * 1000:.2f} ms  "
+          f"p95={latencies[int(len(latencies) * 0.95)] * 1000:.2f} ms  max={latencies[-1] * 1000:.2f} ms")
+    if args.trace_memory:
+        print(f"  memory growth {(peak - baseline) / 1_048_576:.1f} MiB peak, "
+              f"{(current - baseline) / 1_048_576:.1f} MiB after")
+    print(f"  broker: {broker.stats()}")
+
+    # Reading subscribers saw exactly their user's events and the broadcasts, in order
+    broadcasts = expected.get(None, [])
+    for user_id, seqs, _ in readers:
+        assert seqs == sorted(expected.get(user_id, []) + broadcasts), f"{user_id} got wrong events"
+
+    # Stalled subscribers stay bounded and know how much they missed
+    for sub in stalled:
+        wanted = len(expected.get(sub.user_id, [])) + len(broadcasts) + 1  # + "done"
+        assert len(sub.buffer) == min(wanted, args.buffer)
+        assert sub.dropped == max(0, wanted - args.buffer)
+        broker.unsubscribe(sub)
+
+    # Last-Event-ID replay after a reconnect
+    user_id = users[0]
+    first = broker.publish("roi_update", {"user_id": user_id, "seq": -1, "sent": 0})
+    missed = [broker.publish("roi_update", {"user_id": user_id, "seq": -2 - i, "sent": 0}) for i in range(5)]
+    sub = broker.subscribe(user_id=user_id, last_event_id=first.id)
+    assert [e.id for e in sub.buffer] == [e.id for e in missed], "replay mismatch"
+    broker.unsubscribe(sub)
+    print("  OK: per-user filtering, bounded stalled buffers, Last-Event-ID replay")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--broadcast-every", type=int, default=100)
+    parser.add_argument("--stalled", type=float, default=0.1, help="share of subscribers that never read")
+    parser.add_argument("--buffer", type=int, default=64)
+    parser.add_argument("--history", type=int, default=1024)
+    parser.add_argument("--rate", type=float, default=500, help="events per second (0 = as fast as possible)")
+    parser.add_argument("--trace-memory", action="store_true", help="measure allocations (slows the run down)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
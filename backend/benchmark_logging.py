@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Logging overhead benchmark
+
+Runs a synthetic request (build a ~2 KB Supabase-style payload and serialize it, as
+_make_request does) many times and measures the time spent in the request thread with:
+- off:              LOG_LEVEL=WARNING, nothing emitted
+- legacy:           the old pattern - INFO f-strings of URL/payload/response written
+                    synchronously by a StreamHandler
+- queued:           INFO, JSON, written by the listener thread (current default setup)
+- queued-debug:     DEBUG enabled for the client logger (every per-request line emitted)
+- queued-sampled:   DEBUG enabled but sampled at 1%
+
+Output goes to a temporary file (a stand-in for stdout on Render). "drain" is the
+extra time until the listener has written everything.
+
+Usage: python benchmark_logging.py [--requests 20000]
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.core.logging_config import configure_logging, shutdown_logging  # noqa: E402
+
+logger = logging.getLogger("bench.supabase_client")
+endpoint_logger = logging.getLogger("bench.endpoint")
+
+PAYLOAD = {
+    "user_id": "user_2abc",
+    "platform": "instagram",
+    "metrics": {f"metric_{i}": i * 1.5 for i in range(60)},
+    "caption": "x" * 600,
+}
+
+
+def legacy_request(i: int) -> None:
+    url = f"https://example.supabase.co/rest/v1/roi_metrics?id=eq.{i}"
+    params = {"user_id": f"eq.{PAYLOAD['user_id']}", "limit": 3}
+    logger.info(f"🔍 Making POST request to: {url}")
+    logger.info(f"📤 Request data: {PAYLOAD}")
+    logger.info(f"🔍 Request params: {params}")
+    body = json.dumps(PAYLOAD)
+    logger.info(f"📥 Response status: {201}")
+    endpoint_logger.info(f"📊 Inserted row {i} ({len(body)} bytes)")
+
+
+def current_request(i: int) -> None:
+    endpoint = f"roi_metrics?id=eq.{i}"
+    params = {"user_id": f"eq.{PAYLOAD['user_id']}", "limit": 3}
+    logger.debug("🔍 Supabase %s %s params=%s", "POST", endpoint, params)
+    body = json.dumps(PAYLOAD)
+    logger.debug("📥 Supabase %s %s -> %s", "POST", endpoint, 201)
+    endpoint_logger.info("📊 Inserted row %s (%s bytes)", i, len(body), extra={"bytes": len(body)})
+
+
+def baseline_request(i: int) -> None:
+    json.dumps(PAYLOAD)
+
+
+def run_mode(name: str, requests: int, out, request=current_request, **config) -> dict:
+    if name == "legacy":
+        shutdown_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        handler = logging.StreamHandler(out)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        logging.getLogger("bench").setLevel(logging.NOTSET)
+    else:
+        configure_logging(stream=out, queue_size=requests * 4, **config)
+
+    batch = max(1, requests // 20)
+    per_request = []
+    started = time.perf_counter()
+    for start in range(0, requests, batch):
+        t0 = time.perf_counter()
+        for i in range(start, min(start + batch, requests)):
+            request(i)
+        per_request.append((time.perf_counter() - t0) / batch)
+    caller = time.perf_counter() - started
+    shutdown_logging()  # waits for the listener to write everything
+    total = time.perf_counter() - started
+    return {
+        "name": name,
+        "median_us": statistics.median(per_request) * 1e6,
+        "caller_s": caller,
+        "drain_s": total - caller,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    modes = [
+        ("baseline (no logging calls)", dict(level="WARNING", request=baseline_request)),
+        ("off", dict(level="WARNING")),
+        ("legacy", dict(request=legacy_request)),
+        ("queued", dict(level="INFO", fmt="json")),
+        ("queued-debug", dict(level="INFO", fmt="json", module_levels={"bench.supabase_client": "DEBUG"})),
+        ("queued-sampled", dict(level="INFO", fmt="json", module_levels={"bench.supabase_client": "DEBUG"},
+                                sampling={"bench.supabase_client": 0.01})),
+    ]
+    results = []
+    with tempfile.TemporaryFile("w+") as out:
+        run_mode("warm-up", args.requests, out, level="WARNING")
+        for name, config in modes:
+            out.seek(0)
+            out.truncate()
+            results.append(run_mode(name, args.requests, out, **config))
+            results[-1]["bytes"] = out.tell()
+
+    print(f"{args.requests:,} synthetic requests")
+    print(f"  {'mode':<28} {'us/request':>10} {'request thread':>15} {'drain':>8} {'log bytes':>11}")
+    for r in results:
+        print(f"  {r['name']:<28} {r['median_us']:>10.1f} {r['caller_s']:>14.2f}s {r['drain_s']:>7.2f}s {r['bytes']:>11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark for the backend
+
+Runs ``python -X importtime -c "import main"`` in fresh interpreters (with LAZY_STARTUP
+on by default), reports the median total import time and the slowest top-level
+imports, and exits non-zero when the median exceeds the budget, so an endpoint that
+starts importing a heavy SDK at module level is caught before it reaches Render.
+
+Usage:
+    python benchmark_startup.py                      # lazy startup vs. the default budget
+    python benchmark_startup.py --eager              # measure the eager (all routers) import
+    python benchmark_startup.py --budget-ms 1500 --runs 5
+    python benchmark_startup.py --per-router         # import cost of each endpoint module
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2000"))
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def measure(statement: str, lazy: bool) -> Tuple[float, List[Tuple[float, str]]]:
+    """Total import time in ms and (cumulative ms, module) of every top-level import"""
+    env = dict(os.environ)
+    env["LAZY_STARTUP"] = "true" if lazy else "false"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    # The Supabase client only checks that these are set when it is created at import time
+    env.setdefault("SUPABASE_URL", "http://localhost")
+    env.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-5:]
+        raise RuntimeError(f"`{statement}` failed:\n" + "\n".join(tail))
+
+    top_level = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # Top-level imports are those with a single space of nesting indentation
+        if match and len(match.group(3)) == 1:
+            top_level.append((int(match.group(2)) / 1000, match.group(4)))
+    return sum(ms for ms, _ in top_level), top_level
+
+
+def run_main(args) -> bool:
+    lazy = not args.eager
+    totals = []
+    slowest: Dict[str, float] = {}
+    for _ in range(args.runs):
+        total, imports = measure("import main", lazy)
+        totals.append(total)
+        for ms, module in imports:
+            slowest[module] = max(ms, slowest.get(module, 0))
+
+    median = statistics.median(totals)
+    mode = "eager" if args.eager else "lazy"
+    print(f"Cold-start imports ({mode}, {args.runs} runs): median {median:.0f} ms, "
+          f"min {min(totals):.0f} ms, max {max(totals):.0f} ms, budget {args.budget_ms:.0f} ms")
+    for module, ms in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {module}")
+
+    if median > args.budget_ms:
+        print(f"FAIL: cold-start import time {median:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        return False
+    print("OK: within budget")
+    return True
+
+
+def run_per_router(args) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.api.v1.api import ENDPOINT_ROUTERS  # noqa: E402
+
+    print("Endpoint module import cost (first request under LAZY_STARTUP):")
+    for module_name, prefix, _ in ENDPOINT_ROUTERS:
+        try:
+            total, _ = measure(f"import app.api.v1.endpoints.{module_name}", lazy=True)
+            print(f"  {total:8.1f} ms  {prefix:<20} {module_name}")
+        except RuntimeError as e:
+            print(f"  {'failed':>8}     {prefix:<20} {module_name}: {str(e).splitlines()[-1]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eager", action="store_true", help="import every router at startup (LAZY_STARTUP=false)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument("--per-router", action="store_true", help="report the import cost of each endpoint module")
+    args = parser.parse_args()
+
+    if args.per_router:
+        run_per_router(args)
+        return
+    sys.exit(0 if run_main(args) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+YouTube relevance pre-filter benchmark
+
+Scores a labeled set of YouTube search results (title, description, channel, whether
+the video is really about the competitor) with the lexical stage of the YouTubeAgent
+relevance cascade and reports:
+- how many videos the lexical stage accepts / rejects / leaves for the LLM
+- precision of the lexical accepts and how many relevant videos it wrongly rejects
+- LLM calls per scan before (every video, batches of 5) and after (ambiguous band only,
+  batches of RELEVANCE_LLM_BATCH_SIZE)
+
+Add new cases to FIXTURES whenever a false accept/reject shows up in production.
+
+Usage: python benchmark_youtube_relevance.py [--verbose]
+"""
+
+import argparse
+import importlib.util
+import math
+import time
+from pathlib import Path
+
+# Load the scorer on its own: importing it through app.services.monitoring would pull in
+# every agent (LangChain, Google API, Supabase) just to score strings
+_spec = importlib.util.spec_from_file_location(
+    "video_relevance",
+    Path(__file__).parent / "app" / "services" / "monitoring" / "agents" / "sub_agents" / "video_relevance.py"
+)
+video_relevance = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(video_relevance)
+ACCEPT_THRESHOLD = video_relevance.ACCEPT_THRESHOLD
+REJECT_THRESHOLD = video_relevance.REJECT_THRESHOLD
+score_video_relevance = video_relevance.score_video_relevance
+
+LEGACY_BATCH_SIZE = 5
+CASCADE_BATCH_SIZE = 15  # YouTubeAgent.RELEVANCE_LLM_BATCH_SIZE
+
+# (competitor, title, description, channel, relevant)
+FIXTURES = [
+    # Nike
+    ("Nike", "Nike unveils new Air Max line for 2025", "Nike announced the next Air Max generation today.", "Sneaker News Daily", True),
+    ("Nike", "Nike Q3 earnings: revenue beats estimates", "Nike reported quarterly revenue of ...", "CNBC Television", True),
+    ("Nike", "Just Do It | Nike", "The latest campaign.", "Nike", True),
+    ("Nike", "Unboxing the Nike Pegasus 41", "Full review of the new Pegasus.", "RunRepeat", True),
+    ("Nike", "Best running shoes of 2025 (Adidas, Asics, Hoka)", "Our top picks, from Adidas to Hoka.", "Running Channel", False),
+    ("Nike", "Goddess Nike: the myth of victory explained", "Greek mythology series episode 12.", "Mythology Explained", False),
+    ("Nike", "How to lace your sneakers", "Five lacing techniques.", "Shoe Hacks", False),
+    ("Nike", "Adidas Samba restock haul", "Picked up three pairs.", "KicksWithKai", False),
+    # Apple
+    ("Apple Inc.", "Apple announces iPhone 17 at September event", "Apple unveiled the iPhone 17 lineup.", "The Verge", True),
+    ("Apple Inc.", "Apple event recap", "Everything Apple announced today.", "Apple", True),
+    ("Apple Inc.", "Easy apple pie recipe", "Grandma's apple pie with a flaky crust.", "Baking with Rosie", False),
+    ("Apple Inc.", "Apple picking season vlog", "We went apple picking in Vermont.", "Weekend Wanderers", False),
+    ("Apple Inc.", "iPhone 17 Pro review after one week", "Is the new iPhone worth it?", "MKBHD", True),
+    ("Apple Inc.", "Samsung Galaxy S25 review", "Samsung's new flagship tested.", "Mrwhosetheboss", False),
+    ("Apple Inc.", "Apples vs oranges: nutrition facts", "Which fruit is healthier?", "Apples", False),
+    # Tesla
+    ("Tesla", "Tesla Q2 deliveries update", "Tesla delivered more vehicles than expected.", "Electrek", True),
+    ("Tesla", "Tesla Cybertruck review: one year later", "Long-term Tesla Cybertruck review.", "Out of Spec Reviews", True),
+    ("Tesla", "Nikola Tesla: the genius who lit the world", "Documentary about the inventor.", "History Hub", False),
+    ("Tesla", "Tesla coil music performance", "Singing tesla coils at a science fair.", "ArcAttack", False),
+    ("Tesla", "BYD overtakes rivals in EV sales", "China's BYD and the global EV market.", "Bloomberg Television", False),
+    ("Tesla", "Telsa model 3 highland first drive", "Driving the refreshed sedan.", "EV Reviews", True),
+    # Notion
+    ("Notion Labs Inc", "Notion AI launch: everything new", "Notion announced Notion AI features.", "Notion", True),
+    ("Notion Labs Inc", "My Notion setup for 2025", "How I organise my life in Notion.", "Thomas Frank", True),
+    ("Notion Labs Inc", "The notion of free will in philosophy", "Lecture 4 on determinism.", "Philosophy Tube", False),
+    ("Notion Labs Inc", "Obsidian vs Logseq comparison", "Two note-taking apps compared.", "Productivity Guy", False),
+    ("Notion Labs Inc", "Notion Labs raises funding at new valuation", "Notion Labs announced new funding.", "TechCrunch", True),
+    # Canva
+    ("Canva", "Canva Create 2025 keynote", "Canva unveils new AI design tools at Canva Create.", "Canva", True),
+    ("Canva", "Canva tutorial for beginners", "Learn Canva in 10 minutes.", "Design School", True),
+    ("Canva", "Painting on canvas: acrylic basics", "Beginner acrylic painting.", "Art With Ana", False),
+    ("Canva", "Adobe Express new features", "What's new in Adobe Express.", "Adobe", False),
+    # Shopee
+    ("Shopee", "Shopee 9.9 sale haul", "Everything I bought in the Shopee 9.9 sale.", "Mei Lin", True),
+    ("Shopee", "Shopee launches new seller tools", "Shopee announced updates for sellers.", "Tech in Asia", True),
+    ("Shopee", "Lazada vs Shopee: which is cheaper?", "We compare Lazada and Shopee prices.", "Money Matters MY", True),
+    ("Shopee", "Lazada birthday sale highlights", "Top deals from Lazada.", "Deals Hunter", False),
+    ("Shopee", "Street food tour in Penang", "Best hawker stalls.", "Food Ranger", False),
+    # Grab
+    ("Grab Holdings", "Grab quarterly earnings: first profitable year", "Grab Holdings reported revenue growth.", "CNA", True),
+    ("Grab Holdings", "Grab launches new GrabFood features", "Grab update for riders and merchants.", "Grab", True),
+    ("Grab Holdings", "Grab and go breakfast ideas", "Quick breakfasts to grab on the way out.", "Meal Prep Mondays", False),
+    ("Grab Holdings", "How to grab attention in presentations", "Public speaking tips.", "TEDx Talks", False),
+    ("Grab Holdings", "Gojek vs Grab in Indonesia", "Ride hailing competition heats up.", "Asia Business", True),
+    # Monday.com
+    ("monday.com", "monday.com new AI features announcement", "monday.com announced AI blocks.", "monday.com", True),
+    ("monday.com", "Monday motivation: morning routine", "Start your Monday right.", "Wellness Daily", False),
+    ("monday.com", "Asana vs monday.com review", "Project management tools compared, monday.com vs Asana.", "Software Reviews", True),
+    ("monday.com", "Cyber Monday deals 2025", "Best tech deals this Monday.", "Deal Tech", False),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--verbose", action="store_true", help="print every case with its score and band")
+    args = parser.parse_args()
+
+    bands = {"accept": [], "llm": [], "reject": []}
+    started = time.perf_counter()
+    for competitor, title, description, channel, relevant in FIXTURES:
+        score = score_video_relevance(title, description, channel, competitor)
+        band = "accept" if score >= ACCEPT_THRESHOLD else "reject" if score <= REJECT_THRESHOLD else "llm"
+        bands[band].append((competitor, title, relevant, score))
+        if args.verbose:
+            print(f"  {band:<6} {score:.2f} {'REL' if relevant else '---'}  {competitor}: {title}")
+    elapsed_us = (time.perf_counter() - started) / len(FIXTURES) * 1e6
+
+    total = len(FIXTURES)
+    relevant_total = sum(case[-1] for case in FIXTURES)
+    accepted, ambiguous, rejected = bands["accept"], bands["llm"], bands["reject"]
+    true_accepts = sum(case[2] for case in accepted)
+    wrong_rejects = [case for case in rejected if case[2]]
+
+    print(f"{total} labeled videos ({relevant_total} relevant), lexical scoring {elapsed_us:.0f} us/video")
+    print(f"  accepted without LLM: {len(accepted):>3} ({len(accepted) / total:.0%})  precision "
+          f"{(true_accepts / len(accepted)) if accepted else 1:.0%}")
+    print(f"  rejected without LLM: {len(rejected):>3} ({len(rejected) / total:.0%})  relevant videos lost "
+          f"{len(wrong_rejects)}")
+    print(f"  sent to the LLM:      {len(ambiguous):>3} ({len(ambiguous) / total:.0%})")
+    for competitor, title, _, score in wrong_rejects:
+        print(f"    lost: {competitor}: {title} ({score:.2f})")
+    for competitor, title, relevant, score in accepted:
+        if not relevant:
+            print(f"    false accept: {competitor}: {title} ({score:.2f})")
+
+    # LLM calls per scan: the fixtures grouped by competitor stand in for one scan each
+    scans = {}
+    for competitor, *_ in FIXTURES:
+        scans[competitor] = scans.get(competitor, 0) + 1
+    ambiguous_per_scan = {}
+    for competitor, *_ in ambiguous:
+        ambiguous_per_scan[competitor] = ambiguous_per_scan.get(competitor, 0) + 1
+    legacy_calls = sum(math.ceil(n / LEGACY_BATCH_SIZE) for n in scans.values())
+    cascade_calls = sum(math.ceil(n / CASCADE_BATCH_SIZE) for n in ambiguous_per_scan.values())
+    print(f"  LLM relevance calls for {len(scans)} scans: {legacy_calls} before, {cascade_calls} with the cascade "
+          f"({total} -> {len(ambiguous)} videos in prompts)")
+
+
+if __name__ == "__main__":
+    main()
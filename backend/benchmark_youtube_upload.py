@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Check resumable YouTube uploads against a local fake upload server
+
+Starts an in-process server that speaks the YouTube resumable upload protocol
+(session POST, chunked PUTs answered with 308 + Range, "bytes */total" status
+queries), injects dropped connections mid-chunk and 503s, and uploads a large
+temporary file through YouTubeService.upload_video_stream. Asserts that:
+- the bytes the server received hash to the same digest as the file
+- the upload resumed from the acknowledged offset after every injected failure
+- peak RSS growth stays bounded by a few chunks, independent of the file size
+
+Usage: python benchmark_youtube_upload.py [--size-mb 1024] [--chunk-mb 8] [--fail-every 7]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:  # Not a backend dependency: fall back to the kernel's peak RSS
+    psutil = None
+    import resource
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.services.youtube_service import YouTubeService, upload_progress  # noqa: E402
+
+MIB = 1024 * 1024
+_RANGE_RE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class FakeUploadSession:
+    def __init__(self, total_bytes: int):
+        self.total_bytes = total_bytes
+        self.received = 0
+        self.digest = hashlib.sha256()
+        self.chunk_puts = 0
+        self.injected_failures = 0
+        self.resumed_offsets = []
+        self.lock = threading.Lock()
+
+
+class FakeYouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sessions = {}
+    fail_every = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self._drain(int(self.headers.get("Content-Length", 0)))
+        session_id = f"s{len(self.sessions) + 1}"
+        self.sessions[session_id] = FakeUploadSession(int(self.headers["X-Upload-Content-Length"]))
+        host, port = self.server.server_address
+        self._respond(200, headers={"Location": f"http://{host}:{port}/upload/{session_id}"})
+
+    def do_PUT(self):
+        session = self.sessions[self.path.rsplit("/", 1)[1]]
+        length = int(self.headers.get("Content-Length", 0))
+        content_range = self.headers.get("Content-Range", "")
+
+        with session.lock:
+            if content_range.startswith("bytes */"):
+                self._drain(length)
+                return self._acknowledge(session)
+
+            start, end, _ = map(int, _RANGE_RE.match(content_range).groups())
+            if start != session.received:
+                session.resumed_offsets.append((start, session.received))
+                self._drain(length)
+                return self._acknowledge(session)
+
+            session.chunk_puts += 1
+            failure = self.fail_every and session.chunk_puts % self.fail_every == 0
+            if failure and session.chunk_puts % (2 * self.fail_every) == 0:
+                # Store only part of the chunk and drop the connection
+                session.injected_failures += 1
+                self._consume(session, length // 3)
+                self.close_connection = True
+                self.connection.shutdown(2)
+                return
+            if failure:
+                session.injected_failures += 1
+                self._drain(length)
+                return self._respond(503, body=b'{"error": "backendError"}')
+
+            self._consume(session, length)
+            if session.received == session.total_bytes:
+                body = json.dumps({
+                    "id": "fake-video-id",
+                    "snippet": {"title": "benchmark"},
+                    "status": {"uploadStatus": "uploaded", "privacyStatus": "private"}
+                }).encode()
+                return self._respond(200, body=body)
+            return self._acknowledge(session)
+
+    def _consume(self, session, length):
+        remaining = length
+        while remaining:
+            data = self.rfile.read(min(remaining, 256 * 1024))
+            if not data:
+                break
+            session.digest.update(data)
+            session.received += len(data)
+            remaining -= len(data)
+
+    def _drain(self, length):
+        while length:
+            length -= len(self.rfile.read(min(length, 256 * 1024)))
+
+    def _acknowledge(self, session):
+        headers = {"Range": f"bytes=0-{session.received - 1}"} if session.received else {}
+        self._respond(308, headers=headers)
+
+    def _respond(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def write_test_file(size_bytes: int) -> tuple:
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as f:
+        written = 0
+        while written < size_bytes:
+            block = os.urandom(min(4 * MIB, size_bytes - written))
+            digest.update(block)
+            f.write(block)
+            written += len(block)
+        return f.name, digest.hexdigest()
+
+
+def _max_rss() -> int:
+    """Peak RSS of the process so far, in bytes (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class PeakRss:
+    """
+    Peak RSS growth inside the block: sampled with psutil when installed, otherwise
+    the growth of the process-lifetime peak from getrusage (a lower bound only when the
+    process had already peaked higher before the block)
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.process = psutil.Process() if psutil else None
+        self.interval = interval
+        self.baseline = self.process.memory_info().rss if self.process else _max_rss()
+        self.peak = self.baseline
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.process.memory_info().rss)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        if self.process:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.process:
+            self._stop.set()
+            self._thread.join()
+        else:
+            self.peak = _max_rss()
+
+    @property
+    def growth(self) -> int:
+        return self.peak - self.baseline
+
+
+async def run_upload(service: YouTubeService, path: str, chunk_size: int) -> dict:
+    with open(path, "rb") as video_file:
+        return await service.upload_video_stream(
+            access_token="fake-token",
+            video_file=video_file,
+            title="benchmark",
+            description="resumable upload benchmark",
+            upload_id="benchmark",
+            chunk_size=chunk_size
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    parser.add_argument("--fail-every", type=int, default=7, help="inject a failure every N chunk PUTs (0 = never)")
+    args = parser.parse_args()
+
+    FakeYouTubeHandler.fail_every = args.fail_every
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeYouTubeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    service = YouTubeService()
+    service.upload_url = f"http://127.0.0.1:{server.server_address[1]}/upload/youtube/v3/videos"
+    service.retry_backoff = 0.01
+    chunk_size = args.chunk_mb * MIB
+
+    print(f"Writing {args.size_mb} MiB test file ...")
+    path, expected_digest = write_test_file(args.size_mb * MIB)
+    try:
+        with PeakRss() as rss:
+            started = time.perf_counter()
+            result = asyncio.run(run_upload(service, path, chunk_size))
+            elapsed = time.perf_counter() - started
+
+        session = next(iter(FakeYouTubeHandler.sessions.values()))
+        progress = upload_progress.get(None, "benchmark")
+        print(f"  result: success={result['success']} video_id={result.get('video_id')} error={result.get('error')}")
+        print(f"  {args.size_mb} MiB in {elapsed:.1f} s ({args.size_mb / elapsed:.0f} MiB/s), "
+              f"{session.chunk_puts} chunk PUTs, {session.injected_failures} injected failures, "
+              f"{progress['retries']} client retries")
+        print(f"  RSS baseline {rss.baseline / MIB:.0f} MiB, peak {rss.peak / MIB:.0f} MiB, "
+              f"growth {rss.growth / MIB:.0f} MiB (chunk {args.chunk_mb} MiB)")
+
+        assert result["success"], result.get("error")
+        assert session.digest.hexdigest() == expected_digest, "uploaded bytes differ from the file"
+        assert session.resumed_offsets == [], f"client resent from a stale offset: {session.resumed_offsets}"
+        assert progress["status"] == "completed" and progress["percent"] == 100.0
+        bound = 6 * chunk_size + 64 * MIB
+        assert rss.growth < bound, f"RSS grew {rss.growth / MIB:.0f} MiB, bound {bound / MIB:.0f} MiB"
+        print("  OK: digest matches, resumed from acknowledged offsets, RSS bounded")
+    finally:
+        server.shutdown()
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
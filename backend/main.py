@@ -14,28 +14,20 @@ import time
 # from app.core.windows_compatibility import setup_windows_compatibility
 # setup_windows_compatibility()
 
-# Configure logging early - only show essential logs
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from app.core.config import settings
+from app.core.logging_config import configure_from_settings
+from app.core.metrics import RequestTimingMiddleware, metrics
 
-# Reduce verbosity of third-party libraries
-logging.getLogger('urllib3').setLevel(logging.WARNING)
-logging.getLogger('httpx').setLevel(logging.WARNING)
-logging.getLogger('asyncio').setLevel(logging.WARNING)
+# Configure logging early (queued, per-module levels; third-party libraries at WARNING)
+configure_from_settings(settings)
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import os
-from pathlib import Path
-import importlib.util
+import importlib
 
-from app.core.config import settings
 from app.api.v1.api import api_router
 from app.core.database import init_db, get_connection_mode
 
@@ -45,10 +37,20 @@ roi_scheduler_running = False
 monitoring_scheduler_task = None
 monitoring_scheduler_running = False
 
+ROI_SCHEDULER_MODULE = "app.services.roi.roi.services.scheduler"
+
+def load_roi_scheduler():
+    """Import the ROI scheduler module once; start and stop must use the same instance"""
+    return importlib.import_module(ROI_SCHEDULER_MODULE)
+
 def start_roi_scheduler():
     """Start the ROI scheduler in a separate thread"""
     global roi_scheduler_thread, roi_scheduler_running
     
+    if not settings.ROI_SCHEDULER_ENABLED:
+        print("⏸️  ROI scheduler disabled (set ROI_SCHEDULER_ENABLED=true to start it)")
+        return
+    
     if roi_scheduler_running:
         print("🔄 ROI scheduler is already running")
         return
@@ -56,38 +58,15 @@ def start_roi_scheduler():
     try:
         print("🚀 Starting ROI scheduler...")
         
-        # Import the ROI scheduler using importlib to handle spaces in folder names
-        import importlib.util
-        from pathlib import Path
-        
-        # Get the path to the scheduler file
-        backend_path = Path(__file__).parent
-        scheduler_path = backend_path / "app" / "core" / "ROI backend" / "roi" / "services" / "scheduler.py"
-        
-        if not scheduler_path.exists():
-            raise ImportError(f"Scheduler file not found at: {scheduler_path}")
-        
-        # Load the scheduler module
-        spec = importlib.util.spec_from_file_location("roi_scheduler", str(scheduler_path))
-        if spec and spec.loader:
-            scheduler_module = importlib.util.module_from_spec(spec)
-            import sys
-            if spec.name:
-                sys.modules[spec.name] = scheduler_module
-            spec.loader.exec_module(scheduler_module)
-            
-            # Now we can use the functions
-            start_scheduler = getattr(scheduler_module, "start_scheduler")
-            start_scheduler()
-            roi_scheduler_running = True
-            print("✅ ROI scheduler started successfully")
-        else:
-            raise ImportError("Failed to load scheduler module")
+        scheduler_module = load_roi_scheduler()
+        scheduler_module.start_scheduler()
+        roi_scheduler_running = True
+        print("✅ ROI scheduler started successfully")
         
     except ImportError as e:
         print(f"❌ Failed to import ROI scheduler: {e}")
         print("   Make sure the ROI backend services are properly installed")
-        print("   Path should be: app/core/ROI backend/roi/services/")
+        print(f"   Module should be: {ROI_SCHEDULER_MODULE}")
     except Exception as e:
         print(f"❌ Failed to start ROI scheduler: {e}")
         print("   ROI updates will not be available")
@@ -98,30 +77,9 @@ def stop_roi_scheduler():
     
     if roi_scheduler_running:
         try:
-            # Import and stop the scheduler using the same approach
-            import importlib.util
-            from pathlib import Path
-            
-            backend_path = Path(__file__).parent
-            scheduler_path = backend_path / "app" / "core" / "ROI backend" / "roi" / "services" / "scheduler.py"
-            
-            if scheduler_path.exists():
-                spec = importlib.util.spec_from_file_location("roi_scheduler", str(scheduler_path))
-                if spec and spec.loader:
-                    scheduler_module = importlib.util.module_from_spec(spec)
-                    import sys
-                    if spec.name:
-                        sys.modules[spec.name] = scheduler_module
-                    spec.loader.exec_module(scheduler_module)
-                    
-                    stop_scheduler = getattr(scheduler_module, "stop_scheduler")
-                    stop_scheduler()
-                    roi_scheduler_running = False
-                    print("🛑 ROI scheduler stopped")
-                else:
-                    print("⚠️  Could not load scheduler module for stopping")
-            else:
-                print("⚠️  Scheduler file not found for stopping")
+            load_roi_scheduler().stop_scheduler()
+            roi_scheduler_running = False
+            print("🛑 ROI scheduler stopped")
                 
         except Exception as e:
             print(f"⚠️  Warning: Could not stop ROI scheduler cleanly: {e}")
@@ -163,6 +121,21 @@ def start_monitoring_scheduler():
         print(f"❌ Failed to start monitoring scheduler: {e}")
         print("   Continuous monitoring will not be available")
 
+async def start_schedulers_in_background():
+    """
+    LAZY_STARTUP: import the scheduler modules in a worker thread after the app is
+    serving, then start the schedulers on the main loop as usual
+    """
+    try:
+        if settings.ROI_SCHEDULER_ENABLED:
+            await asyncio.to_thread(load_roi_scheduler)
+        await asyncio.to_thread(importlib.import_module, "app.services.monitoring.scheduler")
+    except Exception as e:
+        # start_*_scheduler below reports the import failure
+        print(f"⚠️  Scheduler preload failed: {e}")
+    start_roi_scheduler()
+    start_monitoring_scheduler()
+
 def stop_monitoring_scheduler():
     """Stop the monitoring scheduler"""
     global monitoring_scheduler_running
@@ -197,17 +170,38 @@ def stop_monitoring_scheduler():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
-    # Startup
+    # Startup: refuse to boot without the persistent monitoring state disk when it is required
+    from app.core.state_db import check_state_dir
+    check_state_dir()
+    
     try:
         await init_db()
         connection_mode = get_connection_mode()
         print(f"✅ Database initialized successfully in {connection_mode} mode")
         
-        # Start ROI scheduler
-        start_roi_scheduler()
+        if settings.LAZY_STARTUP:
+            # Serve requests right away; the schedulers come up in the background
+            app.state.scheduler_startup = asyncio.create_task(start_schedulers_in_background())
+        else:
+            # Start ROI scheduler
+            start_roi_scheduler()
+            
+            # Start monitoring scheduler
+            start_monitoring_scheduler()
+        
+        # Cross-worker relay for SSE events (process-local unless configured)
+        from app.core.event_broker import event_broker
+        await event_broker.start(settings.EVENT_BROKER_REDIS_URL)
+        
+        # Start background social insights sync
+        if settings.INSIGHTS_SYNC_ENABLED:
+            from app.services.social_insights import insights_sync_service
+            insights_sync_service.start()
         
-        # Start monitoring scheduler
-        start_monitoring_scheduler()
+        # Publish scheduled content uploads once they are due
+        if settings.PUBLISH_SCHEDULER_ENABLED:
+            from app.services.publishing import publish_job_engine
+            publish_job_engine.start_scheduler()
         
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
@@ -223,6 +217,22 @@ async def lifespan(app: FastAPI):
         # Stop ROI scheduler
         stop_roi_scheduler()
         
+        # Stop background social insights sync
+        from app.services.social_insights import insights_sync_service
+        await insights_sync_service.stop()
+        
+        # Stop publishing scheduled uploads
+        from app.services.publishing import publish_job_engine
+        await publish_job_engine.stop_scheduler()
+        
+        # Stop relaying SSE events
+        from app.core.event_broker import event_broker
+        await event_broker.stop()
+        
+        # Close pooled Graph API connections
+        from app.services.publishing import close_graph_client
+        await close_graph_client()
+        
         # Cleanup database
         from app.core.database import close_db
         await close_db()
@@ -253,6 +263,21 @@ def create_app() -> FastAPI:
     # Include API router
     app.include_router(api_router, prefix="/api/v1")
     
+    if settings.LAZY_STARTUP:
+        # Endpoint routers are imported and mounted on first use
+        from app.api.v1.lazy import LazyRouterLoader, LazyRouterMiddleware
+        app.state.router_loader = LazyRouterLoader(app, api_prefix="/api/v1")
+        app.add_middleware(LazyRouterMiddleware, loader=app.state.router_loader)
+    
+    if settings.METRICS_ENABLED:
+        # Added last so it is outermost: timings include lazy router loading
+        app.add_middleware(RequestTimingMiddleware)
+        
+        @app.get("/metrics", include_in_schema=False)
+        async def prometheus_metrics():
+            """Dependency and route latency histograms in Prometheus text format"""
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+    
     return app
 
 
@@ -267,7 +292,7 @@ if __name__ == "__main__":
     print(f"🌐 Host: {settings.HOST}")
     print(f"🔌 Port: {settings.PORT}")
     print(f"🐛 Debug: {settings.DEBUG}")
-    print(f"📊 ROI Scheduler: Will start automatically")
+    print(f"📊 ROI Scheduler: {'Will start automatically' if settings.ROI_SCHEDULER_ENABLED else 'Disabled'}")
     print(f"🔍 Monitoring Scheduler: Will start automatically")
     
     uvicorn.run(